@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+计算器的批量求值命令行（不需要图形界面）。
+
+从文件或标准输入逐行读取表达式，用计算器同一个表达式引擎和数值后端求值，
+结果按输入顺序流式输出为文本或 CSV，最后在标准错误上报告吞吐量。
+
+- 一行一个表达式；"表达式 = 答案" 的行同时检查答案（用于批改作业）
+- 空行和以 # 开头的行被忽略
+- 只导入 modules.expression 和 modules.numeric，不导入 PyQt，也不创建 QApplication
+- --jobs N 时按块分发到进程池；同时在途的块数有上限，大文件不会整个读入内存
+
+示例:
+    python calc_batch.py devoirs.txt
+    python calc_batch.py --mode fraction --csv -o resultats.csv devoirs.txt
+    cat devoirs.txt | python calc_batch.py --jobs 4
+"""
+
+import argparse
+import csv
+import math
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from modules.expression import evaluate
+from modules.numeric import BACKENDS, DecimalBackend, FloatBackend, NumericBackend, get_backend
+
+# 一个结果行：(行号, 表达式, 结果, 期望答案, 是否正确, 错误信息)
+Row = Tuple[int, str, str, str, Optional[bool], str]
+
+CSV_HEADER = ('ligne', 'expression', 'resultat', 'attendu', 'correct', 'erreur')
+ERROR_TEXT = "Erreur"
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# 作业答案通常是一个数字，不必经过解析器
+_PLAIN_NUMBER = re.compile(r'-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+# 进程池中每个进程的数值后端（由 _init_worker 创建一次）
+_worker_backend: Optional[NumericBackend] = None
+
+
+def parse_line(text: str) -> Optional[Tuple[str, str]]:
+    """拆分一行为 (表达式, 期望答案)；没有答案时答案为空，空行和注释返回 None"""
+    text = text.strip()
+    if not text or text.startswith('#'):
+        return None
+    expression, _, expected = text.partition('=')
+    return expression.strip(), expected.strip()
+
+
+def answers_match(value, expected) -> bool:
+    """比较结果和期望答案；浮点数允许舍入误差"""
+    if isinstance(value, float) or isinstance(expected, float):
+        try:
+            return math.isclose(float(value), float(expected), rel_tol=1e-9, abs_tol=1e-12)
+        except (OverflowError, TypeError, ValueError):
+            return False
+    return value == expected
+
+
+def answer_value(expected: str, backend: NumericBackend):
+    """期望答案的值：纯数字直接转换，其余（如 1/2）按表达式求值"""
+    if _PLAIN_NUMBER.fullmatch(expected):
+        if expected.startswith('-'):
+            return backend.unary['-'](backend.number(expected[1:]))
+        return backend.number(expected)
+    return evaluate(expected, backend=backend)
+
+
+def evaluate_line(number: int, text: str, backend: NumericBackend) -> Optional[Row]:
+    """求值一行（与计算器的 = 按钮相同：出错时结果为 "Erreur"）"""
+    parsed = parse_line(text)
+    if parsed is None:
+        return None
+    expression, expected = parsed
+    try:
+        value = evaluate(expression, backend=backend)
+        result = backend.format(value)
+    except (ArithmeticError, ValueError, TypeError) as error:
+        return number, expression, ERROR_TEXT, expected, (False if expected else None), str(error)
+    if not expected:
+        return number, expression, result, expected, None, ''
+    try:
+        correct = answers_match(value, answer_value(expected, backend))
+    except (ArithmeticError, ValueError, TypeError) as error:
+        return number, expression, result, expected, False, f"Réponse illisible: {error}"
+    return number, expression, result, expected, correct, ''
+
+
+def evaluate_lines(lines: Iterable[Tuple[int, str]], backend: NumericBackend) -> List[Row]:
+    rows = []
+    for number, text in lines:
+        row = evaluate_line(number, text, backend)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def _init_worker(mode: str, precision: int):
+    global _worker_backend
+    _worker_backend = get_backend(mode, precision)
+
+
+def _evaluate_chunk(lines: List[Tuple[int, str]]) -> List[Row]:
+    return evaluate_lines(lines, _worker_backend)
+
+
+def _chunks(lines: Iterable[Tuple[int, str]], size: int) -> Iterator[List[Tuple[int, str]]]:
+    iterator = iter(lines)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run(lines: Iterable[str], mode: str = FloatBackend.name, precision: int = DecimalBackend.DEFAULT_PRECISION,
+        jobs: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Row]:
+    """按输入顺序逐块产生结果行
+
+    jobs > 1 时使用进程池；最多 2 × jobs 个块同时在途，结果仍按输入顺序产生。
+    """
+    numbered = enumerate(lines, 1)
+    if jobs <= 1:
+        backend = get_backend(mode, precision)
+        for chunk in _chunks(numbered, chunk_size):
+            yield from evaluate_lines(chunk, backend)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(mode, precision)) as executor:
+        pending = deque()
+        for chunk in _chunks(numbered, chunk_size):
+            pending.append(executor.submit(_evaluate_chunk, chunk))
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def format_row(row: Row) -> str:
+    """文本输出的一行"""
+    _, expression, result, expected, correct, error = row
+    text = f"{expression} = {result}"
+    if error:
+        text += f"  ({error})"
+    if correct is True:
+        text += "  ✓"
+    elif correct is False:
+        text += f"  ✗ (réponse: {expected})"
+    return text
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'oui' if value else 'non'
+    return str(value)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Évalue des expressions (une par ligne, « expression = réponse » pour corriger) "
+                    "avec le moteur de la calculatrice, sans interface graphique.")
+    parser.add_argument('inputs', nargs='*', default=['-'],
+                        help="fichiers d'expressions (- ou rien pour l'entrée standard)")
+    parser.add_argument('--mode', choices=list(BACKENDS), default=FloatBackend.name,
+                        help="mode de calcul (float, fraction ou decimal)")
+    parser.add_argument('--precision', type=int, default=DecimalBackend.DEFAULT_PRECISION,
+                        help="chiffres significatifs du mode decimal")
+    parser.add_argument('--csv', action='store_true', help="sortie au format CSV")
+    parser.add_argument('-o', '--output', help="fichier de sortie (sortie standard par défaut)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="nombre de processus (0 = un par cœur)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="lignes par bloc envoyé à un processus")
+    parser.add_argument('-q', '--quiet', action='store_true', help="ne pas afficher le débit")
+    return parser
+
+
+def _read_inputs(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if path == '-':
+            yield from sys.stdin
+        else:
+            with open(path, encoding='utf-8') as file:
+                yield from file
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.precision < 1 or args.chunk_size < 1:
+        print("Erreur: la précision et la taille des blocs doivent être positives", file=sys.stderr)
+        return 2
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    writer = csv.writer(output) if args.csv else None
+    if writer is not None:
+        writer.writerow(CSV_HEADER)
+
+    count = errors = graded = correct = 0
+    start = time.perf_counter()
+    try:
+        for row in run(_read_inputs(args.inputs), args.mode, args.precision, jobs, args.chunk_size):
+            count += 1
+            if row[5]:
+                errors += 1
+            if row[4] is not None:
+                graded += 1
+                correct += row[4]
+            if writer is not None:
+                writer.writerow([_cell(value) for value in row])
+            else:
+                output.write(format_row(row) + '\n')
+    except OSError as error:
+        print(f"Erreur: {error}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        else:
+            output.flush()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        rate_text = f"{rate:,.0f}".replace(',', ' ')
+        summary = f"{count} expressions en {elapsed:.2f} s ({rate_text} expr/s, {jobs} processus), {errors} erreurs"
+        if graded:
+            summary += f", {correct}/{graded} réponses correctes"
+        print(summary, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
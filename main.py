@@ -8,25 +8,33 @@
 
 import sys
 import os
+import time
+
+# 进程启动时间，用于测量首帧时间
+_START_TIME = time.perf_counter()
+
+# 启动性能分析（--profile-startup[=前缀] 或 GEOMETRY_PROFILE_STARTUP）：
+# 导入钩子必须在导入 PyQt 之前安装
+from modules import startup_profiler
+startup_profiler.configure(sys.argv, _START_TIME)
 
 # 安装与导入依赖检查
 try:
     # 尝试导入核心PyQt6模块
-    from PyQt6.QtCore import QLibraryInfo
-    from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                                QGridLayout, QMessageBox)
-    from PyQt6.QtGui import QFont
+    with startup_profiler.span("Import PyQt6", 'qt'):
+        from PyQt6.QtCore import QLibraryInfo, QEvent, QTimer
+        from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                                    QGridLayout, QMessageBox)
+        from PyQt6.QtGui import QFont
     
     # 设置Qt插件路径 - 确保插件可以被正确加载
     plugins_path = QLibraryInfo.path(QLibraryInfo.LibraryPath.PluginsPath)
     os.environ["QT_QPA_PLATFORM_PLUGIN_PATH"] = plugins_path
     
-    # 导入应用程序自定义模块
+    # 导入应用程序自定义模块（几何和计算器模块较重，由下面的工厂在需要时导入）
     try:
         from modules.ui_components_pyqt import MetroButton, BaseModule
-        # 从重构后的几何模块导入GeometryModuleRefactored类
-        from modules.geometry_module_refactored import GeometryModuleRefactored
-        from modules.calculator_module_pyqt import CalculatorModule
+        from modules import theme
         # 可以添加一个调试打印
         print("Modules importés avec succès")
     except ImportError as e:
@@ -39,6 +47,29 @@ except ImportError as e:
     print("Veuillez installer PyQt6: pip install PyQt6")
     sys.exit(1)
 
+# 首帧之后空闲预热各模块前的等待时间（毫秒）；GEOMETRY_PREWARM=0 时不预热
+PREWARM_DELAY_MS = 200
+
+
+def _create_geometry_module():
+    # 从重构后的几何模块导入GeometryModuleRefactored类
+    from modules.geometry_module_refactored import GeometryModuleRefactored
+    return GeometryModuleRefactored()
+
+
+def _create_calculator_module():
+    from modules.calculator_module_pyqt import CalculatorModule
+    return CalculatorModule()
+
+
+# 模块工厂：模块（连同 NumPy 等依赖）在第一次显示或空闲预热时才导入和创建，
+# 主页面不必等它们就能显示
+MODULE_FACTORIES = {
+    'geometry': _create_geometry_module,
+    'calculator': _create_calculator_module,
+}
+
+
 class MainApp(QMainWindow):
     """主应用程序类，管理应用程序的主界面和模块切换"""
     def __init__(self):
@@ -54,8 +85,16 @@ class MainApp(QMainWindow):
             'undo': '#FF5722',       # 撤销按钮橙色
         }
         
+        # 已创建的模块（名称 → 模块），由 module() 按需创建
+        self._modules = {}
+        self.first_frame_ms = None
+        self._prewarm_queue = []
+        
         self._setup_ui()
         
+        # 第一次绘制时记录首帧时间，然后开始空闲预热
+        self.installEventFilter(self)
+        
     def _setup_ui(self):
         """设置用户界面"""
         # 创建主容器
@@ -63,7 +102,7 @@ class MainApp(QMainWindow):
         self.setCentralWidget(self.central_widget)
         self.main_layout = QVBoxLayout(self.central_widget)
         self.main_layout.setContentsMargins(0, 0, 0, 0)
-        self.central_widget.setStyleSheet("background-color: #FFFFFF;")
+        theme.set_surface(self.central_widget, 'window')
         
         # 创建主页面和模块页面容器
         self.home_widget = QWidget()
@@ -75,15 +114,6 @@ class MainApp(QMainWindow):
         self.module_widget.hide()
         self.main_layout.addWidget(self.module_widget)
         
-        # 初始化模块 - 使用正确的类名
-        self.geometry_module = GeometryModuleRefactored()
-        self.calculator_module = CalculatorModule()
-        
-        self.module_layout.addWidget(self.geometry_module)
-        self.module_layout.addWidget(self.calculator_module)
-        self.geometry_module.hide()
-        self.calculator_module.hide()
-        
         # 创建主页面按钮
         self._create_home_buttons()
 
@@ -116,6 +146,65 @@ class MainApp(QMainWindow):
         button_layout.setHorizontalSpacing(30)
         button_layout.setVerticalSpacing(30)
 
+    @property
+    def geometry_module(self):
+        return self.module('geometry')
+    
+    @property
+    def calculator_module(self):
+        return self.module('calculator')
+    
+    def module(self, name):
+        """取得模块，第一次使用时导入并创建；失败时显示错误并返回 None"""
+        module = self._modules.get(name)
+        if module is not None:
+            return module
+        try:
+            with startup_profiler.span(f"Module {name}", 'module'):
+                module = MODULE_FACTORIES[name]()
+        except ImportError as e:
+            print(f"Erreur: Impossible d'importer le module {name}: {e}")
+            QMessageBox.critical(self, "Erreur", f"Impossible de charger le module: {e}")
+            return None
+        module.hide()
+        self.module_layout.addWidget(module)
+        self._modules[name] = module
+        return module
+    
+    def eventFilter(self, watched, event):
+        if watched is self and event.type() == QEvent.Type.Paint and self.first_frame_ms is None:
+            self.first_frame_ms = (time.perf_counter() - _START_TIME) * 1000
+            print(f"Première image affichée en {self.first_frame_ms:.0f} ms")
+            self.removeEventFilter(self)
+            startup_profiler.mark("Première image", 'paint')
+            # 同一轮的绘制全部完成后才处理这个定时器，区间即第一次绘制的耗时
+            paint_start = time.perf_counter()
+            QTimer.singleShot(0, lambda: self._first_frame_painted(paint_start))
+        return super().eventFilter(watched, event)
+    
+    def _first_frame_painted(self, paint_start):
+        profiler = startup_profiler.active()
+        if profiler is not None:
+            profiler.record("Premier paintEvent", 'paint', paint_start, time.perf_counter())
+        if os.environ.get('GEOMETRY_PREWARM', '1') != '0':
+            self._prewarm_queue = [name for name in MODULE_FACTORIES if name not in self._modules]
+            QTimer.singleShot(PREWARM_DELAY_MS, self._prewarm_next)
+        else:
+            startup_profiler.write()
+    
+    def _prewarm_next(self):
+        """空闲时创建一个尚未创建的模块，每次一个，两次之间处理界面事件"""
+        while self._prewarm_queue:
+            name = self._prewarm_queue.pop(0)
+            if name not in self._modules:
+                self.module(name)
+                break
+        if self._prewarm_queue:
+            QTimer.singleShot(0, self._prewarm_next)
+        else:
+            # 预热结束即启动结束
+            startup_profiler.write()
+    
     def show_home(self):
         """显示主页面"""
         self.module_widget.hide()
@@ -123,17 +212,22 @@ class MainApp(QMainWindow):
         
     def show_geometry_module(self):
         """显示几何模块"""
-        self.home_widget.hide()
-        self.module_widget.show()
-        self.calculator_module.hide_module()
-        self.geometry_module.show_module()
+        self._show_module('geometry')
         
     def show_calculator_module(self):
         """显示计算器模块"""
+        self._show_module('calculator')
+    
+    def _show_module(self, name):
+        module = self.module(name)
+        if module is None:
+            return
         self.home_widget.hide()
         self.module_widget.show()
-        self.geometry_module.hide_module()
-        self.calculator_module.show_module()
+        for other in self._modules.values():
+            if other is not module:
+                other.hide_module()
+        module.show_module()
         
     def back_to_home(self):
         """返回主页面"""
@@ -159,9 +253,17 @@ if __name__ == "__main__":
                 print(f"Erreur: Fichier de module requis manquant {module}")
                 sys.exit(1)
                 
-        app = QApplication(sys.argv)
-        window = MainApp()
-        window.show()
+        with startup_profiler.span("QApplication", 'qt'):
+            app = QApplication(sys.argv)
+        # 整个应用程序的样式表只编译和安装一次
+        with startup_profiler.span("Thème", 'qt'):
+            theme.install()
+        # 退出时再写一次，包含启动后才创建的模块和按需导入
+        app.aboutToQuit.connect(startup_profiler.write)
+        with startup_profiler.span("MainApp", 'module'):
+            window = MainApp()
+        with startup_profiler.span("window.show", 'qt'):
+            window.show()
         sys.exit(app.exec())
     except Exception as e:
         print(f"Erreur lors du démarrage de l'application: {str(e)}")
@@ -0,0 +1,533 @@
+"""
+面积引擎，计算多个圆形和矩形的并集面积以及两两重叠面积。
+
+- 只有轴对齐矩形时使用扫描线 + 线段树，复杂度 O(n log n)
+- 含有圆形（或旋转后的多边形）时使用精确的边界积分法：
+  求出每个图形未被其他图形覆盖的边界（圆弧和线段），
+  再用格林公式 A = ½∮(x dy - y dx) 累加得到并集面积
+"""
+import math
+import time
+import random
+from typing import Dict, Any, List, Tuple, Optional, Iterable
+
+TWO_PI = 2 * math.pi
+EPS = 1e-9
+
+# 图元表示：
+#   ('circle', cx, cy, r)
+#   ('polygon', vertices, half_planes)  顶点按逆时针排列，half_planes 为 (nx, ny, d)，内部满足 nx*x + ny*y <= d
+Primitive = Tuple
+
+
+def circle_primitive(cx: float, cy: float, r: float) -> Primitive:
+    """创建圆形图元"""
+    return ('circle', float(cx), float(cy), float(r))
+
+
+def polygon_primitive(vertices: List[Tuple[float, float]]) -> Primitive:
+    """创建凸多边形图元（矩形、三角形等）"""
+    pts = [(float(x), float(y)) for x, y in vertices]
+    # 保证逆时针方向（有向面积为正）
+    if _signed_area(pts) < 0:
+        pts.reverse()
+    half_planes = []
+    for i in range(len(pts)):
+        x1, y1 = pts[i]
+        x2, y2 = pts[(i + 1) % len(pts)]
+        nx, ny = y2 - y1, x1 - x2  # 外法线
+        half_planes.append((nx, ny, nx * x1 + ny * y1))
+    return ('polygon', pts, half_planes)
+
+
+def rect_primitive(x1: float, y1: float, x2: float, y2: float) -> Primitive:
+    """创建轴对齐矩形图元"""
+    min_x, max_x = min(x1, x2), max(x1, x2)
+    min_y, max_y = min(y1, y2), max(y1, y2)
+    return polygon_primitive([(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)])
+
+
+def shape_to_primitive(shape: Dict[str, Any]) -> Optional[Primitive]:
+    """将 Canvas.shapes 中的形状字典转换为图元，不支持的类型返回 None"""
+    shape_type = shape.get('type')
+    if shape_type == 'circle':
+        center_x, center_y = shape['center']
+        if shape['radius'] <= 0:
+            return None
+        return circle_primitive(center_x, center_y, shape['radius'])
+    if shape_type in ('rectangle', 'triangle'):
+        vertices = shape.get('vertices') or []
+        if len(vertices) < 3 or abs(_signed_area(vertices)) <= EPS:
+            return None
+        return polygon_primitive(vertices)
+    return None
+
+
+def primitive_area(prim: Primitive) -> float:
+    """单个图元的面积"""
+    if prim[0] == 'circle':
+        return math.pi * prim[3] * prim[3]
+    return abs(_signed_area(prim[1]))
+
+
+def primitive_bbox(prim: Primitive) -> Tuple[float, float, float, float]:
+    """图元的包围盒 (min_x, min_y, max_x, max_y)"""
+    if prim[0] == 'circle':
+        _, cx, cy, r = prim
+        return cx - r, cy - r, cx + r, cy + r
+    xs = [p[0] for p in prim[1]]
+    ys = [p[1] for p in prim[1]]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def union_area(primitives: List[Primitive]) -> float:
+    """计算图元并集的精确面积"""
+    primitives = [p for p in primitives if p is not None]
+    if not primitives:
+        return 0.0
+    rects = [_axis_aligned_rect(p) for p in primitives]
+    if all(r is not None for r in rects):
+        return rectangle_union_area(rects)
+    return _boundary_union_area(primitives)
+
+
+def rectangle_union_area(rects: List[Tuple[float, float, float, float]]) -> float:
+    """扫描线 + 线段树计算轴对齐矩形并集面积
+
+    Args:
+        rects: (min_x, min_y, max_x, max_y) 列表
+    """
+    events = []
+    ys = set()
+    for min_x, min_y, max_x, max_y in rects:
+        if max_x - min_x <= 0 or max_y - min_y <= 0:
+            continue
+        events.append((min_x, 1, min_y, max_y))
+        events.append((max_x, -1, min_y, max_y))
+        ys.add(min_y)
+        ys.add(max_y)
+    if not events:
+        return 0.0
+
+    ys = sorted(ys)
+    y_index = {y: i for i, y in enumerate(ys)}
+    tree = _CoverageTree(ys)
+    events.sort(key=lambda e: e[0])
+
+    area = 0.0
+    prev_x = events[0][0]
+    for x, delta, y1, y2 in events:
+        area += tree.covered() * (x - prev_x)
+        tree.add(y_index[y1], y_index[y2], delta)
+        prev_x = x
+    return area
+
+
+def overlap_area(a: Primitive, b: Primitive) -> float:
+    """两个图元的重叠面积"""
+    if not _bboxes_intersect(primitive_bbox(a), primitive_bbox(b)):
+        return 0.0
+    if a[0] == 'circle' and b[0] == 'circle':
+        return _circle_lens_area(a, b)
+    rect_a, rect_b = _axis_aligned_rect(a), _axis_aligned_rect(b)
+    if rect_a is not None and rect_b is not None:
+        w = min(rect_a[2], rect_b[2]) - max(rect_a[0], rect_b[0])
+        h = min(rect_a[3], rect_b[3]) - max(rect_a[1], rect_b[1])
+        return max(0.0, w) * max(0.0, h)
+    area = primitive_area(a) + primitive_area(b) - _boundary_union_area([a, b])
+    return max(0.0, area)
+
+
+def overlap_areas(primitives: List[Primitive]) -> List[Tuple[int, int, float]]:
+    """计算所有两两重叠面积，只返回面积大于 0 的 (i, j, area)，i < j"""
+    result = []
+    for i, j in _candidate_pairs(primitives):
+        area = overlap_area(primitives[i], primitives[j])
+        if area > EPS:
+            result.append((i, j, area))
+    return result
+
+
+def scene_union_area(canvas, indices: Optional[Iterable[int]] = None) -> float:
+    """计算画布（或其中选定形状）的并集面积，单位为网格单位²
+
+    Args:
+        canvas: Canvas 实例
+        indices: Canvas.shapes 中的下标，None 表示整个场景
+    """
+    primitives = [p for _, p in _scene_primitives(canvas, indices)]
+    return union_area(primitives) / (canvas.grid_spacing ** 2)
+
+
+def scene_overlap_areas(canvas, indices: Optional[Iterable[int]] = None) -> List[Tuple[int, int, float]]:
+    """计算画布形状的两两重叠面积，返回 (Canvas.shapes 下标 i, 下标 j, 网格单位²面积)"""
+    entries = _scene_primitives(canvas, indices)
+    primitives = [p for _, p in entries]
+    scale = canvas.grid_spacing ** 2
+    return [(entries[i][0], entries[j][0], area / scale)
+            for i, j, area in overlap_areas(primitives)]
+
+
+def _scene_primitives(canvas, indices) -> List[Tuple[int, Primitive]]:
+    """收集画布形状对应的图元，保留原始下标"""
+    if indices is None:
+        indices = range(len(canvas.shapes))
+    entries = []
+    for index in indices:
+        prim = shape_to_primitive(canvas.shapes[index])
+        if prim is not None:
+            entries.append((index, prim))
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# 扫描线使用的线段树
+# ---------------------------------------------------------------------------
+
+class _CoverageTree:
+    """记录压缩坐标区间被覆盖长度的线段树"""
+
+    def __init__(self, ys: List[float]):
+        self.ys = ys
+        size = max(1, len(ys) - 1)
+        self.count = [0] * (4 * size)
+        self.length = [0.0] * (4 * size)
+        self.size = size
+
+    def covered(self) -> float:
+        """当前被覆盖的总长度"""
+        return self.length[1]
+
+    def add(self, lo: int, hi: int, delta: int):
+        """对压缩区间 [lo, hi) 增加覆盖计数"""
+        if lo < hi:
+            self._add(1, 0, self.size, lo, hi, delta)
+
+    def _add(self, node: int, left: int, right: int, lo: int, hi: int, delta: int):
+        if hi <= left or right <= lo:
+            return
+        if lo <= left and right <= hi:
+            self.count[node] += delta
+        else:
+            mid = (left + right) // 2
+            self._add(node * 2, left, mid, lo, hi, delta)
+            self._add(node * 2 + 1, mid, right, lo, hi, delta)
+        if self.count[node] > 0:
+            self.length[node] = self.ys[right] - self.ys[left]
+        elif right - left == 1:
+            self.length[node] = 0.0
+        else:
+            self.length[node] = self.length[node * 2] + self.length[node * 2 + 1]
+
+
+# ---------------------------------------------------------------------------
+# 边界积分法
+# ---------------------------------------------------------------------------
+
+def _boundary_union_area(primitives: List[Primitive]) -> float:
+    """用格林公式对并集边界积分计算面积"""
+    neighbours = _neighbour_lists(primitives)
+    total = 0.0
+    for i, prim in enumerate(primitives):
+        others = neighbours[i]
+        if prim[0] == 'circle':
+            total += _circle_boundary_integral(i, prim, [(j, primitives[j]) for j in others])
+        else:
+            total += _polygon_boundary_integral(i, prim, [(j, primitives[j]) for j in others])
+    return total
+
+
+def _circle_boundary_integral(index: int, circle: Primitive, others) -> float:
+    """圆上未被覆盖的圆弧对面积积分的贡献"""
+    _, cx, cy, r = circle
+    covered = []
+    for j, other in others:
+        if other[0] == 'circle':
+            intervals = _circle_covered_by_circle(circle, other, j < index)
+        else:
+            intervals = _circle_covered_by_polygon(circle, other)
+        if intervals is None:
+            return 0.0  # 整个圆被覆盖
+        covered.extend(intervals)
+
+    total = 0.0
+    for start, end in _complement(covered, 0.0, TWO_PI):
+        total += 0.5 * (r * r * (end - start)
+                        + r * cx * (math.sin(end) - math.sin(start))
+                        - r * cy * (math.cos(end) - math.cos(start)))
+    return total
+
+
+def _polygon_boundary_integral(index: int, polygon: Primitive, others) -> float:
+    """多边形未被覆盖的边对面积积分的贡献"""
+    vertices, half_planes = polygon[1], polygon[2]
+    total = 0.0
+    for k in range(len(vertices)):
+        x1, y1 = vertices[k]
+        x2, y2 = vertices[(k + 1) % len(vertices)]
+        normal = half_planes[k]
+        covered = []
+        for j, other in others:
+            if other[0] == 'circle':
+                interval = _segment_covered_by_circle(x1, y1, x2, y2, other)
+            else:
+                interval = _segment_covered_by_polygon(x1, y1, x2, y2, normal, other, j < index)
+            if interval is not None:
+                covered.append(interval)
+        dx, dy = x2 - x1, y2 - y1
+        for t0, t1 in _complement(covered, 0.0, 1.0):
+            ax, ay = x1 + dx * t0, y1 + dy * t0
+            bx, by = x1 + dx * t1, y1 + dy * t1
+            total += 0.5 * (ax * by - bx * ay)
+    return total
+
+
+def _circle_covered_by_circle(circle: Primitive, other: Primitive, other_first: bool):
+    """圆 circle 上被 other 覆盖的角度区间；None 表示完全覆盖"""
+    _, cx, cy, r = circle
+    _, ox, oy, orad = other
+    d = math.hypot(ox - cx, oy - cy)
+    if d <= EPS and abs(r - orad) <= EPS:
+        # 完全重合的圆，只保留下标较小者的边界
+        return None if other_first else []
+    if d >= r + orad:
+        return []
+    if d + r <= orad:
+        return None
+    if d + orad <= r:
+        return []
+    cos_half = (r * r + d * d - orad * orad) / (2 * r * d)
+    half = math.acos(max(-1.0, min(1.0, cos_half)))
+    mid = math.atan2(oy - cy, ox - cx)
+    return _normalized_interval(mid - half, mid + half)
+
+
+def _circle_covered_by_polygon(circle: Primitive, polygon: Primitive):
+    """圆上位于凸多边形内部的角度区间；None 表示完全覆盖"""
+    _, cx, cy, r = circle
+    allowed = [(0.0, TWO_PI)]
+    for nx, ny, d in polygon[2]:
+        norm = math.hypot(nx, ny)
+        k = (d - nx * cx - ny * cy) / (r * norm)
+        if k >= 1.0:
+            continue  # 整个圆都满足此半平面
+        if k <= -1.0:
+            return []
+        # cos(θ - φ) <= k  ⇔  θ ∈ [φ + acos k, φ + 2π - acos k]
+        phi = math.atan2(ny, nx)
+        a = math.acos(k)
+        allowed = _intersect_intervals(allowed, _normalized_interval(phi + a, phi + TWO_PI - a))
+        if not allowed:
+            return []
+    if len(allowed) == 1 and allowed[0][1] - allowed[0][0] >= TWO_PI - EPS:
+        return None
+    return allowed
+
+
+def _segment_covered_by_circle(x1, y1, x2, y2, circle: Primitive):
+    """线段参数区间中位于圆内的部分"""
+    _, cx, cy, r = circle
+    dx, dy = x2 - x1, y2 - y1
+    fx, fy = x1 - cx, y1 - cy
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - r * r
+    disc = b * b - 4 * a * c
+    if a <= EPS or disc <= 0:
+        return None
+    root = math.sqrt(disc)
+    t0 = max(0.0, (-b - root) / (2 * a))
+    t1 = min(1.0, (-b + root) / (2 * a))
+    return (t0, t1) if t1 > t0 else None
+
+
+def _segment_covered_by_polygon(x1, y1, x2, y2, edge_normal, polygon: Primitive, other_first: bool):
+    """Cyrus-Beck 裁剪：线段位于凸多边形内部的参数区间
+
+    与多边形某条边共线时：法线相反视为覆盖（内部边），
+    法线相同则只保留下标较小者的边。
+    """
+    t0, t1 = 0.0, 1.0
+    dx, dy = x2 - x1, y2 - y1
+    scale = math.hypot(dx, dy)
+    for nx, ny, d in polygon[2]:
+        norm = math.hypot(nx, ny)
+        tol = EPS * max(1.0, abs(d) / norm) * norm
+        start = nx * x1 + ny * y1 - d
+        end = nx * x2 + ny * y2 - d
+        if abs(start) <= tol and abs(end) <= tol:
+            same_direction = nx * edge_normal[0] + ny * edge_normal[1] > 0
+            if same_direction and not other_first:
+                return None
+            continue
+        denom = end - start
+        if abs(denom) <= EPS * norm * scale:
+            if start > tol:
+                return None
+            continue
+        t = -start / denom
+        if denom > 0:
+            t1 = min(t1, t)
+        else:
+            t0 = max(t0, t)
+        if t0 >= t1:
+            return None
+    return (t0, t1)
+
+
+def _circle_lens_area(a: Primitive, b: Primitive) -> float:
+    """两圆相交的透镜面积"""
+    _, ax, ay, r1 = a
+    _, bx, by, r2 = b
+    d = math.hypot(bx - ax, by - ay)
+    if d >= r1 + r2:
+        return 0.0
+    if d <= abs(r1 - r2):
+        small = min(r1, r2)
+        return math.pi * small * small
+    alpha = math.acos(max(-1.0, min(1.0, (d * d + r1 * r1 - r2 * r2) / (2 * d * r1))))
+    beta = math.acos(max(-1.0, min(1.0, (d * d + r2 * r2 - r1 * r1) / (2 * d * r2))))
+    return (r1 * r1 * (alpha - math.sin(2 * alpha) / 2)
+            + r2 * r2 * (beta - math.sin(2 * beta) / 2))
+
+
+# ---------------------------------------------------------------------------
+# 区间与候选对工具函数
+# ---------------------------------------------------------------------------
+
+def _normalized_interval(start: float, end: float) -> List[Tuple[float, float]]:
+    """将角度区间规范到 [0, 2π)，跨越 0 时拆分为两段"""
+    length = end - start
+    if length >= TWO_PI:
+        return [(0.0, TWO_PI)]
+    if length <= 0:
+        return []
+    start %= TWO_PI
+    end = start + length
+    if end <= TWO_PI:
+        return [(start, end)]
+    return [(start, TWO_PI), (0.0, end - TWO_PI)]
+
+
+def _intersect_intervals(a: List[Tuple[float, float]], b: List[Tuple[float, float]]):
+    """两组不相交区间的交集"""
+    result = []
+    for a0, a1 in a:
+        for b0, b1 in b:
+            lo, hi = max(a0, b0), min(a1, b1)
+            if hi > lo:
+                result.append((lo, hi))
+    return result
+
+
+def _complement(intervals: List[Tuple[float, float]], lo: float, hi: float) -> List[Tuple[float, float]]:
+    """[lo, hi] 中未被 intervals 覆盖的部分"""
+    result = []
+    cursor = lo
+    for start, end in sorted(intervals):
+        if start > cursor:
+            result.append((cursor, start))
+        cursor = max(cursor, end)
+        if cursor >= hi:
+            break
+    if cursor < hi:
+        result.append((cursor, hi))
+    return result
+
+
+def _signed_area(vertices) -> float:
+    """多边形有向面积（鞋带公式）"""
+    area = 0.0
+    n = len(vertices)
+    for i in range(n):
+        x1, y1 = vertices[i]
+        x2, y2 = vertices[(i + 1) % n]
+        area += x1 * y2 - x2 * y1
+    return area / 2
+
+
+def _axis_aligned_rect(prim: Primitive) -> Optional[Tuple[float, float, float, float]]:
+    """如果图元是轴对齐矩形，返回其包围盒"""
+    if prim[0] != 'polygon' or len(prim[1]) != 4:
+        return None
+    xs = {round(p[0], 9) for p in prim[1]}
+    ys = {round(p[1], 9) for p in prim[1]}
+    if len(xs) != 2 or len(ys) != 2:
+        return None
+    return primitive_bbox(prim)
+
+
+def _bboxes_intersect(a, b) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _candidate_pairs(primitives: List[Primitive]) -> List[Tuple[int, int]]:
+    """按 x 排序扫描，找出包围盒相交的图元对"""
+    boxes = [primitive_bbox(p) for p in primitives]
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][0])
+    active = []
+    pairs = []
+    for i in order:
+        box = boxes[i]
+        active = [j for j in active if boxes[j][2] > box[0]]
+        for j in active:
+            other = boxes[j]
+            if other[1] < box[3] and box[1] < other[3]:
+                pairs.append((min(i, j), max(i, j)))
+        active.append(i)
+    return pairs
+
+
+def _neighbour_lists(primitives: List[Primitive]) -> List[List[int]]:
+    """每个图元的包围盒相交邻居（包含接触的情况）"""
+    boxes = [primitive_bbox(p) for p in primitives]
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][0])
+    neighbours = [[] for _ in primitives]
+    active = []
+    for i in order:
+        box = boxes[i]
+        active = [j for j in active if boxes[j][2] >= box[0]]
+        for j in active:
+            other = boxes[j]
+            if other[1] <= box[3] and box[1] <= other[3]:
+                neighbours[i].append(j)
+                neighbours[j].append(i)
+        active.append(i)
+    return neighbours
+
+
+def benchmark(counts=(100, 1000, 10000), seed: int = 0) -> List[Dict[str, Any]]:
+    """对随机场景测量并集与重叠面积的耗时"""
+    rng = random.Random(seed)
+    results = []
+    for n in counts:
+        # 让平均重叠程度不随数量变化
+        extent = 40.0 * math.sqrt(n)
+        rects = []
+        circles = []
+        for _ in range(n):
+            x, y = rng.uniform(0, extent), rng.uniform(0, extent)
+            rects.append(rect_primitive(x, y, x + rng.uniform(5, 60), y + rng.uniform(5, 60)))
+            circles.append(circle_primitive(rng.uniform(0, extent), rng.uniform(0, extent),
+                                            rng.uniform(3, 30)))
+        mixed = rects[:n // 2] + circles[:n // 2]
+        for name, prims in (('rectangles', rects), ('circles', circles), ('mixed', mixed)):
+            start = time.perf_counter()
+            area = union_area(prims)
+            union_time = time.perf_counter() - start
+            start = time.perf_counter()
+            pairs = overlap_areas(prims)
+            overlap_time = time.perf_counter() - start
+            results.append({
+                'kind': name, 'count': n, 'union_area': area,
+                'union_seconds': union_time, 'overlap_pairs': len(pairs),
+                'overlap_seconds': overlap_time,
+            })
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(f"{row['kind']:>10} n={row['count']:>6} "
+              f"union={row['union_seconds'] * 1000:8.1f} ms "
+              f"overlaps={row['overlap_pairs']:>6} in {row['overlap_seconds'] * 1000:8.1f} ms")
@@ -0,0 +1,335 @@
+"""
+计算器历史：只追加的历史文件、按页加载的列表模型和结果记忆化。
+
+- HistoryFile：每次计算追加一行 JSON（表达式、结果、模式、时间），从不改写旧内容；
+  读取时从文件末尾向前按块扫描，每次只解析一页，打开文件不需要读取全部历史
+- HistoryModel / HistoryView：最新的条目在最前面，滚动到底部时再读取更早的一页
+- ResultMemo：按 (规范化表达式, 数值后端) 记忆结果的 LRU 表，
+  读取历史时也会填入，重新计算历史中的表达式不需要再求值
+"""
+import json
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt6.QtWidgets import QAbstractItemView, QHeaderView, QTableView
+
+from modules.expression import evaluate, normalize
+from modules.numeric import FLOAT, NumericBackend
+
+HISTORY_FILE = 'calculator_history.jsonl'
+PAGE_SIZE = 200
+MEMO_SIZE = 4096
+
+# 向前扫描文件时每次读取的字节数
+_BLOCK_SIZE = 64 * 1024
+_SEPARATORS = (',', ':')
+
+
+def default_history_path() -> str:
+    """历史文件路径，可用环境变量 GEOMETRY_HISTORY_FILE 指定"""
+    return os.environ.get('GEOMETRY_HISTORY_FILE') or os.path.join(
+        os.path.expanduser('~'), '.geometry_calc_app', HISTORY_FILE)
+
+
+def _is_entry(entry: Any) -> bool:
+    """历史条目至少要有字符串形式的表达式和结果，其它字段缺失或类型不对时按默认值显示"""
+    return (isinstance(entry, dict) and isinstance(entry.get('expression'), str)
+            and isinstance(entry.get('result'), str))
+
+
+class HistoryFile:
+    """只追加的历史文件，支持从末尾向前分页读取"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._stream = open(path, 'ab')
+        # 向前读取只覆盖打开时已有的内容，之后追加的条目由调用方直接显示
+        self._cursor = self._stream.tell()
+        self._partial = b''
+        self._lines: List[bytes] = []  # 已切分、尚未返回的行（旧 → 新）
+        self._reader = open(path, 'rb')
+
+    def close(self):
+        self._stream.close()
+        self._reader.close()
+
+    def append(self, entry: Dict[str, Any]):
+        """追加一个条目（立即写入操作系统缓冲区）"""
+        line = json.dumps(entry, separators=_SEPARATORS, ensure_ascii=False) + '\n'
+        self._stream.write(line.encode('utf-8'))
+        self._stream.flush()
+
+    @property
+    def exhausted(self) -> bool:
+        """是否已经读到文件开头"""
+        return self._cursor == 0 and not self._lines and not self._partial
+
+    def read_older(self, count: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+        """返回最多 count 个更早的条目（从新到旧）；损坏的行（如写入中途崩溃）被跳过"""
+        entries: List[Dict[str, Any]] = []
+        while len(entries) < count:
+            if not self._lines:
+                if not self._read_block():
+                    break
+                continue
+            line = self._lines.pop()
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if _is_entry(entry):
+                entries.append(entry)
+        return entries
+
+    def _read_block(self) -> bool:
+        """向前读取一块并切分出完整的行，没有更多内容时返回 False"""
+        if self._cursor == 0:
+            if self._partial:
+                self._lines.append(self._partial)
+                self._partial = b''
+                return True
+            return False
+        start = max(0, self._cursor - _BLOCK_SIZE)
+        self._reader.seek(start)
+        data = self._reader.read(self._cursor - start) + self._partial
+        self._cursor = start
+        lines = data.split(b'\n')
+        # 第一段可能是上一块中某一行的后半部分，留到下次拼接
+        self._partial = lines.pop(0) if start > 0 else b''
+        if start == 0 and lines and lines[0] == b'':
+            lines.pop(0)
+        self._lines = [line for line in lines if line.strip()] + self._lines
+        return True
+
+
+class ResultMemo:
+    """按 (规范化表达式, 后端) 记忆格式化后的结果（LRU）"""
+
+    def __init__(self, size: int = MEMO_SIZE):
+        self.size = size
+        self.results: 'OrderedDict[Tuple[str, str], str]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[str]:
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.results.move_to_end(key)
+        return result
+
+    def put(self, key: Tuple[str, str], result: str):
+        self.results[key] = result
+        self.results.move_to_end(key)
+        if len(self.results) > self.size:
+            self.results.popitem(last=False)
+
+    def seed(self, key: Tuple[str, str], result: str):
+        """用历史中的结果填充，不改变已有条目的顺序"""
+        if key not in self.results and len(self.results) < self.size:
+            self.results[key] = result
+            self.results.move_to_end(key, last=False)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _normalized(expression: str) -> str:
+    return normalize(expression)
+
+
+def _memo_key(expression: str, backend: NumericBackend) -> Tuple[str, str]:
+    # repr 区分后端和十进制精度，并且可以写入历史文件
+    return _normalized(expression), repr(backend)
+
+
+class HistoryModel(QAbstractListModel):
+    """计算历史的列表模型（最新在前），滚动时按页从文件读取"""
+
+    ExpressionRole = Qt.ItemDataRole.UserRole + 1
+    ResultRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, history: Optional[HistoryFile] = None, memo: Optional[ResultMemo] = None, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.memo = memo or ResultMemo()
+        self.entries: List[Dict[str, Any]] = []
+        # 第一页立即读取，视图之后只在滚动到底部时请求更多
+        if self.canFetchMore():
+            self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.history is not None and not self.history.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        page = self.history.read_older(PAGE_SIZE)
+        if not page:
+            return
+        for entry in page:
+            backend = entry.get('backend')
+            if not isinstance(backend, str):
+                continue  # 旧条目没有记录后端，无法确定结果对应的数值后端
+            try:
+                self.memo.seed((_normalized(entry['expression']), backend), entry['result'])
+            except ValueError:
+                pass
+        start = len(self.entries)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.entries.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.entries):
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{entry['expression']} = {entry['result']}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            try:
+                moment = time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(entry.get('time', 0)))
+            except (TypeError, ValueError, OverflowError, OSError):
+                moment = ''
+            return f"{entry.get('mode', '')} — {moment}"
+        if role == self.ExpressionRole:
+            return entry['expression']
+        if role == self.ResultRole:
+            return entry['result']
+        return None
+
+    def calculate(self, expression: str, backend: NumericBackend = FLOAT) -> str:
+        """计算并格式化结果（优先使用记忆的结果），成功时写入历史；出错时抛出原异常"""
+        key = _memo_key(expression, backend)
+        result = self.memo.get(key)
+        if result is None:
+            result = backend.format(evaluate(expression, backend=backend))
+            self.memo.put(key, result)
+        self.add_entry({'expression': expression, 'result': result, 'mode': backend.label,
+                        'backend': key[1], 'time': time.time()})
+        return result
+
+    def add_entry(self, entry: Dict[str, Any]):
+        """在最前面插入一个条目并追加到历史文件"""
+        if self.history is not None:
+            try:
+                self.history.append(entry)
+            except OSError as error:
+                print(f"Impossible d'enregistrer l'historique: {error}")
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.entries.insert(0, entry)
+        self.endInsertRows()
+
+
+class HistoryView(QTableView):
+    """历史列表视图
+
+    用单列的 QTableView 而不是 QListView：QListView 和 QTreeView 每次布局都要遍历所有行
+    （10 万行时约 0.2–0.4 s），表格视图只按固定行高计算可见范围，插入一行的代价与总行数无关。
+    """
+
+    ROW_HEIGHT = 28
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.horizontalHeader().hide()
+        self.horizontalHeader().setStretchLastSection(True)
+        self.verticalHeader().hide()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.ROW_HEIGHT)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(count: int = 100_000, path: Optional[str] = None) -> Dict[str, float]:
+    """写入 count 条历史，测量打开、滚动、插入和记忆化的耗时"""
+    import random
+    import tempfile
+    from PyQt6.QtWidgets import QApplication
+    from modules.expression import Expression
+    from modules.numeric import FRACTION
+
+    app = QApplication.instance() or QApplication([])
+    path = path or os.path.join(tempfile.mkdtemp(), HISTORY_FILE)
+    results: Dict[str, float] = {}
+    random.seed(3)
+    start = time.perf_counter()
+    history = HistoryFile(path)
+    for i in range(count):
+        expression = f"{random.randint(1, 999)}×{random.randint(1, 99)}+{i}"
+        history.append({'expression': expression, 'result': FLOAT.format(evaluate(expression)),
+                        'mode': FLOAT.label, 'backend': repr(FLOAT), 'time': time.time()})
+    history.close()
+    results['write_s'] = time.perf_counter() - start
+    results['file_mb'] = os.path.getsize(path) / 1e6
+
+    start = time.perf_counter()
+    model = HistoryModel(HistoryFile(path))
+    view = HistoryView()
+    view.setModel(model)
+    view.resize(400, 600)
+    view.show()
+    app.processEvents()
+    results['open_ms'] = (time.perf_counter() - start) * 1000
+
+    # 按页向下滚动直到读完整个文件，记录最慢的一帧
+    scrollbar = view.verticalScrollBar()
+    frames, worst = 0, 0.0
+    start = time.perf_counter()
+    while model.canFetchMore() or scrollbar.value() < scrollbar.maximum():
+        frame_start = time.perf_counter()
+        scrollbar.setValue(scrollbar.value() + scrollbar.pageStep() * 20)
+        app.processEvents()
+        worst = max(worst, time.perf_counter() - frame_start)
+        frames += 1
+    results['scroll_frame_ms'] = (time.perf_counter() - start) * 1000 / max(frames, 1)
+    results['scroll_worst_ms'] = worst * 1000
+    results['rows'] = model.rowCount()
+
+    start = time.perf_counter()
+    model.calculate("6×7")
+    app.processEvents()
+    results['insert_ms'] = (time.perf_counter() - start) * 1000
+
+    source = '+'.join(f"1/{i}" for i in range(1, 201))
+    model.calculate(source, FRACTION)
+    start = time.perf_counter()
+    for _ in range(100):
+        model.memo.get(_memo_key(source, FRACTION))
+    results['memo_us'] = (time.perf_counter() - start) / 100 * 1e6
+    start = time.perf_counter()
+    for _ in range(10):
+        FRACTION.format(Expression(source, FRACTION)())
+    results['evaluate_us'] = (time.perf_counter() - start) / 10 * 1e6
+    view.close()
+    model.history.close()
+
+    print(f"Historique de {count} calculs ({results['file_mb']:.1f} Mo)")
+    print(f"  écriture: {results['write_s']:.2f} s")
+    print(f"  ouverture et première page: {results['open_ms']:.1f} ms")
+    print(f"  défilement jusqu'au début ({results['rows']} lignes): {results['scroll_frame_ms']:.2f} ms/image, "
+          f"pire image {results['scroll_worst_ms']:.1f} ms")
+    print(f"  nouveau calcul en tête de liste: {results['insert_ms']:.2f} ms")
+    print(f"  somme de 200 fractions: mémorisée {results['memo_us']:.0f} µs, "
+          f"recalculée {results['evaluate_us']:.0f} µs")
+    return results
+
+
+if __name__ == "__main__":
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    benchmark()
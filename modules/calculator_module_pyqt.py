@@ -6,17 +6,23 @@ PROJECT_ROOT = Path(__file__).parent.parent.absolute()
 
 # 导入PyQt6模块
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, 
-                             QLabel, QLineEdit, QFrame)
+                             QLabel, QLineEdit, QFrame, QComboBox, QSpinBox, QTabWidget)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 
 # 导入自定义组件
 from modules.ui_components_pyqt import BaseModule, MetroButton, COLOR_MAP
+from modules.calc_history import HistoryFile, HistoryModel, HistoryView, default_history_path
+from modules.numeric import FLOAT, BACKENDS, DecimalBackend, get_backend
+from modules.sequence_table import SequencePanel
 
 class CalculatorModule(BaseModule):
     def __init__(self, parent=None):
         super().__init__(parent)
         
+        # 数值后端（浮点 / 精确分数 / 十进制）
+        self.backend = FLOAT
+        
         # 创建主布局
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(10, 10, 10, 10)
@@ -94,9 +100,49 @@ class CalculatorModule(BaseModule):
         return_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
         return_button.clicked.connect(self.back_to_home)
         tools_layout.addWidget(return_button)
-
-        # 添加弹性空间
-        content_layout.addStretch(1)
+        
+        # 计算模式和十进制精度
+        mode_label = QLabel("Mode de calcul")
+        mode_label.setFont(QFont("Arial", 12))
+        tools_layout.addWidget(mode_label)
+        self.mode_combo = QComboBox()
+        self.mode_combo.setFont(QFont("Arial", 12))
+        for name, backend_class in BACKENDS.items():
+            self.mode_combo.addItem(backend_class.label, name)
+        self.mode_combo.currentIndexChanged.connect(self._update_backend)
+        tools_layout.addWidget(self.mode_combo)
+        self.precision_spin = QSpinBox()
+        self.precision_spin.setFont(QFont("Arial", 12))
+        self.precision_spin.setRange(2, 1000)
+        self.precision_spin.setValue(DecimalBackend.DEFAULT_PRECISION)
+        self.precision_spin.setSuffix(" chiffres")
+        self.precision_spin.valueChanged.connect(self._update_backend)
+        self.precision_spin.setVisible(False)
+        tools_layout.addWidget(self.precision_spin)
+        tools_layout.addStretch(1)
+        
+        # 右侧的标签页：计算历史和表格模式
+        side_tabs = QTabWidget()
+        side_tabs.setFont(QFont("Arial", 12))
+        content_layout.addWidget(side_tabs, 1)
+        
+        # 计算历史（保存在磁盘上，滚动时按页加载）
+        history_file = None
+        try:
+            history_file = HistoryFile(default_history_path())
+        except OSError as error:
+            print(f"Historique désactivé: {error}")
+        self.history_model = HistoryModel(history_file, parent=self)
+        self.history_view = HistoryView()
+        self.history_view.setFont(QFont("Arial", 12))
+        self.history_view.setModel(self.history_model)
+        self.history_view.setMinimumWidth(260)
+        self.history_view.clicked.connect(self._recall_history)
+        side_tabs.addTab(self.history_view, "Historique")
+        
+        # 表格模式：表达式对 n 的一段范围求值
+        self.sequence_panel = SequencePanel()
+        side_tabs.addTab(self.sequence_panel, "Tableau")
     
     def click_button(self, value):
         """实现计算器按钮点击功能"""
@@ -109,29 +155,29 @@ class CalculatorModule(BaseModule):
         else:
             self._append_to_display(value)
     
+    def _update_backend(self):
+        """根据选择的模式切换数值后端"""
+        name = self.mode_combo.currentData()
+        self.precision_spin.setVisible(name == DecimalBackend.name)
+        self.backend = get_backend(name, self.precision_spin.value())
+    
     def _calculate_result(self):
         """计算表达式结果"""
         try:
-            # 安全地计算表达式
-            expression = self.result_display.text()
-            # 替换乘除符号为Python可识别的符号
-            expression = expression.replace('×', '*').replace('÷', '/')
-            result = eval(expression)
-            
-            # 格式化结果，避免过长的小数
-            if isinstance(result, float):
-                # 如果是整数值的浮点数，转换为整数
-                if result.is_integer():
-                    result = int(result)
-                else:
-                    # 限制小数位数为6位
-                    result = round(result, 6)
-            
-            self.result_display.setText(str(result))
-        except Exception as e:
+            # 表达式引擎直接识别 × 和 ÷；结果由后端格式化（分数显示为 p/q），
+            # 按规范化的表达式记忆并写入历史
+            result = self.history_model.calculate(self.result_display.text(), self.backend)
+            self.result_display.setText(result)
+        except (ArithmeticError, ValueError, TypeError) as e:
             self.result_display.setText("Erreur")
             print(f"Erreur de calcul: {e}")
             
+    def _recall_history(self, index):
+        """点击历史条目时把表达式放回显示屏"""
+        expression = self.history_model.data(index, HistoryModel.ExpressionRole)
+        if expression:
+            self.result_display.setText(expression)
+    
     def _handle_backspace(self):
         """处理退格功能"""
         current_text = self.result_display.text()
@@ -2,9 +2,41 @@
 画布组件，用于绘制几何图形
 """
 import math
+from contextlib import contextmanager
 from PyQt6.QtWidgets import QWidget, QSizePolicy
-from PyQt6.QtCore import Qt, QRect, pyqtSignal
-from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PyQt6.QtCore import Qt, QPoint, QRect, pyqtSignal
+from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPixmap, QPolygon
+
+from modules.topology import Topology, apply_vertex_move
+from modules.spatial_index import GridIndex, item_bbox, union_bbox
+
+# 局部重绘时为点名称和长度文本预留的边距（像素）
+LABEL_MARGIN = 25
+
+
+def _item_positions(kind, item):
+    """图形中与拓扑顶点对应的位置"""
+    if kind == 'point':
+        return [(item['x'], item['y'])]
+    if kind == 'line':
+        return [(item['x1'], item['y1']), (item['x2'], item['y2'])]
+    if item.get('type') == 'circle':
+        return [tuple(item['center'])]
+    return [tuple(vertex) for vertex in item.get('vertices', [])]
+
+
+def _merge_adds(edits):
+    """把相邻的新增编辑合并为一次（批量事务结束时使用）"""
+    merged = []
+    for edit in edits:
+        if edit['op'] != 'add':
+            merged.append(edit)
+        elif merged and merged[-1]['op'] == 'add':
+            merged[-1]['items'].extend(edit['items'])
+        else:
+            merged.append({'op': 'add', 'items': list(edit['items'])})
+    return merged
+
 
 class Canvas(QWidget):
     """自定义画布组件，用于绘制几何图形"""
@@ -16,6 +48,12 @@ class Canvas(QWidget):
     shape_created = pyqtSignal(dict)  # 传递形状数据
     shape_preview = pyqtSignal(dict)  # 传递形状预览数据
     canvas_cleared = pyqtSignal()  # 画布清除信号
+    # 已提交的编辑：{'op': 'add' | 'set' | 'remove', 'items': [(kind, 下标, 字典, 文本)]}
+    # （'set' 可带修改前的状态 'before'）、{'op': 'clear', 'previous': 清除前的列表}
+    # 或 {'op': 'load', 'path': 路径, 'format': 格式}（紧跟在 'clear' 之后，画布已是加载的内容）
+    scene_edited = pyqtSignal(object)
+    # 批量事务结束：{'points': n, 'lines': n, 'shapes': n（新增数）, 'edits': 编辑数, 'cleared': bool}
+    batch_finished = pyqtSignal(dict)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -34,6 +72,20 @@ class Canvas(QWidget):
         self.line_texts = []  # 存储线段长度文本
         self.shapes = []  # 存储其他形状
         
+        # 共享拓扑：焊接重合的顶点，线段和多边形共享顶点
+        self.topology = Topology()
+        
+        # 批量事务（canvas.batch()）的状态
+        self._batch_depth = 0
+        self._batch_blocked = False
+        self._batch_edits = []
+        self._batch_cleared = False
+        self._batch_dirty = False
+        self._caches_dirty = False
+        
+        # 空间索引：命中测试和局部重绘时查找图形
+        self.spatial_index = GridIndex()
+        
         # 临时绘制状态
         self.temp_shape = None
         self.temp_point = None
@@ -43,12 +95,28 @@ class Canvas(QWidget):
         
         # 当前选中的项
         self.selected_item = None
+        self.selection = set()  # 选中的图形键 ('point' | 'line' | 'shape', 下标)
+        
+        # 移动图层预览（变换动画）：静态内容缓存为位图，每帧只重绘移动的图形
+        self.preview_layer = None
+        self.preview_texts = []
+        self._preview_hidden = set()
+        self._static_layer = None
         
         # 坐标轴设置
         self.show_axes = True
         self.grid_spacing = 50  # 每单位网格线间的像素距离
         self.axis_color = "#555555"
         
+        # 叠加图层（如函数曲线）：不属于场景，不参与撤销和保存，
+        # 每个对象提供 paint(painter, canvas)，在场景之上绘制
+        self.overlays = []
+        self._failed_overlays = []
+        
+        # 点名称和线段长度文本的字体
+        self._label_font = QFont("Arial", 10)
+        self._label_font.setBold(True)
+        
         # 启用鼠标跟踪
         self.setMouseTracking(True)
 
@@ -62,21 +130,398 @@ class Canvas(QWidget):
 
     def clear(self):
         """清除画布上的所有内容"""
+        previous = (self.points, self.lines, self.line_texts, self.shapes)
         self.points = []
         self.lines = []
         self.line_texts = []
         self.shapes = []
+        self.topology.clear()
+        self.spatial_index.clear()
+        self._reset_drawing_state()
+        self.update()
+        self._notify_cleared()
+        self.emit_edit({'op': 'clear', 'previous': previous})
+    
+    def _reset_drawing_state(self):
+        """清除绘制中的临时图形、选择和绘制模式"""
         self.temp_shape = None
         self.temp_point = None
         self.temp_endpoints = []
         self.line_start_point = None
         self.triangle_points = []
         self.selected_item = None
+        self.selection = set()
         self.draw_mode = None  # 清除时也重置绘制模式
         self.current_shape = None
-        self.update()
+    
+    def _notify_cleared(self):
+        if self._batch_depth:
+            self._batch_cleared = True
         self.canvas_cleared.emit()
     
+    def add_point(self, x, y, color):
+        """添加点（屏幕坐标），与容差内已有的点焊接
+        
+        Returns:
+            点在 points 中的下标（焊接时为已有点的下标）
+        """
+        self._ensure_caches()
+        vertex_id = self.topology.weld(x, y)
+        point_index = self.topology.point_of[vertex_id]
+        if point_index >= 0:
+            return point_index
+        self.points.append({'x': x, 'y': y, 'color': color})
+        point_index = len(self.points) - 1
+        self.topology.attach_point(vertex_id, point_index)
+        self.spatial_index.insert(('point', point_index), (x, y, x, y))
+        self.commit_items([('point', point_index)], 'add')
+        return point_index
+    
+    def add_line(self, x1, y1, x2, y2, color, text=None):
+        """添加线段（屏幕坐标）及其长度文本，已存在相同的边时不重复添加
+        
+        Args:
+            text: 长度文本，None 时根据网格间距自动计算
+        
+        Returns:
+            线段在 lines 中的下标
+        """
+        self._ensure_caches()
+        existing = self.topology.line_between(x1, y1, x2, y2)
+        if existing is not None:
+            return existing
+        if text is None:
+            text = self.length_text(x1, y1, x2, y2)
+        self.lines.append({'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2, 'color': color})
+        self.line_texts.append(text)
+        line_index = len(self.lines) - 1
+        self.topology.add_line(line_index, x1, y1, x2, y2)
+        self.spatial_index.insert(('line', line_index), item_bbox('line', self.lines[line_index]))
+        self.commit_items([('line', line_index)], 'add')
+        return line_index
+    
+    def add_shape(self, shape):
+        """添加形状字典并注册到拓扑中，返回形状下标"""
+        self._ensure_caches()
+        self.shapes.append(shape)
+        shape_index = len(self.shapes) - 1
+        self.topology.add_shape(shape_index, shape)
+        self.spatial_index.insert(('shape', shape_index), item_bbox('shape', shape))
+        self.commit_items([('shape', shape_index)], 'add')
+        return shape_index
+    
+    def item_state(self, kind, index):
+        """图形的当前状态 (kind, 下标, 字典, 文本)，字典为引用"""
+        if kind == 'point':
+            return kind, index, self.points[index], None
+        if kind == 'line':
+            return kind, index, self.lines[index], self.line_texts[index]
+        return kind, index, self.shapes[index], None
+    
+    def commit_items(self, keys, op='set', before=None):
+        """发出已提交编辑的通知（新增或修改了这些图形）
+        
+        Args:
+            before: 修改前的状态列表（与 keys 对应），供撤销使用
+        """
+        items = [self.item_state(kind, index) for kind, index in keys]
+        if items:
+            edit = {'op': op, 'items': items}
+            if before is not None:
+                edit['before'] = before
+            self.emit_edit(edit)
+    
+    def _store(self, kind):
+        if kind == 'point':
+            return self.points
+        if kind == 'line':
+            return self.lines
+        return self.shapes
+    
+    def insert_items(self, states):
+        """按 (kind, 下标, 字典, 文本) 插入图形（撤销删除、重做新增）
+        
+        下标都在列表末尾时只增量更新拓扑和空间索引，否则重建缓存。
+        """
+        self._ensure_caches()
+        states = sorted(states, key=lambda state: (state[0] != 'point', state[0] == 'shape', state[1]))
+        rebuild = False
+        keys = []
+        for kind, index, item, text in states:
+            store = self._store(kind)
+            keys.append((kind, index))
+            if index != len(store):
+                store.insert(index, item)
+                if kind == 'line':
+                    self.line_texts.insert(index, text)
+                rebuild = True
+                continue
+            store.append(item)
+            if rebuild:
+                if kind == 'line':
+                    self.line_texts.append(text)
+                continue
+            if kind == 'point':
+                vertex_id = self.topology.weld(item['x'], item['y'])
+                self.topology.attach_point(vertex_id, index)
+            elif kind == 'line':
+                self.line_texts.append(text)
+                self.topology.add_line(index, item['x1'], item['y1'], item['x2'], item['y2'])
+            else:
+                self.topology.add_shape(index, item)
+            self.spatial_index.insert((kind, index), item_bbox(kind, item))
+        if rebuild:
+            self.rebuild_caches()
+            self.update()
+        else:
+            self._update_boxes([self.spatial_index.boxes.get(key) for key in keys])
+        self.commit_items(keys, 'add')
+    
+    def remove_items(self, keys):
+        """删除图形（撤销新增）
+        
+        被删除的图形都位于列表末尾时只增量更新，否则删除后重建缓存。
+        """
+        self._ensure_caches()
+        removed = [self.item_state(kind, index) for kind, index in keys]
+        tail = True
+        for kind in ('point', 'line', 'shape'):
+            indices = sorted(index for k, index in keys if k == kind)
+            size = len(self._store(kind))
+            if indices and indices != list(range(size - len(indices), size)):
+                tail = False
+        
+        boxes = []
+        for kind, index, item, _ in sorted(removed, key=lambda state: state[1], reverse=True):
+            store = self._store(kind)
+            if tail:
+                boxes.append(self.spatial_index.boxes.get((kind, index)))
+                self.spatial_index.remove((kind, index))
+                if kind == 'point':
+                    self.topology.detach_point(index)
+                elif kind == 'line':
+                    self.topology.detach_line(index)
+                else:
+                    self.topology.detach_shape(index, item)
+            del store[index]
+            if kind == 'line':
+                del self.line_texts[index]
+        
+        if tail:
+            self.selection -= set(keys)
+            self._update_boxes(boxes)
+        else:
+            self.selection = set()
+            self.rebuild_caches()
+            self.update()
+        if removed:
+            self.emit_edit({'op': 'remove', 'items': removed})
+    
+    def set_items(self, states):
+        """把图形恢复为给定的状态（撤销/重做修改），只更新受影响的图形"""
+        self._ensure_caches()
+        moves = {}
+        keys = []
+        before = []
+        for kind, index, item, text in states:
+            current = self._store(kind)[index]
+            before.append((kind, index, dict(current), None))
+            for old, new in zip(_item_positions(kind, current), _item_positions(kind, item)):
+                if old != new:
+                    vertex_id = self.topology.find_vertex(*old)
+                    if vertex_id is not None:
+                        moves[vertex_id] = new
+            current.clear()
+            current.update(item)
+            if 'vertices' in current:
+                current['vertices'] = list(current['vertices'])
+            keys.append((kind, index))
+        for vertex_id, (x, y) in moves.items():
+            self.topology.move_vertex(vertex_id, x, y)
+        self.refresh_items(keys)
+        self.commit_items(keys, 'set', before)
+    
+    def replace_scene(self, points, lines, line_texts, shapes, source=None):
+        """整体替换场景内容（撤销/重做清除和加载、加载文件）
+        
+        Args:
+            source: 加载文件时为 {'path': 路径, 'format': 格式}：同时清除绘制中的临时状态，
+                发出 'clear' 和 'load' 编辑，而不是逐个图形的 'add'
+        """
+        previous = (self.points, self.lines, self.line_texts, self.shapes)
+        self.points, self.lines = list(points), list(lines)
+        self.line_texts, self.shapes = list(line_texts), list(shapes)
+        try:
+            self.rebuild_caches()
+        except Exception:
+            # 新内容无法建立缓存（例如坐标不是有限数）时保留原来的场景
+            self.points, self.lines, self.line_texts, self.shapes = previous
+            self.rebuild_caches()
+            raise
+        if source is not None:
+            self._reset_drawing_state()
+        self.selection = set()
+        self.update()
+        self.emit_edit({'op': 'clear', 'previous': previous})
+        if source is not None:
+            self._notify_cleared()
+            self.emit_edit(dict(source, op='load'))
+            return
+        keys = ([('point', i) for i in range(len(self.points))]
+                + [('line', i) for i in range(len(self.lines))]
+                + [('shape', i) for i in range(len(self.shapes))])
+        self.commit_items(keys, 'add')
+    
+    def _update_boxes(self, boxes):
+        """重绘包围盒覆盖的区域"""
+        dirty = union_bbox(boxes)
+        if dirty is not None:
+            x0, y0, x1, y1 = dirty
+            self.update(QRect(int(x0) - LABEL_MARGIN, int(y0) - LABEL_MARGIN,
+                              int(x1 - x0) + 2 * LABEL_MARGIN + 1, int(y1 - y0) + 2 * LABEL_MARGIN + 1))
+    
+    def length_text(self, x1, y1, x2, y2):
+        """线段长度文本（网格单位，保留一位小数）"""
+        length = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2) / self.grid_spacing
+        return f"{length:.1f}"
+    
+    def move_vertex(self, vertex_id, x, y):
+        """移动共享顶点（屏幕坐标），同时更新所有关联的点、线段和形状
+        
+        只刷新受影响图形的缓存数据，并只重绘它们所在的区域。
+        
+        Returns:
+            (受影响的线段下标集合, 受影响的形状下标集合)
+        """
+        self._ensure_caches()
+        lines, shapes = apply_vertex_move(self, vertex_id, x, y)
+        keys = [('line', i) for i in lines] + [('shape', i) for i in shapes]
+        point_index = self.topology.point_of[vertex_id]
+        if point_index >= 0:
+            keys.append(('point', point_index))
+        self.refresh_items(keys)
+        return lines, shapes
+    
+    def refresh_items(self, keys):
+        """图形坐标改变后，更新其长度文本、缓存度量和空间索引，并重绘新旧位置"""
+        self._ensure_caches()
+        old_boxes = [self.spatial_index.boxes.get(key) for key in keys]
+        new_boxes = []
+        for kind, index in keys:
+            if kind == 'point':
+                item = self.points[index]
+            elif kind == 'line':
+                item = self.lines[index]
+                self.line_texts[index] = self.length_text(item['x1'], item['y1'], item['x2'], item['y2'])
+            else:
+                item = self.shapes[index]
+                self.refresh_shape_measurements(item)
+            box = item_bbox(kind, item)
+            self.spatial_index.insert((kind, index), box)
+            new_boxes.append(box)
+        self._update_boxes(old_boxes + new_boxes)
+    
+    def refresh_shape_measurements(self, shape):
+        """根据当前坐标重新计算形状缓存的长度和面积（屏幕单位）"""
+        if shape['type'] == 'circle':
+            radius = shape['radius']
+            shape['circumference'] = 2 * math.pi * radius
+            shape['area'] = math.pi * radius * radius
+            return
+        vertices = shape.get('vertices')
+        if not vertices:
+            return
+        sides = [math.hypot(x2 - x1, y2 - y1)
+                 for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1])]
+        area = abs(sum(x1 * y2 - x2 * y1
+                       for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]))) / 2
+        shape['area'] = area
+        shape['perimeter'] = sum(sides)
+        if shape['type'] == 'triangle':
+            shape['sides'] = sides
+        elif shape['type'] == 'rectangle' and len(sides) == 4:
+            shape['width'], shape['height'] = sides[0], sides[1]
+    
+    def rebuild_caches(self):
+        """在批量修改图形后重建拓扑和空间索引（批量事务中推迟到第一次需要时或事务结束）"""
+        if self._batch_depth:
+            self._caches_dirty = True
+            return
+        self._caches_dirty = False
+        self.topology.rebuild(self)
+        self.spatial_index.rebuild(self)
+    
+    def adopt_caches(self, topology, spatial_index):
+        """换入在工作线程中为当前内容建立好的拓扑和空间索引（批量导入结束时使用）"""
+        self.topology = topology
+        self.spatial_index = spatial_index
+        self._caches_dirty = False
+
+    def _ensure_caches(self):
+        """批量事务中推迟的缓存重建在读取拓扑或空间索引前完成"""
+        if self._caches_dirty:
+            self._caches_dirty = False
+            self.topology.rebuild(self)
+            self.spatial_index.rebuild(self)
+    
+    # ------------------------------------------------------------------
+    # 批量事务
+    # ------------------------------------------------------------------
+    
+    @contextmanager
+    def batch(self):
+        """批量修改的事务：with canvas.batch(): ...
+        
+        事务期间 update() 只做标记，画布的信号被阻塞（处理器发出的 point_created、
+        shape_created 等不再逐个触发信息面板更新），scene_edited 的编辑暂存；
+        rebuild_caches() 推迟。退出时重建一次缓存、按顺序发出暂存的编辑
+        （相邻的新增合并为一次）、发出一个 batch_finished 汇总信号，并只重绘一次。
+        可以嵌套，只有最外层的退出会提交。
+        """
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            self._batch_blocked = self.blockSignals(True)
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._finish_batch()
+    
+    def _finish_batch(self):
+        self.blockSignals(self._batch_blocked)
+        self._ensure_caches()
+        edits, self._batch_edits = self._batch_edits, []
+        cleared, self._batch_cleared = self._batch_cleared, False
+        dirty, self._batch_dirty = self._batch_dirty, False
+        
+        if cleared:
+            self.canvas_cleared.emit()
+        summary = {'points': 0, 'lines': 0, 'shapes': 0, 'edits': len(edits), 'cleared': cleared}
+        for edit in _merge_adds(edits):
+            if edit['op'] == 'add':
+                for kind, _, _, _ in edit['items']:
+                    summary[kind + 's'] += 1
+            self.scene_edited.emit(edit)
+        if edits or cleared:
+            self.batch_finished.emit(summary)
+        if dirty:
+            self.update()
+    
+    def emit_edit(self, edit):
+        """发出 scene_edited（批量事务中暂存到事务结束）"""
+        if self._batch_depth:
+            self._batch_edits.append(edit)
+        else:
+            self.scene_edited.emit(edit)
+    
+    def update(self, *args):
+        """请求重绘；批量事务中只做标记，事务结束时整体重绘一次"""
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
+        super().update(*args)
+    
     def grid_to_screen(self, grid_x, grid_y):
         """将网格坐标转换为屏幕坐标"""
         center_x = self.width() // 2
@@ -95,9 +540,18 @@ class Canvas(QWidget):
     
     def paintEvent(self, event):
         """绘制事件处理"""
+        self._ensure_caches()
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
+        # 预览移动图层时，静态内容直接使用缓存的位图
+        if self.preview_layer is not None:
+            if self._static_layer is None or self._static_layer.size() != self.size():
+                self._static_layer = self._render_static_layer()
+            painter.drawPixmap(0, 0, self._static_layer)
+            self._draw_preview_layer(painter)
+            return
+        
         # 绘制白色背景
         painter.fillRect(self.rect(), Qt.GlobalColor.white)
         
@@ -105,14 +559,11 @@ class Canvas(QWidget):
         if self.show_axes:
             self._draw_coordinate_axes(painter)
         
-        # 绘制已保存的点
-        self._draw_points(painter)
-        
-        # 绘制已保存的线段
-        self._draw_lines(painter)
+        # 只绘制与重绘区域相交的图形（整体重绘时为画布区域，导入的大场景大部分在画布外）
+        self._draw_region(painter, event.rect())
         
-        # 绘制保存的形状
-        self._draw_shapes(painter)
+        # 绘制叠加图层（局部重绘时裁剪到重绘区域）
+        self._draw_overlays(painter)
         
         # 绘制临时形状
         self._draw_temp_shapes(painter)
@@ -125,6 +576,90 @@ class Canvas(QWidget):
         if self.temp_endpoints:
             self._draw_temp_endpoints(painter)
     
+    def _draw_region(self, painter, rect):
+        """通过空间索引只绘制重绘区域附近的图形"""
+        painter.setClipRect(rect)
+        box = (rect.left() - LABEL_MARGIN, rect.top() - LABEL_MARGIN,
+               rect.right() + LABEL_MARGIN, rect.bottom() + LABEL_MARGIN)
+        for kind, index in self.spatial_index.sorted_keys(self.spatial_index.query(box)):
+            if kind == 'point':
+                self._draw_point(painter, self.points[index], 'ABCDEFGHIJKLMN'[index % 14])
+            elif kind == 'line':
+                selected = self.selected_item == ('line', index) or ('line', index) in self.selection
+                text = self.line_texts[index] if index < len(self.line_texts) else None
+                self._draw_line(painter, self.lines[index], text, selected)
+            else:
+                self._draw_shape(painter, self.shapes[index], ('shape', index) in self.selection)
+    
+    def render_scene(self, painter, labels=True, measurements=True, axes=True, box=None):
+        """把场景绘制到任意绘图设备（导出 PDF、位图时使用），坐标为画布的屏幕坐标
+
+        Args:
+            painter: 已在目标设备上开始绘制的 QPainter
+            labels: 是否绘制点的名称
+            measurements: 是否绘制线段长度文本
+            axes: 是否绘制坐标轴
+            box: 只绘制与该区域 (left, top, right, bottom) 相交的图形（通过空间索引查询）
+        """
+        if axes:
+            self._draw_coordinate_axes(painter)
+        if box is None:
+            keys = [('point', i) for i in range(len(self.points))]
+            keys += [('line', i) for i in range(len(self.lines))]
+            keys += [('shape', i) for i in range(len(self.shapes))]
+        else:
+            box = (box[0] - LABEL_MARGIN, box[1] - LABEL_MARGIN,
+                   box[2] + LABEL_MARGIN, box[3] + LABEL_MARGIN)
+            keys = self.spatial_index.sorted_keys(self.spatial_index.query(box))
+        for kind, index in keys:
+            if kind == 'point':
+                self._draw_point(painter, self.points[index], 'ABCDEFGHIJKLMN'[index % 14] if labels else None)
+            elif kind == 'line':
+                text = self.line_texts[index] if measurements and index < len(self.line_texts) else None
+                self._draw_line(painter, self.lines[index], text)
+            else:
+                self._draw_shape(painter, self.shapes[index])
+        self._draw_overlays(painter)
+    
+    def add_overlay(self, overlay):
+        """添加叠加图层并重绘"""
+        self.overlays.append(overlay)
+        self.update()
+    
+    def remove_overlay(self, overlay):
+        """移除叠加图层并重绘"""
+        if overlay in self.overlays:
+            self.overlays.remove(overlay)
+            if overlay in self._failed_overlays:
+                self._failed_overlays.remove(overlay)
+            self.update()
+    
+    def _draw_overlays(self, painter):
+        # 在 paintEvent 中抛出的异常会使 PyQt 终止程序：出错的图层跳过，只报告一次
+        for overlay in self.overlays:
+            painter.save()
+            try:
+                overlay.paint(painter, self)
+            except Exception as error:
+                if overlay not in self._failed_overlays:
+                    self._failed_overlays.append(overlay)
+                    print(f"Erreur de dessin du calque {overlay!r}: {error}")
+            finally:
+                painter.restore()
+    
+    def scene_bounds(self, axes=True):
+        """场景内容（含标签余量）的包围盒 (left, top, right, bottom)
+
+        axes 为 True 时包含坐标轴所在的画布区域；场景为空时返回画布区域。
+        """
+        box = union_bbox(self.spatial_index.boxes.values())
+        if box is not None:
+            box = (box[0] - LABEL_MARGIN, box[1] - LABEL_MARGIN,
+                   box[2] + LABEL_MARGIN, box[3] + LABEL_MARGIN)
+        if axes or box is None:
+            box = union_bbox([box, (0, 0, self.width(), self.height())])
+        return box
+    
     def _draw_coordinate_axes(self, painter):
         """绘制坐标轴"""
         # 获取画布中心点
@@ -167,59 +702,132 @@ class Canvas(QWidget):
         painter.drawText(QRect(center_x + 10, center_y + 10, 15, 15), 
                         Qt.AlignmentFlag.AlignCenter, "O")
     
-    def _draw_points(self, painter):
+    def _draw_points(self, painter, hidden=frozenset()):
         """绘制已保存的点"""
         for i, point in enumerate(self.points):
-            # 设置点的颜色
-            painter.setPen(QPen(QColor(point['color']), 2))
-            painter.setBrush(QBrush(QColor(point['color'])))
-            x = int(point['x'])
-            y = int(point['y'])
-            
-            # 绘制点
-            painter.drawEllipse(x - 5, y - 5, 10, 10)
-            
-            # 绘制点的名称标签
-            point_name = 'ABCDEFGHIJKLMN'[i % 14]
-            
-            painter.setPen(QPen(QColor("#000000")))
-            font = QFont("Arial", 10)
-            font.setBold(True)
-            painter.setFont(font)
-            
-            painter.drawText(x - 5, y - 10, point_name)
+            if ('point', i) in hidden:
+                continue
+            self._draw_point(painter, point, 'ABCDEFGHIJKLMN'[i % 14])
+    
+    def _draw_point(self, painter, point, point_name):
+        """绘制单个点及其名称标签"""
+        # 设置点的颜色
+        painter.setPen(QPen(QColor(point['color']), 2))
+        painter.setBrush(QBrush(QColor(point['color'])))
+        x = int(point['x'])
+        y = int(point['y'])
+        
+        # 绘制点
+        painter.drawEllipse(x - 5, y - 5, 10, 10)
+        
+        # 绘制点的名称标签
+        if not point_name:
+            return
+        painter.setPen(QPen(QColor("#000000")))
+        painter.setFont(self._label_font)
+        
+        painter.drawText(x - 5, y - 10, point_name)
     
-    def _draw_lines(self, painter):
+    def _draw_lines(self, painter, hidden=frozenset()):
         """绘制已保存的线段"""
         for i, line in enumerate(self.lines):
-            if self.selected_item == ('line', i):
-                # 选中的线段用更粗的线
-                painter.setPen(QPen(QColor(line['color']), 3))
-            else:
-                painter.setPen(QPen(QColor(line['color']), 2))
-            
-            painter.drawLine(int(line['x1']), int(line['y1']), int(line['x2']), int(line['y2']))
-            
-            # 绘制线段长度文本
-            if i < len(self.line_texts):
-                text = self.line_texts[i]
-                mid_x = int((line['x1'] + line['x2']) / 2)
-                mid_y = int((line['y1'] + line['y2']) / 2)
-                painter.drawText(QRect(mid_x - 20, mid_y - 10, 40, 20), 
-                                Qt.AlignmentFlag.AlignCenter, text)
-    
-    def _draw_shapes(self, painter):
+            if ('line', i) in hidden:
+                continue
+            selected = self.selected_item == ('line', i) or ('line', i) in self.selection
+            text = self.line_texts[i] if i < len(self.line_texts) else None
+            self._draw_line(painter, line, text, selected)
+    
+    def _draw_line(self, painter, line, text=None, selected=False):
+        """绘制单条线段及其长度文本"""
+        if selected:
+            # 选中的线段用更粗的线
+            painter.setPen(QPen(QColor(line['color']), 3))
+        else:
+            painter.setPen(QPen(QColor(line['color']), 2))
+        
+        painter.drawLine(int(line['x1']), int(line['y1']), int(line['x2']), int(line['y2']))
+        
+        # 绘制线段长度文本（字体固定，不依赖之前绘制的内容留下的状态）
+        if text is not None:
+            painter.setFont(self._label_font)
+            mid_x = int((line['x1'] + line['x2']) / 2)
+            mid_y = int((line['y1'] + line['y2']) / 2)
+            painter.drawText(QRect(mid_x - 20, mid_y - 10, 40, 20), 
+                            Qt.AlignmentFlag.AlignCenter, text)
+    
+    def _draw_shapes(self, painter, hidden=frozenset()):
         """绘制保存的形状"""
-        for shape in self.shapes:
-            if shape['type'] == 'circle':
-                # 绘制圆形
-                painter.setPen(QPen(QColor(shape['color']), 2))
-                painter.setBrush(Qt.BrushStyle.NoBrush)  # 不填充
-                
-                center_x, center_y = shape['center']
-                radius = shape['radius']
-                painter.drawEllipse(int(center_x - radius), int(center_y - radius), 
-                                   int(radius * 2), int(radius * 2))
+        for i, shape in enumerate(self.shapes):
+            if ('shape', i) in hidden:
+                continue
+            self._draw_shape(painter, shape, ('shape', i) in self.selection)
+    
+    def _draw_shape(self, painter, shape, selected=False):
+        """绘制单个形状
+        
+        多边形也绘制自己的轮廓：导入的矩形和三角形只有形状，没有边的线段
+        （手动绘制的多边形的轮廓与它的线段重合，坐标取整方式相同）。
+        """
+        painter.setPen(QPen(QColor(shape['color']), 3 if selected else 2))
+        painter.setBrush(Qt.BrushStyle.NoBrush)  # 不填充
+        if shape['type'] == 'circle':
+            center_x, center_y = shape['center']
+            radius = shape['radius']
+            painter.drawEllipse(int(center_x - radius), int(center_y - radius), 
+                               int(radius * 2), int(radius * 2))
+        elif shape.get('vertices'):
+            painter.drawPolygon(QPolygon([QPoint(int(x), int(y)) for x, y in shape['vertices']]))
+    
+    def begin_preview_layer(self, hidden):
+        """开始移动图层预览
+
+        Args:
+            hidden: 预览期间从静态图层中隐藏的图形键（原地变换时为移动的图形）
+        """
+        self._preview_hidden = set(hidden)
+        self._static_layer = None
+        self.preview_layer = []
+        self.preview_texts = []
+    
+    def set_preview_layer(self, layer, texts):
+        """设置移动图层的内容：(kind, 下标, 字典) 列表和线段长度文本"""
+        self.preview_layer = layer
+        self.preview_texts = texts
+        self.update()
+    
+    def end_preview_layer(self):
+        """结束移动图层预览并释放静态位图"""
+        self.preview_layer = None
+        self.preview_texts = []
+        self._preview_hidden = set()
+        self._static_layer = None
+        self.update()
+    
+    def _render_static_layer(self):
+        """将不移动的内容渲染到位图中"""
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.GlobalColor.white)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        if self.show_axes:
+            self._draw_coordinate_axes(painter)
+        self._draw_points(painter, self._preview_hidden)
+        self._draw_lines(painter, self._preview_hidden)
+        self._draw_shapes(painter, self._preview_hidden)
+        self._draw_overlays(painter)
+        painter.end()
+        return pixmap
+    
+    def _draw_preview_layer(self, painter):
+        """绘制移动图层"""
+        texts = iter(self.preview_texts)
+        for kind, index, item in self.preview_layer:
+            if kind == 'point':
+                self._draw_point(painter, item, 'ABCDEFGHIJKLMN'[index % 14])
+            elif kind == 'line':
+                self._draw_line(painter, item, next(texts, None), True)
+            else:
+                self._draw_shape(painter, item, True)
     
     def _draw_temp_shapes(self, painter):
         """绘制临时形状"""
@@ -358,9 +966,7 @@ class Canvas(QWidget):
         
         point_name = 'ABCDEFGHIJKLMN'[len(self.points) % 14]
         painter.setPen(QPen(QColor("#000000")))
-        font = QFont("Arial", 10)
-        font.setBold(True)
-        painter.setFont(font)
+        painter.setFont(self._label_font)
         painter.drawText(int(x) - 5, int(y) - 10, point_name)
     
     def _draw_temp_endpoints(self, painter):
@@ -411,12 +1017,7 @@ class Canvas(QWidget):
                 self.shape_handler.handle_mouse_press(grid_x, grid_y)
             elif self.draw_mode == "point":
                 # 添加一个点
-                new_point = {
-                    'x': self.start_x,
-                    'y': self.start_y,
-                    'color': "#E65100"  # 橙色
-                }
-                self.points.append(new_point)
+                self.add_point(self.start_x, self.start_y, "#E65100")  # 橙色
                 self.update()
                 # 发送点创建信号
                 point_data = {'x': grid_x, 'y': grid_y, 'color': "#E65100"}
@@ -436,4 +1037,73 @@ class Canvas(QWidget):
                 self.shape_handler.handle_mouse_release(grid_x, grid_y)
         
         # 调用父类的mouseReleaseEvent
-        super().mouseReleaseEvent(event)
\ No newline at end of file
+        super().mouseReleaseEvent(event)
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(count=10_000):
+    """比较逐个插入与 canvas.batch() 中插入 count 个点的耗时
+
+    每次插入与点工具相同：add_point、update()、发出 point_created；
+    画布连接了撤销栈、快照、编辑日志和可见的信息标签。
+    分别测量插入（含信号处理）和之后的事件处理（分组提交、重绘）。
+    """
+    import tempfile
+    import time
+    from PyQt6.QtWidgets import QApplication, QLabel
+    from modules.journal import EditJournal
+    from modules.undo import UndoStack
+    from modules.snapshots import SnapshotStore
+
+    app = QApplication.instance() or QApplication([])
+    results = {}
+    for name in ('sans lot', 'avec batch()'):
+        canvas = Canvas()
+        canvas.resize(800, 600)
+        canvas.show()
+        label = QLabel()
+        label.show()
+        canvas.point_created.connect(lambda data: label.setText(f"Point: ({data['x']:.2f}, {data['y']:.2f})"))
+        canvas.batch_finished.connect(lambda summary: label.setText(f"{summary['points']} points"))
+        undo_stack = UndoStack(canvas)
+        snapshots = SnapshotStore(canvas)
+        journal = EditJournal(tempfile.mkdtemp())
+        journal.attach(canvas)
+        app.processEvents()
+        
+        start = time.perf_counter()
+        if name == 'avec batch()':
+            with canvas.batch():
+                _insert_points(canvas, count)
+        else:
+            _insert_points(canvas, count)
+        inserted = time.perf_counter()
+        app.processEvents()
+        results[name] = (inserted - start, time.perf_counter() - inserted)
+        assert len(canvas.points) == count and len(snapshots.current.points) == count
+        assert len(undo_stack.undo_commands) == 1
+        journal.close()
+        canvas.hide()
+        label.hide()
+    
+    print(f"Insertion de {count} points")
+    for name, (insert_time, events_time) in results.items():
+        print(f"  {name}: insertion {insert_time * 1000:.0f} ms ({insert_time / count * 1e6:.1f} µs/point), "
+              f"événements et dessin {events_time * 1000:.0f} ms")
+    return results
+
+
+def _insert_points(canvas, count):
+    for i in range(count):
+        x, y = 20 + (i % 100) * 7, 20 + (i // 100) * 5
+        canvas.add_point(x, y, "#E65100")
+        canvas.update()
+        canvas.point_created.emit({'x': x, 'y': y, 'color': "#E65100"})
+
+
+if __name__ == "__main__":
+    import os
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    benchmark()
@@ -0,0 +1,516 @@
+"""
+批量导入：从 CSV 或 JSON Lines 文件导入点、线段、圆、矩形和三角形。
+
+每一行描述一个对象（网格坐标），字段为：
+    type       point / segment / circle / rectangle / triangle（也接受法语名称）
+    point      x, y
+    segment    x1, y1, x2, y2
+    circle     x, y（圆心）, r
+    rectangle  x, y（左上角）, width, height
+    triangle   x1, y1, x2, y2, x3, y3
+    color      可选，默认与对应的绘制工具相同
+
+点和线段（及其两个端点）与手动绘制相同；圆、矩形和三角形只生成形状本身
+（形状自己绘制轮廓），不再为每个顶点和每条边各生成一个图形。
+解析和校验在工作线程中分块进行，主线程按批把结果追加到画布列表；
+工作线程解析完后还为导入后的整个场景建立拓扑（批量焊接顶点）和空间索引，
+主线程在一个批量事务（canvas.batch()）中换入它们，只重绘一次，并作为一次编辑提交
+（可撤销、写入编辑日志）。
+"""
+import csv
+import gc
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, IO, Iterator, List, NamedTuple, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from modules.scene_io import Frame, canvas_frame
+from modules.spatial_index import GridIndex
+from modules.topology import Topology
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+TYPE_ALIASES = {
+    'point': 'point',
+    'segment': 'segment', 'line': 'segment', 'ligne': 'segment',
+    'circle': 'circle', 'cercle': 'circle',
+    'rectangle': 'rectangle',
+    'triangle': 'triangle',
+}
+
+# 与各绘制工具一致的默认颜色
+DEFAULT_COLORS = {
+    'point': '#E65100',
+    'segment': '#0277BD',
+    'circle': '#1B5E20',
+    'rectangle': '#1A237E',
+    'triangle': '#311B92',
+}
+
+REQUIRED_FIELDS = {
+    'point': ('x', 'y'),
+    'segment': ('x1', 'y1', 'x2', 'y2'),
+    'circle': ('x', 'y', 'r'),
+    'rectangle': ('x', 'y', 'width', 'height'),
+    'triangle': ('x1', 'y1', 'x2', 'y2', 'x3', 'y3'),
+}
+
+ImportedItem = Tuple[str, Dict[str, Any], Optional[str]]  # (kind, 图形字典, 线段长度文本)
+
+
+class SceneLists(NamedTuple):
+    """重建拓扑和空间索引只需要的三个图形列表（可在工作线程中代替画布）"""
+    points: List[Dict[str, Any]]
+    lines: List[Dict[str, Any]]
+    shapes: List[Dict[str, Any]]
+
+
+class ImportCaches(NamedTuple):
+    """工作线程为导入后的场景建立的缓存，counts 为建立时的 (点, 线段, 形状) 数"""
+    topology: Topology
+    spatial_index: GridIndex
+    counts: Tuple[int, int, int]
+
+
+# ----------------------------------------------------------------------
+# 解析与校验（不依赖画布，可在工作线程中运行）
+# ----------------------------------------------------------------------
+
+def iter_rows(stream: IO[str], path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """按扩展名逐行读取 CSV 或 JSON Lines，生成 (行号, 字段字典)"""
+    if path.lower().endswith('.csv'):
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            yield line_number, {'type': None, '_invalid': "JSON invalide"}
+            continue
+        yield line_number, row
+
+
+def _number(row: Dict[str, Any], field: str) -> float:
+    value = row.get(field)
+    if value is None or value == '':
+        raise ValueError(f"Champ manquant: {field}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Valeur non numérique pour {field}: {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"Valeur non finie pour {field}: {value!r}")
+    return number
+
+
+def row_to_items(row: Dict[str, Any], frame: Frame) -> List[ImportedItem]:
+    """把一行转换为画布图形 (kind, 屏幕坐标字典, 线段长度文本)，无效时抛出 ValueError"""
+    if '_invalid' in row:
+        raise ValueError(row['_invalid'])
+    shape_type = TYPE_ALIASES.get(str(row.get('type') or '').strip().lower())
+    if shape_type is None:
+        raise ValueError(f"Type inconnu: {row.get('type')!r}")
+    values = [_number(row, field) for field in REQUIRED_FIELDS[shape_type]]
+    color = str(row.get('color') or '').strip() or DEFAULT_COLORS[shape_type]
+    origin_x, origin_y, spacing = frame
+
+    if shape_type == 'point':
+        x, y = values
+        return [('point', {'x': origin_x + x * spacing, 'y': origin_y - y * spacing, 'color': color}, None)]
+    if shape_type == 'segment':
+        x1, y1, x2, y2 = values
+        sx1, sy1 = origin_x + x1 * spacing, origin_y - y1 * spacing
+        sx2, sy2 = origin_x + x2 * spacing, origin_y - y2 * spacing
+        return [('point', {'x': sx1, 'y': sy1, 'color': color}, None),
+                ('point', {'x': sx2, 'y': sy2, 'color': color}, None),
+                ('line', {'x1': sx1, 'y1': sy1, 'x2': sx2, 'y2': sy2, 'color': color},
+                 f"{math.hypot(x2 - x1, y2 - y1):.1f}")]
+    if shape_type == 'circle':
+        x, y, radius = values
+        if radius <= 0:
+            raise ValueError("Le rayon doit être positif")
+        center = (origin_x + x * spacing, origin_y - y * spacing)
+        return [('shape', {'type': 'circle', 'center': center, 'radius': radius * spacing, 'color': color}, None)]
+    if shape_type == 'rectangle':
+        x, y, width, height = values
+        if width <= 0 or height <= 0:
+            raise ValueError("La largeur et la hauteur doivent être positives")
+        vertices = [(x, y), (x + width, y), (x + width, y - height), (x, y - height)]
+    else:
+        vertices = [(values[0], values[1]), (values[2], values[3]), (values[4], values[5])]
+        (ax, ay), (bx, by), (cx, cy) = vertices
+        if abs((bx - ax) * (cy - ay) - (by - ay) * (cx - ax)) < 1e-12:
+            raise ValueError("Les trois sommets sont alignés")
+    screen = [(origin_x + x * spacing, origin_y - y * spacing) for x, y in vertices]
+    return [('shape', {'type': shape_type, 'vertices': screen, 'color': color}, None)]
+
+
+def iter_item_chunks(path: str, frame: Frame, chunk_size: int = DEFAULT_CHUNK_SIZE
+                     ) -> Iterator[Tuple[List[ImportedItem], List[Tuple[int, str]], int, int]]:
+    """分块解析文件，生成 (画布图形列表, 错误列表, 已读字节数, 总字节数)
+
+    错误为 (行号, 说明)，出错的行被跳过。
+    """
+    total = os.path.getsize(path)
+    items: List[ImportedItem] = []
+    errors: List[Tuple[int, str]] = []
+    rows = 0
+    with open(path, 'r', encoding='utf-8-sig', newline='') as stream:
+        for line_number, row in iter_rows(stream, path):
+            try:
+                items.extend(row_to_items(row, frame))
+            except ValueError as error:
+                errors.append((line_number, str(error)))
+            rows += 1
+            if rows % chunk_size == 0:
+                yield items, errors, _position(stream, total), total
+                items, errors = [], []
+    yield items, errors, total, total
+
+
+def _position(stream: IO[str], total: int) -> int:
+    """文本流的大致读取位置（CSV 读取器逐行读取，tell 在迭代中不可用时按总大小估计）"""
+    try:
+        return min(stream.buffer.tell(), total)
+    except (AttributeError, OSError):
+        return 0
+
+
+# ----------------------------------------------------------------------
+# 追加到画布（主线程）
+# ----------------------------------------------------------------------
+
+def append_items(canvas, items: List[ImportedItem], keys: List[Tuple[str, int]]):
+    """把一批图形追加到画布列表末尾（不更新缓存、不发出信号、不重绘），新图形的键追加到 keys
+
+    拓扑和空间索引在 finish_import 中一次性重建；导入期间进度对话框是模态的，
+    画布上不会有读取缓存的编辑。
+    """
+    points, lines, texts, shapes = canvas.points, canvas.lines, canvas.line_texts, canvas.shapes
+    refresh = canvas.refresh_shape_measurements
+    for kind, item, text in items:
+        if kind == 'point':
+            keys.append(('point', len(points)))
+            points.append(item)
+        elif kind == 'line':
+            keys.append(('line', len(lines)))
+            lines.append(item)
+            texts.append(text)
+        else:
+            refresh(item)
+            keys.append(('shape', len(shapes)))
+            shapes.append(item)
+
+
+@contextmanager
+def _gc_paused():
+    """暂停循环垃圾回收
+
+    建立缓存和提交会分配数百万个小对象（每个顶点的列表、每个图形的状态副本），
+    回收器会反复扫描整个场景。
+    """
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
+
+
+def scene_lists(canvas) -> SceneLists:
+    """画布图形列表的浅复制（导入开始时在主线程中取得，交给工作线程）"""
+    return SceneLists(list(canvas.points), list(canvas.lines), list(canvas.shapes))
+
+
+def build_caches(scene: SceneLists, tolerance: float, cell_size: float) -> ImportCaches:
+    """为场景建立拓扑和空间索引（不访问画布，可在工作线程中调用）"""
+    with _gc_paused():
+        topology = Topology(tolerance)
+        topology.rebuild(scene)
+        spatial_index = GridIndex(cell_size)
+        spatial_index.rebuild(scene)
+    return ImportCaches(topology, spatial_index, (len(scene.points), len(scene.lines), len(scene.shapes)))
+
+
+def finish_import(canvas, keys: List[Tuple[str, int]], caches: Optional[ImportCaches] = None):
+    """导入结束：在一个批量事务中换入（或重建）拓扑和空间索引，重绘一次，并作为一次新增编辑提交
+
+    caches 为工作线程建立的缓存；其图形数与画布不一致或没有时在这里重建。
+    """
+    with _gc_paused():
+        with canvas.batch():
+            counts = (len(canvas.points), len(canvas.lines), len(canvas.shapes))
+            if caches is not None and caches.counts == counts:
+                canvas.adopt_caches(caches.topology, caches.spatial_index)
+            else:
+                canvas.rebuild_caches()
+            canvas.update()
+            canvas.commit_items(keys, 'add')
+        # 导入的图形和缓存会一直存在：在恢复回收之前移到永久代，之后的完整回收不再扫描这数百万个对象
+        # （它们不含循环引用，删除时仍由引用计数释放）
+        gc.freeze()
+
+
+def import_file(canvas, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                progress: Optional[Callable[[int, int], None]] = None) -> Tuple[int, List[Tuple[int, str]]]:
+    """在当前线程中导入文件，返回 (导入的图形数, 错误列表)"""
+    keys: List[Tuple[str, int]] = []
+    errors: List[Tuple[int, str]] = []
+    with canvas.batch():
+        for items, chunk_errors, done, total in iter_item_chunks(path, canvas_frame(canvas), chunk_size):
+            append_items(canvas, items, keys)
+            errors.extend(chunk_errors)
+            if progress:
+                progress(done, total)
+        finish_import(canvas, keys)
+    return len(keys), errors
+
+
+# ----------------------------------------------------------------------
+# 后台导入
+# ----------------------------------------------------------------------
+
+class ImportThread(QThread):
+    """在工作线程中解析文件，每解析一块发出一次 chunk_ready
+
+    给定 base（导入开始时画布的 scene_lists）时，解析完后为 base 加上导入的图形
+    建立拓扑和空间索引，通过 caches_ready 发出。
+    """
+
+    chunk_ready = pyqtSignal(list, list, int, int)  # 图形, 错误, 已读字节数, 总字节数
+    caches_ready = pyqtSignal(object)  # ImportCaches
+    failed = pyqtSignal(str)
+
+    def __init__(self, path: str, frame: Frame, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 base: Optional[SceneLists] = None, tolerance: float = 0.0, cell_size: float = 0.0,
+                 parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.frame = frame
+        self.chunk_size = chunk_size
+        self.base = base
+        self.tolerance = tolerance
+        self.cell_size = cell_size
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        # 导入期间不断分配长期存在的对象，回收器只会反复扫描它们（暂停对整个进程有效，
+        # 导入期间进度对话框是模态的）
+        with _gc_paused():
+            self._run()
+            if not self._cancelled:
+                gc.freeze()  # 同 finish_import：恢复回收后第一次完整回收不再扫描刚建立的场景和缓存
+
+    def _run(self):
+        scene = SceneLists(*(list(items) for items in self.base)) if self.base is not None else None
+        try:
+            for chunk in iter_item_chunks(self.path, self.frame, self.chunk_size):
+                if self._cancelled:
+                    return
+                if scene is not None:
+                    # 与 append_items 相同的顺序，图形的下标与追加到画布后一致
+                    for kind, item, _ in chunk[0]:
+                        getattr(scene, kind + 's').append(item)
+                self.chunk_ready.emit(*chunk)
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            self.failed.emit(str(error))
+            return
+        if scene is not None and not self._cancelled:
+            self.caches_ready.emit(build_caches(scene, self.tolerance, self.cell_size))
+
+
+class DataImporter(QObject):
+    """后台导入文件到画布
+
+    工作线程解析并建立缓存，主线程在 chunk_ready 中按批追加（不重绘），
+    线程结束后调用 finish_import 换入缓存。取消或失败时移除已追加的图形。
+    """
+
+    progress = pyqtSignal(int, int)  # 已读字节数, 总字节数
+    finished = pyqtSignal(int, list)  # 导入的图形数, 错误列表（最多 MAX_REPORTED_ERRORS 条）
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, canvas, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.thread: Optional[ImportThread] = None
+        self.keys: List[Tuple[str, int]] = []
+        self.errors: List[Tuple[int, str]] = []
+        self.error_count = 0
+        self._base = (0, 0, 0)
+        self._caches: Optional[ImportCaches] = None
+        self._error_message = None
+
+    def is_running(self) -> bool:
+        return self.thread is not None
+
+    def start(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if self.thread is not None:
+            raise ValueError("Une importation est déjà en cours")
+        canvas = self.canvas
+        self.keys, self.errors, self.error_count = [], [], 0
+        self._base = (len(canvas.points), len(canvas.lines), len(canvas.shapes))
+        self._caches = None
+        self._error_message = None
+        self.thread = ImportThread(path, canvas_frame(canvas), chunk_size, scene_lists(canvas),
+                                   canvas.topology.tolerance, canvas.spatial_index.cell_size, self)
+        self.thread.chunk_ready.connect(self._on_chunk)
+        self.thread.caches_ready.connect(self._on_caches)
+        self.thread.failed.connect(self._on_failed)
+        self.thread.finished.connect(self._on_thread_finished)
+        self.thread.start()
+
+    def cancel(self):
+        """取消导入并移除已追加的图形"""
+        if self.thread is not None:
+            self.thread.cancel()
+            self._error_message = ""
+
+    def _on_chunk(self, items, errors, done, total):
+        if self._error_message is not None:
+            return
+        with self.canvas.batch():
+            append_items(self.canvas, items, self.keys)
+        self.error_count += len(errors)
+        self.errors.extend(errors[:MAX_REPORTED_ERRORS - len(self.errors)])
+        self.progress.emit(done, total)
+
+    def _on_caches(self, caches):
+        self._caches = caches
+
+    def _on_failed(self, message):
+        self._error_message = message
+
+    def _on_thread_finished(self):
+        self.thread.wait()
+        self.thread = None
+        if self._error_message is not None:
+            self._rollback()
+            if self._error_message:
+                self.failed.emit(self._error_message)
+            else:
+                self.cancelled.emit()
+            return
+        caches, self._caches = self._caches, None
+        finish_import(self.canvas, self.keys, caches)
+        self.finished.emit(len(self.keys), self.errors)
+
+    def _rollback(self):
+        """删除本次已追加（尚未提交）的图形"""
+        canvas = self.canvas
+        points, lines, shapes = self._base
+        del canvas.points[points:]
+        del canvas.lines[lines:]
+        del canvas.line_texts[lines:]
+        del canvas.shapes[shapes:]
+        self.keys = []
+        self._caches = None
+        canvas.rebuild_caches()
+        canvas.update()
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def _write_sample_csv(path: str, rows: int):
+    """生成 rows 行的示例 CSV（点、线段、圆、矩形、三角形交替）"""
+    with open(path, 'w', encoding='utf-8', newline='') as stream:
+        writer = csv.writer(stream)
+        writer.writerow(['type', 'x', 'y', 'r', 'width', 'height', 'x1', 'y1', 'x2', 'y2', 'x3', 'y3', 'color'])
+        for i in range(rows):
+            x, y = (i % 1000) * 0.1, (i // 1000) * 0.1
+            kind = i % 5
+            if kind == 0:
+                writer.writerow(['point', x, y, '', '', '', '', '', '', '', '', '', ''])
+            elif kind == 1:
+                writer.writerow(['segment', '', '', '', '', '', x, y, x + 0.5, y + 0.2, '', '', ''])
+            elif kind == 2:
+                writer.writerow(['circle', x, y, 0.3, '', '', '', '', '', '', '', '', '#2E7D32'])
+            elif kind == 3:
+                writer.writerow(['rectangle', x, y, '', 0.4, 0.2, '', '', '', '', '', '', ''])
+            else:
+                writer.writerow(['triangle', '', '', '', '', '', x, y, x + 0.3, y, x, y + 0.3, ''])
+
+
+def benchmark(rows: int = 500_000, path: Optional[str] = None) -> Dict[str, float]:
+    """导入 rows 行的 CSV，分别测量工作线程（解析、建立缓存）和主线程（追加、换入缓存并提交、第一次绘制）的耗时
+
+    两部分按 DataImporter 的分工在同一线程中依次运行。
+    """
+    import tempfile
+    from PyQt6.QtWidgets import QApplication
+    from modules.canvas import Canvas
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841  画布需要 QApplication
+    canvas = Canvas()
+    canvas.resize(800, 600)
+    path = path or os.path.join(tempfile.mkdtemp(), 'benchmark.csv')
+    _write_sample_csv(path, rows)
+    try:
+        scene = scene_lists(canvas)
+        keys: List[Tuple[str, int]] = []
+        parse_time = append_time = 0.0
+        chunks = iter_item_chunks(path, canvas_frame(canvas))
+        with _gc_paused():  # 与 ImportThread.run 一样，解析、追加和建立缓存期间暂停回收
+            while True:
+                t = time.perf_counter()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    for kind, item, _ in chunk[0]:
+                        getattr(scene, kind + 's').append(item)
+                parse_time += time.perf_counter() - t
+                if chunk is None:
+                    break
+                t = time.perf_counter()
+                with canvas.batch():
+                    append_items(canvas, chunk[0], keys)
+                append_time += time.perf_counter() - t
+            t = time.perf_counter()
+            caches = build_caches(scene, canvas.topology.tolerance, canvas.spatial_index.cell_size)
+            caches_time = time.perf_counter() - t
+        t = time.perf_counter()
+        finish_import(canvas, keys, caches)
+        finish_time = time.perf_counter() - t
+        t = time.perf_counter()
+        canvas.grab()  # finish_import 只安排重绘，这里单独测量第一次绘制
+        paint_time = time.perf_counter() - t
+    finally:
+        os.remove(path)
+
+    worker = parse_time + caches_time
+    main = append_time + finish_time + paint_time
+    results = {'rows': rows, 'items': len(keys), 'parse_s': parse_time, 'caches_s': caches_time,
+               'append_s': append_time, 'finish_s': finish_time, 'paint_s': paint_time,
+               'worker_s': worker, 'main_s': main}
+    print(f"Importation de {rows} lignes CSV ({len(keys)} éléments)")
+    print(f"  thread de travail: {worker:.2f} s")
+    print(f"    analyse: {parse_time:.2f} s, {rows / parse_time:,.0f} lignes/s")
+    print(f"    topologie et index spatial: {caches_time:.2f} s")
+    print(f"  thread principal: {main:.2f} s")
+    print(f"    ajout au canevas (par blocs de {DEFAULT_CHUNK_SIZE} lignes): {append_time:.2f} s")
+    print(f"    échange des caches et validation: {finish_time:.2f} s")
+    print(f"    premier dessin: {paint_time:.2f} s")
+    return results
+
+
+if __name__ == "__main__":
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    benchmark()
@@ -0,0 +1,364 @@
+"""
+场景导出：SVG、PDF 和高分辨率 PNG。
+
+SVG 按图形逐个写入文件，不构建中间的文档树；PDF 通过 QPdfWriter 使用画布自身的
+绘制代码（Canvas.render_scene）输出矢量内容。PNG 按水平条带渲染，每个条带
+压缩后立即写入文件，峰值内存由条带大小决定，与图片总尺寸无关。
+"""
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Dict, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from PyQt6.QtCore import QMarginsF, QRectF, Qt
+from PyQt6.QtGui import QImage, QPageLayout, QPageSize, QPainter, QPdfWriter
+
+BBox = Tuple[float, float, float, float]
+
+# PDF 默认的纸张、分辨率和页边距（毫米）
+PDF_PAGE_SIZE = QPageSize.PageSizeId.A4
+PDF_RESOLUTION = 300
+PDF_MARGIN_MM = 10
+
+# PNG 默认的分辨率和条带高度（像素）；画布坐标按 96 DPI 计算
+PNG_DPI = 300
+PNG_BAND_HEIGHT = 512
+SCREEN_DPI = 96
+
+POINT_NAMES = 'ABCDEFGHIJKLMN'
+
+
+def _num(value: float) -> str:
+    """紧凑的坐标文本"""
+    text = f"{value:.2f}".rstrip('0').rstrip('.')
+    return text if text != '-0' else '0'
+
+
+# ----------------------------------------------------------------------
+# SVG
+# ----------------------------------------------------------------------
+
+def write_svg(canvas, stream: IO[str], labels: bool = True, measurements: bool = True,
+              axes: bool = True) -> int:
+    """把场景以 SVG 逐个元素写入文本流，返回写入的图形数
+
+    元素样式与画布绘制一致：点为实心圆，线段和圆为 2 像素描边，
+    点名称和线段长度文本为 10pt 粗体，长度文本居中于线段中点。
+    """
+    left, top, right, bottom = canvas.scene_bounds(axes)
+    width, height = right - left, bottom - top
+    write = stream.write
+    write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{_num(width)}" height="{_num(height)}" '
+          f'viewBox="{_num(left)} {_num(top)} {_num(width)} {_num(height)}">\n')
+    write(f'<rect x="{_num(left)}" y="{_num(top)}" width="{_num(width)}" height="{_num(height)}" fill="#FFFFFF"/>\n')
+    if axes:
+        _write_svg_axes(canvas, write)
+
+    count = 0
+    write('<g id="points" stroke-width="2">\n')
+    for point in canvas.points:
+        color = quoteattr(str(point['color']))  # 颜色来自导入和场景文件，未经校验
+        write(f'<circle cx="{_num(point["x"])}" cy="{_num(point["y"])}" r="5" fill={color} stroke={color}/>\n')
+        count += 1
+    write('</g>\n')
+    if labels and canvas.points:
+        write('<g id="labels" font-family="Arial" font-size="10pt" font-weight="bold" fill="#000000">\n')
+        for i, point in enumerate(canvas.points):
+            write(f'<text x="{_num(int(point["x"]) - 5)}" y="{_num(int(point["y"]) - 10)}">'
+                  f'{POINT_NAMES[i % 14]}</text>\n')
+        write('</g>\n')
+
+    write('<g id="lines" stroke-width="2">\n')
+    for line in canvas.lines:
+        write(f'<line x1="{_num(line["x1"])}" y1="{_num(line["y1"])}" x2="{_num(line["x2"])}" '
+              f'y2="{_num(line["y2"])}" stroke={quoteattr(str(line["color"]))}/>\n')
+        count += 1
+    write('</g>\n')
+    if measurements and canvas.line_texts:
+        write('<g id="measurements" font-family="Arial" font-size="10pt" font-weight="bold" '
+              'text-anchor="middle" dominant-baseline="central">\n')
+        for line, text in zip(canvas.lines, canvas.line_texts):
+            if text is None:
+                continue
+            mid_x = int((line['x1'] + line['x2']) / 2)
+            mid_y = int((line['y1'] + line['y2']) / 2)
+            write(f'<text x="{mid_x}" y="{mid_y}" fill={quoteattr(str(line["color"]))}>{escape(text)}</text>\n')
+        write('</g>\n')
+
+    # 多边形输出自己的轮廓（与画布一致：导入的矩形和三角形没有边的线段）
+    write('<g id="shapes" fill="none" stroke-width="2">\n')
+    for shape in canvas.shapes:
+        if shape['type'] == 'circle':
+            center_x, center_y = shape['center']
+            write(f'<circle cx="{_num(center_x)}" cy="{_num(center_y)}" r="{_num(shape["radius"])}" '
+                  f'stroke={quoteattr(str(shape["color"]))}/>\n')
+        elif shape.get('vertices'):
+            points = ' '.join(f"{_num(x)},{_num(y)}" for x, y in shape['vertices'])
+            write(f'<polygon points="{points}" stroke={quoteattr(str(shape["color"]))}/>\n')
+        count += 1
+    write('</g>\n')
+    write('</svg>\n')
+    return count
+
+
+def _write_svg_axes(canvas, write):
+    """坐标轴、刻度和刻度值（对应 Canvas._draw_coordinate_axes）"""
+    width, height = canvas.width(), canvas.height()
+    center_x, center_y = width // 2, height // 2
+    spacing = canvas.grid_spacing
+    color = quoteattr(str(canvas.axis_color))
+    write(f'<g id="axes" stroke={color} stroke-width="1" fill={color} '
+          'font-family="Arial" font-size="8pt" text-anchor="middle" dominant-baseline="central">\n')
+    write(f'<line x1="0" y1="{center_y}" x2="{width}" y2="{center_y}"/>\n')
+    write(f'<line x1="{center_x}" y1="0" x2="{center_x}" y2="{height}"/>\n')
+    for i in range(-10, 11):
+        if i == 0:
+            continue
+        x = center_x + i * spacing
+        if 0 <= x <= width:
+            write(f'<line x1="{x}" y1="{center_y - 5}" x2="{x}" y2="{center_y + 5}"/>\n')
+            write(f'<text x="{x}" y="{center_y + 17}" stroke="none">{i}</text>\n')
+        y = center_y + i * spacing
+        if 0 <= y <= height:
+            write(f'<line x1="{center_x - 5}" y1="{y}" x2="{center_x + 5}" y2="{y}"/>\n')
+            write(f'<text x="{center_x + 20}" y="{y}" stroke="none">{-i}</text>\n')
+    write(f'<text x="{center_x + 17}" y="{center_y + 17}" stroke="none">O</text>\n')
+    write('</g>\n')
+
+
+def export_svg(canvas, path: str, labels: bool = True, measurements: bool = True,
+               axes: bool = True) -> int:
+    """导出 SVG 文件，返回导出的图形数（先写临时文件再替换）"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as stream:
+        count = write_svg(canvas, stream, labels, measurements, axes)
+    os.replace(temp_path, path)
+    return count
+
+
+# ----------------------------------------------------------------------
+# PDF
+# ----------------------------------------------------------------------
+
+def export_pdf(canvas, path: str, labels: bool = True, measurements: bool = True,
+               axes: bool = True, page_size: QPageSize.PageSizeId = PDF_PAGE_SIZE,
+               resolution: int = PDF_RESOLUTION) -> int:
+    """导出单页 PDF，场景按比例缩放并居中于页面，返回导出的图形数
+
+    纸张方向按场景的宽高比自动选择。
+    """
+    left, top, right, bottom = canvas.scene_bounds(axes)
+    width, height = max(right - left, 1), max(bottom - top, 1)
+    orientation = (QPageLayout.Orientation.Landscape if width > height
+                   else QPageLayout.Orientation.Portrait)
+
+    temp_path = path + '.tmp'
+    writer = QPdfWriter(temp_path)
+    writer.setResolution(resolution)
+    writer.setPageLayout(QPageLayout(QPageSize(page_size), orientation,
+                                     QMarginsF(PDF_MARGIN_MM, PDF_MARGIN_MM, PDF_MARGIN_MM, PDF_MARGIN_MM),
+                                     QPageLayout.Unit.Millimeter))
+    writer.setTitle("Scène géométrique")
+    painter = QPainter()
+    if not painter.begin(writer):
+        raise OSError(f"Impossible d'écrire le fichier PDF: {path}")
+    try:
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        page = QRectF(painter.viewport())
+        scale = min(page.width() / width, page.height() / height)
+        painter.translate(page.x() + (page.width() - width * scale) / 2,
+                          page.y() + (page.height() - height * scale) / 2)
+        painter.scale(scale, scale)
+        painter.translate(-left, -top)
+        canvas.render_scene(painter, labels, measurements, axes)
+    finally:
+        painter.end()
+    os.replace(temp_path, path)
+    return len(canvas.points) + len(canvas.lines) + len(canvas.shapes)
+
+
+# ----------------------------------------------------------------------
+# PNG（条带渲染）
+# ----------------------------------------------------------------------
+
+class PngStreamWriter:
+    """逐行写入 PNG：像素数据经 zlib 流式压缩后按 IDAT 块写出（RGB，8 位）"""
+
+    def __init__(self, stream: IO[bytes], width: int, height: int, dpi: float = PNG_DPI):
+        if width <= 0 or height <= 0:
+            raise ValueError("Dimensions d'image invalides")
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(6)
+        stream.write(b'\x89PNG\r\n\x1a\n')
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        pixels_per_meter = int(round(dpi / 0.0254))
+        self._chunk(b'pHYs', struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1))
+
+    def _chunk(self, tag: bytes, data: bytes):
+        self.stream.write(struct.pack('>I', len(data)))
+        self.stream.write(tag)
+        self.stream.write(data)
+        self.stream.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(tag))))
+
+    def write_image(self, image: QImage):
+        """写入一个条带（Format_RGB888 的 QImage，宽度与图片相同）的所有行"""
+        pixels = image.constBits()
+        pixels.setsize(image.sizeInBytes())
+        data = memoryview(pixels)
+        stride = image.bytesPerLine()
+        row_bytes = self.width * 3
+        scanlines = b''.join(b'\x00' + data[i * stride:i * stride + row_bytes]
+                             for i in range(image.height()))
+        compressed = self._compressor.compress(scanlines)
+        if compressed:
+            self._chunk(b'IDAT', compressed)
+        self.rows_written += image.height()
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Image incomplète: {self.rows_written}/{self.height} lignes")
+        self._chunk(b'IDAT', self._compressor.flush())
+        self._chunk(b'IEND', b'')
+
+
+def _render_band(canvas, bounds: BBox, scale: float, width: int, top: int, rows: int,
+                 labels: bool, measurements: bool, axes: bool) -> QImage:
+    """渲染从第 top 行开始的 rows 行"""
+    image = QImage(width, rows, QImage.Format.Format_RGB888)
+    image.fill(Qt.GlobalColor.white)
+    painter = QPainter(image)
+    try:
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.translate(0, -top)
+        painter.scale(scale, scale)
+        painter.translate(-bounds[0], -bounds[1])
+        band_box = (bounds[0], bounds[1] + top / scale, bounds[2], bounds[1] + (top + rows) / scale)
+        canvas.render_scene(painter, labels, measurements, axes, band_box)
+    finally:
+        painter.end()
+    return image
+
+
+def export_png(canvas, path: str, dpi: float = PNG_DPI, labels: bool = True,
+               measurements: bool = True, axes: bool = True, width: Optional[int] = None,
+               band_height: int = PNG_BAND_HEIGHT, workers: int = 0) -> Tuple[int, int]:
+    """按条带渲染并导出 PNG，返回图片尺寸 (宽, 高)
+
+    Args:
+        dpi: 输出分辨率（画布坐标按 96 DPI 换算）；给定 width 时忽略
+        width: 输出宽度（像素），按此宽度计算缩放比例
+        band_height: 每个条带的高度（像素）
+        workers: 大于 0 时用该数量的线程并行渲染条带（每个线程渲染到各自的 QImage），
+            同时在内存中的条带不超过 workers + 1 个
+    """
+    bounds = canvas.scene_bounds(axes)
+    scene_width, scene_height = max(bounds[2] - bounds[0], 1), max(bounds[3] - bounds[1], 1)
+    if width is not None:
+        scale = width / scene_width
+        dpi = SCREEN_DPI * scale
+    else:
+        scale = dpi / SCREEN_DPI
+    image_width = max(1, int(round(scene_width * scale)))
+    image_height = max(1, int(round(scene_height * scale)))
+    bands = [(top, min(band_height, image_height - top)) for top in range(0, image_height, band_height)]
+
+    def render(band):
+        return _render_band(canvas, bounds, scale, image_width, band[0], band[1],
+                            labels, measurements, axes)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as stream:
+        writer = PngStreamWriter(stream, image_width, image_height, dpi)
+        if workers > 0:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for band in bands:
+                    pending.append(executor.submit(render, band))
+                    if len(pending) > workers:
+                        writer.write_image(pending.popleft().result())
+                for future in pending:
+                    writer.write_image(future.result())
+        else:
+            for band in bands:
+                writer.write_image(render(band))
+        writer.close()
+    os.replace(temp_path, path)
+    return image_width, image_height
+
+
+def export_scene(canvas, path: str, labels: bool = True, measurements: bool = True,
+                 axes: bool = True) -> int:
+    """按扩展名（.svg / .pdf / .png）导出场景"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.svg':
+        return export_svg(canvas, path, labels, measurements, axes)
+    if extension == '.pdf':
+        return export_pdf(canvas, path, labels, measurements, axes)
+    if extension == '.png':
+        export_png(canvas, path, labels=labels, measurements=measurements, axes=axes)
+        return len(canvas.points) + len(canvas.lines) + len(canvas.shapes)
+    raise ValueError(f"Format d'export non pris en charge: {extension or path}")
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(count: int = 100_000, directory: Optional[str] = None,
+              poster_width: int = 10_000) -> Dict[str, float]:
+    """对 count 个图形的场景测量 SVG、PDF 和海报尺寸 PNG 导出的耗时与峰值内存增量"""
+    import tempfile
+    from PyQt6.QtWidgets import QApplication
+    from modules.canvas import Canvas
+    from modules.scene_io import _peak_rss_kb, _synthetic_records, insert_records
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841  画布需要 QApplication
+    canvas = Canvas()
+    canvas.resize(800, 600)
+    records = _synthetic_records(count)
+    next(records)  # 跳过文件头
+    insert_records(canvas, records)
+    directory = directory or tempfile.mkdtemp()
+
+    results: Dict[str, float] = {'items': len(canvas.points) + len(canvas.lines) + len(canvas.shapes)}
+    for name, export in (('svg', export_svg), ('pdf', export_pdf)):
+        path = os.path.join(directory, f"benchmark.{name}")
+        base = _peak_rss_kb()
+        start = time.perf_counter()
+        export(canvas, path)
+        results[f'{name}_s'] = time.perf_counter() - start
+        results[f'{name}_rss_growth_kb'] = _peak_rss_kb() - base
+        results[f'{name}_size_mb'] = os.path.getsize(path) / 1e6
+        os.remove(path)
+
+    # 海报尺寸的 PNG：顺序渲染和 4 个线程并行渲染
+    path = os.path.join(directory, "benchmark.png")
+    for name, workers in (('png', 0), ('png_parallel', 4)):
+        base = _peak_rss_kb()
+        start = time.perf_counter()
+        size = export_png(canvas, path, width=poster_width, workers=workers)
+        results[f'{name}_s'] = time.perf_counter() - start
+        results[f'{name}_rss_growth_kb'] = _peak_rss_kb() - base
+        results[f'{name}_size_mb'] = os.path.getsize(path) / 1e6
+        os.remove(path)
+
+    print(f"Export de {results['items']:.0f} éléments")
+    for name, title in (('svg', 'SVG'), ('pdf', 'PDF'), ('png', f'PNG {size[0]}x{size[1]}'),
+                        ('png_parallel', 'PNG, 4 threads')):
+        print(f"  {title}: {results[f'{name}_s']:.2f} s, {results[f'{name}_size_mb']:.1f} Mo, "
+              f"croissance mémoire maximale {results[f'{name}_rss_growth_kb'] / 1024:.1f} Mo")
+    print(f"  (image complète en mémoire: {size[0] * size[1] * 3 / 1e6:.0f} Mo)")
+    return results
+
+
+if __name__ == "__main__":
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    benchmark()
@@ -0,0 +1,460 @@
+"""
+计算器的表达式引擎（不依赖 PyQt，取代 eval）。
+
+- 词法分析：一个正则表达式切分数字、名称和运算符，× ÷ − 直接作为运算符识别
+- 语法分析：Pratt 解析器，按绑定强度处理优先级和结合性（^ 右结合，-2^2 = -4）
+- 常量折叠：子树只含常量时在编译时求值
+- 编译：把语法树转换为嵌套闭包，求值时只做函数调用，不再遍历语法树
+- 缓存：编译结果按 (源文本, 数值后端) 放在 LRU 缓存中，重复计算同一表达式时跳过解析和编译
+
+字面量、运算符、函数和常量都由数值后端（modules.numeric）提供，默认使用浮点后端。
+安装了 NumPy 时，同一棵语法树还可以编译为数组运算（Expression.vector），
+一次求出变量取一整列值时的结果。
+"""
+import operator
+import re
+import time
+from functools import lru_cache, reduce
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from modules.numeric import FLOAT, NumericBackend
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+# 编译缓存的容量（表达式个数）
+CACHE_SIZE = 1024
+
+
+class ExpressionError(ValueError):
+    """表达式语法错误或无法求值"""
+
+    def __init__(self, message: str, position: Optional[int] = None):
+        super().__init__(message)
+        self.position = position
+
+
+# ----------------------------------------------------------------------
+# 词法分析
+# ----------------------------------------------------------------------
+
+class Token(NamedTuple):
+    kind: str  # 'number' | 'name' | 'op' | 'end'
+    text: str
+    position: int
+
+
+_TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[^\W\d]\w*)
+      | (?P<op>\*\*|[-+*/^(),×÷−%])
+    )""", re.VERBOSE)
+
+# 同义运算符统一为一种写法
+_OPERATOR_ALIASES = {'×': '*', '÷': '/', '−': '-', '**': '^'}
+
+
+def tokenize(source: str) -> List[Token]:
+    """把源文本切分为记号列表，末尾附加 'end' 记号"""
+    tokens = []
+    position, length = 0, len(source)
+    match = _TOKEN_PATTERN.match
+    while position < length:
+        found = match(source, position)
+        if found is None:
+            if not source[position:].strip():
+                break
+            start = position + len(source[position:]) - len(source[position:].lstrip())
+            raise ExpressionError(f"Caractère inattendu « {source[start]} » en position {start + 1}", start)
+        kind = found.lastgroup
+        text = found.group(kind)
+        if kind == 'op':
+            text = _OPERATOR_ALIASES.get(text, text)
+        tokens.append(Token(kind, text, found.start(kind)))
+        position = found.end()
+    tokens.append(Token('end', '', length))
+    return tokens
+
+
+def normalize(source: str) -> str:
+    """规范化表达式文本：去掉空白、统一运算符写法（"3 × 4" 与 "3*4" 相同）"""
+    parts = []
+    previous = None
+    for token in tokenize(source)[:-1]:
+        # 相邻的数字/名称之间保留一个空格，"2 3" 不能变成 "23"
+        if previous is not None and previous.kind != 'op' and token.kind != 'op':
+            parts.append(' ')
+        parts.append(token.text)
+        previous = token
+    return ''.join(parts)
+
+
+# ----------------------------------------------------------------------
+# 语法树
+# ----------------------------------------------------------------------
+
+class Number(NamedTuple):
+    value: Any
+
+
+class Name(NamedTuple):
+    name: str
+
+
+class Unary(NamedTuple):
+    op: str
+    operand: Any
+
+
+class Binary(NamedTuple):
+    op: str
+    left: Any
+    right: Any
+
+
+class Call(NamedTuple):
+    name: str
+    args: Tuple[Any, ...]
+
+
+# ----------------------------------------------------------------------
+# Pratt 解析器
+# ----------------------------------------------------------------------
+
+# 中缀运算符的绑定强度：(左, 右)，右 < 左 表示右结合
+_INFIX_POWER = {
+    '+': (10, 11), '-': (10, 11),
+    '*': (20, 21), '/': (20, 21), '%': (20, 21),
+    '^': (41, 40),
+}
+_PREFIX_POWER = 30
+
+
+class Parser:
+    """把记号列表解析为语法树，字面量由数值后端转换"""
+
+    def __init__(self, source: str, backend: NumericBackend = FLOAT):
+        self.source = source
+        self.backend = backend
+        self.tokens = tokenize(source)
+        self.index = 0
+
+    def parse(self):
+        if self.tokens[0].kind == 'end':
+            raise ExpressionError("Expression vide", 0)
+        node = self.expression(0)
+        token = self.tokens[self.index]
+        if token.kind != 'end':
+            raise ExpressionError(f"« {token.text} » inattendu en position {token.position + 1}", token.position)
+        return node
+
+    def next(self) -> Token:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, text: str):
+        token = self.next()
+        if token.text != text:
+            where = "fin de l'expression" if token.kind == 'end' else f"« {token.text} »"
+            raise ExpressionError(f"« {text} » attendu, {where} trouvé", token.position)
+
+    def expression(self, min_power: int):
+        node = self.prefix(self.next())
+        while True:
+            token = self.tokens[self.index]
+            if token.kind != 'op' or token.text not in _INFIX_POWER:
+                return node
+            left_power, right_power = _INFIX_POWER[token.text]
+            if left_power < min_power:
+                return node
+            self.index += 1
+            node = Binary(token.text, node, self.expression(right_power))
+
+    def prefix(self, token: Token):
+        if token.kind == 'number':
+            return Number(self.backend.number(token.text))
+        if token.kind == 'name':
+            if self.tokens[self.index].text == '(':
+                return self.call(token)
+            return Name(token.text)
+        if token.text == '(':
+            node = self.expression(0)
+            self.expect(')')
+            return node
+        if token.text in self.backend.unary:
+            return Unary(token.text, self.expression(_PREFIX_POWER))
+        if token.kind == 'end':
+            raise ExpressionError("Expression incomplète", token.position)
+        raise ExpressionError(f"« {token.text} » inattendu en position {token.position + 1}", token.position)
+
+    def call(self, name: Token):
+        if name.text not in self.backend.functions:
+            raise ExpressionError(f"Fonction inconnue: {name.text}", name.position)
+        self.expect('(')
+        args = []
+        if self.tokens[self.index].text != ')':
+            args.append(self.expression(0))
+            while self.tokens[self.index].text == ',':
+                self.index += 1
+                args.append(self.expression(0))
+        self.expect(')')
+        return Call(name.text, tuple(args))
+
+
+def parse(source: str, backend: NumericBackend = FLOAT):
+    """解析源文本，返回语法树"""
+    return Parser(source, backend).parse()
+
+
+# ----------------------------------------------------------------------
+# 常量折叠和编译
+# ----------------------------------------------------------------------
+
+def fold(node, backend: NumericBackend = FLOAT):
+    """自底向上折叠常量子树；求值出错（如除以零）的子树保留到运行时再报错"""
+    if isinstance(node, Name):
+        return Number(backend.constants[node.name]) if node.name in backend.constants else node
+    if isinstance(node, Unary):
+        operand = fold(node.operand, backend)
+        if isinstance(operand, Number):
+            return _try_fold(node._replace(operand=operand), backend.unary[node.op], operand.value)
+        return node._replace(operand=operand)
+    if isinstance(node, Binary):
+        left, right = fold(node.left, backend), fold(node.right, backend)
+        node = node._replace(left=left, right=right)
+        if isinstance(left, Number) and isinstance(right, Number):
+            return _try_fold(node, backend.binary[node.op], left.value, right.value)
+        return node
+    if isinstance(node, Call):
+        args = tuple(fold(arg, backend) for arg in node.args)
+        node = node._replace(args=args)
+        if all(isinstance(arg, Number) for arg in args):
+            return _try_fold(node, backend.functions[node.name], *(arg.value for arg in args))
+        return node
+    return node
+
+
+def _try_fold(node, function, *values):
+    try:
+        return Number(function(*values))
+    except (ArithmeticError, ValueError, TypeError):
+        return node
+
+
+def variables(node) -> List[str]:
+    """语法树中用到的变量名（按首次出现的顺序）"""
+    names: List[str] = []
+
+    def visit(current):
+        if isinstance(current, Name):
+            if current.name not in names:
+                names.append(current.name)
+        elif isinstance(current, Unary):
+            visit(current.operand)
+        elif isinstance(current, Binary):
+            visit(current.left)
+            visit(current.right)
+        elif isinstance(current, Call):
+            for arg in current.args:
+                visit(arg)
+
+    visit(node)
+    return names
+
+
+Compiled = Callable[[Dict[str, Any]], Any]
+
+
+def compile_node(node, backend: NumericBackend = FLOAT) -> Compiled:
+    """把（折叠后的）语法树编译为闭包 f(env) -> 值"""
+    if isinstance(node, Number):
+        value = node.value
+        return lambda env: value
+    if isinstance(node, Name):
+        name = node.name
+
+        def load(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise ExpressionError(f"Variable inconnue: {name}") from None
+        return load
+    if isinstance(node, Unary):
+        function = backend.unary[node.op]
+        operand = compile_node(node.operand, backend)
+        return lambda env: function(operand(env))
+    if isinstance(node, Binary):
+        function = backend.binary[node.op]
+        left = compile_node(node.left, backend)
+        # 右操作数为常量时少一层调用（如 x^2、x*3）
+        if isinstance(node.right, Number):
+            constant = node.right.value
+            return lambda env: function(left(env), constant)
+        right = compile_node(node.right, backend)
+        return lambda env: function(left(env), right(env))
+    function = backend.functions[node.name]
+    args = [compile_node(arg, backend) for arg in node.args]
+    if len(args) == 1:
+        arg = args[0]
+        return lambda env: function(arg(env))
+    return lambda env: function(*[arg(env) for arg in args])
+
+
+# ----------------------------------------------------------------------
+# 向量化编译（NumPy）
+# ----------------------------------------------------------------------
+
+def _vector_functions() -> Dict[str, Callable[..., Any]]:
+    if np is None:
+        return {}
+
+    def elementwise(function):
+        return lambda *args: reduce(function, args)
+
+    return {
+        'sqrt': np.sqrt, 'racine': np.sqrt,
+        'abs': np.abs, 'round': np.round, 'arrondi': np.round,
+        'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+        'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+        'exp': np.exp, 'ln': np.log, 'log': np.log10,
+        'floor': np.floor, 'ceil': np.ceil,
+        'min': elementwise(np.minimum), 'max': elementwise(np.maximum),
+    }
+
+
+VECTOR_FUNCTIONS = _vector_functions()
+
+_VECTOR_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul,
+    '/': operator.truediv, '%': operator.mod,
+}
+
+
+def _vector_power(base, exponent):
+    # 整数数组的乘方会静默溢出，统一用浮点数计算
+    return np.power(np.asarray(base, dtype=np.float64), exponent)
+
+
+def compile_vector(node) -> Compiled:
+    """把（浮点后端折叠后的）语法树编译为数组运算闭包 f(env) -> ndarray
+
+    env 中的变量是 NumPy 数组；常量保持为标量，由广播扩展。
+    除以零、定义域外等情况得到 inf / nan，而不是抛出异常。
+    """
+    if np is None:
+        raise ExpressionError("NumPy n'est pas installé")
+    if isinstance(node, Number):
+        # 常量也用 NumPy 标量，未能折叠的常量子树（如 1/0）得到 inf / nan 而不是抛出 ZeroDivisionError
+        value = np.float64(node.value)
+        return lambda env: value
+    if isinstance(node, Name):
+        return compile_node(node)
+    if isinstance(node, Unary):
+        function = FLOAT.unary[node.op]
+        operand = compile_vector(node.operand)
+        return lambda env: function(operand(env))
+    if isinstance(node, Binary):
+        function = _vector_power if node.op == '^' else _VECTOR_OPERATORS[node.op]
+        left, right = compile_vector(node.left), compile_vector(node.right)
+        return lambda env: function(left(env), right(env))
+    function = VECTOR_FUNCTIONS[node.name]
+    args = [compile_vector(arg) for arg in node.args]
+    return lambda env: function(*[arg(env) for arg in args])
+
+
+class Expression:
+    """编译好的表达式"""
+
+    __slots__ = ('source', 'backend', 'tree', 'variables', 'constant', '_function', '_vector')
+
+    def __init__(self, source: str, backend: NumericBackend = FLOAT):
+        self.source = source
+        self.backend = backend
+        try:
+            self.tree = fold(parse(source, backend), backend)
+            self.variables = tuple(variables(self.tree))
+            self.constant = isinstance(self.tree, Number)
+            self._function = compile_node(self.tree, backend)
+        except RecursionError:
+            raise ExpressionError("Expression trop longue") from None
+        self._vector = None
+
+    def __call__(self, env: Optional[Dict[str, Any]] = None, **values):
+        if values:
+            env = dict(env or {}, **values)
+        return self._function(env if env is not None else {})
+
+    def vector(self, env: Dict[str, Any]):
+        """对数组求值（需要 NumPy，只支持浮点后端）；结果总是与输入等长的 float64 数组"""
+        if self._vector is None:
+            if self.backend != FLOAT:
+                raise ExpressionError("Le calcul vectorisé n'est possible qu'en mode décimal rapide")
+            try:
+                self._vector = compile_vector(self.tree)
+            except RecursionError:
+                raise ExpressionError("Expression trop longue") from None
+        length = max((len(value) for value in env.values()), default=1)
+        with np.errstate(all='ignore'):
+            result = self._vector(env)
+        # 常量表达式得到标量，扩展为与变量等长的数组
+        return np.broadcast_to(np.asarray(result, dtype=np.float64), (length,))
+
+    def __repr__(self):
+        return f"Expression({self.source!r})"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(source: str, backend: NumericBackend = FLOAT) -> Expression:
+    """解析、折叠并编译表达式（按源文本和后端缓存）"""
+    return Expression(source, backend)
+
+
+def evaluate(source: str, env: Optional[Dict[str, Any]] = None, backend: NumericBackend = FLOAT):
+    """计算表达式的值；语法错误抛出 ExpressionError，数学错误（如除以零）原样抛出"""
+    return compile_expression(source, backend)(env)
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(repeats: int = 200_000) -> Dict[str, float]:
+    """比较 eval、未缓存的解析和缓存后的求值"""
+    sources = ["3×(4+5)÷2", "12.5*4-7/3+2^10", "(1+2)*(3+4)*(5+6)-sqrt(144)"]
+    results: Dict[str, float] = {}
+
+    def rate(function, count):
+        start = time.perf_counter()
+        for i in range(count):
+            function(sources[i % len(sources)])
+        return count / (time.perf_counter() - start) * 60
+
+    python_sources = {source: source.replace('×', '*').replace('÷', '/').replace('^', '**')
+                      .replace('sqrt', '__import__("math").sqrt') for source in sources}
+    results['eval'] = rate(lambda source: eval(python_sources[source]), repeats // 10)
+    results['parse'] = rate(Expression, repeats // 10)
+    compile_expression.cache_clear()
+    results['cached'] = rate(evaluate, repeats)
+
+    function = compile_expression("x^2 + 3*x - sin(x)/2")
+    start = time.perf_counter()
+    env = {'x': 0.0}
+    for i in range(repeats):
+        env['x'] = i * 0.001
+        function(env)
+    results['variable'] = repeats / (time.perf_counter() - start) * 60
+
+    print(f"Évaluations par minute ({', '.join(sources)})")
+    print(f"  eval(): {results['eval'] / 1e6:.2f} M")
+    print(f"  analyse + compilation à chaque fois: {results['parse'] / 1e6:.2f} M")
+    print(f"  avec cache: {results['cached'] / 1e6:.2f} M")
+    print(f"  x^2 + 3*x - sin(x)/2 compilée, x variable: {results['variable'] / 1e6:.2f} M")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
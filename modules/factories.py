@@ -1,58 +1,149 @@
 """
 工厂类，用于创建形状处理器和属性面板
+
+处理器和面板的模块在第一次创建对应形状时才导入（triangle_handler 会带入 NumPy），
+导入几何模块时不再加载全部十个模块；ShapeToolRegistry 按需创建并缓存每种形状的
+(处理器, 面板)。import_report() 列出已按需导入的模块及其耗时。
 """
-from typing import Dict, Any, Optional, Type
+import importlib
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 from modules.canvas import Canvas
 from modules.shapes import ShapeType
 from modules.shape_handlers import ShapeHandler
-from modules.shape_handlers.point_handler import PointHandler
-from modules.shape_handlers.line_handler import LineHandler
-from modules.shape_handlers.rectangle_handler import RectangleHandler
-from modules.shape_handlers.circle_handler import CircleHandler
-from modules.shape_handlers.triangle_handler import TriangleHandler
-
 from modules.property_panels import PropertyPanel
-from modules.property_panels.point_properties_panel import PointPropertiesPanel
-from modules.property_panels.line_properties_panel import LinePropertiesPanel
-from modules.property_panels.rectangle_properties_panel import RectanglePropertiesPanel
-from modules.property_panels.circle_properties_panel import CirclePropertiesPanel
-from modules.property_panels.triangle_properties_panel import TrianglePropertiesPanel
+
+# 按需导入的模块名 → 导入耗时（毫秒）
+_import_times: Dict[str, float] = {}
+
+
+def _load_class(module_name: str, class_name: str) -> type:
+    """导入模块并取得类，记录第一次导入的耗时"""
+    module = sys.modules.get(module_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _import_times[module_name] = (time.perf_counter() - start) * 1000
+    return getattr(module, class_name)
+
+
+def import_report() -> List[Tuple[str, float]]:
+    """已按需导入的处理器/面板模块及其导入耗时（毫秒），按耗时降序"""
+    return sorted(_import_times.items(), key=lambda item: item[1], reverse=True)
+
 
 class ShapeHandlerFactory:
     """形状处理器工厂类"""
-    
-    _handlers: Dict[ShapeType, Type[ShapeHandler]] = {
-        ShapeType.POINT: PointHandler,
-        ShapeType.LINE: LineHandler,
-        ShapeType.RECTANGLE: RectangleHandler,
-        ShapeType.CIRCLE: CircleHandler,
-        ShapeType.TRIANGLE: TriangleHandler
+
+    # 形状类型 → (模块, 类名)
+    _handlers: Dict[ShapeType, Tuple[str, str]] = {
+        ShapeType.POINT: ('modules.shape_handlers.point_handler', 'PointHandler'),
+        ShapeType.LINE: ('modules.shape_handlers.line_handler', 'LineHandler'),
+        ShapeType.RECTANGLE: ('modules.shape_handlers.rectangle_handler', 'RectangleHandler'),
+        ShapeType.CIRCLE: ('modules.shape_handlers.circle_handler', 'CircleHandler'),
+        ShapeType.TRIANGLE: ('modules.shape_handlers.triangle_handler', 'TriangleHandler')
     }
-    
+
     @classmethod
     def create(cls, shape_type: ShapeType, canvas: Canvas) -> Optional[ShapeHandler]:
         """创建形状处理器"""
-        handler_class = cls._handlers.get(shape_type)
-        if handler_class:
-            return handler_class(canvas)
+        path = cls._handlers.get(shape_type)
+        if path:
+            return _load_class(*path)(canvas)
         return None
 
 class PropertyPanelFactory:
     """属性面板工厂类"""
-    
-    _panels: Dict[ShapeType, Type[PropertyPanel]] = {
-        ShapeType.POINT: PointPropertiesPanel,
-        ShapeType.LINE: LinePropertiesPanel,
-        ShapeType.RECTANGLE: RectanglePropertiesPanel,
-        ShapeType.CIRCLE: CirclePropertiesPanel,
-        ShapeType.TRIANGLE: TrianglePropertiesPanel
+
+    # 形状类型 → (模块, 类名)
+    _panels: Dict[ShapeType, Tuple[str, str]] = {
+        ShapeType.POINT: ('modules.property_panels.point_properties_panel', 'PointPropertiesPanel'),
+        ShapeType.LINE: ('modules.property_panels.line_properties_panel', 'LinePropertiesPanel'),
+        ShapeType.RECTANGLE: ('modules.property_panels.rectangle_properties_panel', 'RectanglePropertiesPanel'),
+        ShapeType.CIRCLE: ('modules.property_panels.circle_properties_panel', 'CirclePropertiesPanel'),
+        ShapeType.TRIANGLE: ('modules.property_panels.triangle_properties_panel', 'TrianglePropertiesPanel')
     }
-    
+
     @classmethod
     def create(cls, shape_type: ShapeType, parent=None) -> Optional[PropertyPanel]:
         """创建属性面板"""
-        panel_class = cls._panels.get(shape_type)
-        if panel_class:
-            return panel_class(parent)
+        path = cls._panels.get(shape_type)
+        if path:
+            return _load_class(*path)(parent)
         return None
+
+class ShapeToolRegistry:
+    """按需创建并缓存每种形状的处理器和属性面板
+
+    handlers / panels 只包含已经创建的对象；第一次 get() 某种形状时创建这一对，
+    连接面板信号到处理器，再调用 on_created(shape_type, handler, panel)（如把面板放进布局）。
+    """
+
+    def __init__(self, canvas: Canvas, panel_parent=None,
+                 on_created: Optional[Callable[[ShapeType, ShapeHandler, Optional[PropertyPanel]], None]] = None):
+        self.canvas = canvas
+        self.panel_parent = panel_parent
+        self.on_created = on_created
+        self.handlers: Dict[ShapeType, ShapeHandler] = {}
+        self.panels: Dict[ShapeType, PropertyPanel] = {}
+
+    def get(self, shape_type: ShapeType) -> Tuple[Optional[ShapeHandler], Optional[PropertyPanel]]:
+        """取得形状的 (处理器, 面板)，第一次使用时创建"""
+        handler = self.handlers.get(shape_type)
+        if handler is not None:
+            return handler, self.panels.get(shape_type)
+        handler = ShapeHandlerFactory.create(shape_type, self.canvas)
+        if handler is None:
+            return None, None
+        panel = PropertyPanelFactory.create(shape_type, self.panel_parent)
+        if panel:
+            # 连接面板信号到处理器
+            panel.property_changed.connect(handler._on_properties_changed)
+            panel.create_requested.connect(handler._on_create_from_properties)
+            self.panels[shape_type] = panel
+        self.handlers[shape_type] = handler
+        if self.on_created is not None:
+            self.on_created(shape_type, handler, panel)
+        return handler, panel
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark() -> Dict[str, float]:
+    """导入本模块的耗时和加载的模块数（新进程中测量），以及每种形状第一次创建的耗时"""
+    import os
+    import subprocess
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QApplication
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import sys, time; before = len(sys.modules); start = time.perf_counter(); "
+            "import modules.factories; "
+            "print((time.perf_counter() - start) * 1000, len(sys.modules) - before)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True,
+                            check=True).stdout.split()
+    results: Dict[str, float] = {'import_ms': float(output[0]), 'modules': int(output[1])}
+
+    app = QApplication.instance() or QApplication([])
+    registry = ShapeToolRegistry(Canvas())
+    for shape_type in ShapeType:
+        start = time.perf_counter()
+        registry.get(shape_type)
+        results[shape_type.name] = (time.perf_counter() - start) * 1000
+
+    print(f"Import de modules.factories: {results['import_ms']:.0f} ms, {results['modules']} modules chargés")
+    print("Première sélection de chaque forme (import + création):")
+    for shape_type in ShapeType:
+        print(f"  {shape_type.name.lower()}: {results[shape_type.name]:.1f} ms")
+    print("Modules importés à la demande:")
+    for module_name, elapsed in import_report():
+        print(f"  {module_name}: {elapsed:.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,16 +1,39 @@
 """
 重构后的几何模块，整合了Canvas、形状处理器和属性面板
 """
+import os
+import sqlite3
 from typing import Dict, Any, List, Optional
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, 
-                             QLabel, QSizePolicy)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
+                             QLabel, QSizePolicy, QFileDialog, QMessageBox, QProgressDialog, QInputDialog,
+                             QToolBar, QScrollArea, QFrame)
+from PyQt6.QtCore import Qt, QCoreApplication, QAbstractAnimation
+from PyQt6.QtGui import QFont, QKeySequence, QShortcut
 
 from modules.ui_components_pyqt import BaseModule, MetroButton
+from modules import theme
 from modules.canvas import Canvas
 from modules.shapes import ShapeType
-from modules.factories import ShapeHandlerFactory, PropertyPanelFactory
+from modules.factories import ShapeToolRegistry
+from modules.triangle_analysis import ANGLE_TYPE_LABELS, SIDE_TYPE_LABELS
+from modules.transformations import AffineTransform, TransformPreview, TransformDialog, apply_transform
+from modules.vertex_editor import VertexEditor
+from modules.scene_io import save_scene, load_scene, insert_records, canvas_frame
+from modules.journal import EditJournal, default_autosave_dir
+from modules.undo import UndoStack
+from modules.snapshots import SnapshotStore, HistoryBrowser
+from modules.export import export_scene
+from modules.data_import import DataImporter
+from modules.scene_binary import write_binary_scene, load_binary_scene
+from modules.scene_catalog import (SceneCatalog, ThumbnailCache, LibraryBrowser, default_library_dir,
+                                   CATALOG_FILE, THUMBNAIL_DIR, SCENE_READ_ERRORS)
+from modules.expression import ExpressionError
+from modules.plotter import FunctionPlot, PLOT_COLORS
+
+# 场景文件对话框的过滤器
+SCENE_FILTERS = "Scène géométrique (*.geo.jsonl);;Scène binaire (*.geob)"
+IMPORT_FILTERS = "Données (*.csv *.jsonl);;CSV (*.csv);;JSON Lines (*.jsonl)"
+EXPORT_FILTERS = "Image vectorielle (*.svg);;Document PDF (*.pdf);;Image PNG haute résolution (*.png)"
 
 class GeometryModuleRefactored(BaseModule):
     """重构后的几何模块"""
@@ -34,18 +57,21 @@ class GeometryModuleRefactored(BaseModule):
         
         # 创建工具栏容器
         self.tools_frame = QWidget()
-        self.tools_frame.setFixedWidth(240)
-        self.tools_frame.setStyleSheet("""
-            QWidget {
-                background-color: #F5F5F5;
-                border-right: 1px solid #CCCCCC;
-            }
-        """)
+        self.tools_frame.setMinimumWidth(240)
+        theme.set_surface(self.tools_frame, 'tools')
         self.tools_layout = QGridLayout(self.tools_frame)
         self.tools_layout.setContentsMargins(5, 5, 5, 5)
         self.tools_layout.setHorizontalSpacing(5)
         self.tools_layout.setVerticalSpacing(5)
-        content_layout.addWidget(self.tools_frame)
+        
+        # 展开属性面板时工具列在窗口内滚动，不撑高窗口（宽度留出滚动条的位置）
+        tools_scroll = QScrollArea()
+        tools_scroll.setWidget(self.tools_frame)
+        tools_scroll.setWidgetResizable(True)
+        tools_scroll.setFrameShape(QFrame.Shape.NoFrame)
+        tools_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        tools_scroll.setFixedWidth(240 + tools_scroll.verticalScrollBar().sizeHint().width())
+        content_layout.addWidget(tools_scroll)
         
         # 创建画布区域容器
         canvas_container = QWidget()
@@ -53,6 +79,14 @@ class GeometryModuleRefactored(BaseModule):
         canvas_layout.setContentsMargins(10, 0, 10, 10)
         content_layout.addWidget(canvas_container)
         
+        # 文件、历史、导出等操作的工具栏（带快捷键），工具列只放绘图工具
+        self.action_bar = QToolBar()
+        self.action_bar.setProperty('role', 'actions')
+        self.action_bar.setMovable(False)
+        self.action_bar.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextOnly)
+        self.action_bar.setFont(QFont("Arial", 10))
+        canvas_layout.addWidget(self.action_bar)
+        
         # 创建信息显示栏
         self.info_panel = QLabel("Informations de coordonnées")
         self.info_panel.setFont(QFont("Arial", 10))
@@ -84,12 +118,14 @@ class GeometryModuleRefactored(BaseModule):
         self.canvas.mouse_position_changed.connect(self.update_mouse_position_info)
         self.canvas.point_created.connect(self.update_coordinate_info)
         self.canvas.shape_created.connect(self.update_shape_info)
+        self.canvas.batch_finished.connect(self.update_batch_info)
         self.canvas.shape_preview.connect(self.update_shape_preview_info)
         self.canvas.canvas_cleared.connect(self.reset_info_panel)
         
-        # 初始化形状处理器和属性面板
-        self.shape_handlers = {}
-        self.property_panels = {}
+        # 形状处理器和属性面板：第一次选择某种形状时才导入和创建，之后缓存
+        self.shape_tools = ShapeToolRegistry(self.canvas, self, on_created=self._install_shape_tool)
+        self.shape_handlers = self.shape_tools.handlers
+        self.property_panels = self.shape_tools.panels
         
         # 初始化当前活动的处理器和面板
         self.active_handler = None
@@ -98,6 +134,53 @@ class GeometryModuleRefactored(BaseModule):
         # 关键：初始化时将canvas.shape_handler设为None
         self.canvas.shape_handler = None
         
+        # 编辑已有图形的顶点编辑器（也用于选择要变换的图形）和正在播放的变换动画
+        self.vertex_editor = VertexEditor(self.canvas)
+        self.transform_preview = None
+        
+        # 撤销/重做历史
+        self.undo_stack = UndoStack(self.canvas, parent=self)
+        self.undo_stack.changed.connect(self._update_undo_actions)
+        
+        # 每一步操作之后的场景快照（结构共享，可回看任意一步），浏览器在第一次打开时创建
+        self.snapshots = SnapshotStore(self.canvas, auto=True)
+        self.history_browser = None
+        
+        # 后台批量导入
+        self.importer = DataImporter(self.canvas, self)
+        self.importer.progress.connect(self._on_import_progress)
+        self.importer.finished.connect(self._on_import_finished)
+        self.importer.failed.connect(self._on_import_failed)
+        self.importer.cancelled.connect(self._close_import_progress)
+        self._import_progress = None
+        
+        # 编辑日志（自动保存），首次显示时恢复上次的场景
+        self.journal = None
+        self._journal_restored = False
+        try:
+            self.journal = EditJournal(default_autosave_dir())
+        except (OSError, ValueError) as error:
+            print(f"Sauvegarde automatique désactivée: {error}")
+        else:
+            app = QCoreApplication.instance()
+            if app is not None:
+                app.aboutToQuit.connect(self.journal.close)
+        
+        # 场景库（保存的场景写入索引），浏览器在第一次打开时创建
+        self.catalog = None
+        self.thumbnails = None
+        self.library_browser = None
+        
+        # 画布上的函数曲线（叠加图层，不属于场景）
+        self.plots = []
+        try:
+            library_dir = default_library_dir()
+            self.catalog = SceneCatalog(os.path.join(library_dir, CATALOG_FILE))
+            self.thumbnails = ThumbnailCache(os.path.join(library_dir, THUMBNAIL_DIR), parent=self)
+        except (OSError, sqlite3.Error) as error:
+            self.catalog = None
+            print(f"Bibliothèque de scènes désactivée: {error}")
+        
         # 创建属性面板开关按钮
         self.properties_button = MetroButton("Propriétés", "#030d03", "#FFFFFF")
         self.properties_button.setMinimumSize(220, 40)
@@ -111,9 +194,6 @@ class GeometryModuleRefactored(BaseModule):
         
         # 创建工具栏
         self._create_geometry_tools()
-        
-        # 初始化形状处理器和属性面板
-        self._init_handlers_and_panels()
     
     def _create_geometry_tools(self):
         """创建几何工具按钮"""
@@ -169,6 +249,7 @@ class GeometryModuleRefactored(BaseModule):
         clear_button.setMinimumSize(110, 110)
         clear_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
         clear_button.clicked.connect(self.canvas.clear)
+        clear_button.clicked.connect(self.clear_plots)
         self.tools_layout.addWidget(clear_button, 10, 0)
         
         # 添加坐标轴切换按钮
@@ -178,28 +259,81 @@ class GeometryModuleRefactored(BaseModule):
         self.axes_button.clicked.connect(self.toggle_axes)
         self.axes_button.set_active(self.canvas.show_axes)
         self.tools_layout.addWidget(self.axes_button, 10, 1)
+        
+        # 编辑模式按钮：拖动已有图形的顶点、边和圆的手柄
+        self.edit_button = MetroButton("Modifier", "#4E342E", "#FFFFFF")
+        self.edit_button.setMinimumSize(110, 110)
+        self.edit_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
+        self.edit_button.clicked.connect(self.select_edit_mode)
+        self.tools_layout.addWidget(self.edit_button, 11, 0)
+        
+        # 变换按钮：平移、旋转、位似、轴对称（作用于选中的图形或整个场景）
+        transform_button = MetroButton("Transformer", "#4E342E", "#FFFFFF")
+        transform_button.setMinimumSize(110, 110)
+        transform_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
+        transform_button.setToolTip("Transformer la sélection (Ctrl+T)")
+        transform_button.clicked.connect(self.transform_dialog)
+        self.tools_layout.addWidget(transform_button, 11, 1)
+        QShortcut(QKeySequence("Ctrl+T"), self, self.transform_dialog)
+        
+        self._create_actions()
     
-    def _init_handlers_and_panels(self):
-        """初始化所有形状处理器和属性面板"""
-        # 为每种形状类型创建处理器和面板
-        for shape_type in ShapeType:
-            # 创建处理器
-            handler = ShapeHandlerFactory.create(shape_type, self.canvas)
-            if handler:
-                self.shape_handlers[shape_type] = handler
-            
-            # 创建面板
-            panel = PropertyPanelFactory.create(shape_type, self)
-            if panel:
-                # 连接面板信号到处理器
-                if handler and panel:
-                    panel.property_changed.connect(handler._on_properties_changed)
-                    panel.create_requested.connect(handler._on_create_from_properties)
-                
-                self.property_panels[shape_type] = panel
-                # 将面板添加到工具布局
-                self.tools_layout.addWidget(panel, 4 + shape_type.value, 0, 1, 2)
-                panel.hide()  # 默认隐藏
+    def _create_actions(self):
+        """创建工具栏上的操作和快捷键"""
+        def add_action(text, slot, shortcut=None):
+            action = self.action_bar.addAction(text)
+            action.triggered.connect(slot)
+            if shortcut is not None:
+                # 快捷键属于模块（而不是工具栏），与原来的 Ctrl+Z / Ctrl+Y 相同
+                QShortcut(shortcut, self, slot)
+                keys = QKeySequence(shortcut).toString(QKeySequence.SequenceFormat.NativeText)
+                action.setToolTip(f"{text} ({keys})")
+            return action
+        
+        # 场景保存和打开
+        add_action("Enregistrer", self.save_scene_dialog, QKeySequence.StandardKey.Save)
+        add_action("Ouvrir", self.open_scene_dialog, QKeySequence.StandardKey.Open)
+        self.action_bar.addSeparator()
+        
+        # 撤销和重做
+        self.undo_action = add_action("Annuler", self.undo, QKeySequence.StandardKey.Undo)
+        self.redo_action = add_action("Rétablir", self.redo, QKeySequence.StandardKey.Redo)
+        self.undo_action.setEnabled(False)
+        self.redo_action.setEnabled(False)
+        
+        # 快照浏览器：比较和恢复每一步
+        add_action("Historique", self.show_history, QKeySequence("Ctrl+H"))
+        self.action_bar.addSeparator()
+        
+        # 导出（SVG / PDF / PNG）和导入（CSV / JSON Lines 数据）
+        add_action("Exporter", self.export_scene_dialog, QKeySequence("Ctrl+E"))
+        add_action("Importer", self.import_data_dialog, QKeySequence("Ctrl+I"))
+        
+        # 场景库浏览器
+        library_action = add_action("Bibliothèque", self.show_library, QKeySequence("Ctrl+B"))
+        library_action.setEnabled(self.catalog is not None)
+        self.action_bar.addSeparator()
+        
+        # 函数曲线 y = f(x)
+        add_action("Courbe", self.add_plot_dialog, QKeySequence("Ctrl+F"))
+    
+    def _install_shape_tool(self, shape_type, handler, panel):
+        """新创建的属性面板添加到工具布局（默认隐藏）"""
+        if panel:
+            self.tools_layout.addWidget(panel, 4 + shape_type.value, 0, 1, 2)
+            panel.hide()
+    
+    def showEvent(self, event):
+        """首次显示时（画布尺寸确定后）从编辑日志恢复场景"""
+        super().showEvent(event)
+        if self.journal and not self._journal_restored:
+            self._journal_restored = True
+            # 恢复和之后的记录使用同一个坐标系
+            frame = canvas_frame(self.canvas)
+            if len(self.journal.state):
+                insert_records(self.canvas, self.journal.state.records(), frame)
+                self.snapshots.reload()
+            self.journal.attach(self.canvas, frame)
     
     def back_to_home(self):
         """返回主界面"""
@@ -223,15 +357,12 @@ class GeometryModuleRefactored(BaseModule):
         # 隐藏所有属性面板
         self._hide_all_panels()
         
-        # 获取对应的处理器
-        handler = self.shape_handlers.get(shape_type)
+        # 获取对应的处理器和面板（第一次选择时创建）
+        handler, panel = self.shape_tools.get(shape_type)
         if not handler:
             # 处理器不存在，简单返回
             return
         
-        # 获取对应的面板
-        panel = self.property_panels.get(shape_type)
-        
         # 激活新的处理器
         handler.activate()
         self.active_handler = handler
@@ -250,6 +381,18 @@ class GeometryModuleRefactored(BaseModule):
         # 设置对应按钮为激活状态
         self._activate_button_for_shape(shape_type)
     
+    def select_edit_mode(self):
+        """进入编辑模式，拖动已有图形的顶点"""
+        self._reset_all_buttons()
+        if self.active_handler:
+            self.active_handler.deactivate()
+        self._hide_all_panels()
+        
+        self.vertex_editor.activate()
+        self.active_handler = self.vertex_editor
+        self.canvas.shape_handler = self.vertex_editor
+        self.edit_button.set_active(True)
+    
     def _reset_all_buttons(self):
         """重置所有按钮状态"""
         buttons = {
@@ -263,6 +406,7 @@ class GeometryModuleRefactored(BaseModule):
         for button in buttons.values():
             if button:
                 button.set_active(False)
+        self.edit_button.set_active(False)
     
     def _hide_all_panels(self):
         """隐藏所有属性面板"""
@@ -299,6 +443,182 @@ class GeometryModuleRefactored(BaseModule):
         else:
             self.properties_button.setText("Activer Propriétés")
     
+    def transform_dialog(self):
+        """输入变换并应用到当前选择（在编辑模式中点击图形选择；没有选择时变换整个场景）"""
+        preview = self.transform_preview
+        if preview is not None and preview.animation.state() == QAbstractAnimation.State.Running:
+            return
+        dialog = TransformDialog(len(self.canvas.selection), self)
+        if dialog.exec() != TransformDialog.DialogCode.Accepted:
+            return
+        try:
+            transform = dialog.transform()
+        except ValueError as error:
+            QMessageBox.warning(self, "Erreur", f"Transformation impossible: {error}")
+            return
+        self.transform_selection(transform, copy=dialog.copy_box.isChecked(),
+                                 animate=dialog.animate_box.isChecked())
+    
+    def transform_selection(self, transform: AffineTransform, copy: bool = False, animate: bool = True):
+        """对当前选择（为空时为整个场景）应用几何变换
+        
+        Args:
+            transform: 网格坐标系中的变换
+            copy: True 时保留原图形，变换其副本
+            animate: True 时先播放移动图层动画再应用
+        """
+        if animate:
+            self.transform_preview = TransformPreview(self.canvas, transform, copy=copy)
+            self.transform_preview.start()
+            return self.transform_preview
+        return apply_transform(self.canvas, transform, copy=copy)
+    
+    def undo(self):
+        """撤销最近的操作"""
+        self.undo_stack.undo()
+    
+    def redo(self):
+        """重做最近撤销的操作"""
+        self.undo_stack.redo()
+    
+    def _update_undo_actions(self):
+        """根据历史更新撤销/重做操作的可用状态"""
+        self.undo_action.setEnabled(self.undo_stack.can_undo())
+        self.redo_action.setEnabled(self.undo_stack.can_redo())
+    
+    def save_scene_dialog(self):
+        """选择文件并保存当前场景"""
+        path, _ = QFileDialog.getSaveFileName(self, "Enregistrer la scène", "", SCENE_FILTERS)
+        if not path:
+            return
+        try:
+            if path.endswith('.geob'):
+                write_binary_scene(self.canvas, path)
+            else:
+                save_scene(self.canvas, path)
+        except OSError as error:
+            QMessageBox.warning(self, "Erreur", f"Impossible d'enregistrer la scène: {error}")
+            return
+        if self.catalog is not None:
+            try:
+                self.catalog.index_scene(path)
+            except SCENE_READ_ERRORS + (sqlite3.Error,) as error:
+                print(f"Indexation de la scène impossible: {error}")
+            else:
+                if self.library_browser is not None:
+                    self.library_browser.model.refresh()
+    
+    def open_scene_dialog(self):
+        """选择场景文件并加载到画布"""
+        path, _ = QFileDialog.getOpenFileName(self, "Ouvrir une scène", "", SCENE_FILTERS)
+        if path:
+            self.open_scene(path)
+    
+    def open_scene(self, path: str):
+        """加载场景文件到画布"""
+        try:
+            if path.endswith('.geob'):
+                load_binary_scene(self.canvas, path)
+            else:
+                load_scene(self.canvas, path)
+        except (OSError, ValueError, KeyError) as error:
+            QMessageBox.warning(self, "Erreur", f"Impossible d'ouvrir la scène: {error}")
+    
+    def show_history(self):
+        """打开快照浏览器"""
+        if self.history_browser is None:
+            self.history_browser = HistoryBrowser(self.snapshots)
+        self.history_browser.show()
+        self.history_browser.raise_()
+    
+    def show_library(self):
+        """打开场景库浏览器"""
+        if self.catalog is None:
+            return
+        if self.library_browser is None:
+            self.library_browser = LibraryBrowser(self.catalog, self.thumbnails)
+            self.library_browser.scene_selected.connect(self.open_scene)
+        else:
+            self.library_browser.model.refresh()
+        # 在后台索引直接复制到场景库目录中的文件
+        self.library_browser.scan(default_library_dir())
+        self.library_browser.show()
+        self.library_browser.raise_()
+    
+    def add_plot_dialog(self):
+        """输入 y = f(x) 并在画布上绘制曲线"""
+        text, ok = QInputDialog.getText(self, "Courbe", "y = f(x) :", text="y = ")
+        if not ok or not text.strip():
+            return
+        try:
+            plot = FunctionPlot(text, PLOT_COLORS[len(self.plots) % len(PLOT_COLORS)])
+            # 试算可见区间，在加入画布之前拒绝无法绘制的函数（如 1/0）
+            x_min, _ = self.canvas.screen_to_grid(0, 0)
+            x_max, _ = self.canvas.screen_to_grid(self.canvas.width(), 0)
+            plot.check(x_min, x_max)
+        except ExpressionError as error:
+            QMessageBox.warning(self, "Erreur", f"Fonction invalide: {error}")
+            return
+        self.plots.append(plot)
+        self.canvas.add_overlay(plot)
+    
+    def clear_plots(self):
+        """移除所有函数曲线"""
+        for plot in self.plots:
+            self.canvas.remove_overlay(plot)
+        self.plots = []
+    
+    def import_data_dialog(self):
+        """选择 CSV / JSON Lines 文件并在后台导入，显示进度"""
+        if self.importer.is_running():
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Importer des données", "", IMPORT_FILTERS)
+        if not path:
+            return
+        progress = QProgressDialog("Importation en cours...", "Annuler", 0, 1000, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(self.importer.cancel)
+        self._import_progress = progress
+        try:
+            self.importer.start(path)
+        except (OSError, ValueError) as error:
+            progress.close()
+            QMessageBox.warning(self, "Erreur", f"Impossible d'importer le fichier: {error}")
+    
+    def _on_import_progress(self, done, total):
+        if self._import_progress is not None and total:
+            self._import_progress.setValue(int(done * 1000 / total))
+    
+    def _on_import_finished(self, count, errors):
+        self._close_import_progress()
+        if errors:
+            details = "\n".join(f"Ligne {line}: {message}" for line, message in errors[:10])
+            QMessageBox.warning(self, "Importation",
+                                f"{count} éléments importés, {self.importer.error_count} lignes ignorées:\n{details}")
+    
+    def _on_import_failed(self, message):
+        self._close_import_progress()
+        QMessageBox.warning(self, "Erreur", f"Impossible d'importer le fichier: {message}")
+    
+    def _close_import_progress(self):
+        if self._import_progress is not None:
+            self._import_progress.canceled.disconnect(self.importer.cancel)
+            self._import_progress.close()
+            self._import_progress = None
+    
+    def export_scene_dialog(self):
+        """选择文件并导出当前场景（SVG、PDF 或 PNG，含点名称和长度，坐标轴跟随当前显示状态）"""
+        path, selected = QFileDialog.getSaveFileName(self, "Exporter la scène", "", EXPORT_FILTERS)
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += '.' + selected.rsplit('*.', 1)[-1].rstrip(')')
+        try:
+            export_scene(self.canvas, path, axes=self.canvas.show_axes)
+        except (OSError, ValueError) as error:
+            QMessageBox.warning(self, "Erreur", f"Impossible d'exporter la scène: {error}")
+    
     def toggle_axes(self):
         """切换坐标轴显示状态"""
         self.canvas.show_axes = not self.canvas.show_axes
@@ -406,6 +726,16 @@ class GeometryModuleRefactored(BaseModule):
             info = f"<b>Triangle:</b> A({x1:.2f}, {y1:.2f}), B({x2:.2f}, {y2:.2f}), C({x3:.2f}, {y3:.2f}) | "
             info += f"<b>Côtés:</b> {sides[0]:.2f}, {sides[1]:.2f}, {sides[2]:.2f} | "
             info += f"<b>Périmètre:</b> {perimeter:.2f} | <b>Aire:</b> {area:.2f}"
+            
+            # 显示角度和分类（如果有）
+            angles = preview_data.get('angles')
+            if angles:
+                info += f" | <b>Angles:</b> {angles[0]:.1f}°, {angles[1]:.1f}°, {angles[2]:.1f}°"
+            angle_type = preview_data.get('angle_type')
+            side_type = preview_data.get('side_type')
+            if angle_type and side_type:
+                info += (f" | <b>Type:</b> {ANGLE_TYPE_LABELS[angle_type]}, "
+                         f"{SIDE_TYPE_LABELS[side_type]}")
             self.info_panel.setText(info)
 
     def update_coordinate_info(self, point_data: Dict[str, Any]):
@@ -414,6 +744,13 @@ class GeometryModuleRefactored(BaseModule):
         y = point_data.get('y', 0)
         self.info_panel.setText(f"<b>Point:</b> ({x:.2f}, {y:.2f})")
     
+    def update_batch_info(self, summary: Dict[str, Any]):
+        """批量修改结束后显示汇总信息"""
+        added = summary['points'] + summary['lines'] + summary['shapes']
+        if added:
+            self.info_panel.setText(f"<b>Ajout groupé:</b> {summary['points']} points, "
+                                    f"{summary['lines']} segments, {summary['shapes']} formes")
+    
     def update_shape_info(self, shape_data: Dict[str, Any]):
         """更新形状信息"""
         shape_type = shape_data.get('type', '')
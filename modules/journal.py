@@ -0,0 +1,432 @@
+"""
+编辑日志：把每次提交的编辑追加写入日志文件，崩溃后可以恢复场景。
+
+- 界面线程只把编辑转换为网格坐标的条目并放入队列，不做任何 I/O
+- 后台线程批量写出队列中的条目，每批只 fsync 一次（组提交）
+- 后台线程同时维护一份记录形式的场景副本（SceneState），定期把它压缩为
+  快照文件并截断日志，不会读取画布，也不会阻塞绘制和输入
+- 恢复时读取快照，再回放序号更大的日志尾部；写入中途崩溃留下的
+  不完整的最后一行会被丢弃
+- 加载文件时日志保存加载后的记录本身（不是文件路径，文件之后可能被修改或删除），
+  后台线程应用后立即压缩为快照，大量记录不写入日志
+- 网格坐标按 attach() 时的坐标系换算，整个会话不变（窗口大小改变不影响已记录的条目）
+"""
+import json
+import os
+import threading
+import time
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from modules.scene_io import (Frame, canvas_frame, item_to_record, iter_records, read_header,
+                              read_records, scene_header, scene_records, write_records)
+
+JOURNAL_FILE = 'journal.log'
+SNAPSHOT_FILE = 'snapshot.geo.jsonl'
+
+# 两次 fsync 之间的最短间隔（秒），期间到达的编辑合并为一批
+DEFAULT_COMMIT_INTERVAL = 0.05
+# 日志条目数或时间（秒）超过阈值时压缩为快照
+DEFAULT_COMPACT_EVERY = 5000
+DEFAULT_COMPACT_INTERVAL = 60.0
+
+_SEPARATORS = (',', ':')
+
+
+def default_autosave_dir() -> str:
+    """自动保存目录，可用环境变量 GEOMETRY_AUTOSAVE_DIR 指定"""
+    return os.environ.get('GEOMETRY_AUTOSAVE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.geometry_calc_app', 'autosave')
+
+
+class SceneState:
+    """记录形式（网格坐标）的场景，不依赖 Qt，用于回放和压缩"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.points: List[Dict[str, Any]] = []
+        self.lines: List[Dict[str, Any]] = []
+        self.shapes: List[Dict[str, Any]] = []
+
+    def __len__(self):
+        return len(self.points) + len(self.lines) + len(self.shapes)
+
+    def _store(self, kind: str) -> List[Dict[str, Any]]:
+        if kind == 'point':
+            return self.points
+        if kind == 'line':
+            return self.lines
+        return self.shapes
+
+    def add_record(self, record: Dict[str, Any]):
+        """追加一条场景记录"""
+        self._store(record['kind']).append(record)
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """按场景文件的顺序生成所有记录"""
+        return chain(self.points, self.lines, self.shapes)
+
+    def apply(self, entry: Dict[str, Any]):
+        """应用一个日志条目"""
+        op = entry['op']
+        if op in ('add', 'set'):
+            for kind, index, record in entry['items']:
+                store = self._store(kind)
+                if index < len(store):
+                    store[index] = record
+                elif index == len(store):
+                    store.append(record)
+                else:
+                    raise ValueError(f"Indice {index} hors de la scène ({kind})")
+        elif op == 'remove':
+            for kind, index in sorted(entry['items'], key=lambda item: item[1], reverse=True):
+                del self._store(kind)[index]
+        elif op == 'clear':
+            self.clear()
+        elif op == 'load':
+            if 'records' in entry:
+                self.clear()
+                for record in entry['records']:
+                    self.add_record(record)
+            else:  # 旧版本的日志只记录了文件路径
+                self.load_file(entry['path'], entry.get('format', 'jsonl'))
+        else:
+            raise ValueError(f"Opération de journal inconnue: {op}")
+
+    def load_file(self, path: str, file_format: str = 'jsonl'):
+        """用场景文件的内容替换当前场景"""
+        self.clear()
+        if file_format == 'binary':
+            from modules.scene_binary import SceneArchive
+            with SceneArchive(path) as archive:
+                for kind, item, label in archive.records():
+                    record = dict(item, kind=kind)
+                    if label is not None:
+                        record['text'] = label
+                    self.add_record(record)
+        else:
+            with open(path, 'r', encoding='utf-8') as stream:
+                for record in read_records(stream):
+                    self.add_record(record)
+
+
+def recover_state(directory: str) -> Tuple[SceneState, int, int]:
+    """从快照和日志恢复场景
+
+    Returns:
+        (场景, 最后一个条目的序号, 日志中最后一个完整条目之后的字节偏移)
+    """
+    state = SceneState()
+    seq = 0
+    snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, 'r', encoding='utf-8') as stream:
+            header = read_header(stream)
+            seq = header.get('seq', 0)
+            for record in iter_records(stream):
+                try:
+                    state.add_record(record)
+                except KeyError as error:
+                    print(f"Enregistrement du point de sauvegarde ignoré: {error}")
+
+    valid_end = 0
+    journal_path = os.path.join(directory, JOURNAL_FILE)
+    if os.path.exists(journal_path):
+        with open(journal_path, 'rb') as stream:
+            for line in stream:
+                if not line.endswith(b'\n'):
+                    break  # 写入中途崩溃留下的不完整行
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                valid_end += len(line)
+                if not isinstance(entry, dict) or type(entry.get('seq')) is not int:
+                    print("Entrée de journal sans numéro de séquence ignorée")
+                    continue
+                if entry['seq'] <= seq:
+                    continue  # 已包含在快照中
+                try:
+                    state.apply(entry)
+                except (OSError, ValueError, LookupError, TypeError) as error:
+                    # 条目的字段不合法（如删除不存在的下标），跳过该条目
+                    print(f"Entrée de journal {entry['seq']} ignorée: {error!r}")
+                seq = entry['seq']
+    return state, seq, valid_end
+
+
+class EditJournal:
+    """追加写入的编辑日志和后台自动保存
+
+    用法：
+        journal = EditJournal(directory)
+        frame = canvas_frame(canvas)
+        insert_records(canvas, journal.state.records(), frame)  # 恢复上次的场景
+        journal.attach(canvas, frame)
+    """
+
+    def __init__(self, directory: str, commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+                 compact_every: int = DEFAULT_COMPACT_EVERY,
+                 compact_interval: float = DEFAULT_COMPACT_INTERVAL):
+        self.directory = directory
+        self.commit_interval = commit_interval
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self.canvas = None
+        self.frame: Optional[Frame] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+
+        self.state, self.seq, valid_end = recover_state(directory)
+        self._log = open(self.journal_path, 'ab')
+        self._log.truncate(valid_end)  # 丢弃不完整的尾部
+        self._encode = json.JSONEncoder(separators=_SEPARATORS, ensure_ascii=False).encode
+
+        self._cond = threading.Condition()
+        self._pending: List[Dict[str, Any]] = []
+        self._closing = False
+        self._durable_seq = self.seq
+        self._applied_seq = self.seq
+        self._since_compaction = 0
+        self._last_compaction = time.monotonic()
+        self.stats = {'entries': 0, 'commits': 0, 'compactions': 0}
+
+        self._thread = threading.Thread(target=self._run, name='edit-journal', daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # 界面线程
+    # ------------------------------------------------------------------
+
+    def attach(self, canvas, frame: Optional[Frame] = None):
+        """开始记录画布的编辑
+
+        Args:
+            frame: 本次会话换算网格坐标的坐标系，应与恢复场景时 insert_records 使用的相同；
+                默认为画布当前的坐标系
+        """
+        self.canvas = canvas
+        self.frame = frame or canvas_frame(canvas)
+        canvas.scene_edited.connect(self.record_edit)
+
+    def record_edit(self, edit: Dict[str, Any]):
+        """把 Canvas.scene_edited 的编辑转换为日志条目并放入队列"""
+        op = edit['op']
+        entry = {'op': op}
+        if op in ('add', 'set'):
+            frame = self.frame
+            entry['items'] = [(kind, index, item_to_record(kind, item, text, frame))
+                              for kind, index, item, text in edit['items']]
+        elif op == 'remove':
+            entry['items'] = [(kind, index) for kind, index, *_ in edit['items']]
+        elif op == 'load':
+            # 画布此时已是加载的内容；记录本身进入日志，恢复时不再读取原文件
+            records = scene_records(self.canvas, self.frame)
+            next(records)  # 文件头
+            entry['path'] = edit['path']
+            entry['records'] = list(records)
+        self.append(entry)
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """放入一个条目（只入队，不做 I/O），返回其序号"""
+        with self._cond:
+            self.seq += 1
+            entry['seq'] = self.seq
+            self._pending.append(entry)
+            if len(self._pending) == 1:
+                self._cond.notify_all()
+            return self.seq
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待已入队的条目全部写入磁盘"""
+        with self._cond:
+            target = self.seq
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._durable_seq >= target, timeout)
+
+    def close(self):
+        """写出剩余条目、压缩为快照并停止后台线程"""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._log.close()
+
+    # ------------------------------------------------------------------
+    # 后台线程
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._pending and not self._closing:
+                    self._cond.wait(self.compact_interval)
+                batch, self._pending = self._pending, []
+                closing = self._closing
+            if batch:
+                self._commit(batch)
+            if self._since_compaction and (closing or self._compaction_due()):
+                self._compact()
+            if closing:
+                with self._cond:
+                    if not self._pending:
+                        return
+                continue
+            if batch:
+                # 组提交：在间隔内到达的编辑合并到下一批
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closing, self.commit_interval)
+
+    def _commit(self, batch: List[Dict[str, Any]]):
+        """写出一批条目并 fsync 一次，然后应用到场景副本
+
+        加载文件的条目不写入日志：先写出它之前的条目，应用后立即压缩为快照，
+        快照写完之前崩溃时恢复为加载前的场景。
+        """
+        run: List[Dict[str, Any]] = []
+        for entry in batch:
+            if entry['op'] == 'load':
+                self._write(run)
+                run = []
+                self._apply(entry)
+                self._compact()
+                self._set_durable(entry['seq'])
+            else:
+                run.append(entry)
+        self._write(run)
+        self.stats['entries'] += len(batch)
+        self.stats['commits'] += 1
+
+    def _write(self, entries: List[Dict[str, Any]]):
+        if not entries:
+            return
+        data = ''.join(self._encode(entry) + '\n' for entry in entries).encode('utf-8')
+        self._log.write(data)
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._set_durable(entries[-1]['seq'])
+        for entry in entries:
+            self._apply(entry)
+        self._since_compaction += len(entries)
+
+    def _apply(self, entry: Dict[str, Any]):
+        try:
+            self.state.apply(entry)
+        except (OSError, ValueError, KeyError) as error:
+            print(f"Entrée de journal {entry['seq']} ignorée: {error}")
+        self._applied_seq = entry['seq']
+
+    def _set_durable(self, seq: int):
+        with self._cond:
+            self._durable_seq = seq
+            self._cond.notify_all()
+
+    def _compaction_due(self) -> bool:
+        return (self._since_compaction >= self.compact_every
+                or time.monotonic() - self._last_compaction >= self.compact_interval)
+
+    def _compact(self):
+        """把场景副本写为快照，然后截断日志"""
+        temp_path = self.snapshot_path + '.tmp'
+        header = scene_header(seq=self._applied_seq, counts={
+            'points': len(self.state.points),
+            'lines': len(self.state.lines),
+            'shapes': len(self.state.shapes),
+        })
+        with open(temp_path, 'w', encoding='utf-8') as stream:
+            write_records(chain([header], self.state.records()), stream)
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        _fsync_directory(self.directory)
+
+        # 快照已包含所有已写出的条目；崩溃发生在截断之前时，恢复会按序号跳过它们
+        self._log.truncate(0)
+        self._log.seek(0)
+        self._since_compaction = 0
+        self._last_compaction = time.monotonic()
+        self.stats['compactions'] += 1
+
+
+def _fsync_directory(directory: str):
+    """同步目录项，确保重命名在崩溃后仍然生效（不支持的平台上忽略）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+class _FrameStub:
+    """基准测试用的画布替身，只提供坐标系"""
+
+    grid_spacing = 50
+
+    def width(self):
+        return 1024
+
+    def height(self):
+        return 768
+
+
+def benchmark(count: int = 100_000) -> Dict[str, float]:
+    """测量界面线程每次记录编辑的耗时、组提交次数以及恢复耗时"""
+    import shutil
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    try:
+        journal = EditJournal(directory, compact_every=count // 2)
+        journal.canvas = _FrameStub()
+        journal.frame = canvas_frame(journal.canvas)
+        start = time.perf_counter()
+        for i in range(count):
+            x, y = 100 + (i % 500) * 2.0, 100 + (i // 500) * 2.0
+            if i % 2:
+                edit = {'op': 'add', 'items': [('point', i // 2, {'x': x, 'y': y, 'color': '#E65100'}, None)]}
+            else:
+                shape = {'type': 'triangle', 'color': '#311B92',
+                         'vertices': [(x, y), (x + 50, y), (x, y + 50)]}
+                edit = {'op': 'add', 'items': [('shape', i // 2, shape, None)]}
+            journal.record_edit(edit)
+        record_time = time.perf_counter() - start
+        journal.flush()
+        journal.close()
+
+        start = time.perf_counter()
+        state, seq, _ = recover_state(directory)
+        recover_time = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    results = {
+        'edits': count,
+        'record_us_per_edit': record_time / count * 1e6,
+        'commits': journal.stats['commits'],
+        'compactions': journal.stats['compactions'],
+        'recover_s': recover_time,
+        'recovered': len(state),
+    }
+    print(f"{count} modifications: {results['record_us_per_edit']:.2f} µs par modification (thread UI)")
+    print(f"  {results['commits']} fsync groupés, {results['compactions']} compactages")
+    print(f"  récupération: {recover_time:.2f} s, {len(state)} éléments (séquence {seq})")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
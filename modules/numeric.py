@@ -0,0 +1,380 @@
+"""
+计算器的数值后端（不依赖 PyQt）。
+
+表达式引擎通过后端把字面量转换为数值、执行运算和调用函数，因此同一棵语法树
+可以用不同的数值类型求值：
+- FloatBackend：整数用 Python 整数，除法和函数得到浮点数，最快
+- FractionBackend：精确有理数，整数运算走 int 快速路径，只有出现分数时才使用
+  Fraction（gcd 约分），分母为 1 的结果还原为 int；无理函数退回浮点数
+- DecimalBackend：十进制定点运算，有效位数可配置，所有运算使用后端自己的 Context
+"""
+import decimal
+import functools
+import math
+import operator
+import time
+from abc import ABC, abstractmethod
+from fractions import Fraction
+from typing import Any, Callable, Dict
+
+# 整数乘方的指数上限，避免 9^9^9 之类的表达式耗尽内存
+MAX_INT_EXPONENT = 10_000
+# 精确乘方结果（分子和分母合计）的位数上限，避免 (10^10000)^10000 之类的嵌套乘方卡住
+MAX_RESULT_BITS = 1_000_000
+
+
+def check_exponent(base, exponent):
+    """精确乘方的指数或结果过大时报错而不是卡住（先估计结果的位数，不做乘方）"""
+    if (isinstance(base, (int, Fraction)) and isinstance(exponent, int)
+            and abs(base) != 1 and base != 0):
+        ratio = Fraction(base)
+        bits = ratio.numerator.bit_length() + ratio.denominator.bit_length()
+        if abs(exponent) > MAX_INT_EXPONENT or abs(exponent) * bits > MAX_RESULT_BITS:
+            raise OverflowError("Nombre trop grand")
+
+
+class NumericBackend(ABC):
+    """数值后端的抽象基类：字面量转换、运算符、函数、常量和结果格式化"""
+
+    name = ''
+    label = ''
+
+    def __init__(self):
+        self.binary: Dict[str, Callable[[Any, Any], Any]] = {}
+        self.unary: Dict[str, Callable[[Any], Any]] = {'-': operator.neg, '+': operator.pos}
+        self.functions: Dict[str, Callable[..., Any]] = {}
+        self.constants: Dict[str, Any] = {}
+
+    @abstractmethod
+    def number(self, text: str):
+        """把数字字面量转换为数值"""
+        pass
+
+    def format(self, value) -> str:
+        """把结果格式化为显示文本"""
+        return str(value)
+
+    def key(self):
+        return (type(self),)
+
+    def __eq__(self, other):
+        return isinstance(other, NumericBackend) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+def _float_functions() -> Dict[str, Callable[..., Any]]:
+    return {
+        'sqrt': math.sqrt, 'racine': math.sqrt,
+        'abs': abs, 'round': round, 'arrondi': round,
+        'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+        'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+        'exp': math.exp, 'ln': math.log, 'log': math.log10,
+        'floor': math.floor, 'ceil': math.ceil,
+        'min': min, 'max': max,
+    }
+
+
+def _power(base, exponent):
+    check_exponent(base, exponent)
+    return base ** exponent
+
+
+class FloatBackend(NumericBackend):
+    """Python 原生数值：整数保持精确，其余为浮点数"""
+
+    name = 'float'
+    label = "Décimal (rapide)"
+
+    # 显示时保留的小数位数
+    DIGITS = 6
+
+    def __init__(self):
+        super().__init__()
+        self.binary = {
+            '+': operator.add, '-': operator.sub, '*': operator.mul,
+            '/': operator.truediv, '%': operator.mod, '^': _power,
+        }
+        self.functions = _float_functions()
+        self.constants = {'pi': math.pi, 'π': math.pi, 'e': math.e}
+
+    def number(self, text: str):
+        if '.' in text or 'e' in text or 'E' in text:
+            return float(text)
+        return int(text)
+
+    def format(self, value) -> str:
+        if isinstance(value, float):
+            # 整数值的浮点数显示为整数，其余限制小数位数
+            if value.is_integer():
+                return str(int(value))
+            return str(round(value, self.DIGITS))
+        return str(value)
+
+
+# ----------------------------------------------------------------------
+# 精确分数
+# ----------------------------------------------------------------------
+
+def _exact(value):
+    """分母为 1 的分数还原为整数"""
+    if type(value) is Fraction and value.denominator == 1:
+        return value.numerator
+    return value
+
+
+def _fraction_add(a, b):
+    if type(a) is int and type(b) is int:
+        return a + b
+    return _exact(a + b)
+
+
+def _fraction_sub(a, b):
+    if type(a) is int and type(b) is int:
+        return a - b
+    return _exact(a - b)
+
+
+def _fraction_mul(a, b):
+    if type(a) is int and type(b) is int:
+        return a * b
+    return _exact(a * b)
+
+
+def _fraction_div(a, b):
+    if type(a) is int and type(b) is int:
+        if b == 0:
+            raise ZeroDivisionError("division by zero")
+        quotient, remainder = divmod(a, b)
+        if not remainder:
+            return quotient
+        return Fraction(a, b)
+    if isinstance(a, float) or isinstance(b, float):
+        return a / b
+    return _exact(Fraction(a) / b)
+
+
+def _fraction_mod(a, b):
+    return _exact(a % b)
+
+
+def _fraction_power(base, exponent):
+    check_exponent(base, exponent)
+    if type(exponent) is int:
+        if exponent < 0 and type(base) is int:
+            if base == 0:
+                raise ZeroDivisionError("division by zero")
+            return _exact(Fraction(1, base ** -exponent))
+        return _exact(base ** exponent)
+    if type(exponent) is Fraction and exponent.denominator == 2 and not isinstance(base, float):
+        # 平方根能开尽时保持精确（如 (9/4)^(1/2) = 3/2）
+        root = _fraction_sqrt(base)
+        if not isinstance(root, float):
+            return _fraction_power(root, exponent.numerator)
+    return float(base) ** float(exponent)
+
+
+def _fraction_sqrt(value):
+    """完全平方数（分子分母都是）时返回精确结果，否则退回浮点数"""
+    if isinstance(value, (int, Fraction)) and value >= 0:
+        value = Fraction(value)
+        numerator, denominator = math.isqrt(value.numerator), math.isqrt(value.denominator)
+        if numerator * numerator == value.numerator and denominator * denominator == value.denominator:
+            return _exact(Fraction(numerator, denominator))
+    return math.sqrt(value)
+
+
+def _fraction_round(value, digits=None):
+    if digits is None:
+        return round(value)
+    return _exact(round(Fraction(value), digits)) if not isinstance(value, float) else round(value, digits)
+
+
+class FractionBackend(NumericBackend):
+    """精确有理数：0.1 + 0.2 = 3/10"""
+
+    name = 'fraction'
+    label = "Fraction exacte"
+
+    def __init__(self):
+        super().__init__()
+        self.binary = {
+            '+': _fraction_add, '-': _fraction_sub, '*': _fraction_mul,
+            '/': _fraction_div, '%': _fraction_mod, '^': _fraction_power,
+        }
+        self.functions = _float_functions()
+        self.functions.update({
+            'sqrt': _fraction_sqrt, 'racine': _fraction_sqrt,
+            'round': _fraction_round, 'arrondi': _fraction_round,
+            'floor': math.floor, 'ceil': math.ceil,
+        })
+        self.constants = {'pi': math.pi, 'π': math.pi, 'e': math.e}
+
+    def number(self, text: str):
+        if '.' in text or 'e' in text or 'E' in text:
+            return _exact(Fraction(text))
+        return int(text)
+
+    def format(self, value) -> str:
+        if isinstance(value, float):
+            return FLOAT.format(value)
+        if type(value) is Fraction:
+            return f"{value.numerator}/{value.denominator}"
+        return str(value)
+
+
+# ----------------------------------------------------------------------
+# 十进制
+# ----------------------------------------------------------------------
+
+def _decimal_pi(context: decimal.Context) -> decimal.Decimal:
+    """按 context 的精度计算 π（decimal 文档中的级数）"""
+    local = decimal.Context(prec=context.prec + 2)
+    three = local.create_decimal(3)
+    last, t, s, n, na, d, da = 0, three, three, 1, 0, 0, 24
+    while s != last:
+        last = s
+        n, na = n + na, na + 8
+        d, da = d + da, da + 32
+        t = local.divide(local.multiply(t, n), d)
+        s = local.add(s, t)
+    return context.plus(s)
+
+
+class DecimalBackend(NumericBackend):
+    """十进制运算，precision 为有效数字位数"""
+
+    name = 'decimal'
+    label = "Décimal précis"
+
+    DEFAULT_PRECISION = 28
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        super().__init__()
+        if precision < 1:
+            raise ValueError("La précision doit être un entier positif")
+        self.precision = precision
+        context = decimal.Context(prec=precision, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+        self.context = context
+
+        def power(base, exponent):
+            check_exponent(base, exponent)
+            return context.power(base, exponent)
+
+        def via_float(function):
+            return lambda value: context.create_decimal_from_float(function(float(value)))
+
+        def to_integral(rounding):
+            return lambda value: value.to_integral_value(rounding=rounding, context=context)
+
+        def round_decimal(value, digits=0):
+            return context.quantize(value, decimal.Decimal(1).scaleb(-int(digits)))
+
+        def extremum(pick):
+            # Context.min / max 只接受两个参数，与 Python 的 min / max 一样支持任意多个
+            return lambda first, *rest: functools.reduce(pick, rest, first)
+
+        self.binary = {
+            '+': context.add, '-': context.subtract, '*': context.multiply,
+            '/': context.divide, '%': context.remainder, '^': power,
+        }
+        self.unary = {'-': context.minus, '+': context.plus}
+        self.functions = {
+            'sqrt': context.sqrt, 'racine': context.sqrt,
+            'abs': context.abs, 'round': round_decimal, 'arrondi': round_decimal,
+            'exp': context.exp, 'ln': context.ln, 'log': context.log10,
+            'floor': to_integral(decimal.ROUND_FLOOR), 'ceil': to_integral(decimal.ROUND_CEILING),
+            'min': extremum(context.min), 'max': extremum(context.max),
+        }
+        for name in ('sin', 'cos', 'tan', 'asin', 'acos', 'atan'):
+            self.functions[name] = via_float(getattr(math, name))
+        pi = _decimal_pi(context)
+        self.constants = {'pi': pi, 'π': pi, 'e': context.exp(decimal.Decimal(1))}
+
+    def number(self, text: str):
+        return self.context.create_decimal(text)
+
+    def format(self, value) -> str:
+        if isinstance(value, decimal.Decimal):
+            value = value.normalize(self.context)
+            # 数量级超过有效位数时使用科学计数法，避免显示成一长串 0
+            if value.is_finite() and -self.precision <= value.adjusted() < self.precision:
+                return f"{value:f}"
+            return str(value)
+        return str(value)
+
+    def key(self):
+        return (type(self), self.precision)
+
+    def __repr__(self):
+        return f"DecimalBackend({self.precision})"
+
+
+FLOAT = FloatBackend()
+FRACTION = FractionBackend()
+
+# 计算器中可选择的模式
+BACKENDS = {
+    FloatBackend.name: FloatBackend,
+    FractionBackend.name: FractionBackend,
+    DecimalBackend.name: DecimalBackend,
+}
+
+
+def get_backend(name: str, precision: int = DecimalBackend.DEFAULT_PRECISION) -> NumericBackend:
+    """按名称取得后端"""
+    if name == FloatBackend.name:
+        return FLOAT
+    if name == FractionBackend.name:
+        return FRACTION
+    if name == DecimalBackend.name:
+        return DecimalBackend(precision)
+    raise ValueError(f"Mode de calcul inconnu: {name}")
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(terms: int = 300, repeats: int = 50) -> Dict[str, Dict[str, float]]:
+    """比较各后端在长运算链和大数上的求值耗时
+
+    语法树不做常量折叠直接编译，这样计时的是每次求值的运算本身，不含解析。
+    """
+    from modules.expression import compile_node, parse
+
+    chains = {
+        'somme harmonique': '+'.join(f"1/{i}" for i in range(1, terms + 1)),
+        'chaîne décimale': '+'.join(f"0.{i % 10 or 1}*{i}-{i}/7" for i in range(1, terms + 1)),
+        'entiers': '+'.join(f"{i}*{i}" for i in range(1, terms + 1)),
+        'grands nombres': "2^4000*3^3000/7^2000 - 5^3000/3^1000",
+    }
+    backends = [FLOAT, FRACTION, DecimalBackend(28), DecimalBackend(100)]
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"Coût d'une évaluation (chaînes de {terms} termes)")
+    for title, source in chains.items():
+        results[title] = {}
+        print(f"  {title}")
+        for backend in backends:
+            function = compile_node(parse(source, backend), backend)
+            start = time.perf_counter()
+            try:
+                for _ in range(repeats):
+                    value = function({})
+            except (ArithmeticError, ValueError) as error:
+                value = error
+            elapsed = (time.perf_counter() - start) / repeats * 1000
+            results[title][repr(backend)] = elapsed
+            text = str(value if isinstance(value, Exception) else backend.format(value))
+            if len(text) > 24:
+                text = f"{text[:20]}… {len(text)} caractères"
+            print(f"    {repr(backend)}: {elapsed:.3f} ms ({text})")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,178 @@
+"""
+持久化（结构共享）向量：32 叉前缀树，节点为不可变元组。
+
+修改操作（set、append、pop）返回新的向量，只复制从根到叶的一条路径，
+其余节点与旧版本共享。因此保存一个版本是 O(1)，每个新版本的内存开销
+与修改的元素数成正比（每个元素约 log32(n) 个 32 项节点）。
+"""
+from typing import Any, Iterable, Iterator, List, Optional
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+
+
+class PVector:
+    """不可变的持久化向量"""
+
+    __slots__ = ('_count', '_shift', '_root')
+
+    def __init__(self, count: int = 0, shift: int = BITS, root: tuple = ()):
+        self._count = count
+        self._shift = shift
+        self._root = root
+
+    @classmethod
+    def from_iterable(cls, values: Iterable[Any]) -> 'PVector':
+        """由可迭代对象批量构建（自底向上，O(n)）"""
+        level = []
+        leaf = []
+        count = 0
+        for value in values:
+            leaf.append(value)
+            count += 1
+            if len(leaf) == WIDTH:
+                level.append(tuple(leaf))
+                leaf = []
+        if leaf:
+            level.append(tuple(leaf))
+        if count == 0:
+            return EMPTY
+        shift = 0
+        while len(level) > 1 or shift == 0:
+            level = [tuple(level[i:i + WIDTH]) for i in range(0, len(level), WIDTH)]
+            shift += BITS
+        return cls(count, shift, level[0])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Indice hors limites")
+        node = self._root
+        shift = self._shift
+        while shift > 0:
+            node = node[(index >> shift) & MASK]
+            shift -= BITS
+        return node[index & MASK]
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._iter_node(self._root, self._shift)
+
+    def _iter_node(self, node: tuple, shift: int) -> Iterator[Any]:
+        if shift == 0:
+            yield from node
+        else:
+            for child in node:
+                yield from self._iter_node(child, shift - BITS)
+
+    def to_list(self) -> List[Any]:
+        return list(self)
+
+    # ------------------------------------------------------------------
+    # 修改（返回新版本）
+    # ------------------------------------------------------------------
+
+    def set(self, index: int, value: Any) -> 'PVector':
+        """返回第 index 项替换为 value 的新向量"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Indice hors limites")
+        return PVector(self._count, self._shift, _assoc(self._root, self._shift, index, value))
+
+    def append(self, value: Any) -> 'PVector':
+        """返回末尾追加 value 的新向量"""
+        index = self._count
+        if index == WIDTH << self._shift:
+            # 根已满：增加一层
+            root = (self._root, _new_path(self._shift, value))
+            return PVector(index + 1, self._shift + BITS, root)
+        return PVector(index + 1, self._shift, _push(self._root, self._shift, index, value))
+
+    def pop(self) -> 'PVector':
+        """返回去掉最后一项的新向量"""
+        if self._count == 0:
+            raise IndexError("Le vecteur est vide")
+        if self._count == 1:
+            return EMPTY
+        root = _pop(self._root, self._shift, self._count - 1)
+        shift = self._shift
+        if shift > BITS and len(root) == 1:
+            root = root[0]
+            shift -= BITS
+        return PVector(self._count - 1, shift, root)
+
+    # ------------------------------------------------------------------
+    # 比较
+    # ------------------------------------------------------------------
+
+    def changed_indices(self, other: 'PVector') -> List[int]:
+        """两个版本中不同（或只存在于其中一个）的下标
+
+        共享的子树按对象身份直接跳过，代价与差异的大小成正比。
+        """
+        common = min(self._count, other._count)
+        result: List[int] = []
+        if self._shift == other._shift:
+            _diff(self._root, other._root, self._shift, 0, common, result)
+        else:
+            result.extend(i for i in range(common) if self[i] is not other[i])
+        result.extend(range(common, max(self._count, other._count)))
+        return result
+
+
+EMPTY = PVector()
+
+
+def _assoc(node: tuple, shift: int, index: int, value: Any) -> tuple:
+    slot = (index >> shift) & MASK
+    if shift == 0:
+        child = value
+    else:
+        child = _assoc(node[slot], shift - BITS, index, value)
+    return node[:slot] + (child,) + node[slot + 1:]
+
+
+def _new_path(shift: int, value: Any) -> tuple:
+    node = (value,)
+    while shift > 0:
+        node = (node,)
+        shift -= BITS
+    return node
+
+
+def _push(node: tuple, shift: int, index: int, value: Any) -> tuple:
+    slot = (index >> shift) & MASK
+    if shift == 0:
+        return node + (value,)
+    if slot < len(node):
+        return node[:slot] + (_push(node[slot], shift - BITS, index, value),)
+    return node + (_new_path(shift - BITS, value),)
+
+
+def _pop(node: tuple, shift: int, index: int) -> Optional[tuple]:
+    """删除下标为 index（最后一项）的元素，节点变空时返回 None"""
+    slot = (index >> shift) & MASK
+    if shift == 0:
+        return node[:-1] or None
+    child = _pop(node[slot], shift - BITS, index)
+    if child is None:
+        return node[:slot] or None
+    return node[:slot] + (child,)
+
+
+def _diff(a: tuple, b: tuple, shift: int, base: int, limit: int, result: List[int]):
+    if a is b or base >= limit:
+        return
+    if shift == 0:
+        for i, (x, y) in enumerate(zip(a, b)):
+            if base + i < limit and x is not y:
+                result.append(base + i)
+        return
+    span = 1 << shift
+    for i, (x, y) in enumerate(zip(a, b)):
+        _diff(x, y, shift - BITS, base + i * span, limit, result)
@@ -0,0 +1,317 @@
+"""
+函数曲线：在画布的坐标系中绘制 y = f(x)。
+
+- 表达式用计算器的表达式引擎编译一次；安装了 NumPy 时按数组求值
+- 自适应细分：先按固定像素间隔采样，中点偏离弦超过 TOLERANCE_PIXELS 的区间继续对分，
+  每一层的所有中点一次求值，平坦处点少、弯曲处点多
+- 不连续检测：值不是有限数（定义域外）时断开；细分到最小宽度仍有明显跳变时
+  （如 tan、1/x、floor）也断开，不画出竖直的连线
+- 截断：y 值截断到画布可见高度之外一点（按 TILE_PIXELS 取整），既不把极大的坐标交给
+  QPainter，也不在看不见的地方（如 tan 的渐近线附近）继续细分
+- 缓存：x 方向按 TILE_PIXELS 像素宽的瓦片采样，结果按 (网格间距, 截断高度, 瓦片编号) 放在 LRU 中；
+  视口变化时只采样新露出的瓦片。折线以网格坐标保存，绘制时由画家变换映射到屏幕，
+  重绘只做绘制，不再求值
+"""
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+from PyQt6.QtCore import QPointF, Qt
+from PyQt6.QtGui import QColor, QPen, QPolygonF
+
+from modules.expression import Expression, ExpressionError, compile_expression, np
+
+PLOT_VARIABLE = 'x'
+PLOT_COLORS = ('#C62828', '#00838F', '#6A1B9A', '#EF6C00', '#2E7D32', '#AD1457')
+
+TILE_PIXELS = 256
+INITIAL_STEP_PIXELS = 8
+TOLERANCE_PIXELS = 0.25
+MIN_STEP_PIXELS = 1 / 16
+# 细分到最小宽度后仍需细分、且跳变超过该值（像素）的区间视为不连续
+JUMP_PIXELS = 8
+MAX_TILES = 512
+
+Segment = Tuple[Sequence[float], Sequence[float]]  # (xs, ys)，网格坐标
+
+
+def parse_function(text: str) -> Expression:
+    """解析 "y = f(x)"、"f(x) = ..." 或直接的表达式，只允许变量 x"""
+    source = text.split('=', 1)[1] if '=' in text else text
+    expression = compile_expression(source.strip())
+    others = [name for name in expression.variables if name != PLOT_VARIABLE]
+    if others:
+        raise ExpressionError(f"La fonction ne peut dépendre que de x ({', '.join(others)})")
+    return expression
+
+
+# ----------------------------------------------------------------------
+# 自适应采样
+# ----------------------------------------------------------------------
+
+def sample(expression: Expression, x_start: float, x_end: float, spacing: float,
+           y_limit: float) -> List[Segment]:
+    """在 [x_start, x_end] 上自适应采样，返回按不连续点切开的折线段（网格坐标）
+
+    y 值截断到 [-y_limit, y_limit]（网格单位）。
+    """
+    if np is not None:
+        return _sample_vectorized(expression, x_start, x_end, spacing, y_limit)
+    return _sample_python(expression, x_start, x_end, spacing, y_limit)
+
+
+def _sample_vectorized(expression: Expression, x_start: float, x_end: float, spacing: float,
+                       y_limit: float) -> List[Segment]:
+    tolerance = TOLERANCE_PIXELS / spacing
+    min_step = MIN_STEP_PIXELS / spacing
+    count = max(2, int(math.ceil((x_end - x_start) * spacing / INITIAL_STEP_PIXELS)))
+
+    def evaluate(xs):
+        ys = np.array(expression.vector({PLOT_VARIABLE: xs}))
+        np.clip(ys, -y_limit, y_limit, out=ys)
+        return ys
+
+    xs = np.linspace(x_start, x_end, count + 1)
+    ys = evaluate(xs)
+    while True:
+        mids = (xs[:-1] + xs[1:]) / 2
+        middle = evaluate(mids)
+        left, right = ys[:-1], ys[1:]
+        finite = np.isfinite(left) & np.isfinite(right)
+        with np.errstate(invalid='ignore'):
+            error = np.abs(middle - (left + right) / 2)
+            # 偏离弦太远，或者定义域的边界在区间内（一端有值一端没有）
+            refine = np.where(finite, error > tolerance, np.isfinite(left) | np.isfinite(right))
+        refine &= np.isfinite(middle) | ~finite
+        wide = (xs[1:] - xs[:-1]) > min_step
+        pending = refine & ~wide
+        refine &= wide
+        if not refine.any():
+            break
+        positions = np.nonzero(refine)[0] + 1
+        xs = np.insert(xs, positions, mids[refine])
+        ys = np.insert(ys, positions, middle[refine])
+
+    # 断开：端点不是有限数，或者在最小宽度上仍然跳变
+    with np.errstate(invalid='ignore'):
+        jump = np.abs(ys[1:] - ys[:-1]) > JUMP_PIXELS / spacing
+    breaks = ~(np.isfinite(ys[:-1]) & np.isfinite(ys[1:])) | (pending & jump)
+    segments = []
+    start = 0
+    for index in np.nonzero(breaks)[0].tolist() + [len(xs) - 1]:
+        stop = index + 1
+        part_x, part_y = xs[start:stop], ys[start:stop]
+        finite = np.isfinite(part_y)
+        if not finite.all():
+            part_x, part_y = part_x[finite], part_y[finite]
+        if len(part_x) >= 2:
+            segments.append((part_x, part_y))
+        start = stop
+    return segments
+
+
+def _sample_python(expression: Expression, x_start: float, x_end: float, spacing: float,
+                   y_limit: float) -> List[Segment]:
+    tolerance = TOLERANCE_PIXELS / spacing
+    min_step = MIN_STEP_PIXELS / spacing
+    count = max(2, int(math.ceil((x_end - x_start) * spacing / INITIAL_STEP_PIXELS)))
+    env = {}
+
+    def evaluate(x):
+        env[PLOT_VARIABLE] = x
+        try:
+            y = float(expression(env))
+        except (ArithmeticError, ValueError, TypeError):
+            return math.nan
+        return max(-y_limit, min(y_limit, y)) if math.isfinite(y) else y
+
+    def subdivide(x1, y1, x2, y2, output):
+        """递归细分 (x1, x2]，把点追加到 output；返回最后一个区间是否仍需细分"""
+        middle_x = (x1 + x2) / 2
+        middle_y = evaluate(middle_x)
+        finite1, finite2 = math.isfinite(y1), math.isfinite(y2)
+        if finite1 and finite2:
+            refine = abs(middle_y - (y1 + y2) / 2) > tolerance
+        else:
+            refine = finite1 or finite2
+        if refine and (math.isfinite(middle_y) or not (finite1 and finite2)):
+            if x2 - x1 > min_step:
+                subdivide(x1, y1, middle_x, middle_y, output)
+                subdivide(middle_x, middle_y, x2, y2, output)
+                return
+            output.append((x2, y2, True))
+            return
+        output.append((x2, y2, False))
+
+    step = (x_end - x_start) / count
+    points = [(x_start, evaluate(x_start), False)]
+    for i in range(count):
+        x1, y1, _ = points[-1]
+        x2 = x_start + (i + 1) * step
+        subdivide(x1, y1, x2, evaluate(x2), points)
+
+    segments = []
+    xs, ys = [], []
+    previous = None
+    for x, y, pending in points:
+        finite = math.isfinite(y)
+        broken = (not finite or previous is None or not math.isfinite(previous)
+                  or (pending and abs(y - previous) > JUMP_PIXELS / spacing))
+        if broken and len(xs) >= 2:
+            segments.append((xs, ys))
+        if broken:
+            xs, ys = [], []
+        if finite:
+            xs.append(x)
+            ys.append(y)
+        previous = y
+    if len(xs) >= 2:
+        segments.append((xs, ys))
+    return segments
+
+
+# ----------------------------------------------------------------------
+# 曲线
+# ----------------------------------------------------------------------
+
+class FunctionPlot:
+    """画布上的一条函数曲线（画布叠加图层）"""
+
+    def __init__(self, text: str, color: str = PLOT_COLORS[0], width: float = 2.0):
+        self.text = text.strip()
+        self.expression = parse_function(text)
+        self.color = color
+        self.width = width
+        # (网格间距, 截断高度, 瓦片编号) → 该瓦片的折线（网格坐标的 QPolygonF）
+        self.tiles: 'OrderedDict[Tuple[float, int, int], List[QPolygonF]]' = OrderedDict()
+        self.sampled_tiles = 0
+
+    def check(self, x_start: float, x_end: float, count: int = 64):
+        """在 [x_start, x_end] 上试算 count + 1 个点：求值出错或没有一个有限值时抛出 ExpressionError"""
+        step = (x_end - x_start) / count
+        xs = [x_start + i * step for i in range(count + 1)]
+        try:
+            if np is not None:
+                ys = self.expression.vector({PLOT_VARIABLE: np.array(xs)}).tolist()
+            else:
+                ys = []
+                for x in xs:
+                    try:
+                        ys.append(float(self.expression({PLOT_VARIABLE: x})))
+                    except (ArithmeticError, ValueError):
+                        ys.append(math.nan)
+        except (ArithmeticError, ValueError, TypeError) as error:
+            raise ExpressionError(f"Calcul impossible: {error}") from None
+        if not any(math.isfinite(y) for y in ys):
+            raise ExpressionError("La fonction n'a aucune valeur finie sur l'intervalle visible")
+
+    def tile_polygons(self, spacing: float, limit: int, tile: int) -> List[QPolygonF]:
+        """取得一个瓦片的折线（limit 为截断高度，像素），不在缓存中时采样"""
+        key = (spacing, limit, tile)
+        polygons = self.tiles.get(key)
+        if polygons is not None:
+            self.tiles.move_to_end(key)
+            return polygons
+        width = TILE_PIXELS / spacing
+        polygons = []
+        for xs, ys in sample(self.expression, tile * width, (tile + 1) * width, spacing, limit / spacing):
+            if np is not None:
+                xs, ys = xs.tolist(), ys.tolist()
+            polygons.append(QPolygonF([QPointF(x, y) for x, y in zip(xs, ys)]))
+        self.tiles[key] = polygons
+        self.sampled_tiles += 1
+        if len(self.tiles) > MAX_TILES:
+            self.tiles.popitem(last=False)
+        return polygons
+
+    def visible_tiles(self, canvas) -> range:
+        """画布当前可见的瓦片编号"""
+        spacing = canvas.grid_spacing
+        x_min, _ = canvas.screen_to_grid(0, 0)
+        x_max, _ = canvas.screen_to_grid(canvas.width(), 0)
+        first = math.floor(x_min * spacing / TILE_PIXELS)
+        last = math.floor(x_max * spacing / TILE_PIXELS)
+        return range(first, last + 1)
+
+    @staticmethod
+    def y_limit(canvas) -> int:
+        """截断高度（像素）：画布半高向上取整到 TILE_PIXELS 的倍数，画布高度小幅变化时缓存仍然有效"""
+        return (canvas.height() // 2 // TILE_PIXELS + 1) * TILE_PIXELS
+
+    def paint(self, painter, canvas):
+        spacing = canvas.grid_spacing
+        limit = self.y_limit(canvas)
+        # 默认的方头/斜接比圆头/圆角描边快得多
+        pen = QPen(QColor(self.color), self.width)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.translate(canvas.width() // 2, canvas.height() // 2)
+        painter.scale(spacing, -spacing)
+        for tile in self.visible_tiles(canvas):
+            for polygon in self.tile_polygons(spacing, limit, tile):
+                painter.drawPolyline(polygon)
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(frames: int = 120) -> Dict[str, float]:
+    """多条曲线：首次采样、缓存后每帧的绘制耗时，以及视口变宽时只采样新瓦片"""
+    import os
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtGui import QImage, QPainter
+    from PyQt6.QtWidgets import QApplication
+    from modules.canvas import Canvas
+
+    app = QApplication.instance() or QApplication([])
+    canvas = Canvas()
+    canvas.resize(1200, 800)
+    sources = ["y = sin(x)", "y = tan(x)", "y = 1/x", "y = x^2/4 - 3", "y = sqrt(x)", "y = floor(x)"]
+    plots = [FunctionPlot(source, PLOT_COLORS[i % len(PLOT_COLORS)]) for i, source in enumerate(sources)]
+    image = QImage(canvas.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    results: Dict[str, float] = {}
+
+    def paint_all():
+        image.fill(0xFFFFFFFF)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for plot in plots:
+            painter.save()
+            plot.paint(painter, canvas)
+            painter.restore()
+        painter.end()
+
+    start = time.perf_counter()
+    paint_all()
+    results['first_ms'] = (time.perf_counter() - start) * 1000
+    results['points'] = sum(polygon.size() for plot in plots for polygons in plot.tiles.values()
+                            for polygon in polygons)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        paint_all()
+    results['frame_ms'] = (time.perf_counter() - start) * 1000 / frames
+
+    # 视口变宽：两侧各露出一部分新的 x 范围
+    before = sum(plot.sampled_tiles for plot in plots)
+    canvas.resize(1800, 800)
+    image = QImage(canvas.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    start = time.perf_counter()
+    paint_all()
+    results['widen_ms'] = (time.perf_counter() - start) * 1000
+    results['new_tiles'] = sum(plot.sampled_tiles for plot in plots) - before
+
+    print(f"{len(plots)} courbes sur un canevas de 1200×800 ({'NumPy' if np is not None else 'Python pur'})")
+    print(f"  premier tracé (échantillonnage adaptatif): {results['first_ms']:.1f} ms, "
+          f"{results['points']} points")
+    print(f"  image suivante (cache): {results['frame_ms']:.2f} ms "
+          f"(≈ {1000 / results['frame_ms']:.0f} images/s)")
+    print(f"  élargissement à 1800 px: {results['new_tiles']} nouvelles tuiles en {results['widen_ms']:.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -9,6 +9,8 @@ from PyQt6.QtWidgets import (QFrame, QVBoxLayout, QHBoxLayout, QGridLayout,
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QColor
 
+from modules.theme import THEME, repolish_tree
+
 # 解决元类冲突的方法是创建一个带有ABC元方法的QFrame子类
 class AbstractQFrame(QFrame):
     """解决元类冲突的抽象QFrame基类"""
@@ -36,8 +38,8 @@ class PropertyPanel(AbstractQFrame):
         self.bg_color = bg_color
         self.text_color = text_color
         
-        # 设置基本样式
-        self._update_style()
+        # 样式来自应用程序样式表：配色用动态属性 tone 选择，禁用的外观按 enabled 属性选择（见 set_enabled）
+        self.setProperty('tone', THEME.panel_tone(bg_color, text_color))
         
         # 设置阴影效果
         shadow = QGraphicsDropShadowEffect(self)
@@ -54,7 +56,7 @@ class PropertyPanel(AbstractQFrame):
         # 添加标题
         self.title_label = QLabel(title, self)
         self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.title_label.setStyleSheet(f"font-size: 14px; font-weight: bold; color: {text_color};")
+        self.title_label.setProperty('role', 'title')
         self.main_layout.addWidget(self.title_label)
         
         # 创建属性网格布局
@@ -67,18 +69,7 @@ class PropertyPanel(AbstractQFrame):
         
         # 创建按钮
         self.create_button = QPushButton("Créer")
-        self.create_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {text_color}; 
-                color: white; 
-                border-radius: 4px; 
-                padding: 5px 10px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: {self._lighten_color(text_color)};
-            }}
-        """)
+        self.create_button.setProperty('role', 'create')
         self.create_button.clicked.connect(self._on_create_clicked)
         self.buttons_layout.addWidget(self.create_button)
         
@@ -86,40 +77,6 @@ class PropertyPanel(AbstractQFrame):
         self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         self.setFixedWidth(220)
     
-    def _update_style(self):
-        """更新面板样式"""
-        self.setStyleSheet(f"""
-            QFrame {{
-                background-color: {self.bg_color};
-                border-radius: 8px;
-                border: 1px solid {self._darken_color(self.bg_color)};
-            }}
-            QLabel {{
-                color: {self.text_color};
-                font-weight: bold;
-            }}
-        """)
-    
-    def _lighten_color(self, color: str) -> str:
-        """使颜色变亮"""
-        if color.startswith('#'):
-            color_obj = QColor(color)
-            h, s, v, a = color_obj.getHsvF()
-            v = min(1.0, v * 1.2)  # 增加亮度
-            color_obj.setHsvF(h, s, v, a)
-            return color_obj.name()
-        return color
-    
-    def _darken_color(self, color: str) -> str:
-        """使颜色变暗"""
-        if color.startswith('#'):
-            color_obj = QColor(color)
-            h, s, v, a = color_obj.getHsvF()
-            v = max(0.0, v * 0.8)  # 减少亮度
-            color_obj.setHsvF(h, s, v, a)
-            return color_obj.name()
-        return color
-    
     def _on_create_clicked(self):
         """创建按钮点击事件处理"""
         properties = self.get_properties()
@@ -142,33 +99,10 @@ class PropertyPanel(AbstractQFrame):
         pass
     
     def set_enabled(self, enabled: bool = True) -> None:
-        """设置面板输入控件的启用/禁用状态"""
-        for i in range(self.properties_layout.count()):
-            item = self.properties_layout.itemAt(i)
-            if item and item.widget():
-                widget = item.widget()
-                if isinstance(widget, (QDoubleSpinBox, QPushButton)):
-                    widget.setEnabled(enabled)
-        
-        self.create_button.setEnabled(enabled)
-        
-        # 更新样式
-        if not enabled:
-            self.setStyleSheet(f"""
-                QFrame {{
-                    background-color: #ECEFF1;
-                    border-radius: 8px;
-                    border: 1px solid #CFD8DC;
-                }}
-                QLabel {{
-                    color: #607D8B;
-                    font-weight: bold;
-                }}
-                QDoubleSpinBox, QPushButton {{
-                    background-color: #ECEFF1;
-                    color: #90A4AE;
-                    border: 1px solid #CFD8DC;
-                }}
-            """)
-        else:
-            self._update_style()
+        """设置面板输入控件的启用/禁用状态
+
+        禁用整个面板（子控件随之禁用），应用程序样式表中按面板的 enabled 属性选择禁用的外观；
+        Qt 不会因为启用状态改变而重新匹配规则，所以重新 polish 面板及其子控件。
+        """
+        self.setEnabled(enabled)
+        repolish_tree(self)
@@ -0,0 +1,460 @@
+"""
+紧凑的二进制场景格式，可通过 mmap 直接打开。
+
+文件布局（小端序，各段按 8 字节对齐）：
+    文件头   magic b'GEOSCENE'、版本 uint16、保留 uint16、段数 uint32、记录数 uint64
+    段索引   每段 (名称 8 字节, 偏移 uint64, 字节长度 uint64)
+    kind     uint8  每条记录的类型标签（点、线段、圆、三角形、矩形、多边形）
+    color    uint16 每条记录的颜色（字符串表下标）
+    label    uint32 每条记录的标签（字符串表下标，NO_LABEL 表示无）
+    coordoff uint32 每条记录在 coords 中的起始位置（共 n + 1 项）
+    coords   float64 网格坐标：点 (x, y)、线段 (x1, y1, x2, y2)、圆 (cx, cy, r)、多边形 (x, y)*
+    stroff   uint32 字符串表偏移（共 m + 1 项）
+    strdata  UTF-8 字符串数据
+
+打开时只解析文件头和段索引，各列以 memoryview（安装了 NumPy 时为数组视图）
+直接映射到文件内容，不复制；查看器可以只解码需要显示的记录。
+"""
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+from modules.scene_io import Frame, canvas_frame
+
+MAGIC = b'GEOSCENE'
+FORMAT_VERSION = 1
+
+# 记录类型标签
+KIND_POINT, KIND_LINE, KIND_CIRCLE, KIND_TRIANGLE, KIND_RECTANGLE, KIND_POLYGON = range(6)
+SHAPE_KINDS = {'circle': KIND_CIRCLE, 'triangle': KIND_TRIANGLE, 'rectangle': KIND_RECTANGLE}
+SHAPE_TYPES = {KIND_CIRCLE: 'circle', KIND_TRIANGLE: 'triangle', KIND_RECTANGLE: 'rectangle',
+               KIND_POLYGON: 'polygon'}
+
+NO_LABEL = 0xFFFFFFFF
+
+# 每种记录的坐标数（多边形类为偶数个，不固定）
+_COORDINATE_COUNTS = {KIND_POINT: 2, KIND_LINE: 4, KIND_CIRCLE: 3}
+
+_HEADER = struct.Struct('<8sHHIQ')
+_SECTION = struct.Struct('<8sQQ')
+# 段名称及其 array 类型码
+_SECTIONS = (('kind', 'B'), ('color', 'H'), ('label', 'I'), ('coordoff', 'I'),
+             ('coords', 'd'), ('stroff', 'I'), ('strdata', 'B'))
+
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+# ----------------------------------------------------------------------
+# 写入
+# ----------------------------------------------------------------------
+
+class _StringTable:
+    """去重的字符串表"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.offsets = array('I', [0])
+        self.data = bytearray()
+
+    def add(self, text: str) -> int:
+        found = self.index.get(text)
+        if found is not None:
+            return found
+        found = len(self.offsets) - 1
+        self.index[text] = found
+        self.data += text.encode('utf-8')
+        self.offsets.append(len(self.data))
+        return found
+
+
+def write_binary_scene(canvas, path: str, frame: Optional[Frame] = None) -> int:
+    """把画布内容写入二进制场景文件，返回记录数"""
+    origin_x, origin_y, spacing = frame or canvas_frame(canvas)
+    kinds, colors, labels = array('B'), array('H'), array('I')
+    offsets, coords = array('I', [0]), array('d')
+    strings = _StringTable()
+
+    def color_id(color):
+        index = strings.add(color)
+        if index > 0xFFFF:
+            raise ValueError("Trop de couleurs distinctes pour le format binaire")
+        return index
+
+    def push(kind, color, label, values):
+        kinds.append(kind)
+        colors.append(color_id(color))
+        labels.append(NO_LABEL if label is None else strings.add(label))
+        coords.extend(values)
+        offsets.append(len(coords))
+
+    for point in canvas.points:
+        push(KIND_POINT, point['color'], None,
+             ((point['x'] - origin_x) / spacing, (origin_y - point['y']) / spacing))
+    texts = canvas.line_texts
+    for index, line in enumerate(canvas.lines):
+        push(KIND_LINE, line['color'], texts[index] if index < len(texts) else None,
+             ((line['x1'] - origin_x) / spacing, (origin_y - line['y1']) / spacing,
+              (line['x2'] - origin_x) / spacing, (origin_y - line['y2']) / spacing))
+    for shape in canvas.shapes:
+        color = shape.get('color', '#000000')
+        if shape['type'] == 'circle':
+            center_x, center_y = shape['center']
+            push(KIND_CIRCLE, color, None,
+                 ((center_x - origin_x) / spacing, (origin_y - center_y) / spacing,
+                  shape['radius'] / spacing))
+        else:
+            values = []
+            for x, y in shape.get('vertices', []):
+                values.append((x - origin_x) / spacing)
+                values.append((origin_y - y) / spacing)
+            push(SHAPE_KINDS.get(shape['type'], KIND_POLYGON), color, None, values)
+
+    columns = {'kind': kinds, 'color': colors, 'label': labels, 'coordoff': offsets,
+               'coords': coords, 'stroff': strings.offsets, 'strdata': strings.data}
+    _write_columns(path, len(kinds), columns)
+    return len(kinds)
+
+
+def _write_columns(path: str, count: int, columns: Dict[str, Any]):
+    """按段写出列数据（先写临时文件再替换）"""
+    payloads = []
+    for name, _ in _SECTIONS:
+        column = columns[name]
+        if isinstance(column, array) and not _LITTLE_ENDIAN and column.itemsize > 1:
+            column = array(column.typecode, column)
+            column.byteswap()
+        payloads.append((name, bytes(column) if isinstance(column, bytearray) else column.tobytes()))
+
+    offset = _align(_HEADER.size + _SECTION.size * len(payloads))
+    index = []
+    for name, payload in payloads:
+        index.append((name, offset, len(payload)))
+        offset = _align(offset + len(payload))
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as stream:
+        stream.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(payloads), count))
+        for name, start, length in index:
+            stream.write(_SECTION.pack(name.encode('ascii'), start, length))
+        for (name, start, _), (_, payload) in zip(index, payloads):
+            stream.write(b'\0' * (start - stream.tell()))
+            stream.write(payload)
+    os.replace(temp_path, path)
+
+
+# ----------------------------------------------------------------------
+# 读取
+# ----------------------------------------------------------------------
+
+def _check_offsets(name: str, offsets, limit: int):
+    """偏移表必须从 0 开始、不递减，且最后一项不超过 limit"""
+    if offsets[0] != 0 or offsets[len(offsets) - 1] > limit:
+        raise ValueError(f"Section {name}: décalages hors limites")
+    if np is not None:
+        steps = np.diff(np.frombuffer(offsets, dtype=np.uint32).astype(np.int64))
+        increasing = bool((steps >= 0).all())
+    else:
+        increasing = all(a <= b for a, b in zip(offsets, offsets[1:]))
+    if not increasing:
+        raise ValueError(f"Section {name}: décalages non croissants")
+
+
+class SceneArchive:
+    """以 mmap 打开的二进制场景
+
+    各列（kind、color、label、coordoff、coords）是直接映射到文件的 memoryview，
+    records(start, stop) 只解码指定范围的记录。用完后调用 close() 或使用 with 语句。
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # 空文件无法映射
+            self._file.close()
+            raise ValueError("Fichier de scène binaire vide") from None
+        self._views: List[memoryview] = []
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        """解析文件头和段索引，校验各段的长度和偏移；文件不合法时抛出 ValueError"""
+        size = len(self._map)
+        if size < _HEADER.size:
+            raise ValueError("Fichier de scène binaire tronqué")
+        magic, version, _, section_count, self.count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError("Ce fichier n'est pas une scène géométrique binaire")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Version de scène non prise en charge: {version}")
+        if _HEADER.size + section_count * _SECTION.size > size:
+            raise ValueError("Index des sections hors du fichier")
+
+        base = memoryview(self._map)
+        self._views.append(base)
+        typecodes = dict(_SECTIONS)
+        self.columns: Dict[str, Any] = {}
+        for i in range(section_count):
+            raw_name, start, length = _SECTION.unpack_from(self._map, _HEADER.size + i * _SECTION.size)
+            name = raw_name.rstrip(b'\0').decode('ascii', errors='replace')
+            if name not in typecodes:
+                continue  # 新版本增加的段
+            if start + length > size:
+                raise ValueError(f"Section {name} hors du fichier")
+            typecode = typecodes[name]
+            if start % 8 or length % array(typecode).itemsize:
+                raise ValueError(f"Section {name} mal alignée")
+            view = base[start:start + length]
+            self._views.append(view)
+            if typecode != 'B':
+                if _LITTLE_ENDIAN:
+                    view = view.cast(typecode)
+                    self._views.append(view)
+                else:  # 大端机器只能复制并转换字节序
+                    view = array(typecode, bytes(view))
+                    view.byteswap()
+            self.columns[name] = view
+        missing = [name for name, _ in _SECTIONS if name not in self.columns]
+        if missing:
+            raise ValueError(f"Sections manquantes: {', '.join(missing)}")
+
+        self.kinds = self.columns['kind']
+        self.colors = self.columns['color']
+        self.labels = self.columns['label']
+        self.offsets = self.columns['coordoff']
+        self.coords = self.columns['coords']
+        self._string_cache: Dict[int, str] = {}
+
+        # 各列的长度与记录数一致；偏移表从 0 开始、不递减且不超出所指的段
+        count = self.count
+        for name in ('kind', 'color', 'label'):
+            if len(self.columns[name]) != count:
+                raise ValueError(f"Section {name}: {len(self.columns[name])} entrées pour {count} éléments")
+        if len(self.offsets) != count + 1:
+            raise ValueError(f"Section coordoff: {len(self.offsets)} entrées pour {count} éléments")
+        _check_offsets('coordoff', self.offsets, len(self.coords))
+        stroff = self.columns['stroff']
+        if len(stroff) < 1:
+            raise ValueError("Section stroff vide")
+        _check_offsets('stroff', stroff, len(self.columns['strdata']))
+        self.string_count = len(stroff) - 1
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """释放所有视图并关闭映射"""
+        self.columns = {}
+        self.kinds = self.colors = self.labels = self.offsets = self.coords = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def arrays(self) -> Dict[str, Any]:
+        """以 NumPy 数组视图返回各列（零复制）；未安装 NumPy 时返回 memoryview
+
+        数组引用映射的内存，调用 close() 前需先释放这些数组。
+        """
+        if np is None:
+            return dict(self.columns)
+        return {name: np.frombuffer(self.columns[name], dtype=np.dtype(code))
+                for name, code in _SECTIONS}
+
+    def string(self, index: int) -> Optional[str]:
+        """字符串表中的字符串"""
+        if index == NO_LABEL:
+            return None
+        text = self._string_cache.get(index)
+        if text is None:
+            if index >= self.string_count:
+                raise ValueError(f"Chaîne {index} hors de la table ({self.string_count} chaînes)")
+            stroff = self.columns['stroff']
+            text = bytes(self.columns['strdata'][stroff[index]:stroff[index + 1]]).decode('utf-8')
+            self._string_cache[index] = text
+        return text
+
+    def record(self, index: int) -> Tuple[str, Dict[str, Any], Optional[str]]:
+        """解码一条记录为 (kind, 网格坐标字典, 标签)；记录不合法时抛出 ValueError"""
+        kind = self.kinds[index]
+        # 复制为列表：切片视图若留在异常的回溯中，映射将无法关闭
+        values = self.coords[self.offsets[index]:self.offsets[index + 1]].tolist()
+        expected = _COORDINATE_COUNTS.get(kind)
+        if expected is not None:
+            valid = len(values) == expected
+        else:
+            valid = kind <= KIND_POLYGON and len(values) % 2 == 0
+        if not valid:
+            raise ValueError(f"Élément {index + 1} invalide: type {kind}, {len(values)} coordonnées")
+        if not all(map(math.isfinite, values)):
+            raise ValueError(f"Élément {index + 1} invalide: coordonnée non finie")
+        if kind == KIND_CIRCLE and values[2] <= 0:
+            raise ValueError(f"Élément {index + 1} invalide: le rayon doit être positif")
+        color = self.string(self.colors[index])
+        if kind == KIND_POINT:
+            return 'point', {'x': values[0], 'y': values[1], 'color': color}, None
+        if kind == KIND_LINE:
+            item = {'x1': values[0], 'y1': values[1], 'x2': values[2], 'y2': values[3], 'color': color}
+            return 'line', item, self.string(self.labels[index])
+        if kind == KIND_CIRCLE:
+            item = {'type': 'circle', 'center': (values[0], values[1]), 'radius': values[2], 'color': color}
+            return 'shape', item, None
+        vertices = list(zip(values[0::2], values[1::2]))
+        return 'shape', {'type': SHAPE_TYPES.get(kind, 'polygon'), 'vertices': vertices, 'color': color}, None
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any], Optional[str]]]:
+        """逐条解码 [start, stop) 范围内的记录"""
+        stop = self.count if stop is None else min(stop, self.count)
+        for index in range(start, stop):
+            yield self.record(index)
+
+
+def load_binary_scene(canvas, path: str) -> int:
+    """把二进制场景加载到画布（替换当前内容），返回记录数
+
+    画布以字典列表保存图形，因此这里需要逐条转换为屏幕坐标字典；
+    只需查看部分内容时直接使用 SceneArchive 更快。全部记录解码成功后才一次替换画布内容，
+    文件有任何错误时抛出 ValueError，当前场景不变。
+    """
+    origin_x, origin_y, spacing = canvas_frame(canvas)
+    points, lines, texts, shapes = [], [], [], []
+    with SceneArchive(path) as archive:
+        for kind, item, label in archive.records():
+            if kind == 'point':
+                item['x'] = origin_x + item['x'] * spacing
+                item['y'] = origin_y - item['y'] * spacing
+                points.append(item)
+            elif kind == 'line':
+                for x_key, y_key in (('x1', 'y1'), ('x2', 'y2')):
+                    item[x_key] = origin_x + item[x_key] * spacing
+                    item[y_key] = origin_y - item[y_key] * spacing
+                lines.append(item)
+                texts.append(label if label is not None
+                             else canvas.length_text(item['x1'], item['y1'], item['x2'], item['y2']))
+            else:
+                if item['type'] == 'circle':
+                    center_x, center_y = item['center']
+                    item['center'] = (origin_x + center_x * spacing, origin_y - center_y * spacing)
+                    item['radius'] = item['radius'] * spacing
+                else:
+                    item['vertices'] = [(origin_x + x * spacing, origin_y - y * spacing)
+                                        for x, y in item['vertices']]
+                canvas.refresh_shape_measurements(item)
+                shapes.append(item)
+        count = len(archive)
+    canvas.replace_scene(points, lines, texts, shapes, source={'path': os.path.abspath(path), 'format': 'binary'})
+    return count
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+class _SceneBuffer:
+    """基准测试用的最小画布替身（只有图形列表）"""
+
+    grid_spacing = 50
+
+    def __init__(self, count: int):
+        self.points, self.lines, self.line_texts, self.shapes = [], [], [], []
+        for i in range(count):
+            x, y = 100 + (i % 1000) * 5.0, 100 + (i // 1000) * 5.0
+            if i % 3 == 0:
+                self.shapes.append({'type': 'circle', 'center': (x, y), 'radius': 25.0, 'color': '#1B5E20'})
+            elif i % 3 == 1:
+                self.shapes.append({'type': 'triangle', 'color': '#311B92',
+                                    'vertices': [(x, y), (x + 50, y), (x, y + 50)]})
+            else:
+                self.shapes.append({'type': 'rectangle', 'color': '#1A237E',
+                                    'vertices': [(x, y), (x + 100, y), (x + 100, y + 50), (x, y + 50)]})
+
+
+def benchmark(count: int = 1_000_000) -> Dict[str, float]:
+    """比较二进制格式与 JSON Lines 格式的打开和加载时间"""
+    import tempfile
+    from modules.scene_io import record_to_item, read_records, scene_records, write_records
+
+    scene = _SceneBuffer(count)
+    frame = (512.0, 384.0, 50.0)
+    directory = tempfile.mkdtemp()
+    binary_path = os.path.join(directory, 'scene.geob')
+    json_path = os.path.join(directory, 'scene.geo.jsonl')
+    results = {}
+    try:
+        start = time.perf_counter()
+        write_binary_scene(scene, binary_path, frame)
+        results['binary_write_s'] = time.perf_counter() - start
+        with open(json_path, 'w', encoding='utf-8') as stream:
+            write_records(scene_records(scene, frame), stream)
+        del scene
+
+        start = time.perf_counter()
+        archive = SceneArchive(binary_path)
+        results['binary_open_ms'] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        visible = sum(1 for _ in archive.records(0, 1000))
+        results['binary_first_1000_ms'] = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for _ in archive.records():
+            pass
+        results['binary_decode_all_s'] = time.perf_counter() - start
+        if np is not None:
+            start = time.perf_counter()
+            columns = archive.arrays()
+            circles = int(np.count_nonzero(columns['kind'] == KIND_CIRCLE))
+            results['numpy_column_scan_ms'] = (time.perf_counter() - start) * 1000
+            del columns
+        archive.close()
+
+        start = time.perf_counter()
+        with open(json_path, 'r', encoding='utf-8') as stream:
+            for record in read_records(stream):
+                record_to_item(record, frame)
+        results['json_decode_all_s'] = time.perf_counter() - start
+        results['binary_mb'] = os.path.getsize(binary_path) / 1e6
+        results['json_mb'] = os.path.getsize(json_path) / 1e6
+    finally:
+        for path in (binary_path, json_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(directory)
+
+    print(f"{count} formes: binaire {results['binary_mb']:.1f} Mo, JSON {results['json_mb']:.1f} Mo")
+    print(f"  écriture binaire:        {results['binary_write_s']:.2f} s")
+    print(f"  ouverture (mmap):        {results['binary_open_ms']:.2f} ms")
+    print(f"  {visible} premières formes:  {results['binary_first_1000_ms']:.2f} ms")
+    print(f"  décodage binaire total:  {results['binary_decode_all_s']:.2f} s")
+    print(f"  décodage JSON total:     {results['json_decode_all_s']:.2f} s")
+    if 'numpy_column_scan_ms' in results:
+        print(f"  parcours NumPy (kind):   {results['numpy_column_scan_ms']:.2f} ms ({circles} cercles)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
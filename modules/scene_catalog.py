@@ -0,0 +1,770 @@
+"""
+场景库：用 SQLite 索引保存过的场景，并缓存缩略图。
+
+- SceneCatalog：每个场景文件一行元数据（各类图形数量、总面积、包围盒、作者、日期），
+  标签存放在单独的表中；常用的排序和筛选列都有索引
+- ThumbnailCache：缩略图在线程池中渲染（不使用画布控件），以 PNG 保存在磁盘上，
+  按文件修改时间做 LRU 淘汰，总大小不超过上限；内存中再用 QPixmapCache 缓存
+- CatalogModel / LibraryBrowser：按页从数据库读取的列表模型和浏览器，
+  打开时只查询总数和第一页，滚动时再加载后续页面，缩略图异步到达后只刷新对应的行
+"""
+import getpass
+import hashlib
+import math
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from PyQt6.QtCore import (QAbstractListModel, QModelIndex, QObject, QPointF, QRunnable, QSize, Qt,
+                          QThreadPool, QTimer, pyqtSignal)
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen, QPixmap, QPixmapCache, QPolygonF
+from PyQt6.QtWidgets import QLabel, QLineEdit, QListView, QVBoxLayout, QWidget
+
+from modules.scene_binary import SceneArchive
+from modules.scene_io import read_records
+
+CATALOG_FILE = 'catalog.sqlite3'
+THUMBNAIL_DIR = 'thumbnails'
+THUMBNAIL_SIZE = 160
+DEFAULT_THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+PAGE_SIZE = 256
+SCENE_EXTENSIONS = ('.geo.jsonl', '.geob')
+
+# 读取损坏的场景文件时可能出现的错误：文件头和记录格式的错误已统一为 ValueError，
+# 但统计和缩略图不逐字段校验记录，字段类型不对时会出现其余几种
+SCENE_READ_ERRORS = (OSError, ValueError, LookupError, TypeError, ArithmeticError, RecursionError)
+
+SHAPE_COLUMNS = ('points', 'lines', 'circles', 'rectangles', 'triangles', 'polygons')
+ORDERS = {
+    'modified': 'modified DESC',
+    'title': 'title COLLATE NOCASE',
+    'area': 'total_area DESC',
+    'author': 'author COLLATE NOCASE, modified DESC',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenes (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL DEFAULT '',
+    modified REAL NOT NULL,
+    size INTEGER NOT NULL,
+    points INTEGER NOT NULL DEFAULT 0,
+    lines INTEGER NOT NULL DEFAULT 0,
+    circles INTEGER NOT NULL DEFAULT 0,
+    rectangles INTEGER NOT NULL DEFAULT 0,
+    triangles INTEGER NOT NULL DEFAULT 0,
+    polygons INTEGER NOT NULL DEFAULT 0,
+    total_area REAL NOT NULL DEFAULT 0,
+    min_x REAL, min_y REAL, max_x REAL, max_y REAL
+);
+CREATE INDEX IF NOT EXISTS scenes_modified ON scenes (modified);
+CREATE INDEX IF NOT EXISTS scenes_title ON scenes (title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS scenes_author ON scenes (author COLLATE NOCASE, modified);
+CREATE INDEX IF NOT EXISTS scenes_area ON scenes (total_area);
+CREATE INDEX IF NOT EXISTS scenes_bbox ON scenes (min_x, max_x, min_y, max_y);
+CREATE TABLE IF NOT EXISTS scene_tags (
+    scene_id INTEGER NOT NULL REFERENCES scenes (id) ON DELETE CASCADE,
+    tag TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (scene_id, tag)
+);
+CREATE INDEX IF NOT EXISTS scene_tags_tag ON scene_tags (tag, scene_id);
+"""
+
+
+class CatalogEntry(NamedTuple):
+    """场景库中的一个场景"""
+    id: int
+    path: str
+    title: str
+    author: str
+    modified: float
+    size: int
+    counts: Dict[str, int]
+    total_area: float
+    bbox: Optional[Tuple[float, float, float, float]]
+
+
+def default_library_dir() -> str:
+    """场景库目录，可用环境变量 GEOMETRY_LIBRARY_DIR 指定"""
+    return os.environ.get('GEOMETRY_LIBRARY_DIR') or os.path.join(
+        os.path.expanduser('~'), '.geometry_calc_app', 'library')
+
+
+def is_scene_file(path: str) -> bool:
+    return path.lower().endswith(SCENE_EXTENSIONS)
+
+
+def scene_title(path: str) -> str:
+    """由文件名得到标题（去掉场景扩展名）"""
+    name = os.path.basename(path)
+    for extension in SCENE_EXTENSIONS:
+        if name.lower().endswith(extension):
+            return name[:-len(extension)]
+    return name
+
+
+# ----------------------------------------------------------------------
+# 元数据
+# ----------------------------------------------------------------------
+
+def iter_scene_items(path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """逐个生成场景文件中的 (kind, 网格坐标字典)，支持 JSON Lines 和二进制格式"""
+    if path.lower().endswith('.geob'):
+        with SceneArchive(path) as archive:
+            for kind, item, _ in archive.records():
+                yield kind, item
+        return
+    with open(path, 'r', encoding='utf-8') as stream:
+        for record in read_records(stream):
+            yield record['kind'], record
+
+
+def polygon_area(vertices) -> float:
+    """多边形面积（鞋带公式）"""
+    return abs(sum(x1 * y2 - x2 * y1
+                   for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]))) / 2
+
+
+def scene_metadata(path: str) -> Dict[str, Any]:
+    """流式读取场景文件，统计各类图形数量、形状总面积和包围盒（网格单位）"""
+    counts = dict.fromkeys(SHAPE_COLUMNS, 0)
+    total_area = 0.0
+    min_x = min_y = math.inf
+    max_x = max_y = -math.inf
+    for kind, item in iter_scene_items(path):
+        if kind == 'point':
+            counts['points'] += 1
+            xs, ys = (item['x'],), (item['y'],)
+        elif kind == 'line':
+            counts['lines'] += 1
+            xs, ys = (item['x1'], item['x2']), (item['y1'], item['y2'])
+        elif item['type'] == 'circle':
+            counts['circles'] += 1
+            (x, y), radius = item['center'], item['radius']
+            total_area += math.pi * radius * radius
+            xs, ys = (x - radius, x + radius), (y - radius, y + radius)
+        else:
+            column = item['type'] + 's'
+            counts[column if column in counts else 'polygons'] += 1
+            vertices = [tuple(vertex) for vertex in item['vertices']]
+            total_area += polygon_area(vertices)
+            xs, ys = [x for x, _ in vertices], [y for _, y in vertices]
+        min_x, max_x = min(min_x, *xs), max(max_x, *xs)
+        min_y, max_y = min(min_y, *ys), max(max_y, *ys)
+    bbox = (min_x, min_y, max_x, max_y) if min_x <= max_x else None
+    return {'counts': counts, 'total_area': total_area, 'bbox': bbox}
+
+
+# ----------------------------------------------------------------------
+# 数据库
+# ----------------------------------------------------------------------
+
+class SceneCatalog:
+    """SQLite 场景库（只在创建它的线程中使用）"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA foreign_keys=ON')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def add_entry(self, path: str, metadata: Dict[str, Any], author: str = '',
+                  tags: Iterable[str] = (), modified: Optional[float] = None,
+                  size: int = 0, title: Optional[str] = None, commit: bool = True) -> int:
+        """写入（或更新）一个场景的元数据，返回场景编号"""
+        path = os.path.abspath(path)
+        counts = metadata['counts']
+        bbox = metadata['bbox'] or (None, None, None, None)
+        values = (path, title or scene_title(path), author,
+                  time.time() if modified is None else modified, size,
+                  *(counts.get(column, 0) for column in SHAPE_COLUMNS),
+                  metadata['total_area'], *bbox)
+        cursor = self.connection.execute(
+            f"INSERT INTO scenes (path, title, author, modified, size, {', '.join(SHAPE_COLUMNS)}, "
+            "total_area, min_x, min_y, max_x, max_y) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (path) DO UPDATE SET title = excluded.title, author = excluded.author, "
+            "modified = excluded.modified, size = excluded.size, "
+            + ', '.join(f"{column} = excluded.{column}" for column in SHAPE_COLUMNS)
+            + ", total_area = excluded.total_area, min_x = excluded.min_x, min_y = excluded.min_y, "
+            "max_x = excluded.max_x, max_y = excluded.max_y "
+            "RETURNING id", values)
+        scene_id = cursor.fetchone()[0]
+        self._set_tags(scene_id, tags)
+        if commit:
+            self.connection.commit()
+        return scene_id
+
+    def index_scene(self, path: str, author: Optional[str] = None, tags: Iterable[str] = ()) -> int:
+        """读取场景文件并写入元数据（保存场景后调用）"""
+        stat = os.stat(path)
+        if author is None:
+            author = _current_user()
+        return self.add_entry(path, scene_metadata(path), author, tags, stat.st_mtime, stat.st_size)
+
+    def scan(self, directory: str, author: str = '') -> int:
+        """索引目录中新增或修改过的场景文件，删除已不存在的文件，返回新索引的数量"""
+        known = {path: (modified, size) for path, modified, size in
+                 self.connection.execute("SELECT path, modified, size FROM scenes")}
+        indexed = 0
+        directory = os.path.abspath(directory)
+        for root, _, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(root, name)
+                if not is_scene_file(path):
+                    continue
+                try:
+                    stat = os.stat(path)
+                    if known.get(path) == (stat.st_mtime, stat.st_size):
+                        continue
+                    metadata = scene_metadata(path)
+                except SCENE_READ_ERRORS:
+                    continue
+                self.add_entry(path, metadata, author, (), stat.st_mtime, stat.st_size, commit=False)
+                indexed += 1
+        missing = [(path,) for path in known
+                   if path.startswith(directory + os.sep) and not os.path.exists(path)]
+        self.connection.executemany("DELETE FROM scenes WHERE path = ?", missing)
+        self.connection.commit()
+        return indexed
+
+    def set_tags(self, scene_id: int, tags: Iterable[str]):
+        self._set_tags(scene_id, tags)
+        self.connection.commit()
+
+    def _set_tags(self, scene_id: int, tags: Iterable[str]):
+        self.connection.execute("DELETE FROM scene_tags WHERE scene_id = ?", (scene_id,))
+        self.connection.executemany("INSERT OR IGNORE INTO scene_tags (scene_id, tag) VALUES (?, ?)",
+                                    [(scene_id, tag.strip()) for tag in tags if tag.strip()])
+
+    def remove(self, path: str):
+        self.connection.execute("DELETE FROM scenes WHERE path = ?", (os.path.abspath(path),))
+        self.connection.commit()
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _where(self, text: str = '', tag: str = '', author: str = '') -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if text:
+            clauses.append("(title LIKE ? ESCAPE '\\' OR path LIKE ? ESCAPE '\\')")
+            pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            params += [pattern, pattern]
+        if tag:
+            clauses.append("id IN (SELECT scene_id FROM scene_tags WHERE tag = ?)")
+            params.append(tag)
+        if author:
+            clauses.append("author = ? COLLATE NOCASE")
+            params.append(author)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def count(self, text: str = '', tag: str = '', author: str = '') -> int:
+        where, params = self._where(text, tag, author)
+        return self.connection.execute(f"SELECT COUNT(*) FROM scenes{where}", params).fetchone()[0]
+
+    def page(self, offset: int = 0, limit: int = PAGE_SIZE, text: str = '', tag: str = '',
+             author: str = '', order: str = 'modified') -> List[CatalogEntry]:
+        """按排序返回 [offset, offset + limit) 范围内的场景"""
+        where, params = self._where(text, tag, author)
+        rows = self.connection.execute(
+            f"SELECT id, path, title, author, modified, size, {', '.join(SHAPE_COLUMNS)}, "
+            f"total_area, min_x, min_y, max_x, max_y FROM scenes{where} "
+            f"ORDER BY {ORDERS.get(order, ORDERS['modified'])}, id LIMIT ? OFFSET ?",
+            params + [limit, offset])
+        return [_entry(row) for row in rows]
+
+    def tags(self, scene_id: int) -> List[str]:
+        return [tag for tag, in self.connection.execute(
+            "SELECT tag FROM scene_tags WHERE scene_id = ? ORDER BY tag", (scene_id,))]
+
+    def in_area(self, left: float, bottom: float, right: float, top: float, limit: int = PAGE_SIZE
+                ) -> List[CatalogEntry]:
+        """包围盒与给定区域（网格坐标）相交的场景"""
+        rows = self.connection.execute(
+            f"SELECT id, path, title, author, modified, size, {', '.join(SHAPE_COLUMNS)}, "
+            "total_area, min_x, min_y, max_x, max_y FROM scenes "
+            "WHERE min_x <= ? AND max_x >= ? AND min_y <= ? AND max_y >= ? "
+            "ORDER BY modified DESC LIMIT ?", (right, left, top, bottom, limit))
+        return [_entry(row) for row in rows]
+
+
+def _entry(row) -> CatalogEntry:
+    counts = dict(zip(SHAPE_COLUMNS, row[6:12]))
+    bbox = tuple(row[13:17]) if row[13] is not None else None
+    return CatalogEntry(row[0], row[1], row[2], row[3], row[4], row[5], counts, row[12], bbox)
+
+
+def _current_user() -> str:
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return ''
+
+
+# ----------------------------------------------------------------------
+# 缩略图
+# ----------------------------------------------------------------------
+
+def render_thumbnail(path: str, bbox: Optional[Tuple[float, float, float, float]],
+                     size: int = THUMBNAIL_SIZE) -> QImage:
+    """把场景文件渲染为正方形缩略图（可在工作线程中调用，只使用 QImage）"""
+    image = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(QColor('#FFFFFF'))
+    if bbox is None:
+        return image
+    left, bottom, right, top = bbox
+    margin = 6
+    scale = (size - 2 * margin) / max(right - left, top - bottom, 1e-9)
+    offset_x = (size - (right - left) * scale) / 2
+    offset_y = (size - (top - bottom) * scale) / 2
+
+    def screen(x, y):
+        return offset_x + (x - left) * scale, offset_y + (top - y) * scale
+
+    painter = QPainter(image)
+    try:
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        pen = QPen()
+        pen.setWidthF(1.2)
+        for kind, item in iter_scene_items(path):
+            pen.setColor(QColor(item.get('color', '#000000')))
+            painter.setPen(pen)
+            if kind == 'point':
+                x, y = screen(item['x'], item['y'])
+                painter.drawEllipse(int(x) - 1, int(y) - 1, 3, 3)
+            elif kind == 'line':
+                x1, y1 = screen(item['x1'], item['y1'])
+                x2, y2 = screen(item['x2'], item['y2'])
+                painter.drawLine(int(x1), int(y1), int(x2), int(y2))
+            elif item['type'] == 'circle':
+                x, y = screen(*item['center'])
+                radius = item['radius'] * scale
+                painter.drawEllipse(int(x - radius), int(y - radius), int(2 * radius), int(2 * radius))
+            elif item.get('vertices'):
+                painter.drawPolygon(QPolygonF([QPointF(*screen(*vertex)) for vertex in item['vertices']]))
+    finally:
+        painter.end()
+    return image
+
+
+class _ThumbnailSignals(QObject):
+    rendered = pyqtSignal(str, QImage, int)  # 键, 图像, PNG 字节数
+
+
+class _ThumbnailTask(QRunnable):
+    """在线程池中渲染一个缩略图并写入磁盘缓存"""
+
+    def __init__(self, key: str, entry: CatalogEntry, file_path: str, size: int, signals: _ThumbnailSignals):
+        super().__init__()
+        self.key = key
+        self.entry = entry
+        self.file_path = file_path
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        try:
+            image = render_thumbnail(self.entry.path, self.entry.bbox, self.size)
+        except SCENE_READ_ERRORS:
+            image = QImage()
+        written = 0
+        if not image.isNull():
+            temp_path = self.file_path + '.tmp'
+            try:
+                if image.save(temp_path, 'PNG'):
+                    os.replace(temp_path, self.file_path)
+                    written = os.path.getsize(self.file_path)
+            except OSError:
+                written = 0  # 只是没有写入磁盘缓存
+        self.signals.rendered.emit(self.key, image, written)
+
+
+class _ScanSignals(QObject):
+    finished = pyqtSignal(int)  # 新索引的场景数
+    failed = pyqtSignal(str)
+
+
+class _ScanTask(QRunnable):
+    """在线程池中扫描场景目录
+
+    SceneCatalog 只能在创建它的线程中使用，任务用自己的连接打开同一个数据库（WAL 模式允许并发读写）。
+    """
+
+    def __init__(self, database: str, directory: str, author: str, signals: _ScanSignals):
+        super().__init__()
+        self.database = database
+        self.directory = directory
+        self.author = author
+        self.signals = signals
+
+    def run(self):
+        try:
+            catalog = SceneCatalog(self.database)
+            try:
+                indexed = catalog.scan(self.directory, self.author)
+            finally:
+                catalog.close()
+        except (OSError, sqlite3.Error) as error:
+            self.signals.failed.emit(str(error))
+        else:
+            self.signals.finished.emit(indexed)
+
+
+class ThumbnailCache(QObject):
+    """缩略图缓存：内存（QPixmapCache）→ 磁盘（PNG，LRU）→ 后台渲染
+
+    磁盘上的 LRU 顺序用文件修改时间记录：命中时更新时间，超过上限时删除最久未用的文件。
+    """
+
+    ready = pyqtSignal(str)  # 缩略图键
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_THUMBNAIL_CACHE_BYTES,
+                 size: int = THUMBNAIL_SIZE, pool: Optional[QThreadPool] = None, parent=None):
+        super().__init__(parent)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = size
+        self.pool = pool or QThreadPool.globalInstance()
+        self.pending = set()
+        self.signals = _ThumbnailSignals(self)
+        self.signals.rendered.connect(self._on_rendered)
+        # 磁盘文件的 LRU 表：键 → 字节数（最久未用的在前）
+        self.files: 'OrderedDict[str, int]' = OrderedDict()
+        self.total_bytes = 0
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith('.png'):
+                stat = os.stat(os.path.join(directory, name))
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size_bytes in sorted(entries):
+            self.files[key] = size_bytes
+            self.total_bytes += size_bytes
+        self._evict()
+
+    def key(self, entry: CatalogEntry) -> str:
+        text = f"{entry.path}|{entry.modified}|{entry.size}|{self.size}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def file_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.png')
+
+    def get(self, entry: CatalogEntry) -> Optional[QPixmap]:
+        """返回缩略图；不在缓存中时提交后台渲染并返回 None（完成后发出 ready）"""
+        key = self.key(entry)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        if key in self.files:
+            pixmap = QPixmap(self.file_path(key))
+            if not pixmap.isNull():
+                self.files.move_to_end(key)
+                try:
+                    os.utime(self.file_path(key))
+                except OSError:
+                    pass
+                QPixmapCache.insert(key, pixmap)
+                return pixmap
+            self._forget(key)
+        if key not in self.pending:
+            self.pending.add(key)
+            self.pool.start(_ThumbnailTask(key, entry, self.file_path(key), self.size, self.signals))
+        return None
+
+    def _on_rendered(self, key: str, image: QImage, written: int):
+        self.pending.discard(key)
+        if written:
+            self._forget(key)
+            self.files[key] = written
+            self.total_bytes += written
+            self._evict()
+        if not image.isNull():
+            QPixmapCache.insert(key, QPixmap.fromImage(image))
+        self.ready.emit(key)
+
+    def _forget(self, key: str):
+        size_bytes = self.files.pop(key, None)
+        if size_bytes is not None:
+            self.total_bytes -= size_bytes
+
+    def _evict(self):
+        """删除最久未用的文件直到总大小不超过上限"""
+        while self.total_bytes > self.max_bytes and self.files:
+            key, size_bytes = self.files.popitem(last=False)
+            self.total_bytes -= size_bytes
+            try:
+                os.remove(self.file_path(key))
+            except OSError:
+                pass
+
+
+# ----------------------------------------------------------------------
+# 模型与浏览器
+# ----------------------------------------------------------------------
+
+class CatalogModel(QAbstractListModel):
+    """按页加载的场景列表模型"""
+
+    PathRole = Qt.ItemDataRole.UserRole + 1
+    EntryRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, catalog: SceneCatalog, thumbnails: Optional[ThumbnailCache] = None, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.thumbnails = thumbnails
+        self.filters = {'text': '', 'tag': '', 'author': ''}
+        self.order = 'modified'
+        self.entries: List[CatalogEntry] = []
+        self.total = 0
+        self._rows_by_key: Dict[str, int] = {}
+        self._placeholder = QPixmap(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self._placeholder.fill(QColor('#EEEEEE'))
+        if thumbnails is not None:
+            thumbnails.ready.connect(self._on_thumbnail)
+        self.refresh()
+
+    def set_filter(self, text: str = '', tag: str = '', author: str = '', order: Optional[str] = None):
+        self.filters = {'text': text, 'tag': tag, 'author': author}
+        if order is not None:
+            self.order = order
+        self.refresh()
+
+    def refresh(self):
+        """重新查询总数，清空已加载的页"""
+        self.beginResetModel()
+        self.total = self.catalog.count(**self.filters)
+        self.entries = []
+        self._rows_by_key = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.entries) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        start = len(self.entries)
+        page = self.catalog.page(start, PAGE_SIZE, order=self.order, **self.filters)
+        if not page:
+            self.total = start
+            return
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.entries.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.entries):
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry.title
+        if role == Qt.ItemDataRole.DecorationRole:
+            if self.thumbnails is None:
+                return self._placeholder
+            pixmap = self.thumbnails.get(entry)
+            if pixmap is None:
+                self._rows_by_key[self.thumbnails.key(entry)] = index.row()
+                return self._placeholder
+            return pixmap
+        if role == Qt.ItemDataRole.ToolTipRole:
+            counts = entry.counts
+            return (f"{entry.title}\n{entry.author or 'Auteur inconnu'} — "
+                    f"{time.strftime('%d/%m/%Y %H:%M', time.localtime(entry.modified))}\n"
+                    f"{counts['points']} points, {counts['lines']} segments, "
+                    f"{counts['circles']} cercles, {counts['rectangles']} rectangles, "
+                    f"{counts['triangles']} triangles\nAire totale: {entry.total_area:.2f}")
+        if role == self.PathRole:
+            return entry.path
+        if role == self.EntryRole:
+            return entry
+        return None
+
+    def _on_thumbnail(self, key: str):
+        row = self._rows_by_key.pop(key, None)
+        if row is not None and row < len(self.entries):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class LibraryBrowser(QWidget):
+    """场景库浏览器：搜索框和缩略图网格，双击打开场景；打开时在后台扫描场景目录"""
+
+    scene_selected = pyqtSignal(str)
+
+    def __init__(self, catalog: SceneCatalog, thumbnails: Optional[ThumbnailCache] = None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Bibliothèque de scènes")
+        self.model = CatalogModel(catalog, thumbnails, self)
+
+        layout = QVBoxLayout(self)
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Rechercher (titre, chemin) ou #étiquette")
+        layout.addWidget(self.search)
+
+        self.status = QLabel()
+        self.status.hide()
+        layout.addWidget(self.status)
+        self.scanning = False
+        self._scan_signals = _ScanSignals(self)
+        self._scan_signals.finished.connect(self._on_scanned)
+        self._scan_signals.failed.connect(self._on_scan_failed)
+
+        self.view = QListView()
+        self.view.setViewMode(QListView.ViewMode.IconMode)
+        self.view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.view.setMovement(QListView.Movement.Static)
+        self.view.setUniformItemSizes(True)
+        self.view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.view.setBatchSize(PAGE_SIZE)
+        self.view.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.view.setGridSize(QSize(THUMBNAIL_SIZE + 24, THUMBNAIL_SIZE + 40))
+        self.view.setModel(self.model)
+        self.view.doubleClicked.connect(self._on_activated)
+        layout.addWidget(self.view)
+
+        # 输入停止 250 ms 后再查询
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self._apply_search)
+        self.search.textChanged.connect(self._search_timer.start)
+        self.resize(900, 640)
+
+    def scan(self, directory: str, author: str = '', pool: Optional[QThreadPool] = None):
+        """在后台扫描场景目录，完成后刷新列表（已有扫描进行时忽略）"""
+        if self.scanning:
+            return
+        self.scanning = True
+        self.status.setText("Analyse de la bibliothèque…")
+        self.status.show()
+        pool = pool or QThreadPool.globalInstance()
+        pool.start(_ScanTask(self.model.catalog.path, directory, author, self._scan_signals))
+
+    def _on_scanned(self, indexed: int):
+        self.scanning = False
+        self.status.hide()
+        self.model.refresh()  # 也可能删除了不存在的文件
+
+    def _on_scan_failed(self, message: str):
+        self.scanning = False
+        self.status.setText(f"Analyse de la bibliothèque impossible: {message}")
+
+    def _apply_search(self):
+        text = self.search.text().strip()
+        if text.startswith('#'):
+            self.model.set_filter(tag=text[1:])
+        else:
+            self.model.set_filter(text=text)
+
+    def _on_activated(self, index):
+        path = self.model.data(index, CatalogModel.PathRole)
+        if path:
+            self.scene_selected.emit(path)
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(count: int = 10_000, directory: Optional[str] = None) -> Dict[str, float]:
+    """在 count 个场景的库上测量浏览器打开、滚动、搜索和缩略图渲染的耗时"""
+    import random
+    import tempfile
+    from PyQt6.QtWidgets import QApplication
+    from modules.scene_io import _synthetic_records, write_records
+
+    app = QApplication.instance() or QApplication([])
+    directory = directory or tempfile.mkdtemp()
+    results: Dict[str, float] = {}
+
+    # 一个真实的场景文件（1000 个形状），其余条目共用它的元数据
+    scene_path = os.path.join(directory, 'exemple.geo.jsonl')
+    with open(scene_path, 'w', encoding='utf-8') as stream:
+        write_records(_synthetic_records(1000), stream)
+    start = time.perf_counter()
+    metadata = scene_metadata(scene_path)
+    results['metadata_ms'] = (time.perf_counter() - start) * 1000
+
+    catalog_path = os.path.join(directory, CATALOG_FILE)
+    catalog = SceneCatalog(catalog_path)
+    random.seed(1)
+    start = time.perf_counter()
+    for i in range(count):
+        catalog.add_entry(os.path.join(directory, f"classe{i % 30}", f"dessin{i}.geo.jsonl"), metadata,
+                          author=f"eleve{i % 200}", tags=[f"chapitre{i % 12}", random.choice(['aire', 'angles'])],
+                          modified=1.7e9 + i, size=1000, commit=False)
+    catalog.connection.commit()
+    results['insert_s'] = time.perf_counter() - start
+    catalog.close()
+
+    # 打开浏览器：打开数据库、查询总数和第一页、显示并完成第一次绘制
+    thumbnails = ThumbnailCache(os.path.join(directory, THUMBNAIL_DIR))
+    start = time.perf_counter()
+    catalog = SceneCatalog(catalog_path)
+    browser = LibraryBrowser(catalog, thumbnails)
+    browser.show()
+    app.processEvents()
+    results['open_ms'] = (time.perf_counter() - start) * 1000
+
+    # 滚动到底部：按页加载全部条目
+    start = time.perf_counter()
+    scrollbar = browser.view.verticalScrollBar()
+    frames = 0
+    while True:
+        scrollbar.setValue(scrollbar.maximum())
+        app.processEvents()
+        frames += 1
+        if not browser.model.canFetchMore():
+            break
+    results['scroll_frame_ms'] = (time.perf_counter() - start) * 1000 / frames
+    results['rows'] = browser.model.rowCount()
+
+    for name, kwargs in (('search_text_ms', {'text': 'dessin99'}), ('search_tag_ms', {'tag': 'chapitre3'}),
+                         ('search_author_ms', {'author': 'eleve42'})):
+        start = time.perf_counter()
+        catalog.count(**kwargs)
+        catalog.page(0, PAGE_SIZE, **kwargs)
+        results[name] = (time.perf_counter() - start) * 1000
+
+    entry = catalog.page(0, 1)[0]._replace(path=scene_path, bbox=metadata['bbox'])
+    start = time.perf_counter()
+    render_thumbnail(scene_path, metadata['bbox'])
+    results['thumbnail_ms'] = (time.perf_counter() - start) * 1000
+    thumbnails.get(entry)
+    thumbnails.pool.waitForDone()
+    app.processEvents()
+    results['thumbnail_bytes'] = thumbnails.total_bytes
+    browser.close()
+    catalog.close()
+
+    print(f"Bibliothèque de {count} scènes")
+    print(f"  indexation d'un fichier de 1000 formes: {results['metadata_ms']:.1f} ms")
+    print(f"  insertion des métadonnées: {results['insert_s']:.2f} s")
+    print(f"  ouverture du navigateur: {results['open_ms']:.0f} ms")
+    print(f"  défilement jusqu'à la fin ({results['rows']} lignes): {results['scroll_frame_ms']:.1f} ms/image")
+    print(f"  recherche titre/étiquette/auteur: {results['search_text_ms']:.1f} / "
+          f"{results['search_tag_ms']:.1f} / {results['search_author_ms']:.1f} ms")
+    print(f"  rendu d'une miniature: {results['thumbnail_ms']:.1f} ms, "
+          f"{results['thumbnail_bytes']} octets sur disque")
+    return results
+
+
+if __name__ == "__main__":
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    benchmark()
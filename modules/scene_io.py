@@ -0,0 +1,366 @@
+"""
+场景文档的保存与加载：带版本号的 JSON Lines 格式。
+
+文件第一行是文件头，之后每行一个图形记录，坐标一律使用网格坐标，
+与窗口大小无关：
+    {"format": "geometry-scene", "version": 1, "counts": {...}}
+    {"kind": "point", "x": 1.0, "y": 2.0, "color": "#E65100"}
+    {"kind": "line", "x1": 0, "y1": 0, "x2": 1, "y2": 1, "color": "#0277BD", "text": "1.4"}
+    {"kind": "shape", "type": "circle", "center": [0, 0], "radius": 1.0, "color": "#1B5E20"}
+    {"kind": "shape", "type": "triangle", "vertices": [[0, 0], [1, 0], [0, 1]], "color": "#311B92"}
+
+编码器逐个图形写出，不在内存中构建整个文档；解码器逐行解析并校验，
+全部成功后才一次替换画布内容（文件有错误时当前场景不变），最后只重建一次缓存并重绘一次。
+"""
+import json
+import math
+import os
+import time
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, Optional, Tuple
+
+FORMAT_NAME = "geometry-scene"
+FORMAT_VERSION = 1
+
+# 加载时报告进度的间隔（图形数）
+DEFAULT_BATCH_SIZE = 5000
+
+Frame = Tuple[float, float, float]  # (原点屏幕 x, 原点屏幕 y, 网格间距)
+
+_SEPARATORS = (',', ':')
+
+try:
+    import resource  # 仅用于基准测试中读取进程峰值内存（Unix）
+except ImportError:
+    resource = None
+
+
+def canvas_frame(canvas) -> Frame:
+    """画布当前的屏幕坐标系（与 Canvas.grid_to_screen 一致）"""
+    return canvas.width() // 2, canvas.height() // 2, canvas.grid_spacing
+
+
+# ----------------------------------------------------------------------
+# 编码
+# ----------------------------------------------------------------------
+
+def item_to_record(kind: str, item: Dict[str, Any], text: Optional[str], frame: Frame) -> Dict[str, Any]:
+    """把画布字典（屏幕坐标）转换为一条记录（网格坐标）"""
+    origin_x, origin_y, spacing = frame
+    if kind == 'point':
+        return {'kind': 'point', 'x': (item['x'] - origin_x) / spacing,
+                'y': (origin_y - item['y']) / spacing, 'color': item['color']}
+    if kind == 'line':
+        record = {'kind': 'line',
+                  'x1': (item['x1'] - origin_x) / spacing, 'y1': (origin_y - item['y1']) / spacing,
+                  'x2': (item['x2'] - origin_x) / spacing, 'y2': (origin_y - item['y2']) / spacing,
+                  'color': item['color']}
+        if text is not None:
+            record['text'] = text
+        return record
+    record = {'kind': 'shape', 'type': item['type'], 'color': item.get('color', '#000000')}
+    if item['type'] == 'circle':
+        center_x, center_y = item['center']
+        record['center'] = ((center_x - origin_x) / spacing, (origin_y - center_y) / spacing)
+        record['radius'] = item['radius'] / spacing
+    else:
+        record['vertices'] = [((x - origin_x) / spacing, (origin_y - y) / spacing)
+                              for x, y in item.get('vertices', [])]
+    return record
+
+
+def scene_header(**extra) -> Dict[str, Any]:
+    """文件头记录"""
+    header = {'format': FORMAT_NAME, 'version': FORMAT_VERSION}
+    header.update(extra)
+    return header
+
+
+def scene_records(canvas, frame: Optional[Frame] = None) -> Iterator[Dict[str, Any]]:
+    """逐个生成画布内容的记录（第一条为文件头）"""
+    frame = frame or canvas_frame(canvas)
+    yield scene_header(counts={
+        'points': len(canvas.points),
+        'lines': len(canvas.lines),
+        'shapes': len(canvas.shapes),
+    })
+    for point in canvas.points:
+        yield item_to_record('point', point, None, frame)
+    texts = canvas.line_texts
+    for index, line in enumerate(canvas.lines):
+        yield item_to_record('line', line, texts[index] if index < len(texts) else None, frame)
+    for shape in canvas.shapes:
+        yield item_to_record('shape', shape, None, frame)
+
+
+def write_records(records: Iterable[Dict[str, Any]], stream: IO[str]) -> int:
+    """把记录逐行写入文本流，返回写出的图形记录数（不含文件头）"""
+    dumps = json.JSONEncoder(separators=_SEPARATORS, ensure_ascii=False).encode
+    count = -1
+    for count, record in enumerate(records):
+        stream.write(dumps(record))
+        stream.write('\n')
+    return max(count, 0)
+
+
+def save_scene(canvas, path: str) -> int:
+    """保存画布到场景文件，返回保存的图形数
+
+    先写入临时文件再替换，保存中途失败不会损坏已有的文件。
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as stream:
+        count = write_records(scene_records(canvas), stream)
+    os.replace(temp_path, path)
+    return count
+
+
+# ----------------------------------------------------------------------
+# 解码
+# ----------------------------------------------------------------------
+
+def read_header(stream: IO[str]) -> Dict[str, Any]:
+    """读取并校验文件头"""
+    header_line = stream.readline()
+    if not header_line:
+        raise ValueError("Fichier de scène vide")
+    try:
+        header = json.loads(header_line)
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get('format') != FORMAT_NAME:
+        raise ValueError("Ce fichier n'est pas une scène géométrique")
+    version = header.get('version', 0)
+    if isinstance(version, bool) or not isinstance(version, int):
+        raise ValueError(f"Version de scène invalide: {version!r}")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Version de scène non prise en charge: {version}")
+    return header
+
+
+def iter_records(stream: IO[str], first_line: int = 2) -> Iterator[Dict[str, Any]]:
+    """逐行解析文件头之后的记录（每条记录必须是 JSON 对象）"""
+    loads = json.JSONDecoder().decode
+    for line_number, line in enumerate(stream, start=first_line):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError as error:
+            raise ValueError(f"Ligne {line_number} invalide: {error}") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"Ligne {line_number} invalide: un objet JSON est attendu")
+        yield record
+
+
+def read_records(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    """逐行解析场景文件，校验文件头后逐个生成图形记录"""
+    read_header(stream)
+    yield from iter_records(stream)
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"nombre attendu au lieu de {value!r}")
+    return value
+
+
+def _pair(value: Any) -> Tuple[float, float]:
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"paire de coordonnées attendue au lieu de {value!r}")
+    return _number(value[0]), _number(value[1])
+
+
+def _text(value: Any, name: str) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"{name} doit être une chaîne")
+    return value
+
+
+def record_to_item(record: Dict[str, Any], frame: Frame) -> Tuple[str, Dict[str, Any], Optional[str]]:
+    """把一条记录转换为画布字典（屏幕坐标）；记录不合法时抛出 ValueError
+
+    Returns:
+        (kind, 图形字典, 线段长度文本)
+    """
+    if not isinstance(record, dict):
+        raise ValueError("un objet JSON est attendu")
+    origin_x, origin_y, spacing = frame
+    kind = record.get('kind')
+    try:
+        if kind == 'point':
+            item = {'x': origin_x + _number(record['x']) * spacing,
+                    'y': origin_y - _number(record['y']) * spacing,
+                    'color': _text(record['color'], 'color')}
+            return kind, item, None
+        if kind == 'line':
+            text = record.get('text')
+            item = {'x1': origin_x + _number(record['x1']) * spacing,
+                    'y1': origin_y - _number(record['y1']) * spacing,
+                    'x2': origin_x + _number(record['x2']) * spacing,
+                    'y2': origin_y - _number(record['y2']) * spacing,
+                    'color': _text(record['color'], 'color')}
+            return kind, item, None if text is None else _text(text, 'text')
+        if kind == 'shape':
+            shape_type = _text(record['type'], 'type')
+            item = {'type': shape_type, 'color': _text(record.get('color', '#000000'), 'color')}
+            if shape_type == 'circle':
+                center_x, center_y = _pair(record['center'])
+                item['center'] = (origin_x + center_x * spacing, origin_y - center_y * spacing)
+                item['radius'] = _number(record['radius']) * spacing
+            else:
+                vertices = record['vertices']
+                if not isinstance(vertices, list):
+                    raise ValueError("vertices doit être une liste")
+                item['vertices'] = [(origin_x + x * spacing, origin_y - y * spacing)
+                                    for x, y in map(_pair, vertices)]
+            return kind, item, None
+    except KeyError as error:
+        raise ValueError(f"champ {error.args[0]!r} manquant ({kind})") from None
+    raise ValueError(f"Type d'élément inconnu: {kind!r}")
+
+
+def decode_records(canvas, records: Iterable[Dict[str, Any]], frame: Optional[Frame] = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE,
+                   progress: Optional[Callable[[int], None]] = None) -> Tuple[list, list, list, list]:
+    """把记录解码为画布使用的 (点, 线段, 长度文本, 形状) 列表，不修改画布
+
+    任何一条记录不合法时抛出 ValueError（注明是第几个图形）。
+
+    Args:
+        frame: 网格坐标到屏幕坐标的坐标系，默认为画布当前的坐标系
+        progress: 每解码 batch_size 个图形后以已解码数量调用
+    """
+    frame = frame or canvas_frame(canvas)
+    points, lines, texts, shapes = [], [], [], []
+    count = 0
+    for record in records:
+        try:
+            kind, item, text = record_to_item(record, frame)
+        except ValueError as error:
+            raise ValueError(f"Élément {count + 1} invalide: {error}") from None
+        if kind == 'point':
+            points.append(item)
+        elif kind == 'line':
+            lines.append(item)
+            texts.append(text if text is not None
+                         else canvas.length_text(item['x1'], item['y1'], item['x2'], item['y2']))
+        else:
+            canvas.refresh_shape_measurements(item)
+            shapes.append(item)
+        count += 1
+        if progress and count % batch_size == 0:
+            progress(count)
+    if progress and count % batch_size:
+        progress(count)
+    return points, lines, texts, shapes
+
+
+def load_scene(canvas, path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+               progress: Optional[Callable[[int], None]] = None) -> int:
+    """从场景文件加载画布内容（替换当前内容），返回加载的图形数
+
+    整个文件解码成功后才一次替换画布内容；文件有任何错误时抛出 ValueError，当前场景不变。
+
+    Args:
+        batch_size: 调用 progress 的间隔（图形数）
+        progress: 解码过程中以已解码数量调用
+    """
+    with open(path, 'r', encoding='utf-8') as stream:
+        read_header(stream)
+        points, lines, texts, shapes = decode_records(canvas, iter_records(stream), None, batch_size, progress)
+    canvas.replace_scene(points, lines, texts, shapes, source={'path': os.path.abspath(path), 'format': 'jsonl'})
+    return len(points) + len(lines) + len(shapes)
+
+
+def insert_records(canvas, records: Iterable[Dict[str, Any]], frame: Optional[Frame] = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE,
+                   progress: Optional[Callable[[int], None]] = None) -> int:
+    """把记录追加到画布（全部解码成功后才追加），最后只重建一次缓存并重绘一次，返回插入的图形数"""
+    points, lines, texts, shapes = decode_records(canvas, records, frame, batch_size, progress)
+    canvas.points.extend(points)
+    canvas.lines.extend(lines)
+    canvas.line_texts.extend(texts)
+    canvas.shapes.extend(shapes)
+    canvas.rebuild_caches()
+    canvas.update()
+    return len(points) + len(lines) + len(shapes)
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def _synthetic_records(count: int) -> Iterator[Dict[str, Any]]:
+    """生成 count 个图形记录（圆、三角形、矩形交替）"""
+    yield scene_header(counts={'shapes': count})
+    for i in range(count):
+        x, y = (i % 1000) * 0.1, (i // 1000) * 0.1
+        kind = i % 3
+        if kind == 0:
+            yield {'kind': 'shape', 'type': 'circle', 'color': '#1B5E20', 'center': (x, y), 'radius': 0.5}
+        elif kind == 1:
+            yield {'kind': 'shape', 'type': 'triangle', 'color': '#311B92',
+                   'vertices': [(x, y), (x + 1, y), (x, y + 1)]}
+        else:
+            yield {'kind': 'shape', 'type': 'rectangle', 'color': '#1A237E',
+                   'vertices': [(x, y), (x + 2, y), (x + 2, y + 1), (x, y + 1)]}
+
+
+def _peak_rss_kb() -> float:
+    """进程的峰值常驻内存（KB），不支持时返回 0"""
+    if resource is None:
+        return 0.0
+    return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def benchmark(count: int = 1_000_000, path: Optional[str] = None) -> Dict[str, float]:
+    """对 count 个图形的文件测量流式编码和解码的耗时与峰值内存增量
+
+    峰值内存取进程峰值常驻内存在编码/解码前后的增量，
+    流式编解码时该增量不随文件大小增长。
+    """
+    import tempfile
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+    frame = (512.0, 384.0, 50.0)
+    try:
+        base = _peak_rss_kb()
+        start = time.perf_counter()
+        with open(path, 'w', encoding='utf-8') as stream:
+            write_records(_synthetic_records(count), stream)
+        write_time = time.perf_counter() - start
+        write_growth = _peak_rss_kb() - base
+
+        base = _peak_rss_kb()
+        start = time.perf_counter()
+        decoded = 0
+        with open(path, 'r', encoding='utf-8') as stream:
+            for record in read_records(stream):
+                record_to_item(record, frame)
+                decoded += 1
+        read_time = time.perf_counter() - start
+        read_growth = _peak_rss_kb() - base
+
+        size = os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+    results = {
+        'shapes': decoded,
+        'file_mb': size / 1e6,
+        'write_s': write_time,
+        'read_s': read_time,
+        'write_peak_growth_kb': write_growth,
+        'read_peak_growth_kb': read_growth,
+    }
+    print(f"{decoded} formes, fichier {results['file_mb']:.1f} Mo")
+    print(f"  écriture: {write_time:.2f} s ({decoded / write_time:,.0f} formes/s), "
+          f"hausse du pic mémoire {write_growth:.0f} Ko")
+    print(f"  lecture:  {read_time:.2f} s ({decoded / read_time:,.0f} formes/s), "
+          f"hausse du pic mémoire {read_growth:.0f} Ko")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
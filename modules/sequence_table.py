@@ -0,0 +1,270 @@
+"""
+计算器的表格（数列）模式：对变量取一段整数范围，列出表达式的值，例如乘法表 7*n。
+
+- 表达式只编译一次；安装了 NumPy 时一次数组运算算出整列结果
+- 没有 NumPy 时不预先计算，表格显示到哪一行才逐行求值（结果按页缓存）
+- 模型只保存范围和结果数组，单元格文本在绘制时才生成；视图用固定行高的表格，
+  一百万行也只处理可见的几十行
+"""
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import (QAbstractItemView, QHBoxLayout, QHeaderView, QLabel, QLineEdit,
+                             QSpinBox, QTableView, QVBoxLayout, QWidget)
+
+from modules.expression import ExpressionError, compile_expression, np
+from modules.numeric import FLOAT
+from modules.ui_components_pyqt import MetroButton
+
+DEFAULT_VARIABLE = 'n'
+MAX_ROWS = 10_000_000
+
+# 无 NumPy 时逐行求值的缓存页大小
+_PAGE_SIZE = 256
+
+
+def format_value(value) -> str:
+    """格式化一个结果；无法计算（除以零、定义域外）时显示破折号"""
+    if value is None or not math.isfinite(value):
+        return "—"
+    if abs(value) >= 1e15:
+        return f"{value:.6g}"
+    return FLOAT.format(float(value))
+
+
+def sequence_variable(expression) -> str:
+    """表达式中的变量名（没有变量时为 n），多于一个变量时报错"""
+    if len(expression.variables) > 1:
+        raise ExpressionError(f"Une seule variable est permise ({', '.join(expression.variables)})")
+    return expression.variables[0] if expression.variables else DEFAULT_VARIABLE
+
+
+class SequenceModel(QAbstractTableModel):
+    """两列的表格模型：变量值和表达式的值"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.expression = None
+        self.variable = DEFAULT_VARIABLE
+        self.start = 0
+        self.step = 1
+        self.count = 0
+        self.values = None  # NumPy 结果数组（向量化时）
+        self._pages: Dict[int, List[Optional[float]]] = {}
+
+    def set_sequence(self, source: str, start: int, stop: int, step: int = 1, vectorized: bool = True):
+        """设置表达式和范围 [start, stop]（包含两端）；表达式无效时抛出 ExpressionError"""
+        if step == 0:
+            raise ValueError("Le pas ne peut pas être nul")
+        count = max(0, (stop - start) // step + 1)
+        if count > MAX_ROWS:
+            raise ValueError(f"Trop de lignes (maximum {MAX_ROWS})")
+        expression = compile_expression(source)
+        variable = sequence_variable(expression)
+        values = None
+        if vectorized and np is not None:
+            # 整数数组的乘法会静默溢出，变量先转为 float64
+            column = np.arange(count, dtype=np.float64) * step + start
+            values = expression.vector({variable: column})
+        self.beginResetModel()
+        self.expression = expression
+        self.variable = variable
+        self.start, self.step, self.count = start, step, count
+        self.values = values
+        self._pages = {}
+        self.endResetModel()
+
+    def value(self, row: int) -> Optional[float]:
+        """第 row 行的结果"""
+        if self.values is not None:
+            return float(self.values[row])
+        page = self._pages.get(row // _PAGE_SIZE)
+        if page is None:
+            page = self._pages[row // _PAGE_SIZE] = self._evaluate_page(row // _PAGE_SIZE)
+        return page[row % _PAGE_SIZE]
+
+    def _evaluate_page(self, page_index: int) -> List[Optional[float]]:
+        results = []
+        first = page_index * _PAGE_SIZE
+        env = {}
+        for row in range(first, min(first + _PAGE_SIZE, self.count)):
+            env[self.variable] = self.start + row * self.step
+            try:
+                results.append(float(self.expression(env)))
+            except (ArithmeticError, ValueError, TypeError):
+                results.append(None)
+        return results
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            row = index.row()
+            if index.column() == 0:
+                return str(self.start + row * self.step)
+            return format_value(self.value(row))
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or orientation != Qt.Orientation.Horizontal:
+            return None
+        if section == 0:
+            return self.variable
+        return self.expression.source if self.expression is not None else "Valeur"
+
+
+class SequenceTableView(QTableView):
+    """固定行高的结果表格（不计算每一行的尺寸）"""
+
+    ROW_HEIGHT = 28
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.verticalHeader().hide()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.ROW_HEIGHT)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        self.setWordWrap(False)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+
+
+class SequencePanel(QWidget):
+    """表格模式面板：表达式、范围和结果表格"""
+
+    error = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+
+        self.expression_edit = QLineEdit("7*n")
+        self.expression_edit.setFont(QFont("Arial", 14))
+        self.expression_edit.setPlaceholderText("Expression en n, par exemple 3*n+1")
+        self.expression_edit.returnPressed.connect(self.compute)
+        layout.addWidget(self.expression_edit)
+
+        range_layout = QHBoxLayout()
+        self.start_spin = self._spin_box(1)
+        self.stop_spin = self._spin_box(10)
+        self.step_spin = self._spin_box(1)
+        for text, spin in (("de", self.start_spin), ("à", self.stop_spin), ("pas", self.step_spin)):
+            label = QLabel(text)
+            label.setFont(QFont("Arial", 12))
+            range_layout.addWidget(label)
+            range_layout.addWidget(spin)
+        layout.addLayout(range_layout)
+
+        compute_button = MetroButton("Calculer le tableau", "#1B5E20", "#FFFFFF")
+        compute_button.setMinimumHeight(40)
+        compute_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
+        compute_button.clicked.connect(self.compute)
+        layout.addWidget(compute_button)
+
+        self.status_label = QLabel()
+        self.status_label.setFont(QFont("Arial", 10))
+        layout.addWidget(self.status_label)
+
+        self.model = SequenceModel(self)
+        self.table = SequenceTableView()
+        self.table.setFont(QFont("Arial", 12))
+        self.table.setModel(self.model)
+        layout.addWidget(self.table)
+
+    @staticmethod
+    def _spin_box(value: int) -> QSpinBox:
+        spin = QSpinBox()
+        spin.setFont(QFont("Arial", 12))
+        spin.setRange(-MAX_ROWS, MAX_ROWS)
+        spin.setValue(value)
+        return spin
+
+    def compute(self):
+        """计算并显示表格"""
+        start = time.perf_counter()
+        try:
+            self.model.set_sequence(self.expression_edit.text(), self.start_spin.value(),
+                                    self.stop_spin.value(), self.step_spin.value())
+        except (ArithmeticError, ValueError) as error:
+            self.status_label.setText(f"Erreur: {error}")
+            self.error.emit(str(error))
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        mode = "vectorisé" if self.model.values is not None else "ligne par ligne"
+        self.status_label.setText(f"{self.model.count} lignes ({mode}, {elapsed:.0f} ms)")
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(rows: int = 1_000_000, source: str = "3*n^2 + 7*n - sqrt(n)/2") -> Dict[str, Any]:
+    """比较 NumPy 整列求值和逐行求值，并测量一百万行表格的显示与滚动"""
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    results: Dict[str, Any] = {}
+    expression = compile_expression(source)
+
+    start = time.perf_counter()
+    env = {}
+    for n in range(1, 100_001):
+        env['n'] = n
+        expression(env)
+    results['python_us'] = (time.perf_counter() - start) / 100_000 * 1e6
+
+    view = SequenceTableView()
+    model = SequenceModel()
+    view.setModel(model)
+    view.resize(400, 600)
+    view.show()
+    app.processEvents()
+    for vectorized in (True, False):
+        if vectorized and np is None:
+            continue
+        key = 'numpy' if vectorized else 'lazy'
+        start = time.perf_counter()
+        model.set_sequence(source, 1, rows, 1, vectorized=vectorized)
+        app.processEvents()
+        results[f'{key}_open_ms'] = (time.perf_counter() - start) * 1000
+        scrollbar = view.verticalScrollBar()
+        worst = 0.0
+        for i in range(1, 101):
+            frame_start = time.perf_counter()
+            scrollbar.setValue(scrollbar.maximum() * i // 100)
+            app.processEvents()
+            worst = max(worst, time.perf_counter() - frame_start)
+        results[f'{key}_worst_ms'] = worst * 1000
+        scrollbar.setValue(0)
+    view.close()
+
+    print(f"Tableau de {rows} lignes: {source}")
+    print(f"  évaluation ligne par ligne: {results['python_us']:.2f} µs/ligne "
+          f"(≈ {results['python_us'] * rows / 1e6:.1f} s pour tout le tableau)")
+    if 'numpy_open_ms' in results:
+        print(f"  NumPy (tout le tableau): affichage en {results['numpy_open_ms']:.0f} ms, "
+              f"pire image en défilant {results['numpy_worst_ms']:.1f} ms")
+    else:
+        print("  NumPy non installé")
+    print(f"  sans NumPy (lignes visibles seulement): affichage en {results['lazy_open_ms']:.0f} ms, "
+          f"pire image en défilant {results['lazy_worst_ms']:.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    import os
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    benchmark()
@@ -81,18 +81,14 @@ class CircleHandler(ShapeHandler):
         screen_radius = radius * self.canvas.grid_spacing
         
         # 添加圆心作为一个点
-        self.canvas.points.append({
-            'x': screen_x,
-            'y': screen_y,
-            'color': self.color
-        })
+        self.canvas.add_point(screen_x, screen_y, self.color)
         
         # 计算圆的周长和面积
         circumference = 2 * math.pi * screen_radius
         area = math.pi * (screen_radius ** 2)
         
         # 存储到形状属性中
-        self.canvas.shapes.append({
+        self.canvas.add_shape({
             'type': 'circle',
             'center': (screen_x, screen_y),
             'radius': screen_radius,
@@ -129,7 +125,7 @@ class CircleHandler(ShapeHandler):
             self.canvas.current_shape = "circle"
             self.canvas.temp_shape = None
             # 添加圆心点
-            self.canvas.points.append({'x': screen_x, 'y': screen_y, 'color': self.color})
+            self.canvas.add_point(screen_x, screen_y, self.color)
             self.canvas.update()
         else:
             # 完成圆形绘制
@@ -191,7 +187,7 @@ class CircleHandler(ShapeHandler):
         circumference = 2 * math.pi * real_radius
         area = math.pi * (real_radius ** 2)
         
-        self.canvas.shapes.append({
+        self.canvas.add_shape({
             'type': 'circle',
             'center': (center_x, center_y),
             'radius': radius,
@@ -123,23 +123,16 @@ class LineHandler(ShapeHandler):
         screen_x2, screen_y2 = self.canvas.grid_to_screen(x2, y2)
         
         # 添加起点和终点
-        self.canvas.points.append({'x': screen_x1, 'y': screen_y1, 'color': "#0277BD"})
-        self.canvas.points.append({'x': screen_x2, 'y': screen_y2, 'color': "#0277BD"})
+        self.canvas.add_point(screen_x1, screen_y1, "#0277BD")
+        self.canvas.add_point(screen_x2, screen_y2, "#0277BD")
         
         # 计算线段长度
         length = math.sqrt((screen_x2 - screen_x1) ** 2 + (screen_y2 - screen_y1) ** 2)
         real_length = length / self.canvas.grid_spacing
         length_text = f"{real_length:.1f}"
         
-        # 添加线段
-        self.canvas.lines.append({
-            'x1': screen_x1, 'y1': screen_y1,
-            'x2': screen_x2, 'y2': screen_y2,
-            'color': "#0277BD"
-        })
-        
-        # 添加长度文本
-        self.canvas.line_texts.append(length_text)
+        # 添加线段及长度文本
+        self.canvas.add_line(screen_x1, screen_y1, screen_x2, screen_y2, "#0277BD", length_text)
         
         # 清除临时端点
         if hasattr(self.canvas, 'temp_endpoints'):
@@ -198,11 +191,7 @@ class LineHandler(ShapeHandler):
             self.canvas.current_shape = "line"
             
             # 添加起点
-            self.canvas.points.append({
-                'x': screen_x,
-                'y': screen_y,
-                'color': self.color
-            })
+            self.canvas.add_point(screen_x, screen_y, self.color)
             self.canvas.update()
         else:
             # 完成线段绘制
@@ -259,25 +248,14 @@ class LineHandler(ShapeHandler):
             return
         
         # 添加终点
-        self.canvas.points.append({
-            'x': screen_x,
-            'y': screen_y,
-            'color': self.color
-        })
+        self.canvas.add_point(screen_x, screen_y, self.color)
         
         # 计算长度
         length = math.sqrt((screen_x - x1)**2 + (screen_y - y1)**2)
         real_length = length / self.canvas.grid_spacing
         
-        # 添加线段
-        self.canvas.lines.append({
-            'x1': x1, 'y1': y1,
-            'x2': screen_x, 'y2': screen_y,
-            'color': self.color
-        })
-        
-        # 添加长度文本
-        self.canvas.line_texts.append(f"{real_length:.1f}")
+        # 添加线段及长度文本
+        self.canvas.add_line(x1, y1, screen_x, screen_y, self.color, f"{real_length:.1f}")
         
         # 发送线段创建信号
         grid_x1, grid_y1 = self.canvas.screen_to_grid(x1, y1)
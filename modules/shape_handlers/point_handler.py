@@ -70,11 +70,7 @@ class PointHandler(ShapeHandler):
         screen_x, screen_y = self.canvas.grid_to_screen(x, y)
         
         # 添加点
-        self.canvas.points.append({
-            'x': screen_x,
-            'y': screen_y,
-            'color': self.color
-        })
+        self.canvas.add_point(screen_x, screen_y, self.color)
         
         # 清除临时点
         self.canvas.temp_point = None
@@ -92,11 +88,7 @@ class PointHandler(ShapeHandler):
         screen_x, screen_y = self.canvas.grid_to_screen(x, y)
         
         # 添加点
-        self.canvas.points.append({
-            'x': screen_x,
-            'y': screen_y,
-            'color': self.color
-        })
+        self.canvas.add_point(screen_x, screen_y, self.color)
         
         # 更新画布
         self.canvas.update()
@@ -88,30 +88,24 @@ class RectangleHandler(ShapeHandler):
         x3, y3 = screen_x + screen_w, screen_y + screen_h  # 右下角
         x4, y4 = screen_x, screen_y + screen_h  # 左下角
         
-        # 添加四个顶点
-        self.canvas.points.append({'x': x1, 'y': y1, 'color': self.color})
-        self.canvas.points.append({'x': x2, 'y': y2, 'color': self.color})
-        self.canvas.points.append({'x': x3, 'y': y3, 'color': self.color})
-        self.canvas.points.append({'x': x4, 'y': y4, 'color': self.color})
+        # 添加四个顶点（与已有的重合点焊接）
+        self.canvas.add_point(x1, y1, self.color)
+        self.canvas.add_point(x2, y2, self.color)
+        self.canvas.add_point(x3, y3, self.color)
+        self.canvas.add_point(x4, y4, self.color)
         
-        # 添加四条边
-        self.canvas.lines.append({'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2, 'color': self.color})
-        self.canvas.lines.append({'x1': x2, 'y1': y2, 'x2': x3, 'y2': y3, 'color': self.color})
-        self.canvas.lines.append({'x1': x3, 'y1': y3, 'x2': x4, 'y2': y4, 'color': self.color})
-        self.canvas.lines.append({'x1': x4, 'y1': y4, 'x2': x1, 'y2': y1, 'color': self.color})
-        
-        # 添加边长文本
-        self.canvas.line_texts.append(f"{width:.1f}")
-        self.canvas.line_texts.append(f"{height:.1f}")
-        self.canvas.line_texts.append(f"{width:.1f}")
-        self.canvas.line_texts.append(f"{height:.1f}")
+        # 添加四条边及边长文本
+        self.canvas.add_line(x1, y1, x2, y2, self.color, f"{width:.1f}")
+        self.canvas.add_line(x2, y2, x3, y3, self.color, f"{height:.1f}")
+        self.canvas.add_line(x3, y3, x4, y4, self.color, f"{width:.1f}")
+        self.canvas.add_line(x4, y4, x1, y1, self.color, f"{height:.1f}")
         
         # 计算面积和周长
         area = width * height
         perimeter = 2 * (width + height)
         
         # 添加形状信息
-        self.canvas.shapes.append({
+        self.canvas.add_shape({
             'type': 'rectangle',
             'vertices': [(x1, y1), (x2, y2), (x3, y3), (x4, y4)],
             'width': screen_w,
@@ -149,8 +143,8 @@ class RectangleHandler(ShapeHandler):
             self.canvas.line_start_point = self.start_point
             self.canvas.current_shape = "rectangle"
             self.canvas.temp_shape = None
-            # 只在起点添加一个点，用于预览
-            self.canvas.points.append({'x': screen_x, 'y': screen_y, 'color': self.color})
+            # 只在起点添加一个点，用于预览（完成时与对应的顶点焊接）
+            self.canvas.add_point(screen_x, screen_y, self.color)
             self.canvas.update()
         else:
             # 完成矩形绘制
@@ -218,41 +212,28 @@ class RectangleHandler(ShapeHandler):
             (min_x, max_y)   # 左下
         ]
         
-        # 移除原来的起点，添加四个顶点
-        if self.canvas.points and self.canvas.points[-1]['x'] == x1 and self.canvas.points[-1]['y'] == y1:
-            self.canvas.points.pop()
-        
+        # 添加四个顶点（起点本身就是其中一个角，会被焊接而不是重复添加）
         for vx, vy in vertices:
-            self.canvas.points.append({'x': vx, 'y': vy, 'color': self.color})
-        
-        # 添加四条边
-        for i in range(4):
-            x1_line, y1_line = vertices[i]
-            x2_line, y2_line = vertices[(i + 1) % 4]
-            self.canvas.lines.append({
-                'x1': x1_line, 'y1': y1_line, 
-                'x2': x2_line, 'y2': y2_line, 
-                'color': self.color
-            })
+            self.canvas.add_point(vx, vy, self.color)
         
         # 计算长宽
         grid_spacing = self.canvas.grid_spacing
         real_width = (max_x - min_x) / grid_spacing
         real_height = (max_y - min_y) / grid_spacing
         
-        # 添加边长文本
-        self.canvas.line_texts.extend([
-            f"{real_width:.1f}",   # 上边
-            f"{real_height:.1f}",  # 右边
-            f"{real_width:.1f}",   # 下边
-            f"{real_height:.1f}"   # 左边
-        ])
+        # 添加四条边及边长文本（上、右、下、左）
+        side_texts = [f"{real_width:.1f}", f"{real_height:.1f}",
+                      f"{real_width:.1f}", f"{real_height:.1f}"]
+        for i in range(4):
+            x1_line, y1_line = vertices[i]
+            x2_line, y2_line = vertices[(i + 1) % 4]
+            self.canvas.add_line(x1_line, y1_line, x2_line, y2_line, self.color, side_texts[i])
         
         # 计算面积和周长
         area = real_width * real_height
         perimeter = 2 * (real_width + real_height)
         
-        self.canvas.shapes.append({
+        self.canvas.add_shape({
             'type': 'rectangle',
             'vertices': vertices,
             'width': max_x - min_x,
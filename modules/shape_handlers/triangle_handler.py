@@ -7,6 +7,10 @@ import math
 from modules.canvas import Canvas
 from modules.shape_handlers import ShapeHandler
 from modules.shapes import ShapeType
+from modules.triangle_analysis import analyze_triangle
+
+# 预览时的分类容差（鼠标绘制难以精确对齐）
+PREVIEW_TOLERANCE = 0.01
 
 class TriangleHandler(ShapeHandler):
     """处理三角形的创建和交互"""
@@ -108,9 +112,9 @@ class TriangleHandler(ShapeHandler):
         screen_x3, screen_y3 = self.canvas.grid_to_screen(x3, y3)
         
         # 添加三个顶点
-        self.canvas.points.append({'x': screen_x1, 'y': screen_y1, 'color': self.color})
-        self.canvas.points.append({'x': screen_x2, 'y': screen_y2, 'color': self.color})
-        self.canvas.points.append({'x': screen_x3, 'y': screen_y3, 'color': self.color})
+        self.canvas.add_point(screen_x1, screen_y1, self.color)
+        self.canvas.add_point(screen_x2, screen_y2, self.color)
+        self.canvas.add_point(screen_x3, screen_y3, self.color)
         
         # 计算三条边的长度
         side1 = math.sqrt((screen_x2 - screen_x1)**2 + (screen_y2 - screen_y1)**2)
@@ -123,15 +127,10 @@ class TriangleHandler(ShapeHandler):
         real_side2 = side2 / grid_spacing
         real_side3 = side3 / grid_spacing
         
-        # 添加三条边
-        self.canvas.lines.append({'x1': screen_x1, 'y1': screen_y1, 'x2': screen_x2, 'y2': screen_y2, 'color': self.color})
-        self.canvas.lines.append({'x1': screen_x2, 'y1': screen_y2, 'x2': screen_x3, 'y2': screen_y3, 'color': self.color})
-        self.canvas.lines.append({'x1': screen_x3, 'y1': screen_y3, 'x2': screen_x1, 'y2': screen_y1, 'color': self.color})
-        
-        # 添加边长文本
-        self.canvas.line_texts.append(f"{real_side1:.1f}")
-        self.canvas.line_texts.append(f"{real_side2:.1f}")
-        self.canvas.line_texts.append(f"{real_side3:.1f}")
+        # 添加三条边及边长文本
+        self.canvas.add_line(screen_x1, screen_y1, screen_x2, screen_y2, self.color, f"{real_side1:.1f}")
+        self.canvas.add_line(screen_x2, screen_y2, screen_x3, screen_y3, self.color, f"{real_side2:.1f}")
+        self.canvas.add_line(screen_x3, screen_y3, screen_x1, screen_y1, self.color, f"{real_side3:.1f}")
         
         # 计算三角形周长
         perimeter = side1 + side2 + side3
@@ -143,7 +142,7 @@ class TriangleHandler(ShapeHandler):
         real_area = area / (grid_spacing ** 2)
         
         # 存储到形状属性中
-        self.canvas.shapes.append({
+        self.canvas.add_shape({
             'type': 'triangle',
             'vertices': [(screen_x1, screen_y1), (screen_x2, screen_y2), (screen_x3, screen_y3)],
             'sides': [side1, side2, side3],
@@ -185,7 +184,7 @@ class TriangleHandler(ShapeHandler):
             self.canvas.current_shape = "triangle"  # 确保设置正确的形状类型
             self.canvas.triangle_points = []
             self.canvas.temp_shape = None
-            self.canvas.points.append({'x': screen_x, 'y': screen_y, 'color': self.color})
+            self.canvas.add_point(screen_x, screen_y, self.color)
             self.canvas.update()
             
         elif len(self.vertices) == 1:
@@ -193,50 +192,31 @@ class TriangleHandler(ShapeHandler):
             self.vertices.append((screen_x, screen_y))
             self.canvas.triangle_points = [(screen_x, screen_y)]
             self.canvas.temp_shape = None
-            self.canvas.points.append({'x': screen_x, 'y': screen_y, 'color': self.color})
+            self.canvas.add_point(screen_x, screen_y, self.color)
             
-            # 创建第一条边
+            # 创建第一条边并添加长度文本
             x1, y1 = self.vertices[0]
-            self.canvas.lines.append({
-                'x1': x1, 'y1': y1, 
-                'x2': screen_x, 'y2': screen_y, 
-                'color': self.color
-            })
-            
-            # 计算并添加第一条边的长度
             side_length = math.sqrt((screen_x - x1)**2 + (screen_y - y1)**2) / self.canvas.grid_spacing
-            self.canvas.line_texts.append(f"{side_length:.1f}")
+            self.canvas.add_line(x1, y1, screen_x, screen_y, self.color, f"{side_length:.1f}")
             
             self.canvas.update()
             
         elif len(self.vertices) == 2:
             # 第三个点，完成三角形
             self.vertices.append((screen_x, screen_y))
-            self.canvas.points.append({'x': screen_x, 'y': screen_y, 'color': self.color})
+            self.canvas.add_point(screen_x, screen_y, self.color)
             
             x1, y1 = self.vertices[0]
             x2, y2 = self.vertices[1]
             x3, y3 = screen_x, screen_y
             
-            # 添加剩余两条边
-            self.canvas.lines.append({
-                'x1': x2, 'y1': y2, 
-                'x2': x3, 'y2': y3, 
-                'color': self.color
-            })
-            self.canvas.lines.append({
-                'x1': x3, 'y1': y3, 
-                'x2': x1, 'y2': y1, 
-                'color': self.color
-            })
-            
             # 计算边长
             side2 = math.sqrt((x3 - x2)**2 + (y3 - y2)**2) / self.canvas.grid_spacing
             side3 = math.sqrt((x1 - x3)**2 + (y1 - y3)**2) / self.canvas.grid_spacing
             
-            # 添加边长文本
-            self.canvas.line_texts.append(f"{side2:.1f}")
-            self.canvas.line_texts.append(f"{side3:.1f}")
+            # 添加剩余两条边及边长文本
+            self.canvas.add_line(x2, y2, x3, y3, self.color, f"{side2:.1f}")
+            self.canvas.add_line(x3, y3, x1, y1, self.color, f"{side3:.1f}")
             
             # 计算所有边长（用于面积计算）
             side1 = math.sqrt((x2 - x1)**2 + (y2 - y1)**2) / self.canvas.grid_spacing
@@ -246,7 +226,7 @@ class TriangleHandler(ShapeHandler):
             s = perimeter / 2
             area = math.sqrt(s * (s - side1) * (s - side2) * (s - side3))
             
-            self.canvas.shapes.append({
+            self.canvas.add_shape({
                 'type': 'triangle',
                 'vertices': [(x1, y1), (x2, y2), (x3, y3)],
                 'sides': [side1 * self.canvas.grid_spacing, side2 * self.canvas.grid_spacing, side3 * self.canvas.grid_spacing],
@@ -322,24 +302,23 @@ class TriangleHandler(ShapeHandler):
                 grid_x1, grid_y1 = self.canvas.screen_to_grid(x1, y1)
                 grid_x2, grid_y2 = self.canvas.screen_to_grid(x2, y2)
                 
-                # 计算三条边的长度
-                side1 = math.sqrt((grid_x2 - grid_x1)**2 + (grid_y2 - grid_y1)**2)
-                side2 = math.sqrt((x - grid_x2)**2 + (y - grid_y2)**2)
-                side3 = math.sqrt((grid_x1 - x)**2 + (grid_y1 - y)**2)
-                
-                # 计算面积（使用海伦公式）
-                s = (side1 + side2 + side3) / 2
-                area = 0
-                if s > side1 and s > side2 and s > side3:
-                    area = math.sqrt(s * (s - side1) * (s - side2) * (s - side3))
+                # 一次性计算边长、面积、角度和分类
+                analysis = analyze_triangle(
+                    ((grid_x1, grid_y1), (grid_x2, grid_y2), (x, y)),
+                    PREVIEW_TOLERANCE
+                )
+                side_bc, side_ca, side_ab = analysis.sides
                 
                 preview_data = {
                     'type': 'triangle_preview',
                     'x1': grid_x1, 'y1': grid_y1,
                     'x2': grid_x2, 'y2': grid_y2,
                     'x3': x, 'y3': y,
-                    'sides': [side1, side2, side3],
-                    'area': area
+                    'sides': [side_ab, side_bc, side_ca],
+                    'area': analysis.area,
+                    'angles': list(analysis.angles),
+                    'angle_type': analysis.angle_type,
+                    'side_type': analysis.side_type
                 }
                 self.canvas.shape_preview.emit(preview_data)
         
@@ -0,0 +1,344 @@
+"""
+场景快照：用持久化向量保存画布内容的各个版本，供教师回看学生的每一步。
+
+当前场景以四个 PVector（点、线段、长度文本、形状）表示，按 Canvas.scene_edited
+的增量更新；拍快照只是记录这四个根（O(1)），每个版本的内存开销与该步修改的
+图形数成正比。比较两个版本时共享的子树直接跳过，恢复时交换当前根并把该版本
+写回画布。
+
+自动快照的数量有上限（MAX_VERSIONS），超出时丢弃最早的快照。HistoryBrowser 列出各个
+快照，用于比较和恢复。
+"""
+import time
+import tracemalloc
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import (QAbstractItemView, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+                             QPushButton, QVBoxLayout, QWidget)
+
+from modules.persistent import EMPTY, PVector
+from modules.transformations import copy_item
+
+# 基准测试的内存预算（字节）
+BENCHMARK_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# 保留的快照数：基准测试中 10000 个快照在内存预算之内
+MAX_VERSIONS = 10_000
+
+
+class SceneVersion(NamedTuple):
+    """场景的一个不可变版本"""
+    points: PVector
+    lines: PVector
+    texts: PVector
+    shapes: PVector
+    label: str = ""
+    created: float = 0.0
+
+
+EMPTY_VERSION = SceneVersion(EMPTY, EMPTY, EMPTY, EMPTY)
+
+
+class VersionedScene:
+    """版本化的场景（不依赖画布），保存的图形字典都是副本"""
+
+    def __init__(self):
+        self.current = EMPTY_VERSION
+        self.versions: List[SceneVersion] = []
+
+    def load(self, points, lines, line_texts, shapes):
+        """用完整的场景内容重建当前版本（O(n)，只在加载文件时使用）"""
+        self.current = SceneVersion(
+            PVector.from_iterable(copy_item(item) for item in points),
+            PVector.from_iterable(copy_item(item) for item in lines),
+            PVector.from_iterable(line_texts),
+            PVector.from_iterable(copy_item(item) for item in shapes))
+
+    def apply_edit(self, edit: Dict[str, Any]):
+        """按 Canvas.scene_edited 的编辑更新当前版本"""
+        op = edit['op']
+        points, lines, texts, shapes = self.current[:4]
+        if op in ('add', 'set'):
+            for kind, index, item, text in edit['items']:
+                item = copy_item(item)
+                if kind == 'point':
+                    points = _put(points, index, item)
+                elif kind == 'line':
+                    lines = _put(lines, index, item)
+                    texts = _put(texts, index, text)
+                else:
+                    shapes = _put(shapes, index, item)
+        elif op == 'remove':
+            for kind, index, _, _ in sorted(edit['items'], key=lambda state: state[1], reverse=True):
+                if kind == 'point':
+                    points = _delete(points, index)
+                elif kind == 'line':
+                    lines = _delete(lines, index)
+                    texts = _delete(texts, index)
+                else:
+                    shapes = _delete(shapes, index)
+        elif op == 'clear':
+            points = lines = texts = shapes = EMPTY
+        else:
+            return
+        self.current = SceneVersion(points, lines, texts, shapes)
+
+    def snapshot(self, label: str = "") -> int:
+        """保存当前版本（O(1)），返回快照编号"""
+        self.versions.append(self.current._replace(label=label, created=time.time()))
+        return len(self.versions) - 1
+
+    def materialize(self, version: SceneVersion) -> Tuple[list, list, list, list]:
+        """把版本展开为画布使用的列表（图形字典为新副本）"""
+        return ([copy_item(item) for item in version.points],
+                [copy_item(item) for item in version.lines],
+                list(version.texts),
+                [copy_item(item) for item in version.shapes])
+
+    def diff(self, first: int, second: int) -> Dict[str, List[int]]:
+        """两个快照之间有变化的图形下标"""
+        a, b = self.versions[first], self.versions[second]
+        return {
+            'points': b.points.changed_indices(a.points),
+            'lines': b.lines.changed_indices(a.lines),
+            'shapes': b.shapes.changed_indices(a.shapes),
+        }
+
+
+def _put(vector: PVector, index: int, value: Any) -> PVector:
+    if index == len(vector):
+        return vector.append(value)
+    return vector.set(index, value)
+
+
+def _delete(vector: PVector, index: int) -> PVector:
+    if index == len(vector) - 1:
+        return vector.pop()
+    items = vector.to_list()  # 删除中间的图形：重建（与画布的非末尾删除一样是 O(n)）
+    del items[index]
+    return PVector.from_iterable(items)
+
+
+class SnapshotStore(VersionedScene):
+    """跟随画布编辑的快照存储
+
+    Args:
+        canvas: 画布
+        auto: True 时每一步操作（同一次事件循环中的编辑）之后自动拍快照
+        max_versions: 保留的快照数，超出时丢弃最早的快照（None 表示不限）
+    """
+
+    def __init__(self, canvas, auto: bool = False, max_versions: Optional[int] = MAX_VERSIONS):
+        super().__init__()
+        self.canvas = canvas
+        self.auto = auto
+        self.max_versions = max_versions
+        self.pruned = 0  # 已丢弃的快照数（界面上的步骤编号从 pruned + 1 开始）
+        self._restoring = False
+        self._snapshot_pending = False
+        self.reload()
+        canvas.scene_edited.connect(self._on_edit)
+
+    def reload(self):
+        """从画布重新读取当前场景"""
+        canvas = self.canvas
+        self.load(canvas.points, canvas.lines, canvas.line_texts, canvas.shapes)
+
+    def _on_edit(self, edit: Dict[str, Any]):
+        if self._restoring:
+            return
+        if edit['op'] == 'load':
+            self.reload()
+        else:
+            self.apply_edit(edit)
+        if self.auto and not self._snapshot_pending:
+            self._snapshot_pending = True
+            QTimer.singleShot(0, self._auto_snapshot)
+
+    def _auto_snapshot(self):
+        self._snapshot_pending = False
+        self.snapshot()
+
+    def snapshot(self, label: str = "") -> int:
+        """保存当前版本，超出上限时丢弃最早的快照，返回快照编号"""
+        index = super().snapshot(label)
+        if self.max_versions is not None and len(self.versions) > self.max_versions:
+            excess = len(self.versions) - self.max_versions
+            del self.versions[:excess]
+            self.pruned += excess
+            index -= excess
+        return index
+
+    def restore(self, index: int):
+        """恢复到指定快照：交换当前根并把内容写回画布
+
+        写回画布是一次普通的编辑（可以撤销）；自动快照时恢复后的场景也记为新的一步。
+        """
+        version = self.versions[index]
+        self._restoring = True
+        try:
+            self.canvas.replace_scene(*self.materialize(version))
+        finally:
+            self._restoring = False
+        self.current = version._replace(label="")
+        if self.auto:
+            self.snapshot(f"Retour à l'étape {self.pruned + index + 1}")
+
+
+class HistoryBrowser(QWidget):
+    """快照浏览器：列出每一步，比较两个快照（或一个快照与上一步），恢复选中的快照"""
+
+    def __init__(self, store: SnapshotStore, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Historique des étapes")
+        self.store = store
+        self._refresh_pending = False
+
+        layout = QVBoxLayout(self)
+        self.list = QListWidget()
+        self.list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.list.itemSelectionChanged.connect(self._update_buttons)
+        self.list.itemDoubleClicked.connect(lambda item: self.restore_selected())
+        layout.addWidget(self.list)
+
+        self.summary = QLabel("Sélectionnez une étape, ou deux étapes à comparer.")
+        self.summary.setWordWrap(True)
+        layout.addWidget(self.summary)
+
+        buttons = QHBoxLayout()
+        self.compare_button = QPushButton("Comparer")
+        self.compare_button.clicked.connect(self.compare_selected)
+        buttons.addWidget(self.compare_button)
+        self.restore_button = QPushButton("Restaurer")
+        self.restore_button.clicked.connect(self.restore_selected)
+        buttons.addWidget(self.restore_button)
+        layout.addLayout(buttons)
+
+        # 自动快照在编辑之后的下一轮事件循环中拍摄，列表在它之后刷新
+        store.canvas.scene_edited.connect(self._schedule_refresh)
+        self.resize(560, 520)
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def _schedule_refresh(self, edit):
+        if self.isVisible() and not self._refresh_pending:
+            self._refresh_pending = True
+            QTimer.singleShot(0, self.refresh)
+
+    def refresh(self):
+        """按存储中的快照重建列表（最新的一步在最上面）"""
+        self._refresh_pending = False
+        store = self.store
+        self.list.clear()
+        for index in range(len(store.versions) - 1, -1, -1):
+            version = store.versions[index]
+            text = (f"Étape {store.pruned + index + 1} — {time.strftime('%H:%M:%S', time.localtime(version.created))}"
+                    f" — {len(version.shapes)} formes, {len(version.lines)} segments, {len(version.points)} points")
+            if version.label:
+                text += f" ({version.label})"
+            item = QListWidgetItem(text)
+            item.setData(Qt.ItemDataRole.UserRole, index)
+            self.list.addItem(item)
+        self._update_buttons()
+
+    def _selected_indices(self) -> List[int]:
+        return sorted(item.data(Qt.ItemDataRole.UserRole) for item in self.list.selectedItems())
+
+    def _update_buttons(self):
+        selected = self._selected_indices()
+        self.compare_button.setEnabled(len(selected) == 2 or (len(selected) == 1 and selected[0] > 0))
+        self.restore_button.setEnabled(len(selected) == 1)
+
+    def compare_selected(self):
+        """比较两个选中的快照；只选一个时与上一步比较"""
+        selected = self._selected_indices()
+        if len(selected) == 1 and selected[0] > 0:
+            selected = [selected[0] - 1, selected[0]]
+        if len(selected) != 2:
+            return
+        first, second = selected
+        changes = self.store.diff(first, second)
+        offset = self.store.pruned + 1
+        self.summary.setText(
+            f"De l'étape {first + offset} à l'étape {second + offset}, éléments modifiés, ajoutés ou supprimés — "
+            f"formes: {len(changes['shapes'])}, segments: {len(changes['lines'])}, points: {len(changes['points'])}")
+
+    def restore_selected(self):
+        """恢复选中的快照"""
+        selected = self._selected_indices()
+        if len(selected) != 1:
+            return
+        number = self.store.pruned + selected[0] + 1
+        self.store.restore(selected[0])
+        self.summary.setText(f"Étape {number} restaurée.")
+        self.refresh()
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(shape_count: int = 10_000, snapshot_count: int = 10_000,
+              budget: int = BENCHMARK_MEMORY_BUDGET) -> Dict[str, float]:
+    """在 shape_count 个形状的场景中，每修改一个形状拍一次快照，共 snapshot_count 次
+
+    测量快照的总内存增量（tracemalloc）并与预算比较。
+    """
+    shapes = [{'type': 'triangle', 'color': '#311B92',
+               'vertices': [(i % 100 * 10.0, i // 100 * 10.0), (i % 100 * 10.0 + 8, i // 100 * 10.0),
+                            (i % 100 * 10.0, i // 100 * 10.0 + 8)],
+               'area': 32.0, 'perimeter': 27.3}
+              for i in range(shape_count)]
+    scene = VersionedScene()
+    scene.load([], [], [], shapes)
+    scene.snapshot("initial")
+
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    snapshot_time = 0.0
+    for step in range(snapshot_count):
+        index = (step * 7919) % shape_count
+        shape = dict(shapes[index])
+        x, y = shape['vertices'][0]
+        shape['vertices'] = [(x + step % 5, y)] + shape['vertices'][1:]
+        scene.apply_edit({'op': 'set', 'items': [('shape', index, shape, None)]})
+        t = time.perf_counter()
+        scene.snapshot()
+        snapshot_time += time.perf_counter() - t
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+
+    t = time.perf_counter()
+    changes = scene.diff(0, len(scene.versions) - 1)
+    diff_time = time.perf_counter() - t
+    t = time.perf_counter()
+    scene.materialize(scene.versions[len(scene.versions) // 2])
+    materialize_time = time.perf_counter() - t
+
+    results = {
+        'snapshots': snapshot_count,
+        'memory_mb': used / 1e6,
+        'bytes_per_snapshot': used / snapshot_count,
+        'snapshot_us': snapshot_time / snapshot_count * 1e6,
+        'edit_and_snapshot_s': elapsed,
+        'diff_ms': diff_time * 1000,
+        'materialize_ms': materialize_time * 1000,
+        'within_budget': used <= budget,
+    }
+    print(f"{snapshot_count} instantanés d'une scène de {shape_count} formes")
+    print(f"  mémoire: {results['memory_mb']:.1f} Mo ({results['bytes_per_snapshot']:.0f} octets/instantané), "
+          f"budget {budget / 1e6:.0f} Mo: {'OK' if results['within_budget'] else 'DÉPASSÉ'}")
+    print(f"  instantané: {results['snapshot_us']:.2f} µs, total {elapsed:.2f} s (tracemalloc actif)")
+    print(f"  différence premier/dernier: {len(changes['shapes'])} formes en {results['diff_ms']:.1f} ms")
+    print(f"  restauration (copie vers le canevas): {results['materialize_ms']:.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,140 @@
+"""
+空间索引：用均匀网格记录每个图形的包围盒，
+用于命中测试和只重绘局部区域时查找相关图形。
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+BBox = Tuple[float, float, float, float]  # (min_x, min_y, max_x, max_y)
+ItemKey = Tuple[str, int]  # ('point' | 'line' | 'shape', 下标)
+
+# 默认网格大小（屏幕像素）
+DEFAULT_CELL_SIZE = 64.0
+
+# 包围盒覆盖的格子超过这个数的图形（很长的线段、很大的圆）不登记到格子中，
+# 单独保存，每次查询都检查
+MAX_ITEM_CELLS = 256
+
+
+def item_bbox(kind: str, item: dict) -> Optional[BBox]:
+    """计算画布图形字典的包围盒"""
+    if kind == 'point':
+        return item['x'], item['y'], item['x'], item['y']
+    if kind == 'line':
+        return (min(item['x1'], item['x2']), min(item['y1'], item['y2']),
+                max(item['x1'], item['x2']), max(item['y1'], item['y2']))
+    if item.get('type') == 'circle':
+        center_x, center_y = item['center']
+        radius = item['radius']
+        return center_x - radius, center_y - radius, center_x + radius, center_y + radius
+    vertices = item.get('vertices')
+    if not vertices:
+        return None
+    xs = [x for x, _ in vertices]
+    ys = [y for _, y in vertices]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def union_bbox(boxes: Iterable[Optional[BBox]]) -> Optional[BBox]:
+    """多个包围盒的并"""
+    result = None
+    for box in boxes:
+        if box is None:
+            continue
+        if result is None:
+            result = box
+        else:
+            result = (min(result[0], box[0]), min(result[1], box[1]),
+                      max(result[2], box[2]), max(result[3], box[3]))
+    return result
+
+
+class GridIndex:
+    """均匀网格空间索引
+
+    大图形（覆盖超过 MAX_ITEM_CELLS 个格子）保存在 large 中，不占用格子。
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.clear()
+
+    def clear(self):
+        """清空索引"""
+        self.cells: Dict[Tuple[int, int], Set[ItemKey]] = {}
+        self.boxes: Dict[ItemKey, BBox] = {}
+        self.large: Set[ItemKey] = set()
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cell_range(self, box: BBox):
+        size = self.cell_size
+        return (math.floor(box[0] / size), math.floor(box[1] / size),
+                math.floor(box[2] / size), math.floor(box[3] / size))
+
+    def insert(self, key: ItemKey, box: Optional[BBox]):
+        """插入或更新图形的包围盒"""
+        if key in self.boxes:
+            self.remove(key)
+        if box is None:
+            return
+        self.boxes[key] = box
+        x0, y0, x1, y1 = self._cell_range(box)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_ITEM_CELLS:
+            self.large.add(key)
+            return
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(key)
+
+    def remove(self, key: ItemKey):
+        """移除图形"""
+        box = self.boxes.pop(key, None)
+        if box is None:
+            return
+        if key in self.large:
+            self.large.discard(key)
+            return
+        x0, y0, x1, y1 = self._cell_range(box)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self.cells[(cx, cy)]
+
+    def query(self, box: BBox) -> Set[ItemKey]:
+        """返回包围盒与 box 相交的所有图形"""
+        x0, y0, x1, y1 = self._cell_range(box)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self.cells):
+            # 查询范围的格子比已占用的格子还多：遍历已占用的格子
+            buckets = [bucket for (cx, cy), bucket in self.cells.items()
+                       if x0 <= cx <= x1 and y0 <= cy <= y1]
+        else:
+            buckets = [self.cells.get((cx, cy), ()) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+        result = set()
+        for bucket in buckets + [self.large]:
+            for key in bucket:
+                other = self.boxes[key]
+                if (other[0] <= box[2] and box[0] <= other[2]
+                        and other[1] <= box[3] and box[1] <= other[3]):
+                    result.add(key)
+        return result
+
+    def query_point(self, x: float, y: float, radius: float) -> Set[ItemKey]:
+        """返回包围盒距离 (x, y) 不超过 radius 的图形"""
+        return self.query((x - radius, y - radius, x + radius, y + radius))
+
+    def rebuild(self, canvas):
+        """根据画布内容重建索引"""
+        self.clear()
+        for kind, items in (('point', canvas.points), ('line', canvas.lines), ('shape', canvas.shapes)):
+            for index, item in enumerate(items):
+                self.insert((kind, index), item_bbox(kind, item))
+
+    def sorted_keys(self, keys: Iterable[ItemKey]) -> List[ItemKey]:
+        """按绘制顺序（点、线段、形状，各自按下标）排序"""
+        order = {'point': 0, 'line': 1, 'shape': 2}
+        return sorted(keys, key=lambda key: (order[key[0]], key[1]))
@@ -0,0 +1,301 @@
+"""
+启动性能分析（main.py --profile-startup 或环境变量 GEOMETRY_PROFILE_STARTUP）。
+
+- 导入钩子：sys.meta_path 最前面的查找器把其余查找器找到的 spec 的加载器包装起来，
+  记录每个模块从查找到执行完的墙钟时间（含子模块的总时间和扣除子模块的自身时间）
+- 阶段：应用程序用 span() / mark() 记录 PyQt 初始化、各模块构造和第一次绘制
+- 报告：<前缀>.json（机器可读的摘要，便于跨版本比较）和 <前缀>.trace.json
+  （Chrome 跟踪格式，可在 chrome://tracing 或 Perfetto 中打开）
+
+本模块只依赖标准库，必须在导入 PyQt 之前启用才能记录 PyQt 的导入。
+未启用时 span() / mark() 几乎没有开销。
+"""
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+ARGUMENT = '--profile-startup'
+ENVIRONMENT_VARIABLE = 'GEOMETRY_PROFILE_STARTUP'
+DEFAULT_PREFIX = 'startup-profile'
+REPORT_FORMAT = 'geometry-startup-profile'
+REPORT_VERSION = 1
+
+
+class _Event:
+    """一个计时区间（秒，相对 perf_counter）"""
+
+    __slots__ = ('name', 'category', 'start', 'end', 'thread', 'args')
+
+    def __init__(self, name: str, category: str, start: float, end: Optional[float],
+                 thread: int, args: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = end  # None 表示瞬时事件
+        self.thread = thread
+        self.args = args or {}
+
+
+class _TimedLoader:
+    """包装真正的加载器，记录模块的创建和执行；执行完后把模块的加载器还原"""
+
+    def __init__(self, loader, hook: '_ImportHook', start: float):
+        self.loader = loader
+        self.hook = hook
+        self.start = start
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        hook = self.hook
+        stack = hook.stack()
+        stack.append(0.0)  # 子模块的时间之和
+        try:
+            self.loader.exec_module(module)
+        finally:
+            end = time.perf_counter()
+            children = stack.pop()
+            inclusive = end - self.start
+            if stack:
+                stack[-1] += inclusive
+            name = module.__name__
+            hook.profiler.record(name, 'import', self.start, end,
+                                 {'self_ms': round((inclusive - children) * 1000, 3)})
+            spec = getattr(module, '__spec__', None)
+            if spec is not None and spec.loader is self:
+                spec.loader = self.loader
+            if getattr(module, '__loader__', None) is self:
+                module.__loader__ = self.loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class _ImportHook:
+    """sys.meta_path 上的查找器：委托给其余查找器，再包装找到的加载器"""
+
+    def __init__(self, profiler: 'StartupProfiler'):
+        self.profiler = profiler
+        self._local = threading.local()
+
+    def stack(self) -> List[float]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def find_spec(self, fullname, path, target=None):
+        busy = getattr(self._local, 'busy', None)
+        if busy is None:
+            busy = self._local.busy = set()
+        if fullname in busy:
+            return None
+        start = time.perf_counter()
+        busy.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                find_spec = getattr(finder, 'find_spec', None)
+                if finder is self or find_spec is None:
+                    continue
+                spec = find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            busy.discard(fullname)
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self, start)
+        return spec
+
+
+class StartupProfiler:
+    """记录导入和启动阶段，写出 JSON 报告和 Chrome 跟踪文件"""
+
+    def __init__(self, prefix: str = DEFAULT_PREFIX, origin: Optional[float] = None):
+        self.prefix = prefix
+        self.origin = time.perf_counter() if origin is None else origin
+        self.events: List[_Event] = []
+        self._lock = threading.Lock()
+        self._hook: Optional[_ImportHook] = None
+        self._written = 0
+
+    # ------------------------------------------------------------------
+    # 记录
+
+    def install_import_hook(self):
+        if self._hook is None:
+            self._hook = _ImportHook(self)
+            sys.meta_path.insert(0, self._hook)
+
+    def remove_import_hook(self):
+        if self._hook is not None:
+            if self._hook in sys.meta_path:
+                sys.meta_path.remove(self._hook)
+            self._hook = None
+
+    def record(self, name: str, category: str, start: float, end: Optional[float] = None,
+               args: Optional[Dict[str, Any]] = None):
+        event = _Event(name, category, start, end, threading.get_ident(), args)
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str = 'phase', **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter(), args)
+
+    def mark(self, name: str, category: str = 'phase', **args):
+        self.record(name, category, time.perf_counter(), None, args)
+
+    # ------------------------------------------------------------------
+    # 报告
+
+    def _ms(self, seconds: float) -> float:
+        return round(seconds * 1000, 3)
+
+    def report(self) -> Dict[str, Any]:
+        """机器可读的摘要：所有事件、按总时间排序的导入和各类别的合计"""
+        import platform
+        from datetime import datetime
+
+        with self._lock:
+            events = list(self.events)
+        main_thread = threading.main_thread().ident
+        imports = []
+        totals: Dict[str, float] = {}
+        for event in events:
+            if event.end is None:
+                continue
+            duration = event.end - event.start
+            if event.category == 'import':
+                imports.append({'module': event.name, 'inclusive_ms': self._ms(duration),
+                                'self_ms': event.args.get('self_ms', 0.0),
+                                'main_thread': event.thread == main_thread})
+                # 用自身时间求和，嵌套的导入不重复计算
+                totals['import'] = totals.get('import', 0.0) + event.args.get('self_ms', 0.0) / 1000
+            else:
+                totals[event.category] = totals.get(event.category, 0.0) + duration
+        imports.sort(key=lambda item: item['inclusive_ms'], reverse=True)
+        marks = {event.name: self._ms(event.start - self.origin) for event in events if event.end is None}
+        return {
+            'format': REPORT_FORMAT,
+            'version': REPORT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'argv': sys.argv,
+            'elapsed_ms': self._ms(time.perf_counter() - self.origin),
+            'marks_ms': marks,
+            'totals_ms': {category: self._ms(seconds) for category, seconds in sorted(totals.items())},
+            'imports': imports,
+            'events': [{'name': event.name, 'category': event.category,
+                        'start_ms': self._ms(event.start - self.origin),
+                        'duration_ms': None if event.end is None else self._ms(event.end - event.start),
+                        'main_thread': event.thread == main_thread, 'args': event.args}
+                       for event in events if event.category != 'import'],
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Chrome 跟踪格式（"X" 区间事件和 "i" 瞬时事件，时间单位微秒）"""
+        with self._lock:
+            events = list(self.events)
+        pid = os.getpid()
+        main_thread = threading.main_thread().ident
+        threads = {main_thread: 0}
+        trace = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                  'args': {'name': "Géométrie & Calcul"}},
+                 {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': "principal"}}]
+        for event in events:
+            tid = threads.setdefault(event.thread, len(threads))
+            item = {'name': event.name, 'cat': event.category, 'pid': pid, 'tid': tid,
+                    'ts': round((event.start - self.origin) * 1e6, 1), 'args': event.args}
+            if event.end is None:
+                item.update(ph='i', s='g')
+            else:
+                item.update(ph='X', dur=round((event.end - event.start) * 1e6, 1))
+            trace.append(item)
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms',
+                'otherData': {'format': REPORT_FORMAT, 'version': REPORT_VERSION}}
+
+    def write(self, force: bool = False) -> Optional[Tuple[str, str]]:
+        """写出 <前缀>.json 和 <前缀>.trace.json；自上次写出后没有新事件时跳过"""
+        import json
+
+        if not force and len(self.events) == self._written:
+            return None
+        self._written = len(self.events)
+        report_path = f"{self.prefix}.json"
+        trace_path = f"{self.prefix}.trace.json"
+        directory = os.path.dirname(os.path.abspath(report_path))
+        os.makedirs(directory, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, ensure_ascii=False, indent=1)
+        with open(trace_path, 'w', encoding='utf-8') as file:
+            json.dump(self.chrome_trace(), file, ensure_ascii=False)
+        return report_path, trace_path
+
+
+# ----------------------------------------------------------------------
+# 应用程序使用的全局分析器
+# ----------------------------------------------------------------------
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def configure(argv: List[str], origin: Optional[float] = None) -> Optional[StartupProfiler]:
+    """按命令行（--profile-startup[=前缀]，从 argv 中移除）或环境变量启用分析并安装导入钩子"""
+    global _profiler
+    prefix = None
+    for argument in list(argv[1:]):
+        if argument == ARGUMENT or argument.startswith(ARGUMENT + '='):
+            argv.remove(argument)
+            prefix = argument.partition('=')[2] or DEFAULT_PREFIX
+    if prefix is None:
+        value = os.environ.get(ENVIRONMENT_VARIABLE, '')
+        if value and value != '0':
+            prefix = DEFAULT_PREFIX if value == '1' else value
+    if prefix is None:
+        return None
+    _profiler = StartupProfiler(prefix, origin)
+    _profiler.install_import_hook()
+    return _profiler
+
+
+def active() -> Optional[StartupProfiler]:
+    return _profiler
+
+
+def span(name: str, category: str = 'phase', **args):
+    """记录一个区间（未启用时什么也不做）"""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.span(name, category, **args)
+
+
+def mark(name: str, category: str = 'phase', **args):
+    """记录一个瞬时事件（未启用时什么也不做）"""
+    if _profiler is not None:
+        _profiler.mark(name, category, **args)
+
+
+def write():
+    """写出报告（未启用或没有新事件时什么也不做）"""
+    if _profiler is None:
+        return
+    try:
+        paths = _profiler.write()
+    except OSError as error:
+        print(f"Impossible d'écrire le profil de démarrage: {error}")
+        return
+    if paths is not None:
+        print(f"Profil de démarrage écrit: {paths[0]}, {paths[1]}")
@@ -0,0 +1,310 @@
+"""
+界面主题：整个应用程序只有一个样式表，安装在 QApplication 上。
+
+- 组件通过动态属性选择规则：MetroButton 和 PropertyPanel 的配色用 tone（如 "1a237e-ffffff"），
+  背景区域用 surface；状态用动态属性 active（按钮）或 Qt 自身的 enabled 属性（面板，[enabled="false"]）。
+  切换状态只是设置属性并重新 polish，不再生成和解析样式表
+- 每种配色的规则只生成一次。程序中用到的配色（BUTTON_PALETTE、PANEL_PALETTE）预先编译；运行中出现的新配色
+  合并到下一轮事件循环里一次性追加
+- 颜色变亮/变暗的结果按 (颜色, 系数) 缓存
+
+注意：不带选择器、或用 QWidget 选择器的控件级样式表会覆盖子控件的应用程序级规则
+（不论优先级），容器的背景因此也放在这里，用 surface 属性选择。
+"""
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from PyQt6.QtCore import QEvent, QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication, QWidget
+
+# 程序中使用的 (背景色, 文字色)，安装时预先编译
+BUTTON_PALETTE = (
+    '#1B5E20', '#1A237E', '#311B92', '#0277BD', '#E65100', '#030d03', '#37474F',
+    '#4E342E', '#607D8B', '#757575', '#B71C1C', '#FF5722',
+)
+PANEL_PALETTE = (
+    ('#FBE9E7', '#E65100'), ('#E3F2FD', '#0277BD'), ('#E8F5E9', '#1A237E'),
+    ('#E8F5E9', '#1B5E20'), ('#EDE7F6', '#311B92'),
+)
+
+# 背景区域：surface 属性的值 → 规则内容（作用于该控件及其所有子控件）
+SURFACES = {
+    'window': "background-color: #FFFFFF;",
+    'tools': "background-color: #F5F5F5; border-right: 1px solid #CCCCCC;",
+}
+
+# 画布上方的操作工具栏（role="actions"），紧凑的文字按钮
+ACTION_BAR_RULES = """
+QToolBar[role="actions"] { border: none; border-bottom: 1px solid #DEE2E6; spacing: 0px; }
+QToolBar[role="actions"] QToolButton {
+    color: #37474F; border: 1px solid transparent; border-radius: 4px; padding: 3px;
+}
+QToolBar[role="actions"] QToolButton:hover { background-color: #ECEFF1; border: 1px solid #CFD8DC; }
+QToolBar[role="actions"] QToolButton:pressed { background-color: #CFD8DC; }
+QToolBar[role="actions"] QToolButton:disabled { color: #B0BEC5; }
+"""
+
+# 禁用的属性面板
+DISABLED_BACKGROUND = '#ECEFF1'
+DISABLED_BORDER = '#CFD8DC'
+DISABLED_LABEL = '#607D8B'
+DISABLED_INPUT = '#90A4AE'
+
+
+# ----------------------------------------------------------------------
+# 颜色
+# ----------------------------------------------------------------------
+
+@lru_cache(maxsize=256)
+def lighten(color: str, factor: float = 0.4) -> str:
+    """与白色按 factor 混合（RGB）"""
+    if not color.startswith('#'):
+        return color
+    r, g, b = int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+    r = min(255, int(r + (255 - r) * factor))
+    g = min(255, int(g + (255 - g) * factor))
+    b = min(255, int(b + (255 - b) * factor))
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+@lru_cache(maxsize=256)
+def darken(color: str, factor: float = 0.3) -> str:
+    """各分量乘以 1 - factor（RGB）"""
+    if not color.startswith('#'):
+        return color
+    r, g, b = int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+    r = max(0, int(r * (1 - factor)))
+    g = max(0, int(g * (1 - factor)))
+    b = max(0, int(b * (1 - factor)))
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+@lru_cache(maxsize=256)
+def scale_value(color: str, factor: float) -> str:
+    """按 factor 缩放 HSV 的亮度（属性面板使用）"""
+    if not color.startswith('#'):
+        return color
+    color_obj = QColor(color)
+    h, s, v, a = color_obj.getHsvF()
+    color_obj.setHsvF(h, s, max(0.0, min(1.0, v * factor)), a)
+    return color_obj.name()
+
+
+@lru_cache(maxsize=256)
+def tone_name(bg_color: str, text_color: str) -> str:
+    """配色的属性值，颜色先规范化（"white" 与 "#FFFFFF" 相同）"""
+    return f"{QColor(bg_color).name()[1:]}-{QColor(text_color).name()[1:]}"
+
+
+# ----------------------------------------------------------------------
+# 规则
+# ----------------------------------------------------------------------
+
+def _surface_rules(name: str, declarations: str) -> str:
+    # 两个选择器优先级相同，嵌套的区域（如工具栏在主窗口内）按顺序由后面的规则生效
+    return f'QWidget[surface="{name}"], [surface="{name}"] QWidget {{ {declarations} }}'
+
+
+def _button_rules(tone: str, bg_color: str, text_color: str) -> str:
+    # 同样优先级的规则后写的生效：激活状态写在 :hover / :pressed 之后
+    selector = f'MetroButton[tone="{tone}"]'
+    return f"""
+{selector} {{
+    background-color: {bg_color}; color: {text_color};
+    border: 2px solid {bg_color}; border-radius: 8px; font-weight: bold;
+}}
+{selector}:hover {{ background-color: {lighten(bg_color)}; border: 1px solid rgba(255, 255, 255, 0.4); }}
+{selector}:pressed {{ background-color: {darken(bg_color)}; }}
+{selector}[active="true"] {{
+    background-color: {text_color}; color: {bg_color}; border: 2px solid {bg_color};
+}}
+{selector}[active="true"]:hover {{ background-color: {lighten(text_color)}; }}
+"""
+
+
+def _panel_rules(tone: str, bg_color: str, text_color: str) -> str:
+    # 禁用状态用面板的 enabled 属性选择，不用 :disabled：任何状态下有边框规则的输入框都不再按原生样式绘制，
+    # 而且 Qt 不会因为启用状态改变而重新 polish（尺寸不更新），set_enabled() 负责重新 polish
+    selector = f'PropertyPanel[tone="{tone}"]'
+    disabled = f'{selector}[enabled="false"]'
+    return f"""
+{selector}, {selector} QFrame {{
+    background-color: {bg_color}; border-radius: 8px; border: 1px solid {scale_value(bg_color, 0.8)};
+}}
+{selector} QLabel {{ color: {text_color}; font-weight: bold; }}
+{selector} QLabel[role="title"] {{ font-size: 14px; font-weight: bold; color: {text_color}; }}
+{selector} QPushButton[role="create"] {{
+    background-color: {text_color}; color: white; border-radius: 4px; padding: 5px 10px; font-weight: bold;
+}}
+{selector} QPushButton[role="create"]:hover {{ background-color: {scale_value(text_color, 1.2)}; }}
+{disabled}, {disabled} QFrame {{
+    background-color: {DISABLED_BACKGROUND}; border-radius: 8px; border: 1px solid {DISABLED_BORDER};
+}}
+{disabled} QLabel {{ color: {DISABLED_LABEL}; font-weight: bold; }}
+{disabled} QDoubleSpinBox, {disabled} QPushButton {{
+    background-color: {DISABLED_BACKGROUND}; color: {DISABLED_INPUT}; border: 1px solid {DISABLED_BORDER};
+}}
+"""
+
+
+class Theme:
+    """应用程序样式表：按需追加配色规则，合并后一次安装"""
+
+    def __init__(self):
+        self._rules: List[str] = [_surface_rules(name, declarations) for name, declarations in SURFACES.items()]
+        self._rules.append(ACTION_BAR_RULES)
+        # (种类, 背景色, 文字色) → tone；已生成规则的 (种类, tone)
+        self._tones: Dict[Tuple[str, str, str], str] = {}
+        self._compiled: Set[Tuple[str, str]] = set()
+        self._installed: Optional[str] = None
+        self._pending = False
+        for bg_color in BUTTON_PALETTE:
+            self._register('button', bg_color, '#FFFFFF', _button_rules)
+        for bg_color, text_color in PANEL_PALETTE:
+            self._register('panel', bg_color, text_color, _panel_rules)
+
+    def stylesheet(self) -> str:
+        return '\n'.join(self._rules)
+
+    def button_tone(self, bg_color: str, text_color: str) -> str:
+        """MetroButton 的 tone 属性值，第一次遇到这种配色时生成规则"""
+        return self._tone(self._register('button', bg_color, text_color, _button_rules))
+
+    def panel_tone(self, bg_color: str, text_color: str) -> str:
+        """PropertyPanel 的 tone 属性值，第一次遇到这种配色时生成规则"""
+        return self._tone(self._register('panel', bg_color, text_color, _panel_rules))
+
+    def _tone(self, tone: str) -> str:
+        if self._installed is None:
+            # 没有显式调用 install() 时（如单独运行某个模块），第一次使用时安装
+            self.install()
+        return tone
+
+    def _register(self, kind: str, bg_color: str, text_color: str, rules) -> str:
+        key = (kind, bg_color, text_color)
+        tone = self._tones.get(key)
+        if tone is None:
+            tone = self._tones[key] = tone_name(bg_color, text_color)
+            # 不同写法的同一配色只生成一次规则
+            if (kind, tone) not in self._compiled:
+                self._compiled.add((kind, tone))
+                self._rules.append(rules(tone, QColor(bg_color).name(), QColor(text_color).name()))
+                self._schedule()
+        return tone
+
+    def install(self):
+        """把样式表安装到 QApplication（内容未变时什么也不做）"""
+        app = QApplication.instance()
+        if app is None:
+            return
+        sheet = self.stylesheet()
+        if sheet != self._installed:
+            self._installed = sheet
+            self._pending = False
+            app.setStyleSheet(sheet)
+
+    def _schedule(self):
+        """安装后新出现的配色合并到下一轮事件循环一次性安装"""
+        if self._installed is not None and not self._pending:
+            self._pending = True
+            QTimer.singleShot(0, self.install)
+
+
+THEME = Theme()
+
+
+def install():
+    """安装应用程序样式表（QApplication 创建后调用一次）"""
+    THEME.install()
+
+
+def repolish(widget: QWidget):
+    """动态属性改变后让样式重新匹配规则（不解析样式表）"""
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+
+
+def repolish_tree(widget: QWidget):
+    """重新 polish 控件及其所有子控件（规则依赖祖先的属性时）
+
+    边框、内边距等改变尺寸的规则还需要 StyleChange 事件，控件（如 QAbstractSpinBox 的内部输入框）
+    才会重新布局并更新 sizeHint。
+    """
+    style = widget.style()
+    widgets = [widget] + widget.findChildren(QWidget)
+    for child in widgets:
+        style.unpolish(child)
+    for child in widgets:
+        style.polish(child)
+    event = QEvent(QEvent.Type.StyleChange)
+    for child in widgets:
+        QApplication.sendEvent(child, event)
+    widget.update()
+
+
+def set_surface(widget: QWidget, name: str):
+    """把控件标记为一个背景区域（见 SURFACES）"""
+    widget.setProperty('surface', name)
+    repolish(widget)
+
+
+# ----------------------------------------------------------------------
+# 基准测试
+# ----------------------------------------------------------------------
+
+def benchmark(toggles: int = 400) -> Dict[str, float]:
+    """40 个按钮和一个属性面板：切换按钮激活状态和面板启用状态的耗时"""
+    import os
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtWidgets import QGridLayout
+    from modules.ui_components_pyqt import MetroButton
+    from modules.property_panels.triangle_properties_panel import TrianglePropertiesPanel
+
+    app = QApplication.instance() or QApplication([])
+    install()
+    results: Dict[str, float] = {}
+    root = QWidget()
+    set_surface(root, 'tools')
+    layout = QGridLayout(root)
+    start = time.perf_counter()
+    buttons = [MetroButton(f"B{i}", BUTTON_PALETTE[i % 3], "#FFFFFF") for i in range(40)]
+    for i, button in enumerate(buttons):
+        layout.addWidget(button, i // 4, i % 4)
+    panel = TrianglePropertiesPanel()
+    layout.addWidget(panel, 10, 0, 1, 4)
+    root.show()
+    app.processEvents()
+    results['build_ms'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for i in range(toggles):
+        # 每一轮把所有按钮切换到另一个状态
+        buttons[i % len(buttons)].set_active((i // len(buttons)) % 2 == 0)
+    results['toggle_us'] = (time.perf_counter() - start) / toggles * 1e6
+
+    start = time.perf_counter()
+    for i in range(toggles):
+        # 每一轮把所有按钮切换到另一个状态
+        buttons[i % len(buttons)].set_active((i // len(buttons)) % 2 == 0)
+        app.processEvents()
+    results['toggle_frame_ms'] = (time.perf_counter() - start) / toggles * 1000
+
+    start = time.perf_counter()
+    for i in range(50):
+        panel.set_enabled(i % 2 == 0)
+        app.processEvents()
+    results['panel_frame_ms'] = (time.perf_counter() - start) / 50 * 1000
+    root.close()
+
+    print(f"40 boutons et un panneau: création et première image {results['build_ms']:.1f} ms")
+    print(f"  set_active: {results['toggle_us']:.1f} µs, avec l'image {results['toggle_frame_ms']:.3f} ms")
+    print(f"  panneau set_enabled avec l'image: {results['panel_frame_ms']:.2f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,401 @@
+"""
+拓扑层：顶点焊接与半边结构。
+
+- 顶点焊接：用哈希网格（格子大小等于容差）查找容差范围内已有的顶点，
+  重合的点只保存一份，不再重复占用内存和绘制调用
+- 半边结构：每条线段对应一对互为孪生的半边，多边形（矩形、三角形）
+  作为面引用沿边界的半边，共享边和共享顶点不再复制
+- 移动顶点时只遍历该顶点的出边和所在的面，复杂度为 O(度数)
+- 重建时批量焊接：坐标完全相同的位置只查找一次；安装了 NumPy 时先找出相邻格子中
+  没有其他位置的坐标，直接创建顶点，只有其余的坐标逐个查找（结果与逐个焊接相同）
+"""
+import math
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+# 默认焊接容差（屏幕像素）
+DEFAULT_TOLERANCE = 0.5
+
+
+class SpatialHash:
+    """均匀网格哈希，用于在容差范围内查找顶点"""
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def insert(self, vertex_id: int, x: float, y: float):
+        """插入顶点"""
+        self.cells.setdefault(self._cell(x, y), []).append(vertex_id)
+
+    def remove(self, vertex_id: int, x: float, y: float):
+        """移除顶点"""
+        bucket = self.cells.get(self._cell(x, y))
+        if bucket and vertex_id in bucket:
+            bucket.remove(vertex_id)
+            if not bucket:
+                del self.cells[self._cell(x, y)]
+
+    def nearby(self, x: float, y: float):
+        """返回 (x, y) 所在格子及其 8 个相邻格子中的顶点"""
+        cx, cy = self._cell(x, y)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                yield from self.cells.get((cx + dx, cy + dy), ())
+
+
+class Topology:
+    """画布图形的共享拓扑
+
+    顶点、半边和面都用整数编号，数据存放在并行列表中：
+        顶点：vx, vy, point_of（对应 Canvas.points 下标，-1 表示没有可见的点）,
+              outgoing（出边半边列表）, vertex_shapes（(形状下标, 顶点槽位) 列表）
+        半边：origin, twin, next, face, line_of（对应 Canvas.lines 下标，-1 表示无）
+        面：  face_edges（边界半边列表）, face_shape（对应 Canvas.shapes 下标）
+    """
+
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE):
+        self.tolerance = tolerance
+        self.clear()
+
+    def clear(self):
+        """清空所有拓扑数据"""
+        self.grid = SpatialHash(max(self.tolerance, 1e-9))
+        self.vx: List[float] = []
+        self.vy: List[float] = []
+        self.point_of: List[int] = []
+        self.outgoing: List[List[int]] = []
+        self.vertex_shapes: List[List[Tuple[int, object]]] = []
+
+        self.origin: List[int] = []
+        self.twin: List[int] = []
+        self.next: List[int] = []
+        self.face: List[int] = []
+        self.line_of: List[int] = []
+        self.edge_map: Dict[Tuple[int, int], int] = {}
+
+        self.face_edges: List[List[int]] = []
+        self.face_shape: List[int] = []
+
+        self.vertex_of_point: Dict[int, int] = {}
+        self.line_edges: Dict[int, int] = {}
+
+    # ------------------------------------------------------------------
+    # 顶点
+    # ------------------------------------------------------------------
+
+    def find_vertex(self, x: float, y: float) -> Optional[int]:
+        """查找容差范围内最近的顶点"""
+        best, best_dist = None, self.tolerance * self.tolerance
+        # 与 SpatialHash.nearby 相同的 3x3 格子遍历，内联以减少批量重建时的调用开销
+        cells = self.grid.cells
+        cx, cy = self.grid._cell(x, y)
+        vx, vy = self.vx, self.vy
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                bucket = cells.get((gx, gy))
+                if not bucket:
+                    continue
+                for vertex_id in bucket:
+                    dx, dy = vx[vertex_id] - x, vy[vertex_id] - y
+                    dist = dx * dx + dy * dy
+                    if dist <= best_dist:
+                        best, best_dist = vertex_id, dist
+        return best
+
+    def weld(self, x: float, y: float) -> int:
+        """返回 (x, y) 处的顶点编号，不存在时创建"""
+        vertex_id = self.find_vertex(x, y)
+        if vertex_id is not None:
+            return vertex_id
+        return self._new_vertex(x, y)
+
+    def _new_vertex(self, x: float, y: float) -> int:
+        vertex_id = len(self.vx)
+        self.vx.append(x)
+        self.vy.append(y)
+        self.point_of.append(-1)
+        self.outgoing.append([])
+        self.vertex_shapes.append([])
+        self.grid.insert(vertex_id, x, y)
+        return vertex_id
+
+    def weld_all(self, xs: Sequence[float], ys: Sequence[float]) -> List[int]:
+        """按顺序焊接一批位置，返回各自的顶点编号（与逐个调用 weld 的结果相同）"""
+        isolated = self._isolated(xs, ys)
+        exact: Dict[Tuple[float, float], int] = {}
+        ids = []
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            vertex_id = exact.get((x, y))
+            if vertex_id is None:
+                if isolated is not None and isolated[i]:
+                    vertex_id = self._new_vertex(x, y)
+                else:
+                    vertex_id = self.weld(x, y)
+                # 只有恰好位于该坐标的顶点才能直接复用（距离为 0，不会有更近的顶点）
+                if self.vx[vertex_id] == x and self.vy[vertex_id] == y:
+                    exact[(x, y)] = vertex_id
+            ids.append(vertex_id)
+        return ids
+
+    def _isolated(self, xs: Sequence[float], ys: Sequence[float]):
+        """每个位置所在格子和 8 个相邻格子中是否没有其他坐标和已有顶点（NumPy 不可用时返回 None）
+
+        这样的位置不会与任何其他顶点焊接，可以直接创建顶点；坐标完全相同的位置
+        由 weld_all 的精确匹配处理，不算作邻居。
+        """
+        if np is None or not len(xs):
+            return None
+        # 坐标编码为复数后去重（一维排序，比按行去重快得多）
+        unique, inverse = np.unique(np.asarray(xs, dtype=np.float64) + 1j * np.asarray(ys, dtype=np.float64),
+                                    return_inverse=True)
+        everything = np.concatenate([np.column_stack((unique.real, unique.imag)),
+                                     np.column_stack((np.asarray(self.vx, dtype=np.float64),
+                                                      np.asarray(self.vy, dtype=np.float64)))])
+        cells = np.floor(everything / self.grid.cell_size)
+        if not np.isfinite(cells).all() or np.abs(cells).max() > 2 ** 30:
+            return None  # 坐标过大或不是有限数，格子编号无法编码
+        cells = cells.astype(np.int64)
+        keys = np.sort((cells[:, 0] << 32) + cells[:, 1])
+        cx, cy = cells[:len(unique), 0], cells[:len(unique), 1]
+        crowded = np.zeros(len(unique), dtype=bool)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                neighbours = ((cx + dx) << 32) + (cy + dy)
+                found = np.searchsorted(keys, neighbours, 'right') - np.searchsorted(keys, neighbours, 'left')
+                if dx == 0 and dy == 0:
+                    found -= 1  # 坐标自己
+                crowded |= found > 0
+        return ~crowded[inverse.reshape(-1)]
+
+    def attach_point(self, vertex_id: int, point_index: int):
+        """将 Canvas.points 中的点关联到顶点"""
+        self.point_of[vertex_id] = point_index
+        self.vertex_of_point[point_index] = vertex_id
+
+    def degree(self, vertex_id: int) -> int:
+        """顶点的度数（关联的边和形状数）"""
+        return len(self.outgoing[vertex_id]) + len(self.vertex_shapes[vertex_id])
+
+    # ------------------------------------------------------------------
+    # 边与面
+    # ------------------------------------------------------------------
+
+    def _half_edge(self, u: int, v: int) -> int:
+        """返回从 u 指向 v 的半边，边不存在时创建一对孪生半边"""
+        if u == v:
+            raise ValueError("Une arête doit relier deux sommets distincts")
+        key = (u, v) if u < v else (v, u)
+        he = self.edge_map.get(key)
+        if he is None:
+            he = len(self.origin)
+            self.origin.extend(key)
+            self.next.extend((-1, -1))
+            self.face.extend((-1, -1))
+            self.line_of.extend((-1, -1))
+            self.outgoing[key[0]].append(he)
+            self.outgoing[key[1]].append(he + 1)
+            self.twin.extend((he + 1, he))
+            self.edge_map[key] = he
+        return he if self.origin[he] == u else he + 1
+
+    def add_line(self, line_index: int, x1: float, y1: float, x2: float, y2: float) -> Optional[int]:
+        """注册线段，返回从起点出发的半边；两端焊接到同一顶点时返回 None"""
+        return self._link_line(line_index, self.weld(x1, y1), self.weld(x2, y2))
+
+    def _link_line(self, line_index: int, u: int, v: int) -> Optional[int]:
+        if u == v:
+            return None
+        he = self._half_edge(u, v)
+        self.line_of[he] = line_index
+        self.line_of[self.twin[he]] = line_index
+        self.line_edges[line_index] = he
+        return he
+
+    def add_polygon(self, shape_index: int, vertices: List[Tuple[float, float]]) -> int:
+        """注册多边形面，返回面编号"""
+        return self._link_polygon(shape_index, [self.weld(x, y) for x, y in vertices])
+
+    def _link_polygon(self, shape_index: int, ids: List[int]) -> int:
+        face_id = len(self.face_edges)
+        ring = []
+        for slot, vertex_id in enumerate(ids):
+            self.vertex_shapes[vertex_id].append((shape_index, slot))
+            following = ids[(slot + 1) % len(ids)]
+            if following != vertex_id:
+                he = self._half_edge(vertex_id, following)
+                if self.face[he] == -1:
+                    self.face[he] = face_id
+                ring.append(he)
+        for i, he in enumerate(ring):
+            self.next[he] = ring[(i + 1) % len(ring)]
+        self.face_edges.append(ring)
+        self.face_shape.append(shape_index)
+        return face_id
+
+    def add_circle(self, shape_index: int, center_x: float, center_y: float) -> int:
+        """注册圆心，返回顶点编号"""
+        vertex_id = self.weld(center_x, center_y)
+        self.vertex_shapes[vertex_id].append((shape_index, 'center'))
+        return vertex_id
+
+    # ------------------------------------------------------------------
+    # 查询与编辑
+    # ------------------------------------------------------------------
+
+    def line_between(self, x1: float, y1: float, x2: float, y2: float) -> Optional[int]:
+        """返回已连接这两个位置的线段下标，不存在时返回 None"""
+        u, v = self.find_vertex(x1, y1), self.find_vertex(x2, y2)
+        if u is None or v is None:
+            return None
+        he = self.edge_map.get((u, v) if u < v else (v, u))
+        if he is None or self.line_of[he] < 0:
+            return None
+        return self.line_of[he]
+
+    def incident_lines(self, vertex_id: int) -> List[Tuple[int, int]]:
+        """顶点关联的线段：(Canvas.lines 下标, 端点 1 或 2)"""
+        result = []
+        for he in self.outgoing[vertex_id]:
+            line_index = self.line_of[he]
+            if line_index >= 0:
+                end = 1 if self.line_edges.get(line_index) == he else 2
+                result.append((line_index, end))
+        return result
+
+    def detach_point(self, point_index: int):
+        """解除点与顶点的关联（删除末尾的点时使用）"""
+        vertex_id = self.vertex_of_point.pop(point_index, None)
+        if vertex_id is not None and self.point_of[vertex_id] == point_index:
+            self.point_of[vertex_id] = -1
+
+    def detach_line(self, line_index: int):
+        """解除线段与半边的关联，半边本身保留到下次重建"""
+        he = self.line_edges.pop(line_index, None)
+        if he is not None:
+            for edge in (he, self.twin[he]):
+                if self.line_of[edge] == line_index:
+                    self.line_of[edge] = -1
+
+    def detach_shape(self, shape_index: int, shape: dict):
+        """解除形状与顶点和面的关联（删除末尾的形状时使用）"""
+        if shape.get('type') == 'circle':
+            positions = [shape['center']]
+        else:
+            positions = shape.get('vertices', [])
+        for x, y in positions:
+            vertex_id = self.find_vertex(x, y)
+            if vertex_id is not None:
+                self.vertex_shapes[vertex_id] = [entry for entry in self.vertex_shapes[vertex_id]
+                                                 if entry[0] != shape_index]
+        if self.face_shape and self.face_shape[-1] == shape_index:
+            face_id = len(self.face_edges) - 1
+            for he in self.face_edges.pop():
+                if self.face[he] == face_id:
+                    self.face[he] = -1
+                self.next[he] = -1
+            self.face_shape.pop()
+
+    def move_vertex(self, vertex_id: int, x: float, y: float):
+        """移动顶点位置（只更新拓扑中的坐标和哈希网格）"""
+        self.grid.remove(vertex_id, self.vx[vertex_id], self.vy[vertex_id])
+        self.vx[vertex_id] = x
+        self.vy[vertex_id] = y
+        self.grid.insert(vertex_id, x, y)
+
+    def rebuild(self, canvas):
+        """根据画布上的点、线段和形状重建整个拓扑
+
+        先按逐个注册时的顺序（点、线段端点、形状顶点或圆心）收集所有位置并批量焊接，
+        再用得到的顶点编号连接线段和形状。
+        """
+        self.clear()
+        xs: List[float] = []
+        ys: List[float] = []
+        for point in canvas.points:
+            xs.append(point['x'])
+            ys.append(point['y'])
+        for line in canvas.lines:
+            xs.extend((line['x1'], line['x2']))
+            ys.extend((line['y1'], line['y2']))
+        for shape in canvas.shapes:
+            for x, y in _shape_positions(shape):
+                xs.append(x)
+                ys.append(y)
+        ids = iter(self.weld_all(xs, ys))
+
+        for index in range(len(canvas.points)):
+            vertex_id = next(ids)
+            if self.point_of[vertex_id] == -1:
+                self.attach_point(vertex_id, index)
+        for index in range(len(canvas.lines)):
+            self._link_line(index, next(ids), next(ids))
+        for index, shape in enumerate(canvas.shapes):
+            positions = _shape_positions(shape)
+            if shape.get('type') == 'circle':
+                vertex_id = next(ids)
+                self.vertex_shapes[vertex_id].append((index, 'center'))
+            elif positions:
+                self._link_polygon(index, [next(ids) for _ in positions])
+
+    def add_shape(self, shape_index: int, shape: dict):
+        """按形状类型注册"""
+        if shape.get('type') == 'circle':
+            self.add_circle(shape_index, *shape['center'])
+        elif shape.get('vertices'):
+            self.add_polygon(shape_index, shape['vertices'])
+
+    def stats(self) -> Dict[str, int]:
+        """拓扑规模统计"""
+        return {
+            'vertices': len(self.vx),
+            'half_edges': len(self.origin),
+            'faces': len(self.face_edges),
+        }
+
+
+def _shape_positions(shape: dict) -> List[Tuple[float, float]]:
+    """形状在拓扑中注册的位置：圆心或多边形的顶点（与 add_shape 一致）"""
+    if shape.get('type') == 'circle':
+        return [shape['center']]
+    return shape.get('vertices') or []
+
+
+def apply_vertex_move(canvas, vertex_id: int, x: float, y: float) -> Tuple[Set[int], Set[int]]:
+    """把顶点移动到屏幕坐标 (x, y)，并更新所有共享该顶点的点、线段和形状
+
+    只访问该顶点的出边和所在形状，复杂度为 O(度数)。
+
+    Returns:
+        (受影响的线段下标集合, 受影响的形状下标集合)
+    """
+    topology = canvas.topology
+    topology.move_vertex(vertex_id, x, y)
+
+    point_index = topology.point_of[vertex_id]
+    if point_index >= 0:
+        point = canvas.points[point_index]
+        point['x'], point['y'] = x, y
+
+    lines = set()
+    for line_index, end in topology.incident_lines(vertex_id):
+        line = canvas.lines[line_index]
+        line[f'x{end}'], line[f'y{end}'] = x, y
+        lines.add(line_index)
+
+    shapes = set()
+    for shape_index, slot in topology.vertex_shapes[vertex_id]:
+        shape = canvas.shapes[shape_index]
+        if slot == 'center':
+            shape['center'] = (x, y)
+        else:
+            shape['vertices'][slot] = (x, y)
+        shapes.add(shape_index)
+    return lines, shapes
@@ -0,0 +1,493 @@
+"""
+几何变换模块：平移、绕点旋转、位似（缩放）和轴对称。
+
+变换以步骤列表的形式惰性组合，只在需要时合成一个 3×3 矩阵；
+应用到画布时，先把所有受影响的坐标收集到一个扁平缓冲区，
+一次性完成矩阵乘法（安装了 NumPy 时向量化），再写回各个图形。
+TransformDialog 输入变换的种类和参数。
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from PyQt6.QtCore import QObject, QVariantAnimation, QEasingCurve, pyqtSignal
+from PyQt6.QtWidgets import (QCheckBox, QComboBox, QDialog, QDialogButtonBox, QDoubleSpinBox, QFormLayout,
+                             QLabel, QStackedWidget, QVBoxLayout, QWidget)
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+Matrix = Tuple[float, float, float, float, float, float, float, float, float]
+ItemKey = Tuple[str, int]  # ('point' | 'line' | 'shape', 下标)
+
+IDENTITY: Matrix = (1.0, 0.0, 0.0,
+                    0.0, 1.0, 0.0,
+                    0.0, 0.0, 1.0)
+
+
+def multiply(a: Matrix, b: Matrix) -> Matrix:
+    """矩阵乘法 a · b（先应用 b，再应用 a）"""
+    return tuple(
+        a[row * 3] * b[col] + a[row * 3 + 1] * b[3 + col] + a[row * 3 + 2] * b[6 + col]
+        for row in range(3) for col in range(3)
+    )
+
+
+def _translation(dx: float, dy: float) -> Matrix:
+    return (1.0, 0.0, dx, 0.0, 1.0, dy, 0.0, 0.0, 1.0)
+
+
+def _about(center_x: float, center_y: float, m: Matrix) -> Matrix:
+    """以 (center_x, center_y) 为中心应用线性变换 m"""
+    return multiply(_translation(center_x, center_y), multiply(m, _translation(-center_x, -center_y)))
+
+
+def _step_matrix(step: Tuple, t: float = 1.0) -> Matrix:
+    """单个变换步骤的矩阵，t ∈ [0, 1] 为动画进度"""
+    kind = step[0]
+    if kind == 'translate':
+        _, dx, dy = step
+        return _translation(dx * t, dy * t)
+    if kind == 'rotate':
+        _, angle, cx, cy = step
+        rad = math.radians(angle * t)
+        cos_a, sin_a = math.cos(rad), math.sin(rad)
+        return _about(cx, cy, (cos_a, -sin_a, 0.0, sin_a, cos_a, 0.0, 0.0, 0.0, 1.0))
+    if kind == 'scale':
+        _, factor, cx, cy = step
+        k = 1.0 + (factor - 1.0) * t
+        return _about(cx, cy, (k, 0.0, 0.0, 0.0, k, 0.0, 0.0, 0.0, 1.0))
+    if kind == 'reflect':
+        _, x1, y1, x2, y2 = step
+        dx, dy = x2 - x1, y2 - y1
+        length2 = dx * dx + dy * dy
+        if length2 == 0:
+            raise ValueError("L'axe de symétrie doit passer par deux points distincts")
+        # 关于过原点方向 (dx, dy) 的直线的反射矩阵
+        a = (dx * dx - dy * dy) / length2
+        b = 2 * dx * dy / length2
+        m = _about(x1, y1, (a, b, 0.0, b, -a, 0.0, 0.0, 0.0, 1.0))
+        return _lerp(IDENTITY, m, t)
+    if kind == 'matrix':
+        return _lerp(IDENTITY, step[1], t)
+    raise ValueError(f"Transformation inconnue: {kind}")
+
+
+def _lerp(a: Matrix, b: Matrix, t: float) -> Matrix:
+    if t >= 1.0:
+        return b
+    return tuple(x + (y - x) * t for x, y in zip(a, b))
+
+
+class AffineTransform:
+    """惰性组合的仿射变换（网格坐标系，y 轴向上）
+
+    每个方法返回一个追加了新步骤的新变换，原变换保持不变：
+
+        AffineTransform().rotate(90, 0, 0).translate(2, 0)
+    """
+
+    def __init__(self, steps: Sequence[Tuple] = ()):
+        self.steps = tuple(steps)
+        self._matrix: Optional[Matrix] = None
+
+    @classmethod
+    def from_matrix(cls, m: Sequence[float]) -> 'AffineTransform':
+        """从 3×3 矩阵（行优先的 9 个数）创建变换"""
+        return cls((('matrix', tuple(float(v) for v in m)),))
+
+    def _then(self, step: Tuple) -> 'AffineTransform':
+        return AffineTransform(self.steps + (step,))
+
+    def translate(self, dx: float, dy: float) -> 'AffineTransform':
+        """平移"""
+        return self._then(('translate', float(dx), float(dy)))
+
+    def rotate(self, angle: float, center_x: float = 0.0, center_y: float = 0.0) -> 'AffineTransform':
+        """绕点逆时针旋转 angle 度"""
+        return self._then(('rotate', float(angle), float(center_x), float(center_y)))
+
+    def scale(self, factor: float, center_x: float = 0.0, center_y: float = 0.0) -> 'AffineTransform':
+        """以给定点为中心的位似变换"""
+        if factor == 0:
+            raise ValueError("Le rapport d'homothétie ne peut pas être nul")
+        return self._then(('scale', float(factor), float(center_x), float(center_y)))
+
+    def reflect(self, x1: float, y1: float, x2: float, y2: float) -> 'AffineTransform':
+        """关于过 (x1, y1)、(x2, y2) 两点的直线作轴对称"""
+        return self._then(('reflect', float(x1), float(y1), float(x2), float(y2)))
+
+    def then(self, other: 'AffineTransform') -> 'AffineTransform':
+        """先应用本变换，再应用 other"""
+        return AffineTransform(self.steps + other.steps)
+
+    @property
+    def matrix(self) -> Matrix:
+        """合成后的 3×3 矩阵，首次访问时计算并缓存"""
+        if self._matrix is None:
+            self._matrix = self.partial_matrix(1.0)
+        return self._matrix
+
+    def partial_matrix(self, t: float) -> Matrix:
+        """动画进度 t 时的矩阵（旋转角、平移量、缩放比按 t 插值）"""
+        m = IDENTITY
+        for step in self.steps:
+            m = multiply(_step_matrix(step, t), m)
+        return m
+
+    def map_point(self, x: float, y: float) -> Tuple[float, float]:
+        """变换单个点"""
+        m = self.matrix
+        return m[0] * x + m[1] * y + m[2], m[3] * x + m[4] * y + m[5]
+
+    @property
+    def scale_factor(self) -> float:
+        """长度缩放比（相似变换下精确）"""
+        m = self.matrix
+        return math.sqrt(abs(m[0] * m[4] - m[1] * m[3]))
+
+
+def canvas_matrix(canvas, m: Matrix) -> Matrix:
+    """将网格坐标系中的矩阵转换为画布屏幕坐标系中的矩阵"""
+    spacing = canvas.grid_spacing
+    center_x, center_y = canvas.width() // 2, canvas.height() // 2
+    to_screen = (spacing, 0.0, center_x, 0.0, -spacing, center_y, 0.0, 0.0, 1.0)
+    to_grid = (1 / spacing, 0.0, -center_x / spacing, 0.0, -1 / spacing, center_y / spacing, 0.0, 0.0, 1.0)
+    return multiply(to_screen, multiply(m, to_grid))
+
+
+def expand_selection(canvas, items: Iterable[ItemKey]) -> List[ItemKey]:
+    """补全选择：选中形状时，一并选中与其顶点/边重合的点和线段"""
+    keys: Set[ItemKey] = set(items)
+    vertex_set = set()
+    edge_set = set()
+    for kind, index in keys:
+        if kind != 'shape':
+            continue
+        shape = canvas.shapes[index]
+        if shape['type'] == 'circle':
+            vertex_set.add(_coord_key(*shape['center']))
+            continue
+        vertices = [_coord_key(x, y) for x, y in shape.get('vertices', [])]
+        vertex_set.update(vertices)
+        for i in range(len(vertices)):
+            edge_set.add(frozenset((vertices[i], vertices[(i + 1) % len(vertices)])))
+
+    if vertex_set:
+        for i, point in enumerate(canvas.points):
+            if _coord_key(point['x'], point['y']) in vertex_set:
+                keys.add(('point', i))
+        for i, line in enumerate(canvas.lines):
+            edge = frozenset((_coord_key(line['x1'], line['y1']), _coord_key(line['x2'], line['y2'])))
+            if edge in edge_set:
+                keys.add(('line', i))
+    return sorted(keys)
+
+
+def _coord_key(x: float, y: float) -> Tuple[float, float]:
+    return round(x, 6), round(y, 6)
+
+
+def item_coordinate_slots(item: Dict[str, Any], kind: str) -> List[Tuple[str, Any]]:
+    """返回图形中所有坐标所在的位置，用于收集与写回"""
+    if kind == 'point':
+        return [('xy', ('x', 'y'))]
+    if kind == 'line':
+        return [('xy', ('x1', 'y1')), ('xy', ('x2', 'y2'))]
+    if item['type'] == 'circle':
+        return [('tuple', 'center')]
+    return [('vertex', i) for i in range(len(item.get('vertices', [])))]
+
+
+def transform_items(items: List[Tuple[str, Dict[str, Any]]], m: Matrix, scale_factor: float,
+                    grid_spacing: float) -> List[str]:
+    """对一组图形字典原地应用屏幕坐标矩阵 m
+
+    Args:
+        items: (kind, 字典) 列表
+        m: 屏幕坐标系下的 3×3 矩阵
+        scale_factor: 长度缩放比，用于更新半径、边长、面积等缓存量
+        grid_spacing: 网格间距，用于重新生成线段长度文本
+
+    Returns:
+        每个线段对应的新长度文本（按 items 中线段出现的顺序）
+    """
+    # 收集所有坐标到扁平缓冲区
+    xs: List[float] = []
+    ys: List[float] = []
+    slots = []
+    for kind, item in items:
+        for slot in item_coordinate_slots(item, kind):
+            slots.append((item, slot))
+            x, y = _read_slot(item, slot)
+            xs.append(x)
+            ys.append(y)
+
+    new_xs, new_ys = _apply_matrix(m, xs, ys)
+
+    for (item, slot), x, y in zip(slots, new_xs, new_ys):
+        _write_slot(item, slot, x, y)
+
+    # 更新缓存的度量值
+    area_factor = scale_factor * scale_factor
+    texts = []
+    for kind, item in items:
+        if kind == 'line':
+            length = math.hypot(item['x2'] - item['x1'], item['y2'] - item['y1'])
+            texts.append(f"{length / grid_spacing:.1f}")
+        elif kind == 'shape':
+            _scale_measurements(item, scale_factor, area_factor)
+    return texts
+
+
+def _read_slot(item, slot) -> Tuple[float, float]:
+    mode, key = slot
+    if mode == 'xy':
+        return item[key[0]], item[key[1]]
+    if mode == 'tuple':
+        return item[key]
+    return item['vertices'][key]
+
+
+def _write_slot(item, slot, x: float, y: float):
+    mode, key = slot
+    if mode == 'xy':
+        item[key[0]] = x
+        item[key[1]] = y
+    elif mode == 'tuple':
+        item[key] = (x, y)
+    else:
+        vertices = item['vertices']
+        vertices[key] = (x, y)
+
+
+def _apply_matrix(m: Matrix, xs: List[float], ys: List[float]):
+    """一次性变换所有坐标"""
+    if not xs:
+        return [], []
+    if np is not None:
+        x = np.asarray(xs, dtype=np.float64)
+        y = np.asarray(ys, dtype=np.float64)
+        return (m[0] * x + m[1] * y + m[2]).tolist(), (m[3] * x + m[4] * y + m[5]).tolist()
+    a, b, c, d, e, f = m[:6]
+    return ([a * x + b * y + c for x, y in zip(xs, ys)],
+            [d * x + e * y + f for x, y in zip(xs, ys)])
+
+
+def _scale_measurements(shape: Dict[str, Any], scale_factor: float, area_factor: float):
+    """按缩放比更新形状中缓存的长度和面积"""
+    for key in ('radius', 'circumference', 'perimeter', 'width', 'height'):
+        if key in shape:
+            shape[key] = shape[key] * scale_factor
+    if 'sides' in shape:
+        shape['sides'] = [side * scale_factor for side in shape['sides']]
+    if 'area' in shape:
+        shape['area'] = shape['area'] * area_factor
+
+
+def copy_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """复制图形字典（顶点列表也复制）"""
+    result = dict(item)
+    if 'vertices' in result:
+        result['vertices'] = list(result['vertices'])
+    if 'sides' in result:
+        result['sides'] = list(result['sides'])
+    return result
+
+
+def apply_transform(canvas, transform: AffineTransform, items: Optional[Iterable[ItemKey]] = None,
+                    copy: bool = False) -> List[ItemKey]:
+    """对画布上的选择应用变换
+
+    Args:
+        canvas: Canvas 实例
+        transform: 网格坐标系中的变换
+        items: 要变换的图形，None 表示当前选择（为空时为整个场景）
+        copy: True 时保留原图形，变换其副本
+
+    Returns:
+        变换后图形的键列表（复制时为新图形）
+    """
+    keys = resolve_items(canvas, items)
+    if not keys:
+        return []
+
+    m = canvas_matrix(canvas, transform.matrix)
+    if copy:
+        return _add_copies(canvas, keys, m, transform.scale_factor)
+    before = [(kind, index, copy_item(_store(canvas, kind)[index]),
+               canvas.line_texts[index] if kind == 'line' else None)
+              for kind, index in keys]
+    resolved = [(kind, _store(canvas, kind)[index]) for kind, index in keys]
+    texts = transform_items(resolved, m, transform.scale_factor, canvas.grid_spacing)
+    line_indices = [index for kind, index in keys if kind == 'line']
+    for index, text in zip(line_indices, texts):
+        canvas.line_texts[index] = text
+
+    canvas.rebuild_caches()
+    canvas.selection = set(keys)
+    canvas.update()
+    canvas.commit_items(keys, 'set', before)
+    return keys
+
+
+def _add_copies(canvas, keys: List[ItemKey], m: Matrix, scale_factor: float) -> List[ItemKey]:
+    """变换副本并通过画布的添加方法加入
+
+    与 Canvas.add_point / add_line 一样焊接：落在已有顶点上的点不重复添加，
+    与已有的边重合的线段返回已有的线段。返回的键中包含这些已有的图形。
+    """
+    copies = [(kind, copy_item(_store(canvas, kind)[index])) for kind, index in keys]
+    texts = iter(transform_items(copies, m, scale_factor, canvas.grid_spacing))
+    new_keys: List[ItemKey] = []
+    with canvas.batch():  # 逐个添加的编辑合并为一次新增
+        for kind, item in copies:
+            if kind == 'point':
+                key = ('point', canvas.add_point(item['x'], item['y'], item['color']))
+            elif kind == 'line':
+                key = ('line', canvas.add_line(item['x1'], item['y1'], item['x2'], item['y2'],
+                                               item['color'], next(texts)))
+            else:
+                key = ('shape', canvas.add_shape(item))
+            if key not in new_keys:
+                new_keys.append(key)
+        canvas.selection = set(new_keys)
+    return new_keys
+
+
+def resolve_items(canvas, items: Optional[Iterable[ItemKey]] = None) -> List[ItemKey]:
+    """确定变换作用的图形：给定的图形、当前选择或整个场景"""
+    if items is None:
+        items = canvas.selection
+    if not items:
+        items = ([('point', i) for i in range(len(canvas.points))]
+                 + [('line', i) for i in range(len(canvas.lines))]
+                 + [('shape', i) for i in range(len(canvas.shapes))])
+    return expand_selection(canvas, items)
+
+
+def _store(canvas, kind: str) -> list:
+    return {'point': canvas.points, 'line': canvas.lines, 'shape': canvas.shapes}[kind]
+
+
+class TransformPreview(QObject):
+    """变换的动画预览
+
+    动画期间画布把静态内容缓存为一张位图，每帧只重绘移动的图层；
+    动画结束后把变换真正应用到画布。
+    """
+
+    finished = pyqtSignal(list)  # 变换后图形的键列表
+
+    def __init__(self, canvas, transform: AffineTransform, items: Optional[Iterable[ItemKey]] = None,
+                 copy: bool = False, duration: int = 600, parent=None):
+        super().__init__(parent or canvas)
+        self.canvas = canvas
+        self.transform = transform
+        self.copy = copy
+        self.keys = resolve_items(canvas, items)
+        self._originals = [(kind, index, copy_item(_store(canvas, kind)[index]))
+                           for kind, index in self.keys]
+
+        self.animation = QVariantAnimation(self)
+        self.animation.setStartValue(0.0)
+        self.animation.setEndValue(1.0)
+        self.animation.setDuration(duration)
+        self.animation.setEasingCurve(QEasingCurve.Type.InOutCubic)
+        self.animation.valueChanged.connect(self._on_progress)
+        self.animation.finished.connect(self._on_finished)
+
+    def start(self):
+        """开始动画"""
+        hidden = set() if self.copy else set(self.keys)
+        self.canvas.begin_preview_layer(hidden)
+        self._on_progress(0.0)
+        self.animation.start()
+
+    def _on_progress(self, t):
+        """生成进度 t 时移动图层的内容"""
+        m = canvas_matrix(self.canvas, self.transform.partial_matrix(float(t)))
+        scale_factor = math.sqrt(abs(m[0] * m[4] - m[1] * m[3]))
+        layer = [(kind, index, copy_item(item)) for kind, index, item in self._originals]
+        texts = transform_items([(kind, item) for kind, _, item in layer], m, scale_factor,
+                                self.canvas.grid_spacing)
+        self.canvas.set_preview_layer(layer, texts)
+
+    def _on_finished(self):
+        self.canvas.end_preview_layer()
+        keys = apply_transform(self.canvas, self.transform, self.keys, copy=self.copy)
+        self.finished.emit(keys)
+
+
+# 变换对话框的种类：(名称, [(参数名称, 默认值, 最小值, 最大值, 后缀)])
+_COORDINATE = (-50.0, 50.0, "")
+TRANSFORM_KINDS = (
+    ("Translation", [("Δx:", 1.0) + _COORDINATE, ("Δy:", 0.0) + _COORDINATE]),
+    ("Rotation", [("Angle:", 90.0, -360.0, 360.0, " °"),
+                  ("Centre x:", 0.0) + _COORDINATE, ("Centre y:", 0.0) + _COORDINATE]),
+    ("Homothétie", [("Rapport:", 2.0, -10.0, 10.0, ""),
+                    ("Centre x:", 0.0) + _COORDINATE, ("Centre y:", 0.0) + _COORDINATE]),
+    ("Symétrie axiale", [("Axe, point A x:", 0.0) + _COORDINATE, ("Axe, point A y:", 0.0) + _COORDINATE,
+                         ("Axe, point B x:", 0.0) + _COORDINATE, ("Axe, point B y:", 1.0) + _COORDINATE]),
+)
+
+
+class TransformDialog(QDialog):
+    """输入变换的种类和参数（网格坐标），以及是否复制、是否播放动画
+
+    Args:
+        selected: 当前选择的图形数，0 表示变换整个场景
+    """
+
+    def __init__(self, selected: int = 0, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Transformer")
+        layout = QVBoxLayout(self)
+        scope = f"Sélection: {selected} élément(s)" if selected else "Aucune sélection: toute la scène"
+        layout.addWidget(QLabel(scope))
+
+        self.kind = QComboBox()
+        self.pages = QStackedWidget()
+        self.spins: List[List[QDoubleSpinBox]] = []
+        for name, parameters in TRANSFORM_KINDS:
+            self.kind.addItem(name)
+            page = QWidget()
+            form = QFormLayout(page)
+            spins = []
+            for label, value, minimum, maximum, suffix in parameters:
+                spin = QDoubleSpinBox()
+                spin.setRange(minimum, maximum)
+                spin.setDecimals(2)
+                spin.setSingleStep(1.0)
+                spin.setValue(value)
+                spin.setSuffix(suffix)
+                form.addRow(label, spin)
+                spins.append(spin)
+            self.pages.addWidget(page)
+            self.spins.append(spins)
+        self.kind.currentIndexChanged.connect(self.pages.setCurrentIndex)
+        layout.addWidget(self.kind)
+        layout.addWidget(self.pages)
+
+        self.copy_box = QCheckBox("Copie (garder les figures d'origine)")
+        layout.addWidget(self.copy_box)
+        self.animate_box = QCheckBox("Animation")
+        self.animate_box.setChecked(True)
+        layout.addWidget(self.animate_box)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.button(QDialogButtonBox.StandardButton.Ok).setText("Appliquer")
+        buttons.button(QDialogButtonBox.StandardButton.Cancel).setText("Annuler")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def transform(self) -> AffineTransform:
+        """对话框中的变换；参数无效时抛出 ValueError"""
+        index = self.kind.currentIndex()
+        values = [spin.value() for spin in self.spins[index]]
+        steps = (AffineTransform.translate, AffineTransform.rotate, AffineTransform.scale, AffineTransform.reflect)
+        transform = steps[index](AffineTransform(), *values)
+        transform.matrix  # 立即合成：无效的对称轴在这里抛出 ValueError
+        return transform
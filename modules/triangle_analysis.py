@@ -0,0 +1,300 @@
+"""
+三角形分析模块：计算三角形的特殊点、半径、角度和分类。
+
+所有量都由同一组中间项（以 A 为原点的边向量、叉积、点积、边长平方）推导，
+避免像 modules/shapes.Triangle 那样每个属性都重新计算边长。
+支持单个三角形和批量（NumPy 向量化，未安装 NumPy 时退回纯 Python）计算。
+"""
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+Coord = Tuple[float, float]
+
+# 角度分类
+ACUTE, RIGHT, OBTUSE, DEGENERATE = 0, 1, 2, 3
+ANGLE_TYPES = ('acute', 'right', 'obtuse', 'degenerate')
+
+# 边长分类
+SCALENE, ISOSCELES, EQUILATERAL = 0, 1, 2
+SIDE_TYPES = ('scalene', 'isosceles', 'equilateral')
+
+# 界面显示用的法语名称
+ANGLE_TYPE_LABELS = {
+    'acute': 'acutangle',
+    'right': 'rectangle',
+    'obtuse': 'obtusangle',
+    'degenerate': 'dégénéré',
+}
+SIDE_TYPE_LABELS = {
+    'scalene': 'scalène',
+    'isosceles': 'isocèle',
+    'equilateral': 'équilatéral',
+}
+
+DEFAULT_TOLERANCE = 1e-6
+
+
+@dataclass
+class TriangleAnalysis:
+    """单个三角形的分析结果
+
+    边的命名遵循惯例：a = BC（A 的对边），b = CA，c = AB；
+    角度以度为单位，依次为 A、B、C 处的内角。
+    退化三角形的外心、垂心和外接圆半径为 None。
+    """
+    vertices: Tuple[Coord, Coord, Coord]
+    sides: Tuple[float, float, float]
+    angles: Tuple[float, float, float]
+    perimeter: float
+    area: float
+    centroid: Coord
+    incenter: Coord
+    circumcenter: Optional[Coord]
+    orthocenter: Optional[Coord]
+    inradius: float
+    circumradius: Optional[float]
+    angle_type: str
+    side_type: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典表示"""
+        return {
+            'vertices': list(self.vertices),
+            'sides': list(self.sides),
+            'angles': list(self.angles),
+            'perimeter': self.perimeter,
+            'area': self.area,
+            'centroid': self.centroid,
+            'incenter': self.incenter,
+            'circumcenter': self.circumcenter,
+            'orthocenter': self.orthocenter,
+            'inradius': self.inradius,
+            'circumradius': self.circumradius,
+            'angle_type': self.angle_type,
+            'side_type': self.side_type,
+        }
+
+
+def triangle_vertices(triangle) -> Tuple[Coord, Coord, Coord]:
+    """从各种三角形表示中取出三个顶点
+
+    支持 shapes.Triangle（vertex1/vertex2/vertex3）、
+    Canvas.shapes 中带 'vertices' 的字典以及三个 (x, y) 组成的序列。
+    """
+    if hasattr(triangle, 'vertex1'):
+        points = (triangle.vertex1, triangle.vertex2, triangle.vertex3)
+        return tuple((float(p.x), float(p.y)) for p in points)
+    if isinstance(triangle, dict):
+        triangle = triangle['vertices']
+    if len(triangle) != 3:
+        raise ValueError("Un triangle doit avoir exactement trois sommets")
+    return tuple((float(x), float(y)) for x, y in triangle)
+
+
+def analyze_triangle(triangle, tolerance: float = DEFAULT_TOLERANCE) -> TriangleAnalysis:
+    """分析单个三角形
+
+    Args:
+        triangle: 三角形（见 triangle_vertices 支持的格式）
+        tolerance: 分类使用的相对容差
+    """
+    (ax, ay), (bx, by), (cx, cy) = vertices = triangle_vertices(triangle)
+
+    # 共享的中间项：以 A 为原点的边向量
+    ux, uy = bx - ax, by - ay      # AB
+    vx, vy = cx - ax, cy - ay      # AC
+    c2 = ux * ux + uy * uy         # |AB|²
+    b2 = vx * vx + vy * vy         # |AC|²
+    dot = ux * vx + uy * vy        # AB·AC
+    cross = ux * vy - uy * vx      # 2 × 有向面积
+    a2 = b2 + c2 - 2 * dot         # |BC|²，由余弦定理得到，无需再次求差
+    a, b, c = math.sqrt(max(a2, 0.0)), math.sqrt(b2), math.sqrt(c2)
+    perimeter = a + b + c
+    abs_cross = abs(cross)
+
+    dot_a, dot_b, dot_c = dot, c2 - dot, b2 - dot
+    angles = (math.degrees(math.atan2(abs_cross, dot_a)),
+              math.degrees(math.atan2(abs_cross, dot_b)),
+              math.degrees(math.atan2(abs_cross, dot_c)))
+
+    centroid = (ax + (ux + vx) / 3, ay + (uy + vy) / 3)
+    if perimeter > 0:
+        incenter = (ax + (b * ux + c * vx) / perimeter, ay + (b * uy + c * vy) / perimeter)
+        inradius = abs_cross / perimeter
+    else:
+        incenter, inradius = (ax, ay), 0.0
+
+    max_side2 = max(a2, b2, c2)
+    degenerate = abs_cross <= tolerance * max_side2 or max_side2 == 0
+    if degenerate:
+        circumcenter = orthocenter = circumradius = None
+    else:
+        d = 2 * cross
+        ox = (vy * c2 - uy * b2) / d
+        oy = (ux * b2 - vx * c2) / d
+        circumcenter = (ax + ox, ay + oy)
+        orthocenter = (ax + ux + vx - 2 * ox, ay + uy + vy - 2 * oy)
+        circumradius = math.hypot(ox, oy)
+
+    angle_code = _angle_code(degenerate, (dot_a, dot_b, dot_c), (b * c, a * c, a * b), tolerance)
+    side_code = _side_code(a, b, c, tolerance)
+
+    return TriangleAnalysis(
+        vertices=vertices,
+        sides=(a, b, c),
+        angles=angles,
+        perimeter=perimeter,
+        area=abs_cross / 2,
+        centroid=centroid,
+        incenter=incenter,
+        circumcenter=circumcenter,
+        orthocenter=orthocenter,
+        inradius=inradius,
+        circumradius=circumradius,
+        angle_type=ANGLE_TYPES[angle_code],
+        side_type=SIDE_TYPES[side_code],
+    )
+
+
+def analyze_triangles(triangles, tolerance: float = DEFAULT_TOLERANCE) -> Dict[str, Any]:
+    """批量分析三角形
+
+    Args:
+        triangles: 形状为 (n, 3, 2) 或 (n, 6) 的坐标数组，或三角形对象序列
+        tolerance: 分类使用的相对容差
+
+    Returns:
+        列式结果字典：'sides' (n, 3)、'angles' (n, 3)、'perimeter'、'area'、
+        'centroid'、'incenter'、'circumcenter'、'orthocenter' (n, 2)、
+        'inradius'、'circumradius'、'angle_type'、'side_type'（分类编码）。
+        安装了 NumPy 时各列为数组（退化三角形对应 NaN），否则为列表（对应 None）。
+    """
+    if np is None:
+        return _analyze_triangles_python(triangles, tolerance)
+
+    coords = _as_coordinate_array(triangles)
+    ax, ay, bx, by, cx, cy = coords.T
+
+    ux, uy = bx - ax, by - ay
+    vx, vy = cx - ax, cy - ay
+    c2 = ux * ux + uy * uy
+    b2 = vx * vx + vy * vy
+    dot = ux * vx + uy * vy
+    cross = ux * vy - uy * vx
+    a2 = np.maximum(b2 + c2 - 2 * dot, 0.0)
+    a, b, c = np.sqrt(a2), np.sqrt(b2), np.sqrt(c2)
+    perimeter = a + b + c
+    abs_cross = np.abs(cross)
+
+    dots = np.stack([dot, c2 - dot, b2 - dot], axis=1)
+    angles = np.degrees(np.arctan2(abs_cross[:, None], dots))
+
+    max_side2 = np.maximum(np.maximum(a2, b2), c2)
+    degenerate = (abs_cross <= tolerance * max_side2) | (max_side2 == 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        safe_perimeter = np.where(perimeter > 0, perimeter, 1.0)
+        incenter = np.stack([ax + (b * ux + c * vx) / safe_perimeter,
+                             ay + (b * uy + c * vy) / safe_perimeter], axis=1)
+        inradius = abs_cross / safe_perimeter
+
+        d = np.where(degenerate, np.nan, 2 * cross)
+        ox = (vy * c2 - uy * b2) / d
+        oy = (ux * b2 - vx * c2) / d
+
+        # 角度分类：某个角的余弦接近 0 为直角，为负为钝角
+        norms = np.stack([b * c, a * c, a * b], axis=1)
+        cosines = dots / np.where(norms > 0, norms, 1.0)
+    min_cos = cosines.min(axis=1)
+    angle_type = np.where(min_cos < -tolerance, OBTUSE,
+                          np.where(min_cos <= tolerance, RIGHT, ACUTE))
+    angle_type = np.where(degenerate, DEGENERATE, angle_type)
+
+    scale = tolerance * np.maximum(max_side2, 0.0) ** 0.5
+    equal_ab = np.abs(a - b) <= scale
+    equal_bc = np.abs(b - c) <= scale
+    equal_ca = np.abs(c - a) <= scale
+    side_type = np.where(equal_ab & equal_bc, EQUILATERAL,
+                         np.where(equal_ab | equal_bc | equal_ca, ISOSCELES, SCALENE))
+
+    return {
+        'sides': np.stack([a, b, c], axis=1),
+        'angles': angles,
+        'perimeter': perimeter,
+        'area': abs_cross / 2,
+        'centroid': np.stack([ax + (ux + vx) / 3, ay + (uy + vy) / 3], axis=1),
+        'incenter': incenter,
+        'circumcenter': np.stack([ax + ox, ay + oy], axis=1),
+        'orthocenter': np.stack([ax + ux + vx - 2 * ox, ay + uy + vy - 2 * oy], axis=1),
+        'inradius': inradius,
+        'circumradius': np.hypot(ox, oy),
+        'angle_type': angle_type.astype(np.uint8),
+        'side_type': side_type.astype(np.uint8),
+    }
+
+
+def _analyze_triangles_python(triangles, tolerance: float) -> Dict[str, List]:
+    """未安装 NumPy 时的批量分析"""
+    columns = {key: [] for key in ('sides', 'angles', 'perimeter', 'area', 'centroid',
+                                   'incenter', 'circumcenter', 'orthocenter',
+                                   'inradius', 'circumradius', 'angle_type', 'side_type')}
+    for triangle in _iter_triangles(triangles):
+        result = analyze_triangle(triangle, tolerance)
+        for key in columns:
+            value = getattr(result, key)
+            if key == 'angle_type':
+                value = ANGLE_TYPES.index(value)
+            elif key == 'side_type':
+                value = SIDE_TYPES.index(value)
+            columns[key].append(value)
+    return columns
+
+
+def _iter_triangles(triangles):
+    """将批量输入逐个转换为三个顶点"""
+    for item in triangles:
+        if hasattr(item, 'vertex1') or isinstance(item, dict):
+            yield item
+        elif len(item) == 6:
+            yield ((item[0], item[1]), (item[2], item[3]), (item[4], item[5]))
+        else:
+            yield item
+
+
+def _as_coordinate_array(triangles):
+    """将批量输入转换为 (n, 6) 的 float64 数组"""
+    if isinstance(triangles, np.ndarray):
+        return np.asarray(triangles, dtype=np.float64).reshape(-1, 6)
+    rows = [sum(triangle_vertices(t), ()) for t in _iter_triangles(triangles)]
+    return np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+
+
+def _angle_code(degenerate: bool, dots: Sequence[float], norms: Sequence[float], tolerance: float) -> int:
+    """根据最大角的余弦判断锐角/直角/钝角"""
+    if degenerate:
+        return DEGENERATE
+    min_cos = min(d / n for d, n in zip(dots, norms))
+    if min_cos < -tolerance:
+        return OBTUSE
+    if min_cos <= tolerance:
+        return RIGHT
+    return ACUTE
+
+
+def _side_code(a: float, b: float, c: float, tolerance: float) -> int:
+    """根据边长判断不等边/等腰/等边"""
+    scale = tolerance * max(a, b, c)
+    equal_ab = abs(a - b) <= scale
+    equal_bc = abs(b - c) <= scale
+    equal_ca = abs(c - a) <= scale
+    if equal_ab and equal_bc:
+        return EQUILATERAL
+    if equal_ab or equal_bc or equal_ca:
+        return ISOSCELES
+    return SCALENE
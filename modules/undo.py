@@ -0,0 +1,278 @@
+"""
+撤销/重做：命令模式的历史栈。
+
+每个命令只保存被修改图形的增量（新增/删除的图形、修改前后的状态），
+撤销和重做的代价与修改的大小成正比，与场景大小无关。
+同一次事件循环中提交的编辑（例如绘制矩形时的 4 个点、4 条线段和 1 个形状）
+合并为一个命令。历史占用的内存超过上限时，先合并最早的修改命令，再丢弃最早的命令。
+"""
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from modules.transformations import copy_item
+
+ItemState = Tuple[str, int, Dict[str, Any], Optional[str]]  # (kind, 下标, 字典, 文本)
+
+# 默认的历史内存上限（字节，估算值）
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# 单个图形的大致内存占用（用于估算整个场景）
+_ITEM_BYTES = 400
+
+
+def _state_size(state: ItemState) -> int:
+    """估算一个图形状态占用的内存"""
+    item = state[2]
+    size = sys.getsizeof(item) + 64 * len(item)
+    vertices = item.get('vertices')
+    if vertices:
+        size += 72 * len(vertices)
+    return size
+
+
+class Command(ABC):
+    """可撤销的命令的抽象基类"""
+
+    label = ""
+
+    def __init__(self):
+        self.size = 0
+
+    @abstractmethod
+    def undo(self, canvas):
+        """在画布上撤销命令"""
+        pass
+
+    @abstractmethod
+    def redo(self, canvas):
+        """在画布上重做命令"""
+        pass
+
+
+class AddItemsCommand(Command):
+    """新增图形；撤销时从列表末尾删除"""
+
+    label = "Ajout"
+
+    def __init__(self, states: Sequence[ItemState]):
+        super().__init__()
+        self.states = list(states)
+        self.size = sum(_state_size(state) for state in self.states)
+
+    def undo(self, canvas):
+        canvas.remove_items([(kind, index) for kind, index, _, _ in self.states])
+
+    def redo(self, canvas):
+        canvas.insert_items(self.states)
+
+
+class RemoveItemsCommand(AddItemsCommand):
+    """删除图形；撤销时重新插入"""
+
+    label = "Suppression"
+
+    def undo(self, canvas):
+        AddItemsCommand.redo(self, canvas)
+
+    def redo(self, canvas):
+        AddItemsCommand.undo(self, canvas)
+
+
+class SetItemsCommand(Command):
+    """修改图形（移动、变换、样式）；保存修改前后的状态副本"""
+
+    label = "Modification"
+
+    def __init__(self, before: Sequence[ItemState], after: Sequence[ItemState]):
+        super().__init__()
+        self.before = list(before)
+        self.after = list(after)
+        self.size = sum(_state_size(state) for state in self.before + self.after)
+
+    def undo(self, canvas):
+        canvas.set_items(self.before)
+
+    def redo(self, canvas):
+        canvas.set_items(self.after)
+
+    def merge(self, newer: 'SetItemsCommand') -> 'SetItemsCommand':
+        """与之后的修改合并：保留最早的“修改前”和最新的“修改后”"""
+        before = {state[:2]: state for state in newer.before}
+        before.update({state[:2]: state for state in self.before})
+        after = {state[:2]: state for state in self.after}
+        after.update({state[:2]: state for state in newer.after})
+        return SetItemsCommand(list(before.values()), list(after.values()))
+
+
+class ReplaceSceneCommand(Command):
+    """整体替换场景（清除、加载文件）；保存前后两组列表的引用"""
+
+    label = "Remplacement"
+
+    def __init__(self, before: Tuple[list, list, list, list], after: Tuple[list, list, list, list]):
+        super().__init__()
+        self.before = before
+        self.after = after
+        points, lines, _, shapes = before
+        count = len(points) + len(lines) + len(shapes)
+        points, lines, _, shapes = after
+        count += len(points) + len(lines) + len(shapes)
+        self.size = _ITEM_BYTES * count
+
+    def undo(self, canvas):
+        canvas.replace_scene(*self.before)
+
+    def redo(self, canvas):
+        canvas.replace_scene(*self.after)
+
+
+class CompositeCommand(Command):
+    """同一次用户操作产生的多个命令"""
+
+    def __init__(self, commands: List[Command]):
+        super().__init__()
+        self.commands = commands
+        self.size = sum(command.size for command in commands)
+        self.label = commands[-1].label if commands else ""
+
+    def undo(self, canvas):
+        for command in reversed(self.commands):
+            command.undo(canvas)
+
+    def redo(self, canvas):
+        for command in self.commands:
+            command.redo(canvas)
+
+
+class UndoStack(QObject):
+    """监听 Canvas.scene_edited 的撤销/重做栈
+
+    Args:
+        canvas: 画布
+        max_bytes: 历史占用内存的上限（估算值）
+    """
+
+    changed = pyqtSignal()  # 可撤销/可重做状态改变
+
+    def __init__(self, canvas, max_bytes: int = DEFAULT_MAX_BYTES, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.max_bytes = max_bytes
+        self.undo_commands: List[Command] = []
+        self.redo_commands: List[Command] = []
+        self.total_bytes = 0
+        self._group: List[Command] = []
+        self._replaying = False
+        canvas.scene_edited.connect(self._on_edit)
+
+    # ------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------
+
+    def _on_edit(self, edit: Dict[str, Any]):
+        """把画布的编辑转换为命令，加入当前分组"""
+        if self._replaying:
+            return
+        op = edit['op']
+        if op == 'add':
+            command = AddItemsCommand(edit['items'])
+        elif op == 'remove':
+            command = RemoveItemsCommand(edit['items'])
+        elif op == 'set':
+            before = edit.get('before')
+            if before is None:
+                return  # 没有修改前的状态，无法撤销
+            after = [(kind, index, copy_item(item), text) for kind, index, item, text in edit['items']]
+            command = SetItemsCommand(before, after)
+        elif op == 'clear':
+            command = ReplaceSceneCommand(edit['previous'], ([], [], [], []))
+        elif op == 'load':
+            # 加载由 clear 和逐批追加组成：把分组中的清除命令的“之后”换成加载结果
+            after = (list(self.canvas.points), list(self.canvas.lines),
+                     list(self.canvas.line_texts), list(self.canvas.shapes))
+            previous = [c for c in self._group if isinstance(c, ReplaceSceneCommand)]
+            before = previous[0].before if previous else ([], [], [], [])
+            self._group = [c for c in self._group if not isinstance(c, ReplaceSceneCommand)]
+            command = ReplaceSceneCommand(before, after)
+        else:
+            return
+        if not self._group:
+            QTimer.singleShot(0, self.close_group)
+        self._group.append(command)
+
+    def close_group(self):
+        """结束当前分组，作为一个命令压入撤销栈"""
+        if not self._group:
+            return
+        commands, self._group = self._group, []
+        self.push(commands[0] if len(commands) == 1 else CompositeCommand(commands))
+
+    def push(self, command: Command):
+        """压入命令并清空重做栈"""
+        self.undo_commands.append(command)
+        self.total_bytes += command.size
+        for dropped in self.redo_commands:
+            self.total_bytes -= dropped.size
+        self.redo_commands = []
+        self._enforce_budget()
+        self.changed.emit()
+
+    def _enforce_budget(self):
+        """超过内存上限时先合并最早的两个修改命令，否则丢弃最早的命令"""
+        while self.total_bytes > self.max_bytes and len(self.undo_commands) > 1:
+            first, second = self.undo_commands[0], self.undo_commands[1]
+            if isinstance(first, SetItemsCommand) and isinstance(second, SetItemsCommand):
+                merged = first.merge(second)
+                self.undo_commands[0:2] = [merged]
+                self.total_bytes += merged.size - first.size - second.size
+            else:
+                self.undo_commands.pop(0)
+                self.total_bytes -= first.size
+
+    # ------------------------------------------------------------------
+    # 撤销与重做
+    # ------------------------------------------------------------------
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_commands) or bool(self._group)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_commands)
+
+    def undo(self):
+        """撤销最近的命令"""
+        self.close_group()
+        if not self.undo_commands:
+            return
+        command = self.undo_commands.pop()
+        self._replay(command.undo)
+        self.redo_commands.append(command)
+        self.changed.emit()
+
+    def redo(self):
+        """重做最近撤销的命令"""
+        self.close_group()
+        if not self.redo_commands:
+            return
+        command = self.redo_commands.pop()
+        self._replay(command.redo)
+        self.undo_commands.append(command)
+        self.changed.emit()
+
+    def clear(self):
+        """清空历史"""
+        self._group = []
+        self.undo_commands = []
+        self.redo_commands = []
+        self.total_bytes = 0
+        self.changed.emit()
+
+    def _replay(self, action):
+        self._replaying = True
+        try:
+            action(self.canvas)
+        finally:
+            self._replaying = False
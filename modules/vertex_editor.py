@@ -0,0 +1,273 @@
+"""
+顶点编辑器：直接拖动已完成图形的顶点、边、圆心和半径手柄。
+
+每一帧只更新受影响图形的缓存几何、长度文本、空间索引中的包围盒，
+并只重绘这些图形所在的区域，相邻内容不会重新计算。
+"""
+import math
+from typing import Any, Dict, Optional, Set, Tuple
+
+from modules.transformations import copy_item
+from modules.triangle_analysis import analyze_triangle
+
+# 手柄的命中半径（屏幕像素）
+HANDLE_RADIUS = 8
+
+
+class VertexEditor:
+    """编辑模式的鼠标处理器，接口与 ShapeHandler 的鼠标方法一致"""
+
+    shape_type = None
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.is_active = False
+        self.drag = None  # 当前拖动状态
+        self.touched = set()  # 本次拖动修改过的图形键
+        self.before = {}  # 被修改图形在拖动前的状态（供撤销）
+        self.moved = False
+
+    def activate(self):
+        """激活编辑模式"""
+        self.is_active = True
+        self.drag = None
+        self.canvas.draw_mode = None
+        self.canvas.current_shape = None
+        self.canvas.line_start_point = None
+        self.canvas.temp_shape = None
+
+    def deactivate(self):
+        """停用编辑模式"""
+        self.is_active = False
+        self.drag = None
+
+    # ------------------------------------------------------------------
+    # 命中测试
+    # ------------------------------------------------------------------
+
+    def hit_test(self, sx: float, sy: float) -> Optional[Tuple]:
+        """查找鼠标位置下的手柄，优先级：顶点 > 圆的半径 > 边
+
+        Returns:
+            ('vertex', 顶点编号, 图形键)、('radius', 形状下标) 或
+            ('edge', 线段下标)，没有命中时返回 None
+        """
+        canvas = self.canvas
+        keys = canvas.spatial_index.query_point(sx, sy, HANDLE_RADIUS)
+        limit = HANDLE_RADIUS * HANDLE_RADIUS
+
+        # 顶点：点、多边形顶点、圆心
+        best, best_dist = None, limit
+        for kind, index in keys:
+            for px, py in self._handle_positions(kind, index):
+                dist = (px - sx) ** 2 + (py - sy) ** 2
+                if dist <= best_dist:
+                    best, best_dist = (px, py, (kind, index)), dist
+        if best is not None:
+            vertex_id = canvas.topology.find_vertex(best[0], best[1])
+            if vertex_id is not None:
+                return ('vertex', vertex_id, best[2])
+
+        # 圆的半径手柄：圆周附近
+        for kind, index in keys:
+            if kind == 'shape' and canvas.shapes[index]['type'] == 'circle':
+                shape = canvas.shapes[index]
+                center_x, center_y = shape['center']
+                if abs(math.hypot(sx - center_x, sy - center_y) - shape['radius']) <= HANDLE_RADIUS:
+                    return ('radius', index)
+
+        # 边
+        for kind, index in keys:
+            if kind == 'line':
+                line = canvas.lines[index]
+                if _segment_distance(sx, sy, line) <= HANDLE_RADIUS:
+                    return ('edge', index)
+        return None
+
+    def _handle_positions(self, kind: str, index: int):
+        """图形的顶点手柄位置"""
+        canvas = self.canvas
+        if kind == 'point':
+            point = canvas.points[index]
+            return [(point['x'], point['y'])]
+        if kind == 'shape':
+            shape = canvas.shapes[index]
+            if shape['type'] == 'circle':
+                return [shape['center']]
+            return shape.get('vertices', [])
+        return []
+
+    # ------------------------------------------------------------------
+    # 鼠标事件
+    # ------------------------------------------------------------------
+
+    def handle_mouse_press(self, x: float, y: float):
+        """按下鼠标：选中并开始拖动命中的手柄"""
+        canvas = self.canvas
+        sx, sy = canvas.grid_to_screen(x, y)
+        hit = self.hit_test(sx, sy)
+        self.touched = set()
+        self.before = {}
+        self.moved = False
+        if hit is None:
+            self.drag = None
+            canvas.selection = set()
+            canvas.update()
+            return
+
+        if hit[0] == 'vertex':
+            vertex_id = hit[1]
+            topology = canvas.topology
+            offset = (topology.vx[vertex_id] - sx, topology.vy[vertex_id] - sy)
+            if topology.point_of[vertex_id] >= 0:
+                self.touched.add(('point', topology.point_of[vertex_id]))
+            self.drag = ('vertex', vertex_id, offset)
+            canvas.selection = {hit[2]}
+        elif hit[0] == 'radius':
+            self.drag = ('radius', hit[1])
+            canvas.selection = {('shape', hit[1])}
+        else:
+            line = canvas.lines[hit[1]]
+            ends = [canvas.topology.find_vertex(line['x1'], line['y1']),
+                    canvas.topology.find_vertex(line['x2'], line['y2'])]
+            topology = canvas.topology
+            starts = [(topology.vx[v], topology.vy[v]) for v in ends if v is not None]
+            self.drag = ('edge', [v for v in ends if v is not None], starts, (sx, sy))
+            self.touched.update(('point', topology.point_of[v]) for v in ends
+                                if v is not None and topology.point_of[v] >= 0)
+            canvas.selection = {('line', hit[1])}
+        canvas.update()
+
+    def handle_mouse_move(self, x: float, y: float):
+        """拖动：只更新受影响的图形"""
+        if not self.drag:
+            return
+        canvas = self.canvas
+        sx, sy = canvas.grid_to_screen(x, y)
+        lines: Set[int] = set()
+        shapes: Set[int] = set()
+        if not self.moved:
+            self._capture_before()
+
+        if self.drag[0] == 'vertex':
+            _, vertex_id, (dx, dy) = self.drag
+            moved_lines, moved_shapes = canvas.move_vertex(vertex_id, sx + dx, sy + dy)
+            lines |= moved_lines
+            shapes |= moved_shapes
+        elif self.drag[0] == 'edge':
+            _, vertex_ids, starts, (start_x, start_y) = self.drag
+            dx, dy = sx - start_x, sy - start_y
+            for vertex_id, (vx, vy) in zip(vertex_ids, starts):
+                moved_lines, moved_shapes = canvas.move_vertex(vertex_id, vx + dx, vy + dy)
+                lines |= moved_lines
+                shapes |= moved_shapes
+        else:
+            shape_index = self.drag[1]
+            shape = canvas.shapes[shape_index]
+            center_x, center_y = shape['center']
+            shape['radius'] = max(1.0, math.hypot(sx - center_x, sy - center_y))
+            canvas.refresh_items([('shape', shape_index)])
+            shapes.add(shape_index)
+
+        self.moved = True
+        self.touched.update(('line', i) for i in lines)
+        self.touched.update(('shape', i) for i in shapes)
+        self._emit_measurements(lines, shapes)
+
+    def handle_mouse_release(self, x: float, y: float):
+        """结束拖动，把修改过的图形作为一次编辑提交"""
+        if self.drag and self.moved:
+            keys = self.canvas.spatial_index.sorted_keys(self.touched)
+            self.canvas.commit_items(keys, 'set', [self.before[key] for key in keys])
+        self.drag = None
+        self.touched = set()
+        self.before = {}
+
+    def _capture_before(self):
+        """在第一次移动前记录所有可能被修改的图形的状态"""
+        canvas = self.canvas
+        topology = canvas.topology
+        if self.drag[0] == 'radius':
+            keys = {('shape', self.drag[1])}
+        else:
+            vertex_ids = [self.drag[1]] if self.drag[0] == 'vertex' else self.drag[1]
+            keys = set(self.touched)
+            for vertex_id in vertex_ids:
+                keys.update(('line', index) for index, _ in topology.incident_lines(vertex_id))
+                keys.update(('shape', index) for index, _ in topology.vertex_shapes[vertex_id])
+        for kind, index in keys:
+            _, _, item, text = canvas.item_state(kind, index)
+            self.before[(kind, index)] = (kind, index, copy_item(item), text)
+
+    # ------------------------------------------------------------------
+    # 信息显示
+    # ------------------------------------------------------------------
+
+    def _emit_measurements(self, lines: Set[int], shapes: Set[int]):
+        """发送被编辑图形的实时度量（复用形状预览信号）"""
+        canvas = self.canvas
+        preview = None
+        if shapes:
+            preview = self._shape_preview(canvas.shapes[min(shapes)])
+        elif lines:
+            line = canvas.lines[min(lines)]
+            x1, y1 = canvas.screen_to_grid(line['x1'], line['y1'])
+            x2, y2 = canvas.screen_to_grid(line['x2'], line['y2'])
+            preview = {
+                'type': 'line_preview',
+                'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2,
+                'length': math.hypot(x2 - x1, y2 - y1),
+                'angle': math.degrees(math.atan2(y2 - y1, x2 - x1)) % 360
+            }
+        if preview:
+            canvas.shape_preview.emit(preview)
+
+    def _shape_preview(self, shape: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """形状的网格单位度量"""
+        canvas = self.canvas
+        spacing = canvas.grid_spacing
+        if shape['type'] == 'circle':
+            center_x, center_y = canvas.screen_to_grid(*shape['center'])
+            radius = shape['radius'] / spacing
+            return {
+                'type': 'circle_preview',
+                'center_x': center_x, 'center_y': center_y,
+                'radius': radius, 'area': math.pi * radius * radius
+            }
+        vertices = [canvas.screen_to_grid(x, y) for x, y in shape.get('vertices', [])]
+        if shape['type'] == 'triangle' and len(vertices) == 3:
+            analysis = analyze_triangle(vertices)
+            side_bc, side_ca, side_ab = analysis.sides
+            (x1, y1), (x2, y2), (x3, y3) = vertices
+            return {
+                'type': 'triangle_preview',
+                'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2, 'x3': x3, 'y3': y3,
+                'sides': [side_ab, side_bc, side_ca],
+                'area': analysis.area,
+                'angles': list(analysis.angles),
+                'angle_type': analysis.angle_type,
+                'side_type': analysis.side_type
+            }
+        if shape['type'] == 'rectangle' and vertices:
+            xs = [x for x, _ in vertices]
+            ys = [y for _, y in vertices]
+            if len(set(xs)) > 2 or len(set(ys)) > 2:
+                return None  # 拖动后不再是轴对齐矩形
+            width, height = max(xs) - min(xs), max(ys) - min(ys)
+            return {
+                'type': 'rectangle_preview',
+                'x1': min(xs), 'y1': max(ys), 'x2': max(xs), 'y2': min(ys),
+                'width': width, 'height': height, 'area': width * height
+            }
+        return None
+
+
+def _segment_distance(px: float, py: float, line: Dict[str, float]) -> float:
+    """点到线段的距离"""
+    x1, y1, x2, y2 = line['x1'], line['y1'], line['x2'], line['y2']
+    dx, dy = x2 - x1, y2 - y1
+    length2 = dx * dx + dy * dy
+    if length2 == 0:
+        return math.hypot(px - x1, py - y1)
+    t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length2))
+    return math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
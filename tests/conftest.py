@@ -0,0 +1,27 @@
+"""
+测试的公共设置：项目根目录加入 sys.path，Qt 使用 offscreen 平台（不需要显示器）。
+"""
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """整个测试会话共用一个 QApplication"""
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def canvas(qapp):
+    """一个空画布（800×600）"""
+    from modules.canvas import Canvas
+    widget = Canvas()
+    widget.resize(800, 600)
+    yield widget
+    widget.deleteLater()
@@ -0,0 +1,70 @@
+"""面积引擎：相同、相切、包含和分离的图形与解析面积比较，扫描线和边界积分两条路径"""
+import math
+
+import pytest
+
+from modules.area_engine import (circle_primitive, overlap_area, overlap_areas, polygon_primitive,
+                                 rect_primitive, scene_overlap_areas, scene_union_area, union_area)
+
+PI = math.pi
+LENS = 2 * PI / 3 - math.sqrt(3) / 2  # 两个单位圆，圆心距为 1
+DIAMOND = polygon_primitive([(1, 0), (0, 1), (-1, 0), (0, -1)])  # 内接于单位圆的正方形，面积 2
+
+
+@pytest.mark.parametrize('a, b, union, overlap', [
+    # 相同
+    (circle_primitive(0, 0, 1), circle_primitive(0, 0, 1), PI, PI),
+    (rect_primitive(0, 0, 2, 3), rect_primitive(0, 0, 2, 3), 6, 6),
+    (DIAMOND, DIAMOND, 2, 2),
+    # 外切和内切
+    (circle_primitive(0, 0, 1), circle_primitive(2, 0, 1), 2 * PI, 0),
+    (circle_primitive(0, 0, 2), circle_primitive(1, 0, 1), 4 * PI, PI),
+    (circle_primitive(0, 0, 1), rect_primitive(1, -1, 3, 1), PI + 4, 0),
+    (rect_primitive(0, 0, 1, 1), rect_primitive(1, 0, 2, 1), 2, 0),
+    (polygon_primitive([(0, 0), (2, 0), (0, 2)]), rect_primitive(0, 0, 2, 2), 4, 2),  # 两条边重合
+    # 包含
+    (circle_primitive(0, 0, 1), rect_primitive(-2, -2, 2, 2), 16, PI),
+    (circle_primitive(0, 0, 3), circle_primitive(0.5, 0, 1), 9 * PI, PI),
+    (DIAMOND, circle_primitive(0, 0, 1), PI, 2),  # 顶点在圆周上
+    (rect_primitive(0, 0, 4, 4), rect_primitive(1, 1, 2, 3), 16, 2),
+    # 分离
+    (circle_primitive(0, 0, 1), circle_primitive(5, 5, 2), 5 * PI, 0),
+    (circle_primitive(0, 0, 1), polygon_primitive([(3, 3), (4, 3), (3, 4)]), PI + 0.5, 0),
+    (rect_primitive(0, 0, 1, 1), rect_primitive(3, 3, 5, 4), 3, 0),
+    # 部分重叠
+    (circle_primitive(0, 0, 1), circle_primitive(1, 0, 1), 2 * PI - LENS, LENS),
+    (circle_primitive(0, 0, 1), rect_primitive(0, -5, 5, 5), PI / 2 + 50, PI / 2),
+    (rect_primitive(0, 0, 2, 2), rect_primitive(1, 1, 3, 3), 7, 1),
+])
+def test_pairs_against_closed_forms(a, b, union, overlap):
+    assert union_area([a, b]) == pytest.approx(union, rel=1e-9, abs=1e-9)
+    assert union_area([b, a]) == pytest.approx(union, rel=1e-9, abs=1e-9)
+    assert overlap_area(a, b) == pytest.approx(overlap, rel=1e-9, abs=1e-9)
+    assert overlap_area(b, a) == pytest.approx(overlap, rel=1e-9, abs=1e-9)
+
+
+def test_three_identical_circles_count_once():
+    circle = circle_primitive(2, 2, 1.5)
+    assert union_area([circle] * 3) == pytest.approx(2.25 * PI)
+    assert [(i, j) for i, j, _ in overlap_areas([circle] * 3)] == [(0, 1), (0, 2), (1, 2)]
+
+
+def test_rectangle_sweep_matches_inclusion_exclusion():
+    rects = [rect_primitive(0, 0, 4, 2), rect_primitive(2, 1, 6, 3), rect_primitive(3, 0, 5, 4)]
+    # 8 + 8 + 8 − (2 + 2 + 4) + 1
+    assert union_area(rects) == pytest.approx(17)
+    assert sorted((i, j) for i, j, _ in overlap_areas(rects)) == [(0, 1), (0, 2), (1, 2)]
+
+
+def test_scene_areas_are_in_grid_units(canvas):
+    spacing = canvas.grid_spacing
+    canvas.add_shape({'type': 'circle', 'center': (100, 100), 'radius': spacing, 'color': '#1B5E20'})
+    canvas.add_shape({'type': 'circle', 'center': (100 + spacing, 100), 'radius': spacing, 'color': '#1B5E20'})
+    canvas.add_shape({'type': 'rectangle', 'color': '#1A237E',
+                      'vertices': [(500, 400), (500 + spacing, 400), (500 + spacing, 400 + spacing),
+                                   (500, 400 + spacing)]})
+    canvas.add_shape({'type': 'circle', 'center': (0, 0), 'radius': 0, 'color': '#1B5E20'})  # 被忽略
+    assert scene_union_area(canvas) == pytest.approx(2 * PI - LENS + 1)
+    assert scene_union_area(canvas, [2]) == pytest.approx(1)
+    [(i, j, area)] = scene_overlap_areas(canvas)
+    assert (i, j) == (0, 1) and area == pytest.approx(LENS)
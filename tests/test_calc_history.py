@@ -0,0 +1,80 @@
+"""计算器历史：跨块边界的分页读取、被截断的最后一行和字段类型不对的条目"""
+import json
+
+import pytest
+from PyQt6.QtCore import Qt
+
+from modules.calc_history import _BLOCK_SIZE, PAGE_SIZE, HistoryFile, HistoryModel
+from modules.numeric import FLOAT
+
+
+def entry(i):
+    return {'expression': f"{i}+{'0' * (i % 50)}1", 'result': str(i + 1), 'mode': FLOAT.label,
+            'backend': repr(FLOAT), 'time': 1_700_000_000 + i}
+
+
+def write_history(path, entries, tail=b''):
+    with open(path, 'wb') as stream:
+        for item in entries:
+            stream.write(json.dumps(item, ensure_ascii=False).encode('utf-8') + b'\n')
+        stream.write(tail)
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return str(tmp_path / 'history.jsonl')
+
+
+def test_pages_cross_block_boundaries(history_path):
+    expected = [entry(i) for i in range(3000)]
+    write_history(history_path, expected)
+    history = HistoryFile(history_path)
+    assert history._cursor > 3 * _BLOCK_SIZE  # 至少跨越三个块，必然有行被块边界切开
+
+    pages = []
+    while not history.exhausted:
+        pages.append(history.read_older(PAGE_SIZE))
+    history.close()
+    assert [len(page) for page in pages[:-1]] == [PAGE_SIZE] * (len(pages) - 1)
+    assert [item for page in pages for item in page] == expected[::-1]
+
+
+def test_torn_last_line_is_skipped(history_path):
+    write_history(history_path, [entry(i) for i in range(500)], tail=b'{"expression":"1+1","res')
+    history = HistoryFile(history_path)
+    entries = history.read_older(1000)
+    assert [item['result'] for item in entries] == [str(i + 1) for i in reversed(range(500))]
+
+    history.append(entry(500))  # 之后追加的条目不会和截断的行混在一起被向前读取
+    assert history.exhausted and history.read_older() == []
+    history.close()
+
+
+@pytest.mark.parametrize('line', [
+    {'expression': 1, 'result': '1'},
+    {'expression': '1+1'},
+    {'expression': '1+1', 'result': None},
+    {'expression': ['1'], 'result': '1'},
+    {'result': '2'},
+    ['1+1', '2'],
+    '1+1',
+])
+def test_malformed_entries_are_skipped(qapp, history_path, line):
+    write_history(history_path, [entry(1), line, entry(2)])
+    model = HistoryModel(HistoryFile(history_path))
+    assert model.rowCount() == 2
+    assert [model.data(model.index(row), Qt.ItemDataRole.DisplayRole) for row in range(2)] == [
+        "2+001 = 3", "1+01 = 2"]
+    model.history.close()
+
+
+def test_optional_fields_of_the_wrong_type(qapp, history_path):
+    write_history(history_path, [{'expression': '6×7', 'result': '42', 'backend': ['float'], 'time': 'hier'},
+                                 {'expression': '2+2', 'result': '4', 'time': 10 ** 30}])
+    model = HistoryModel(HistoryFile(history_path))
+    assert model.rowCount() == 2
+    for row in range(2):
+        assert model.data(model.index(row), Qt.ItemDataRole.ToolTipRole).startswith(' — ')
+    assert model.data(model.index(1), HistoryModel.ResultRole) == '42'
+    assert model.memo.results == {}  # 没有记录后端的条目不填入记忆表
+    model.history.close()
@@ -0,0 +1,141 @@
+"""批量导入：行的校验、CSV 和 JSON Lines 的解析，以及导入后的缓存和编辑提交"""
+import io
+import os
+import threading
+
+import pytest
+from PyQt6.QtCore import QEventLoop, QTimer
+
+from modules.data_import import DataImporter, import_file, iter_rows, row_to_items
+from modules.topology import Topology
+from modules.undo import UndoStack
+
+FRAME = (400.0, 300.0, 50.0)  # 原点在 (400, 300)，每个网格单位 50 像素
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('row, message', [
+    ({'type': 'hexagone', 'x': 1, 'y': 1}, "Type inconnu: 'hexagone'"),
+    ({'type': None}, "Type inconnu: None"),
+    ({'type': 'point', 'x': 1}, "Champ manquant: y"),
+    ({'type': 'point', 'x': 1, 'y': ''}, "Champ manquant: y"),
+    ({'type': 'point', 'x': 'abc', 'y': 1}, "Valeur non numérique pour x: 'abc'"),
+    ({'type': 'point', 'x': [1], 'y': 1}, "Valeur non numérique pour x: [1]"),
+    ({'type': 'point', 'x': 'nan', 'y': 1}, "Valeur non finie pour x: 'nan'"),
+    ({'type': 'segment', 'x1': 0, 'y1': 0, 'x2': 'inf', 'y2': 0}, "Valeur non finie pour x2: 'inf'"),
+    ({'type': 'circle', 'x': 0, 'y': 0, 'r': 0}, "Le rayon doit être positif"),
+    ({'type': 'rectangle', 'x': 0, 'y': 0, 'width': -1, 'height': 1},
+     "La largeur et la hauteur doivent être positives"),
+    ({'type': 'triangle', 'x1': 0, 'y1': 0, 'x2': 1, 'y2': 1, 'x3': 2, 'y3': 2}, "Les trois sommets sont alignés"),
+    ({'type': None, '_invalid': "JSON invalide"}, "JSON invalide"),
+])
+def test_invalid_rows(row, message):
+    with pytest.raises(ValueError) as error:
+        row_to_items(row, FRAME)
+    assert str(error.value) == message
+
+
+def test_point_and_segment_rows():
+    assert row_to_items({'type': 'point', 'x': '1', 'y': '2'}, FRAME) == [
+        ('point', {'x': 450.0, 'y': 200.0, 'color': '#E65100'}, None)]
+    items = row_to_items({'type': 'ligne', 'x1': 0, 'y1': 0, 'x2': 3, 'y2': 4, 'color': '#FF0000'}, FRAME)
+    assert [kind for kind, _, _ in items] == ['point', 'point', 'line']
+    assert items[2] == ('line', {'x1': 400.0, 'y1': 300.0, 'x2': 550.0, 'y2': 100.0, 'color': '#FF0000'}, "5.0")
+
+
+def test_shape_rows_produce_only_the_shape():
+    circle = row_to_items({'type': 'cercle', 'x': 1, 'y': 0, 'r': 2}, FRAME)
+    assert circle == [('shape', {'type': 'circle', 'center': (450.0, 300.0), 'radius': 100.0,
+                                 'color': '#1B5E20'}, None)]
+    rectangle = row_to_items({'type': 'rectangle', 'x': 0, 'y': 0, 'width': 2, 'height': 1}, FRAME)
+    assert rectangle == [('shape', {'type': 'rectangle', 'color': '#1A237E',
+                                    'vertices': [(400.0, 300.0), (500.0, 300.0), (500.0, 350.0), (400.0, 350.0)]},
+                          None)]
+    triangle = row_to_items({'type': 'triangle', 'x1': 0, 'y1': 0, 'x2': 1, 'y2': 0, 'x3': 0, 'y3': 1}, FRAME)
+    assert len(triangle) == 1 and triangle[0][1]['vertices'] == [(400.0, 300.0), (450.0, 300.0), (400.0, 250.0)]
+
+
+def test_csv_and_jsonl_rows():
+    stream = io.StringIO("type,x,y\npoint,1,2\n\ncercle,0,0\n")
+    assert list(iter_rows(stream, 'data.CSV')) == [(2, {'type': 'point', 'x': '1', 'y': '2'}),
+                                                   (4, {'type': 'cercle', 'x': '0', 'y': '0'})]
+    stream = io.StringIO('{"type": "point", "x": 1, "y": 2}\n\n{oops\n[1, 2]\n')
+    assert list(iter_rows(stream, 'data.jsonl')) == [
+        (1, {'type': 'point', 'x': 1, 'y': 2}),
+        (3, {'type': None, '_invalid': "JSON invalide"}),
+        (4, {'type': None, '_invalid': "JSON invalide"})]
+
+
+def test_import_file_reports_errors_and_commits_once(canvas, tmp_path):
+    path = write(tmp_path, 'scene.csv',
+                 "type,x,y,r,width,height,x1,y1,x2,y2,x3,y3,color\n"
+                 "segment,,,,,,0,0,2,0,,,\n"
+                 "rectangle,0,0,,2,1,,,,,,,\n"
+                 "triangle,,,,,,2,0,3,0,2,1,\n"
+                 "circle,5,5,0,,,,,,,,,\n"
+                 "inconnu,1,1,,,,,,,,,,\n")
+    stack = UndoStack(canvas)
+    progress = []
+    count, errors = import_file(canvas, path, chunk_size=2, progress=lambda done, total: progress.append(done))
+    stack.close_group()
+
+    assert count == 5  # 线段及其两个端点、矩形、三角形
+    assert errors == [(5, "Le rayon doit être positif"), (6, "Type inconnu: 'inconnu'")]
+    assert len(progress) == 3 and progress[-1] == os.path.getsize(path)  # 每两行一块
+    assert (len(canvas.points), len(canvas.lines), len(canvas.shapes)) == (2, 1, 2)
+    assert len(stack.undo_commands) == 1
+    stack.undo()
+    assert (len(canvas.points), len(canvas.lines), len(canvas.shapes)) == (0, 0, 0)
+
+
+def test_caches_are_rebuilt_after_import(canvas, tmp_path):
+    path = write(tmp_path, 'scene.jsonl',
+                 '{"type": "segment", "x1": 0, "y1": 0, "x2": 2, "y2": 0}\n'
+                 '{"type": "rectangle", "x": 0, "y": 0, "width": 2, "height": 1}\n'
+                 '{"type": "triangle", "x1": 2, "y1": 0, "x2": 3, "y2": 0, "x3": 2, "y3": 1}\n')
+    import_file(canvas, path)
+    topology = canvas.topology
+    # 线段端点、矩形和三角形共用的角焊接为同一个顶点
+    corner = topology.find_vertex(*canvas.grid_to_screen(2, 0))
+    assert corner is not None and topology.point_of[corner] >= 0
+    assert [shape for shape, _ in topology.vertex_shapes[corner]] == [0, 1]
+    assert len(topology.face_edges) == 2
+    assert topology.line_between(*canvas.grid_to_screen(0, 0), *canvas.grid_to_screen(2, 0)) == 0
+    # 空间索引包含所有图形
+    assert len(canvas.spatial_index) == 5
+    assert ('shape', 1) in canvas.spatial_index.query_point(*canvas.grid_to_screen(3, 0), 1)
+
+
+def test_background_import_adopts_caches_built_by_the_worker(canvas, qapp, tmp_path, monkeypatch):
+    canvas.add_point(*canvas.grid_to_screen(0, 0), '#E65100')  # 已有的点与导入的线段端点焊接
+    path = write(tmp_path, 'scene.jsonl',
+                 '{"type": "segment", "x1": 0, "y1": 0, "x2": 2, "y2": 0}\n'
+                 '{"type": "triangle", "x1": 2, "y1": 0, "x2": 3, "y2": 0, "x3": 2, "y3": 1}\n'
+                 '{"type": "cercle", "x": 0, "y": 0, "r": -1}\n')
+    importer = DataImporter(canvas)
+    results, summaries, rebuilt = [], [], []
+    rebuild = Topology.rebuild
+
+    def record_rebuild(topology, scene):
+        rebuilt.append(threading.current_thread() is threading.main_thread())
+        return rebuild(topology, scene)
+    monkeypatch.setattr(Topology, 'rebuild', record_rebuild)
+    importer.finished.connect(lambda count, errors: results.append((count, errors)))
+    canvas.batch_finished.connect(summaries.append)
+    importer.start(path, chunk_size=1)
+    loop = QEventLoop()
+    importer.finished.connect(loop.quit)
+    QTimer.singleShot(10_000, loop.quit)
+    loop.exec()
+
+    assert results == [(4, [(3, "Le rayon doit être positif")])]
+    assert rebuilt == [False]  # 拓扑只在工作线程中建立一次，主线程直接换入
+    assert len(canvas.points) == 3 and canvas.topology.find_vertex(*canvas.grid_to_screen(0, 0)) == 0
+    assert canvas.topology.line_between(*canvas.grid_to_screen(0, 0), *canvas.grid_to_screen(2, 0)) == 0
+    assert len(canvas.spatial_index) == 5
+    assert summaries == [{'points': 2, 'lines': 1, 'shapes': 1, 'edits': 1, 'cleared': False}]
@@ -0,0 +1,76 @@
+"""场景导出：SVG 是合法的 XML（颜色被转义），条带 PNG 与整幅渲染一致"""
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+from PyQt6.QtGui import QImage
+
+from modules.export import export_png, export_svg
+
+SVG = '{http://www.w3.org/2000/svg}'
+HOSTILE = 'R&D"/><script>alert(1)</script><x a="'
+
+
+def fill(canvas, color='#0277BD'):
+    canvas.add_point(100, 100, '#E65100')
+    canvas.add_point(250, 180, '#E65100')
+    canvas.add_line(100, 100, 250, 180, color)
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 60, 'color': color})
+    canvas.add_shape({'type': 'triangle', 'vertices': [(10, 10), (90, 10), (10, 70)], 'color': color})
+
+
+def test_svg_is_well_formed(canvas, tmp_path):
+    fill(canvas)
+    path = tmp_path / 'scene.svg'
+    assert export_svg(canvas, str(path)) == 5
+    root = ElementTree.parse(path).getroot()
+    groups = {group.get('id'): group for group in root.iter(SVG + 'g')}
+    assert len(groups['points']) == 2 and len(groups['lines']) == 1
+    assert [element.tag for element in groups['shapes']] == [SVG + 'circle', SVG + 'polygon']
+    assert groups['shapes'][1].get('points') == '10,10 90,10 10,70'
+    assert [text.text for text in groups['labels']] == ['A', 'B']
+
+
+def test_svg_escapes_colors(canvas, tmp_path):
+    fill(canvas, HOSTILE)
+    canvas.points[0]['color'] = HOSTILE
+    path = tmp_path / 'scene.svg'
+    export_svg(canvas, str(path))
+    root = ElementTree.parse(path).getroot()
+    assert not [element for element in root.iter() if element.tag.endswith('script')]
+    assert root.find(f'{SVG}g[@id="lines"]/{SVG}line').get('stroke') == HOSTILE
+    assert root.find(f'{SVG}g[@id="points"]/{SVG}circle').get('fill') == HOSTILE
+    assert {element.get('stroke') for element in root.find(f'{SVG}g[@id="shapes"]')} == {HOSTILE}
+
+
+def pixels(path):
+    """图片和逐行的 RGB 字节（去掉行尾按 4 字节对齐的填充，填充字节未初始化）"""
+    image = QImage(str(path)).convertToFormat(QImage.Format.Format_RGB888)
+    data = image.constBits()
+    data.setsize(image.sizeInBytes())
+    stride, row = image.bytesPerLine(), image.width() * 3
+    return image, b''.join(bytes(data[y * stride:y * stride + row]) for y in range(image.height()))
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_banded_png_matches_single_band(canvas, tmp_path, workers):
+    fill(canvas)
+    reference = tmp_path / 'reference.png'
+    size = export_png(canvas, str(reference), dpi=120, band_height=10 ** 6)
+    path = tmp_path / 'bands.png'
+    assert export_png(canvas, str(path), dpi=120, band_height=37, workers=workers) == size
+
+    image, data = pixels(path)
+    _, expected = pixels(reference)
+    assert (image.width(), image.height()) == size
+    assert QImage(str(path)).dotsPerMeterX() == round(120 / 0.0254)
+    # 条带平移后抗锯齿边缘的取整可能相差几个色阶，但不能缺少或错位内容
+    assert len(data) == len(expected)
+    assert max(abs(a - b) for a, b in zip(data, expected)) <= 16
+
+
+def test_parallel_bands_are_identical(canvas, tmp_path):
+    fill(canvas)
+    serial, parallel = tmp_path / 'serial.png', tmp_path / 'parallel.png'
+    export_png(canvas, str(serial), dpi=120, band_height=37)
+    export_png(canvas, str(parallel), dpi=120, band_height=37, workers=2)
+    assert serial.read_bytes() == parallel.read_bytes()
@@ -0,0 +1,119 @@
+"""表达式引擎和数值后端：优先级、× ÷、错误和每个后端的结果"""
+import decimal
+import re
+from fractions import Fraction
+
+import pytest
+
+from modules.expression import ExpressionError, compile_expression, evaluate
+from modules.numeric import FLOAT, FRACTION, DecimalBackend, NumericBackend, get_backend
+
+DECIMAL = get_backend('decimal', 30)
+ALL_BACKENDS = [FLOAT, FRACTION, DECIMAL]
+
+
+@pytest.mark.parametrize('backend', ALL_BACKENDS, ids=repr)
+@pytest.mark.parametrize('source, expected', [
+    ("2+3*4", "14"),
+    ("(2+3)*4", "20"),
+    ("2^3^2", "512"),      # 乘方右结合
+    ("-2^2", "-4"),        # 乘方优先于一元负号
+    ("10-4-3", "3"),       # 减法左结合
+    ("7%3", "1"),
+    ("2**10", "1024"),
+    ("10 − 4", "6"),       # Unicode 减号
+    ("min(3, 1, 2) + max(4, 9, 2)", "10"),
+    ("sqrt(16)", "4"),
+])
+def test_precedence_and_operators(backend, source, expected):
+    assert backend.format(evaluate(source, backend=backend)) == expected
+
+
+@pytest.mark.parametrize('backend, expected', [(FLOAT, "1.5"), (FRACTION, "3/2"), (DECIMAL, "1.5")], ids=repr)
+def test_multiplication_and_division_signs(backend, expected):
+    assert backend.format(evaluate("2×3÷4", backend=backend)) == expected
+    assert evaluate("2×3÷4", backend=backend) == evaluate("2*3/4", backend=backend)
+
+
+def test_float_backend():
+    assert evaluate("1/3") == pytest.approx(1 / 3)
+    assert FLOAT.format(evaluate("1/3")) == "0.333333"
+    assert type(evaluate("6/3")) is float and FLOAT.format(evaluate("6/3")) == "2"
+    assert type(evaluate("2^62")) is int
+
+
+def test_fraction_backend_is_exact():
+    assert evaluate("1/3+1/6", backend=FRACTION) == Fraction(1, 2)
+    assert evaluate("0.1+0.2", backend=FRACTION) == Fraction(3, 10)
+    assert type(evaluate("4/2", backend=FRACTION)) is int
+    assert type(evaluate("sqrt(2)", backend=FRACTION)) is float
+
+
+def test_decimal_backend_uses_its_precision():
+    assert evaluate("0.1+0.2", backend=DECIMAL) == decimal.Decimal("0.3")
+    assert DECIMAL.format(evaluate("1/3", backend=DECIMAL)) == "0." + "3" * 30
+    assert len(DECIMAL.format(evaluate("pi", backend=DECIMAL))) == 31
+    assert get_backend('decimal', 5).format(evaluate("2/3", backend=get_backend('decimal', 5))) == "0.66667"
+    with pytest.raises(ValueError):
+        DecimalBackend(0)
+
+
+def test_backends_compare_by_configuration():
+    assert get_backend('decimal', 30) == DECIMAL and hash(get_backend('decimal', 30)) == hash(DECIMAL)
+    assert get_backend('decimal', 12) != DECIMAL
+    assert FLOAT != FRACTION
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        NumericBackend()
+
+
+@pytest.mark.parametrize('source, message', [
+    ("", "Expression vide"),
+    ("2+", "Expression incomplète"),
+    ("(2", "« ) » attendu"),
+    ("2)", "« ) » inattendu en position 2"),
+    ("2 3", "« 3 » inattendu en position 3"),
+    ("$", "Caractère inattendu « $ » en position 1"),
+    ("foo(1)", "Fonction inconnue: foo"),
+    ("x+1", "Variable inconnue: x"),
+])
+def test_syntax_errors(source, message):
+    with pytest.raises(ExpressionError, match=re.escape(message)):
+        evaluate(source)
+
+
+@pytest.mark.parametrize('backend', ALL_BACKENDS, ids=repr)
+@pytest.mark.parametrize('source', ["1/0", "sqrt(-1)", "ln(-1)"])
+def test_calculation_errors(backend, source):
+    # 计算器把这些错误显示为 « Erreur »
+    with pytest.raises((ArithmeticError, ValueError)):
+        evaluate(source, backend=backend)
+
+
+def test_huge_integer_powers_are_refused():
+    for backend in (FLOAT, FRACTION):
+        with pytest.raises(OverflowError):
+            evaluate("9^9^9", backend=backend)
+    # 十进制的指数范围足够大，结果用科学计数法显示
+    assert "E+" in DECIMAL.format(evaluate("9^9^9", backend=DECIMAL))
+
+
+def test_huge_nested_powers_are_refused():
+    # 指数本身不大，但结果有 3 亿多位：在乘方之前按位数估计拒绝
+    for backend in (FLOAT, FRACTION):
+        for source in ("(10^10000)^10000", "x^10000"):
+            with pytest.raises(OverflowError):
+                evaluate(source, {'x': 10 ** 10000}, backend=backend)
+    with pytest.raises(OverflowError):
+        evaluate("(1/3^5000)^1000", backend=FRACTION)
+    assert evaluate("(10^100)^100") == 10 ** 10000
+    assert "E+" in DECIMAL.format(evaluate("(10^10000)^10000", backend=DECIMAL))
+
+
+def test_compiled_expression_with_variables():
+    expression = compile_expression("x^2 + 2×y")
+    assert expression.variables == ('x', 'y')
+    assert expression(x=3, y=1) == 11
+    assert evaluate("x÷4", {'x': 2}) == 0.5
@@ -0,0 +1,128 @@
+"""编辑日志：回放、不完整的尾部、加载后删除原文件和会话坐标系"""
+import os
+
+import pytest
+
+from modules.journal import JOURNAL_FILE, EditJournal, recover_state
+from modules.scene_io import canvas_frame, insert_records, load_scene, save_scene
+
+
+@pytest.fixture
+def journal(canvas, tmp_path):
+    journal = EditJournal(str(tmp_path / 'autosave'), commit_interval=0)
+    journal.attach(canvas)
+    yield journal
+    journal.close()
+
+
+def records(state):
+    return list(state.records())
+
+
+def test_edits_are_recovered(canvas, journal):
+    canvas.add_point(100, 100, '#E65100')
+    canvas.add_line(100, 100, 300, 100, '#0277BD')
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 50, 'color': '#1B5E20'})
+    canvas.remove_items([('point', 0)])
+    assert journal.flush(5)
+    state, seq, _ = recover_state(journal.directory)
+    assert seq == journal.seq
+    assert [record['kind'] for record in records(state)] == ['line', 'shape']
+    assert state.lines[0]['x2'] == pytest.approx((300 - 400) / 50)
+
+
+def test_recovery_matches_after_compaction(canvas, journal):
+    for i in range(20):
+        canvas.add_point(10 + i * 5, 10, '#E65100')
+    journal.close()
+    assert journal.stats['compactions'] >= 1
+    assert os.path.getsize(os.path.join(journal.directory, JOURNAL_FILE)) == 0
+    state, _, _ = recover_state(journal.directory)
+    assert len(state.points) == len(canvas.points)
+
+
+def test_torn_tail_is_discarded(canvas, journal):
+    canvas.add_point(100, 100, '#E65100')
+    assert journal.flush(5)
+    with open(os.path.join(journal.directory, JOURNAL_FILE), 'ab') as stream:
+        stream.write(b'{"op":"add","seq":99,"items":[["point",1,')
+    state, seq, valid_end = recover_state(journal.directory)
+    assert len(state.points) == 1
+    assert seq == journal.seq
+    assert valid_end < os.path.getsize(os.path.join(journal.directory, JOURNAL_FILE))
+
+
+def test_malformed_entries_are_skipped(canvas, journal):
+    canvas.add_point(100, 100, '#E65100')
+    assert journal.flush(5)
+    seq = journal.seq
+    journal.close()
+    with open(os.path.join(journal.directory, JOURNAL_FILE), 'ab') as stream:
+        for line in ('{"op":"remove","seq":%d,"items":[["point",99]]}' % (seq + 1),
+                     '{"op":"add","items":[]}',
+                     '[1,2]',
+                     '{"op":"add","seq":"7","items":[]}',
+                     '{"op":"add","seq":%d,"items":[["point"]]}' % (seq + 2),
+                     '{"op":"add","seq":%d,"items":5}' % (seq + 3),
+                     '{"op":"add","seq":%d,"items":[["point",1,{"kind":"point","x":1,"y":1}]]}' % (seq + 4)):
+            stream.write(line.encode() + b'\n')
+    state, recovered_seq, _ = recover_state(journal.directory)
+    assert recovered_seq == seq + 4
+    assert len(state.points) == 2
+    reopened = EditJournal(journal.directory, commit_interval=0)
+    assert reopened.seq == seq + 4
+    reopened.close()
+
+
+def test_load_survives_deleted_source(canvas, journal, tmp_path):
+    canvas.add_point(100, 100, '#E65100')
+    canvas.add_point(200, 100, '#E65100')
+    path = str(tmp_path / 'scene.jsonl')
+    save_scene(canvas, path)
+    canvas.clear()
+    canvas.add_point(50, 50, '#0277BD')
+    load_scene(canvas, path)
+    canvas.add_point(300, 300, '#1B5E20')
+    assert journal.flush(5)
+    os.remove(path)
+    state, _, _ = recover_state(journal.directory)
+    assert [(record['x'], record['color']) for record in state.points] == [
+        ((100 - 400) / 50, '#E65100'), ((200 - 400) / 50, '#E65100'), ((300 - 400) / 50, '#1B5E20')]
+
+
+def test_load_is_compacted_not_logged(canvas, journal, tmp_path):
+    for i in range(50):
+        canvas.add_point(10 + i * 5, 10, '#E65100')
+    path = str(tmp_path / 'scene.jsonl')
+    save_scene(canvas, path)
+    compactions = journal.stats['compactions']
+    load_scene(canvas, path)
+    assert journal.flush(5)
+    assert journal.stats['compactions'] == compactions + 1
+    with open(os.path.join(journal.directory, JOURNAL_FILE), 'rb') as stream:
+        assert b'"load"' not in stream.read()
+
+
+def test_frame_is_fixed_for_the_session(canvas, journal):
+    frame = journal.frame
+    canvas.resize(1000, 700)
+    assert canvas_frame(canvas) != frame
+    canvas.add_point(100, 100, '#E65100')
+    assert journal.flush(5)
+    state, _, _ = recover_state(journal.directory)
+    origin_x, origin_y, spacing = frame
+    assert state.points[0]['x'] == pytest.approx((100 - origin_x) / spacing)
+    assert state.points[0]['y'] == pytest.approx((origin_y - 100) / spacing)
+
+
+def test_restore_into_new_canvas(canvas, journal, qapp):
+    from modules.canvas import Canvas
+    canvas.add_shape({'type': 'triangle', 'vertices': [(10, 10), (90, 10), (10, 70)], 'color': '#311B92'})
+    journal.close()
+    restored = Canvas()
+    restored.resize(800, 600)
+    state, _, _ = recover_state(journal.directory)
+    insert_records(restored, state.records(), journal.frame)
+    for vertex, expected in zip(restored.shapes[0]['vertices'], canvas.shapes[0]['vertices']):
+        assert vertex == pytest.approx(expected)
+    restored.deleteLater()
@@ -0,0 +1,47 @@
+"""函数曲线：常量子树出错、试算和出错的叠加图层"""
+import math
+
+import numpy as np
+
+import pytest
+
+from modules.expression import ExpressionError
+from modules.plotter import FunctionPlot, parse_function, sample
+
+
+@pytest.mark.parametrize('text', ['y = 1/0', 'y = x + 1/(2-2)', 'y = 0^-1 + x'])
+def test_constant_errors_become_infinite(text):
+    ys = parse_function(text).vector({'x': np.linspace(-1, 1, 5)})
+    assert not any(math.isfinite(y) for y in ys)
+
+
+@pytest.mark.parametrize('text', ['y = 1/0', 'y = x + 1/(2-2)'])
+def test_check_rejects_functions_without_finite_values(text):
+    with pytest.raises(ExpressionError):
+        FunctionPlot(text).check(-10, 10)
+
+
+@pytest.mark.parametrize('text', ['y = 1/x', 'y = tan(x)', 'y = sqrt(x)'])
+def test_check_accepts_partial_functions(text):
+    FunctionPlot(text).check(-10, 10)
+
+
+def test_sample_splits_at_discontinuity():
+    segments = sample(parse_function('y = 1/x'), -2, 2, 50, 10)
+    assert len(segments) == 2
+    assert all(y < 0 for y in segments[0][1]) and all(y > 0 for y in segments[1][1])
+
+
+def test_canvas_survives_failing_overlay(canvas):
+    class Failing:
+        def paint(self, painter, canvas):
+            raise RuntimeError("échec")
+
+    failing = Failing()
+    canvas.add_overlay(FunctionPlot('y = 1/0'))
+    canvas.add_overlay(failing)
+    canvas.grab()
+    canvas.grab()
+    assert canvas._failed_overlays == [failing]
+    canvas.remove_overlay(failing)
+    assert canvas._failed_overlays == []
@@ -0,0 +1,127 @@
+"""二进制场景格式：往返、SceneArchive 的校验和损坏的文件"""
+import struct
+
+import pytest
+
+from modules.scene_binary import (SceneArchive, _HEADER, _SECTION, load_binary_scene,
+                                  write_binary_scene)
+
+
+def fill(canvas):
+    canvas.add_point(100, 100, '#E65100')
+    canvas.add_line(100, 100, 250, 180, '#0277BD')
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 60, 'color': '#1B5E20'})
+    canvas.add_shape({'type': 'triangle', 'vertices': [(10, 10), (90, 10), (10, 70)], 'color': '#311B92'})
+
+
+def counts(canvas):
+    return len(canvas.points), len(canvas.lines), len(canvas.shapes)
+
+
+@pytest.fixture
+def scene_file(canvas, tmp_path):
+    fill(canvas)
+    path = tmp_path / 'scene.geob'
+    assert write_binary_scene(canvas, str(path)) == 4
+    return path
+
+
+def test_round_trip(canvas, scene_file):
+    points, lines, texts = [dict(p) for p in canvas.points], [dict(l) for l in canvas.lines], list(canvas.line_texts)
+    circle, triangle = (dict(shape) for shape in canvas.shapes)
+    canvas.clear()
+    assert load_binary_scene(canvas, str(scene_file)) == 4
+    assert canvas.points == points
+    assert canvas.lines == lines
+    assert canvas.line_texts == texts
+    assert canvas.shapes[0]['center'] == pytest.approx(circle['center'])
+    assert canvas.shapes[0]['radius'] == pytest.approx(circle['radius'])
+    assert canvas.shapes[1]['type'] == 'triangle'
+    for vertex, expected in zip(canvas.shapes[1]['vertices'], triangle['vertices']):
+        assert vertex == pytest.approx(expected)
+    assert len(canvas.spatial_index.boxes) == 4
+
+
+def test_archive_decodes_range(scene_file):
+    with SceneArchive(str(scene_file)) as archive:
+        assert len(archive) == 4
+        assert [kind for kind, _, _ in archive.records(1, 3)] == ['line', 'shape']
+
+
+def _sections(data):
+    count = _HEADER.unpack_from(data, 0)[3]
+    entries = {}
+    for i in range(count):
+        name, start, length = _SECTION.unpack_from(data, _HEADER.size + i * _SECTION.size)
+        entries[name.rstrip(b'\0').decode('ascii')] = (start, length)
+    return entries
+
+
+def _set_header(data, **fields):
+    magic, version, reserved, sections, count = _HEADER.unpack_from(data, 0)
+    values = dict(magic=magic, version=version, reserved=reserved, sections=sections, count=count)
+    values.update(fields)
+    _HEADER.pack_into(data, 0, *values.values())
+
+
+def _set_coordinate_offset(data, index, value):
+    start, _ = _sections(data)['coordoff']
+    struct.pack_into('<I', data, start + 4 * index, value)
+
+
+def _set_coordinate(data, index, value):
+    start, _ = _sections(data)['coords']
+    struct.pack_into('<d', data, start + 8 * index, value)
+
+
+def _set_color(data, index, value):
+    start, _ = _sections(data)['color']
+    struct.pack_into('<H', data, start + 2 * index, value)
+
+
+CORRUPTIONS = {
+    'count_too_large': lambda data: _set_header(data, count=100),
+    'count_too_small': lambda data: _set_header(data, count=1),
+    'too_many_sections': lambda data: _set_header(data, sections=10 ** 6),
+    'bad_magic': lambda data: data.__setitem__(slice(0, 8), b'NOTSCENE'),
+    'future_version': lambda data: _set_header(data, version=99),
+    'offset_past_coords': lambda data: _set_coordinate_offset(data, 4, 10 ** 6),
+    'decreasing_offsets': lambda data: _set_coordinate_offset(data, 1, 999),
+    'wrong_coordinate_count': lambda data: _set_coordinate_offset(data, 1, 1),
+    'nan_coordinate': lambda data: _set_coordinate(data, 0, float('nan')),
+    'infinite_coordinate': lambda data: _set_coordinate(data, 9, float('inf')),
+    'negative_radius': lambda data: _set_coordinate(data, 8, -60.0),  # 点 2 个、线段 4 个坐标之后是圆
+    'color_out_of_table': lambda data: _set_color(data, 2, 500),
+    'truncated': lambda data: data.__delitem__(slice(len(data) - 5, None)),
+    'header_only': lambda data: data.__delitem__(slice(_HEADER.size, None)),
+}
+
+
+@pytest.mark.parametrize('corruption', sorted(CORRUPTIONS))
+def test_corrupt_file_raises_value_error_and_keeps_scene(canvas, scene_file, tmp_path, corruption):
+    data = bytearray(scene_file.read_bytes())
+    CORRUPTIONS[corruption](data)
+    path = tmp_path / 'corrupt.geob'
+    path.write_bytes(bytes(data))
+    before = counts(canvas)
+    with pytest.raises(ValueError):
+        load_binary_scene(canvas, str(path))
+    assert counts(canvas) == before
+    assert len(canvas.spatial_index.boxes) == sum(before)
+
+
+def test_empty_file(canvas, tmp_path):
+    path = tmp_path / 'empty.geob'
+    path.write_bytes(b'')
+    with pytest.raises(ValueError):
+        load_binary_scene(canvas, str(path))
+
+
+def test_replace_scene_keeps_scene_when_caches_fail(canvas):
+    fill(canvas)
+    before = [dict(point) for point in canvas.points]
+    with pytest.raises(ValueError):
+        canvas.replace_scene([{'x': float('nan'), 'y': 0.0, 'color': '#E65100'}], [], [], [])
+    assert canvas.points == before and counts(canvas) == (1, 1, 2)
+    assert len(canvas.spatial_index.boxes) == 4
+    canvas.grab()  # 绘制不会遇到无效坐标
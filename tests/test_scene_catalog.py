@@ -0,0 +1,85 @@
+"""场景库：目录扫描跳过损坏的文件，缩略图任务和后台扫描"""
+import os
+import time
+
+import pytest
+from PyQt6.QtCore import QThreadPool
+
+from modules.scene_catalog import (CatalogEntry, LibraryBrowser, SceneCatalog, _ThumbnailSignals,
+                                   _ThumbnailTask)
+from modules.scene_io import scene_header, write_records
+
+TRIANGLE = {'kind': 'shape', 'type': 'triangle', 'color': '#311B92', 'vertices': [(0, 0), (4, 0), (0, 3)]}
+
+# 文件头和 JSON 都合法，但字段类型不对的记录
+MALFORMED = {
+    'texte.geo.jsonl': {'kind': 'point', 'x': 'a', 'y': 1},
+    'rayon.geo.jsonl': {'kind': 'shape', 'type': 'circle', 'center': (0, 0), 'radius': None},
+    'centre.geo.jsonl': {'kind': 'shape', 'type': 'circle', 'center': 5, 'radius': 1},
+    'sommets.geo.jsonl': {'kind': 'shape', 'type': 'triangle', 'vertices': [1, 2, 3]},
+    'vide.geo.jsonl': {'kind': 'shape', 'type': 'triangle', 'vertices': []},
+    'type.geo.jsonl': {'kind': 'shape', 'vertices': [(0, 0), (1, 0), (0, 1)]},
+    'immense.geo.jsonl': {'kind': 'shape', 'type': 'circle', 'center': (0, 0), 'radius': 10 ** 400},
+}
+
+
+def write_scene(path, *records):
+    with open(path, 'w', encoding='utf-8') as stream:
+        write_records([scene_header(), *records], stream)
+
+
+@pytest.fixture
+def library(tmp_path):
+    directory = tmp_path / 'library'
+    directory.mkdir()
+    write_scene(directory / 'triangle.geo.jsonl', TRIANGLE)
+    for name, record in MALFORMED.items():
+        write_scene(directory / name, record)
+    (directory / 'tronque.geob').write_bytes(b'GEOB')
+    (directory / 'entete.geo.jsonl').write_text('{"format": "autre"}\n', encoding='utf-8')
+    return directory
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = SceneCatalog(str(tmp_path / 'catalog.sqlite3'))
+    yield catalog
+    catalog.close()
+
+
+def test_scan_skips_malformed_scenes(catalog, library):
+    assert catalog.scan(str(library)) == 1
+    entries = catalog.page()
+    assert [entry.title for entry in entries] == ['triangle']
+    assert entries[0].total_area == 6.0
+
+    os.remove(library / 'triangle.geo.jsonl')
+    assert catalog.scan(str(library)) == 0
+    assert catalog.count() == 0
+
+
+@pytest.mark.parametrize('name', sorted(set(MALFORMED) - {'vide.geo.jsonl'}))  # 没有顶点的多边形直接跳过
+def test_thumbnail_task_survives_malformed_scene(qapp, library, tmp_path, name):
+    entry = CatalogEntry(1, str(library / name), name, '', 0.0, 0, dict.fromkeys(
+        ('points', 'lines', 'circles', 'rectangles', 'triangles', 'polygons'), 0), 0.0, (0.0, 0.0, 1.0, 1.0))
+    signals = _ThumbnailSignals()
+    rendered = []
+    signals.rendered.connect(lambda key, image, written: rendered.append((key, image.isNull(), written)))
+    _ThumbnailTask('cle', entry, str(tmp_path / 'cle.png'), 32, signals).run()
+    assert rendered == [('cle', True, 0)]
+
+
+def test_browser_scans_in_background(qapp, catalog, library):
+    browser = LibraryBrowser(catalog)
+    assert browser.model.total == 0
+    browser.scan(str(library))
+    assert browser.scanning and not browser.status.isHidden()
+    browser.scan(str(library))  # 扫描进行中，忽略
+
+    deadline = time.monotonic() + 10
+    while browser.scanning and time.monotonic() < deadline:
+        QThreadPool.globalInstance().waitForDone(50)
+        qapp.processEvents()
+    assert not browser.scanning and browser.status.isHidden()
+    assert browser.model.total == 1
+    browser.deleteLater()
@@ -0,0 +1,107 @@
+"""JSON Lines 场景文件：往返、文件头校验和损坏的文件"""
+import io
+import json
+
+import pytest
+
+from modules.scene_io import load_scene, read_header, record_to_item, save_scene, scene_header
+
+
+def fill(canvas):
+    canvas.add_point(100, 100, '#E65100')
+    canvas.add_line(100, 100, 250, 180, '#0277BD')
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 60, 'color': '#1B5E20'})
+    canvas.add_shape({'type': 'triangle', 'vertices': [(10, 10), (90, 10), (10, 70)], 'color': '#311B92'})
+
+
+def scene_of(canvas):
+    return ([dict(point) for point in canvas.points], [dict(line) for line in canvas.lines],
+            list(canvas.line_texts), [dict(shape) for shape in canvas.shapes])
+
+
+def write_lines(path, lines):
+    path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+    return str(path)
+
+
+def test_round_trip(canvas, tmp_path):
+    fill(canvas)
+    expected = scene_of(canvas)
+    path = str(tmp_path / 'scene.jsonl')
+    assert save_scene(canvas, path) == len(canvas.points) + len(canvas.lines) + len(canvas.shapes)
+    canvas.clear()
+    load_scene(canvas, path)
+    points, lines, texts, shapes = scene_of(canvas)
+    assert points == expected[0]
+    assert lines == expected[1]
+    assert texts == expected[2]
+    assert [shape['type'] for shape in shapes] == [shape['type'] for shape in expected[3]]
+    assert shapes[0]['center'] == pytest.approx(expected[3][0]['center'])
+    for vertex, expected_vertex in zip(shapes[1]['vertices'], expected[3][1]['vertices']):
+        assert vertex == pytest.approx(expected_vertex)
+    # 缓存随加载重建
+    assert len(canvas.spatial_index.boxes) == len(points) + len(lines) + len(shapes)
+
+
+def test_load_emits_clear_then_load(canvas, tmp_path):
+    fill(canvas)
+    path = str(tmp_path / 'scene.jsonl')
+    save_scene(canvas, path)
+    edits = []
+    canvas.scene_edited.connect(edits.append)
+    load_scene(canvas, path)
+    assert [edit['op'] for edit in edits] == ['clear', 'load']
+    assert edits[1]['format'] == 'jsonl'
+
+
+@pytest.mark.parametrize('header', [
+    '',
+    'not json',
+    '[1, 2]',
+    '{"format": "autre", "version": 1}',
+    '{"format": "geometry-scene", "version": "2"}',
+    '{"format": "geometry-scene", "version": 99}',
+])
+def test_read_header_rejects(header):
+    with pytest.raises(ValueError):
+        read_header(io.StringIO(header + '\n' if header else ''))
+
+
+@pytest.mark.parametrize('record', [
+    [1, 2],
+    {'kind': 'inconnu'},
+    {'kind': 'point', 'x': 1},
+    {'kind': 'point', 'x': 'a', 'y': 1, 'color': '#000000'},
+    {'kind': 'point', 'x': True, 'y': 1, 'color': '#000000'},
+    {'kind': 'point', 'x': 1, 'y': 1, 'color': 3},
+    {'kind': 'line', 'x1': 0, 'y1': 0, 'x2': 1, 'y2': 1, 'color': '#000000', 'text': 5},
+    {'kind': 'shape', 'type': 'circle', 'center': [0], 'radius': 1},
+    {'kind': 'shape', 'type': 'circle', 'center': [0, 0], 'radius': None},
+    {'kind': 'shape', 'type': 'triangle', 'vertices': 'abc'},
+    {'kind': 'shape', 'type': 'triangle', 'vertices': [[0, 0], [1, 0], [0, 1, 2]]},
+])
+def test_record_to_item_rejects_with_value_error(record):
+    with pytest.raises(ValueError):
+        record_to_item(record, (400, 300, 50))
+
+
+@pytest.mark.parametrize('bad_line', [
+    '{"kind": "point", "x": "a", "y": 1, "color": "#000000"}',
+    '[1, 2]',
+    '{tronqué',
+])
+def test_corrupt_file_leaves_scene_untouched(canvas, tmp_path, bad_line):
+    fill(canvas)
+    before = scene_of(canvas)
+    good = {'kind': 'point', 'x': 0, 'y': 0, 'color': '#E65100'}
+    path = write_lines(tmp_path / 'bad.jsonl',
+                       [json.dumps(scene_header()), json.dumps(good), bad_line, json.dumps(good)])
+    with pytest.raises(ValueError):
+        load_scene(canvas, path)
+    assert scene_of(canvas) == before
+
+
+def test_string_version_is_value_error(canvas, tmp_path):
+    path = write_lines(tmp_path / 'version.jsonl', ['{"format": "geometry-scene", "version": "1"}'])
+    with pytest.raises(ValueError):
+        load_scene(canvas, path)
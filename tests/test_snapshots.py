@@ -0,0 +1,68 @@
+"""场景快照：比较、恢复（可撤销）和快照数上限"""
+from modules.snapshots import HistoryBrowser, SnapshotStore
+from modules.undo import UndoStack
+
+
+def add_points(canvas, qapp, count):
+    """每个点是单独的一步（每次编辑后处理事件，拍一次自动快照）"""
+    for i in range(count):
+        canvas.add_point(10 + i * 5, 10, '#E65100')
+        qapp.processEvents()
+
+
+def test_diff_reports_changed_items(canvas, qapp):
+    store = SnapshotStore(canvas)
+    canvas.add_point(10, 10, '#E65100')
+    store.snapshot()
+    canvas.add_point(20, 10, '#E65100')
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 50, 'color': '#1B5E20'})
+    store.snapshot()
+    assert store.diff(0, 1) == {'points': [1], 'lines': [], 'shapes': [0]}
+    assert store.diff(1, 1) == {'points': [], 'lines': [], 'shapes': []}
+
+
+def test_restore_writes_back_and_is_undoable(canvas, qapp):
+    store = SnapshotStore(canvas, auto=True)
+    undo = UndoStack(canvas)
+    add_points(canvas, qapp, 3)
+    assert [len(version.points) for version in store.versions] == [1, 2, 3]
+
+    store.restore(0)
+    qapp.processEvents()
+    assert len(canvas.points) == 1
+    assert store.versions[-1].label == "Retour à l'étape 1"
+    assert len(store.versions[-1].points) == 1
+
+    undo.undo()
+    qapp.processEvents()
+    assert len(canvas.points) == 3
+    assert len(store.current.points) == 3
+
+
+def test_oldest_snapshots_are_pruned(canvas, qapp):
+    store = SnapshotStore(canvas, auto=True, max_versions=4)
+    add_points(canvas, qapp, 6)
+    assert len(store.versions) == 4
+    assert store.pruned == 2
+    assert [len(version.points) for version in store.versions] == [3, 4, 5, 6]
+    assert store.snapshot() == 3
+
+
+def test_browser_compares_and_restores(canvas, qapp):
+    store = SnapshotStore(canvas, auto=True)
+    add_points(canvas, qapp, 3)
+    browser = HistoryBrowser(store)
+    assert browser.list.count() == 3
+    assert browser.list.item(0).text().startswith("Étape 3")
+
+    browser.list.item(0).setSelected(True)
+    browser.compare_selected()
+    assert "De l'étape 2 à l'étape 3" in browser.summary.text()
+    assert "points: 1" in browser.summary.text()
+
+    browser.list.clearSelection()
+    browser.list.item(2).setSelected(True)
+    browser.restore_selected()
+    assert len(canvas.points) == 1
+    assert browser.list.count() == 4
+    browser.deleteLater()
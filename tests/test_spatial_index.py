@@ -0,0 +1,41 @@
+"""空间索引：查询、大图形和很大的查询范围"""
+import time
+
+from modules.spatial_index import MAX_ITEM_CELLS, GridIndex
+
+
+def test_query_returns_intersecting_boxes():
+    index = GridIndex()
+    index.insert(('point', 0), (10, 10, 10, 10))
+    index.insert(('line', 0), (0, 0, 300, 20))
+    index.insert(('shape', 0), (500, 500, 600, 600))
+    assert index.query((5, 5, 15, 15)) == {('point', 0), ('line', 0)}
+    assert index.query_point(550, 550, 1) == {('shape', 0)}
+    index.insert(('shape', 0), (0, 0, 1, 1))  # 更新包围盒
+    assert index.query_point(550, 550, 1) == set()
+    index.remove(('line', 0))
+    assert index.query((0, 0, 1000, 1000)) == {('point', 0), ('shape', 0)}
+
+
+def test_large_items_do_not_fill_cells(canvas):
+    start = time.perf_counter()
+    canvas.add_line(0, 0, 200000, 200000, '#0277BD')
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 1e6, 'color': '#1B5E20'})
+    assert time.perf_counter() - start < 1
+    index = canvas.spatial_index
+    assert index.large == {('line', 0), ('shape', 0)}
+    assert len(index.cells) <= MAX_ITEM_CELLS
+    assert index.query_point(100000, 100000, 1) == {('line', 0), ('shape', 0)}
+    assert ('line', 0) not in index.query((-50, 500, -10, 600))
+    canvas.remove_items([('line', 0)])
+    assert index.large == {('shape', 0)}
+
+
+def test_huge_query_scans_occupied_cells():
+    index = GridIndex()
+    index.insert(('point', 0), (10, 10, 10, 10))
+    index.insert(('point', 1), (1e9, 1e9, 1e9, 1e9))
+    start = time.perf_counter()
+    assert index.query((-1e9, -1e9, 2e9, 2e9)) == {('point', 0), ('point', 1)}
+    assert index.query((0, 0, 1e8, 1e8)) == {('point', 0)}
+    assert time.perf_counter() - start < 1
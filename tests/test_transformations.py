@@ -0,0 +1,70 @@
+"""几何变换：对话框生成的变换和对选择的应用"""
+import pytest
+
+from modules.transformations import AffineTransform, TransformDialog, apply_transform
+from modules.undo import UndoStack
+
+
+@pytest.mark.parametrize('kind, values, expected', [
+    (0, [2.0, -1.0], (3.0, 0.0)),
+    (1, [90.0, 0.0, 0.0], (-1.0, 1.0)),
+    (2, [2.0, 1.0, 0.0], (1.0, 2.0)),
+    (3, [0.0, 0.0, 0.0, 1.0], (-1.0, 1.0)),
+])
+def test_dialog_builds_each_transform(qapp, kind, values, expected):
+    dialog = TransformDialog()
+    dialog.kind.setCurrentIndex(kind)
+    for spin, value in zip(dialog.spins[kind], values):
+        spin.setValue(value)
+    assert dialog.transform().map_point(1.0, 1.0) == pytest.approx(expected)
+
+
+def test_dialog_rejects_degenerate_axis(qapp):
+    dialog = TransformDialog()
+    dialog.kind.setCurrentIndex(3)
+    for spin in dialog.spins[3]:
+        spin.setValue(1.0)
+    with pytest.raises(ValueError):
+        dialog.transform()
+
+
+def test_selection_is_transformed_as_copy(canvas):
+    canvas.add_line(*canvas.grid_to_screen(0, 0), *canvas.grid_to_screen(2, 0), '#0277BD')
+    canvas.add_line(*canvas.grid_to_screen(0, 1), *canvas.grid_to_screen(2, 1), '#0277BD')
+    canvas.selection = {('line', 0)}
+    dialog = TransformDialog(len(canvas.selection))
+    dialog.kind.setCurrentIndex(0)
+    dialog.spins[0][0].setValue(0.0)
+    dialog.spins[0][1].setValue(3.0)
+
+    keys = apply_transform(canvas, dialog.transform(), copy=True)
+    assert keys == [('line', 2)]
+    line = canvas.lines[2]
+    assert canvas.screen_to_grid(line['x1'], line['y1']) == pytest.approx((0.0, 3.0))
+    assert canvas.screen_to_grid(canvas.lines[1]['x1'], canvas.lines[1]['y1']) == pytest.approx((0.0, 1.0))
+    assert canvas.selection == {('line', 2)}
+
+
+def test_copies_are_welded_to_existing_vertices(canvas):
+    stack = UndoStack(canvas)
+    canvas.add_point(*canvas.grid_to_screen(0, 0), '#E65100')
+    canvas.add_point(*canvas.grid_to_screen(2, 0), '#E65100')
+    canvas.add_line(*canvas.grid_to_screen(0, 0), *canvas.grid_to_screen(2, 0), '#0277BD')
+    stack.close_group()
+
+    # 副本的起点落在原线段的终点上
+    keys = apply_transform(canvas, AffineTransform().translate(2, 0), copy=True)
+    stack.close_group()
+    assert sorted(keys) == [('line', 1), ('point', 1), ('point', 2)]
+    assert len(canvas.points) == 3 and len(canvas.lines) == 2
+    shared = canvas.topology.find_vertex(*canvas.grid_to_screen(2, 0))
+    assert canvas.topology.point_of[shared] == 1
+    assert canvas.topology.line_between(*canvas.grid_to_screen(2, 0), *canvas.grid_to_screen(4, 0)) == 1
+    assert canvas.line_texts[1] == "2.0"
+
+    # 与原图形完全重合的副本不添加任何图形
+    assert apply_transform(canvas, AffineTransform().translate(0, 0), [('line', 0)], copy=True) == [('line', 0)]
+    assert (len(canvas.points), len(canvas.lines)) == (3, 2)
+
+    stack.undo()  # 复制是一次编辑
+    assert (len(canvas.points), len(canvas.lines)) == (2, 1)
@@ -0,0 +1,94 @@
+"""三角形分析：已知三角形的外心、垂心、内心和分类，单个分析和批量分析（NumPy 与纯 Python）"""
+import math
+
+import pytest
+
+from modules import triangle_analysis
+from modules.triangle_analysis import (ANGLE_TYPES, SIDE_TYPES, analyze_triangle, analyze_triangles,
+                                       triangle_vertices)
+
+SQRT3, SQRT5 = math.sqrt(3), math.sqrt(5)
+_P = 3 * math.sqrt(2) + math.sqrt(10) + 4  # (0,0) (4,0) (1,3) 的周长
+
+# 顶点、外心、外接圆半径、垂心、内心、内切圆半径、角度分类、边长分类
+KNOWN = {
+    'rectangle 3-4-5': ([(0, 0), (4, 0), (0, 3)], (2, 1.5), 2.5, (0, 0), (1, 1), 1, 'right', 'scalene'),
+    'acutangle': ([(0, 0), (4, 0), (1, 3)], (2, 1), SQRT5, (1, 1),
+                  ((4 * math.sqrt(10) + 4) / _P, 12 / _P), 12 / _P, 'acute', 'scalene'),
+    'obtusangle isocèle': ([(0, 0), (4, 0), (2, 1)], (2, -1.5), 2.5, (2, 4), (2, 2 * SQRT5 - 4), 2 * SQRT5 - 4,
+                           'obtuse', 'isosceles'),
+    'rectangle isocèle': ([(0, 0), (2, 0), (0, 2)], (1, 1), math.sqrt(2), (0, 0),
+                          (2 - math.sqrt(2), 2 - math.sqrt(2)), 2 - math.sqrt(2), 'right', 'isosceles'),
+    'équilatéral': ([(0, 0), (2, 0), (1, SQRT3)], (1, SQRT3 / 3), 2 / SQRT3, (1, SQRT3 / 3), (1, SQRT3 / 3),
+                    1 / SQRT3, 'acute', 'equilateral'),
+    'translaté': ([(1000, -500), (1004, -500), (1001, -497)], (1002, -499), SQRT5, (1001, -499),
+                  (1000 + (4 * math.sqrt(10) + 4) / _P, -500 + 12 / _P), 12 / _P, 'acute', 'scalene'),
+}
+DEGENERATE = [(0, 0), (1, 1), (3, 3)]
+
+
+def approx(point):
+    return pytest.approx(point, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize('name', KNOWN)
+def test_single_triangle(name):
+    vertices, circumcenter, circumradius, orthocenter, incenter, inradius, angle_type, side_type = KNOWN[name]
+    result = analyze_triangle(vertices)
+    assert result.circumcenter == approx(circumcenter)
+    assert result.circumradius == approx(circumradius)
+    assert result.orthocenter == approx(orthocenter)
+    assert result.incenter == approx(incenter)
+    assert result.inradius == approx(inradius)
+    assert (result.angle_type, result.side_type) == (angle_type, side_type)
+    assert sum(result.angles) == approx(180)
+    # 欧拉线：重心在外心和垂心之间的三分之一处
+    assert result.centroid == approx(tuple((2 * o + h) / 3 for o, h in zip(circumcenter, orthocenter)))
+
+
+def test_degenerate_triangle():
+    result = analyze_triangle({'vertices': DEGENERATE})
+    assert result.angle_type == 'degenerate' and result.area == 0
+    assert result.circumcenter is None and result.orthocenter is None and result.circumradius is None
+    with pytest.raises(ValueError):
+        triangle_vertices([(0, 0), (1, 0)])
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def batch_path(request, monkeypatch):
+    """批量分析的两条路径：NumPy 向量化，以及模拟未安装 NumPy 时的逐个计算"""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(triangle_analysis, 'np', None)
+    return request.param
+
+
+def test_batch_matches_known_triangles(batch_path):
+    names = list(KNOWN)
+    triangles = [KNOWN[name][0] for name in names] + [DEGENERATE]
+    columns = analyze_triangles(triangles)
+    for row, name in enumerate(names):
+        _, circumcenter, circumradius, orthocenter, incenter, inradius, angle_type, side_type = KNOWN[name]
+        assert tuple(columns['circumcenter'][row]) == approx(circumcenter)
+        assert float(columns['circumradius'][row]) == approx(circumradius)
+        assert tuple(columns['orthocenter'][row]) == approx(orthocenter)
+        assert tuple(columns['incenter'][row]) == approx(incenter)
+        assert float(columns['inradius'][row]) == approx(inradius)
+        assert ANGLE_TYPES[columns['angle_type'][row]] == angle_type
+        assert SIDE_TYPES[columns['side_type'][row]] == side_type
+
+    last = len(names)
+    assert ANGLE_TYPES[columns['angle_type'][last]] == 'degenerate'
+    if batch_path == 'numpy':
+        assert all(math.isnan(value) for value in columns['circumcenter'][last])
+        assert math.isnan(columns['circumradius'][last])
+    else:
+        assert columns['circumcenter'][last] is None and columns['circumradius'][last] is None
+
+
+def test_batch_accepts_flat_rows_and_dicts(batch_path):
+    flat = [sum(KNOWN['acutangle'][0], ()), {'vertices': KNOWN['équilatéral'][0]}]
+    columns = analyze_triangles(flat)
+    assert [SIDE_TYPES[code] for code in columns['side_type']] == ['scalene', 'equilateral']
+    assert [float(area) for area in columns['area']] == approx([6, SQRT3])
@@ -0,0 +1,129 @@
+"""撤销/重做：每种命令的撤销和重做，以及命令基类"""
+import pytest
+
+from modules.scene_io import load_scene, save_scene
+from modules.transformations import AffineTransform, apply_transform
+from modules.undo import (AddItemsCommand, Command, CompositeCommand, RemoveItemsCommand,
+                          ReplaceSceneCommand, SetItemsCommand, UndoStack)
+
+
+@pytest.fixture
+def stack(canvas):
+    return UndoStack(canvas)
+
+
+def scene(canvas):
+    return ([(p['x'], p['y']) for p in canvas.points],
+            [(l['x1'], l['y1'], l['x2'], l['y2']) for l in canvas.lines],
+            list(canvas.line_texts),
+            [s['type'] for s in canvas.shapes])
+
+
+def record(stack, edit):
+    """执行一次编辑并结束分组，返回压入的命令"""
+    edit()
+    stack.close_group()
+    return stack.undo_commands[-1]
+
+
+def check_undo_redo(stack, canvas, before, after):
+    stack.undo()
+    assert scene(canvas) == before
+    stack.redo()
+    assert scene(canvas) == after
+
+
+def test_command_is_abstract():
+    with pytest.raises(TypeError):
+        Command()
+
+
+def test_add(canvas, stack):
+    before = scene(canvas)
+    command = record(stack, lambda: canvas.add_point(100, 100, '#E65100'))
+    assert isinstance(command, AddItemsCommand)
+    check_undo_redo(stack, canvas, before, scene(canvas))
+
+
+def test_remove(canvas, stack):
+    canvas.add_point(100, 100, '#E65100')
+    canvas.add_line(100, 100, 300, 100, '#0277BD')
+    stack.close_group()
+    before = scene(canvas)
+    command = record(stack, lambda: canvas.remove_items([('point', 0), ('line', 0)]))
+    assert isinstance(command, RemoveItemsCommand)
+    assert scene(canvas) == ([], [], [], [])
+    check_undo_redo(stack, canvas, before, ([], [], [], []))
+
+
+def test_set(canvas, stack):
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 50, 'color': '#1B5E20'})
+    stack.close_group()
+    before = [dict(canvas.shapes[0])]
+    command = record(stack, lambda: apply_transform(canvas, AffineTransform().translate(2, 0)))
+    assert isinstance(command, SetItemsCommand)
+    after = [dict(canvas.shapes[0])]
+    assert after[0]['center'] != before[0]['center']
+    stack.undo()
+    assert canvas.shapes[0]['center'] == before[0]['center']
+    stack.redo()
+    assert canvas.shapes[0]['center'] == after[0]['center']
+
+
+def test_clear(canvas, stack):
+    canvas.add_point(100, 100, '#E65100')
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 50, 'color': '#1B5E20'})
+    stack.close_group()
+    before = scene(canvas)
+    command = record(stack, canvas.clear)
+    assert isinstance(command, ReplaceSceneCommand)
+    check_undo_redo(stack, canvas, before, ([], [], [], []))
+
+
+def test_load(canvas, stack, tmp_path):
+    path = str(tmp_path / 'scene.geo.jsonl')
+    canvas.add_line(100, 100, 300, 100, '#0277BD')
+    save_scene(canvas, path)
+    canvas.clear()
+    canvas.add_point(50, 50, '#E65100')
+    stack.close_group()
+    before = scene(canvas)
+    command = record(stack, lambda: load_scene(canvas, path))
+    assert isinstance(command, ReplaceSceneCommand)
+    loaded = scene(canvas)
+    assert len(loaded[1]) == 1 and not loaded[0]
+    check_undo_redo(stack, canvas, before, loaded)
+
+
+def test_edits_in_one_turn_are_one_command(canvas, stack):
+    before = scene(canvas)
+
+    def draw():
+        canvas.add_point(100, 100, '#E65100')
+        canvas.add_point(300, 100, '#E65100')
+        canvas.add_line(100, 100, 300, 100, '#0277BD')
+
+    command = record(stack, draw)
+    assert isinstance(command, CompositeCommand)
+    assert len(stack.undo_commands) == 1
+    check_undo_redo(stack, canvas, before, scene(canvas))
+
+
+def test_new_edit_clears_redo(canvas, stack):
+    record(stack, lambda: canvas.add_point(100, 100, '#E65100'))
+    stack.undo()
+    assert stack.can_redo()
+    record(stack, lambda: canvas.add_point(200, 100, '#E65100'))
+    assert not stack.can_redo()
+
+
+def test_budget_merges_oldest_modifications(canvas):
+    canvas.add_shape({'type': 'circle', 'center': (400, 300), 'radius': 50, 'color': '#1B5E20'})
+    start = canvas.shapes[0]['center']
+    stack = UndoStack(canvas, max_bytes=1)
+    for _ in range(5):
+        record(stack, lambda: apply_transform(canvas, AffineTransform().translate(1, 0)))
+    assert len(stack.undo_commands) == 1
+    assert stack.total_bytes == stack.undo_commands[0].size
+    stack.undo()
+    assert canvas.shapes[0]['center'] == start